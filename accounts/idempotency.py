@@ -0,0 +1,120 @@
+"""
+Duplicate-submit protection for state-changing POST views.
+
+Forms carry a one-time key ({% idempotency_field %} from the idempotency
+template library, or an Idempotency-Key header for API and HTMX clients).
+The @idempotent decorator claims the key by inserting an IdempotencyKey row
+— unique per user — before the view runs, then stores the response. A
+second POST with the same key (a double tap, a retry after a timeout) loses
+the insert race and, instead of running the view again, waits for the first
+request to finish and replays its response.
+
+Error responses (4xx/5xx) and exceptions release the key so the user can
+retry, as do responses too large to replay (a streamed or over-MAX_BODY
+page that is not a redirect). Keys older than IDEMPOTENCY_KEY_TTL_HOURS are deleted by the
+accounts.tasks.purge_idempotency_keys task.
+
+Usage:
+    @role_required(Role.COUNTER, Role.OWNER)
+    @idempotent
+    def payment_screen(request, job_id): ...
+"""
+
+import time
+import uuid
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+
+from .models import IdempotencyKey
+
+FORM_FIELD = "idempotency_key"
+HEADER = "Idempotency-Key"
+MAX_BODY = 256 * 1024
+WAIT_SECONDS = 10
+POLL_INTERVAL = 0.05
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def _key(request):
+    return (request.POST.get(FORM_FIELD) or request.headers.get(HEADER, "")).strip()[:64]
+
+
+def _replayable(response):
+    if response.has_header("Location"):
+        return True
+    return not response.streaming and len(response.content) <= MAX_BODY
+
+
+def _store(record, response):
+    record.status_code = response.status_code
+    record.location = response.get("Location", "")[:500]
+    record.content_type = response.get("Content-Type", "")[:100]
+    if not response.streaming:
+        record.body = response.content.decode(response.charset or "utf-8", errors="replace")
+    record.save(update_fields=["status_code", "location", "content_type", "body"])
+
+
+def _replay(record):
+    if record.location:
+        response = HttpResponseRedirect(record.location, status=record.status_code)
+    else:
+        response = HttpResponse(
+            record.body, status=record.status_code, content_type=record.content_type or None
+        )
+    response["Idempotent-Replay"] = "true"
+    return response
+
+
+def _wait_for(user, key, scope):
+    """The finished record for `key`, waiting for a request still in flight."""
+    deadline = time.monotonic() + WAIT_SECONDS
+    while True:
+        record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record is None:
+            # the first request failed and released the key
+            return None
+        if record.scope != scope:
+            return HttpResponse("คีย์นี้ถูกใช้กับรายการอื่นแล้ว", status=422)
+        if record.status_code is not None:
+            return _replay(record)
+        if time.monotonic() >= deadline:
+            return HttpResponse("รายการนี้กำลังดำเนินการ กรุณารอสักครู่", status=409)
+        time.sleep(POLL_INTERVAL)
+
+
+def idempotent(view_func):
+    """Run a POST at most once per idempotency key; repeats get the first response."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = _key(request) if request.method == "POST" else ""
+        if not key or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+
+        scope = f"{view_func.__module__}.{view_func.__name__}"
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(user=request.user, key=key, scope=scope)
+        except IntegrityError:
+            replay = _wait_for(request.user, key, scope)
+            if replay is not None:
+                return replay
+            return HttpResponse("รายการก่อนหน้าไม่สำเร็จ กรุณาส่งใหม่อีกครั้ง", status=409)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 400 or not _replayable(response):
+            record.delete()
+        else:
+            _store(record, response)
+        return response
+
+    return wrapper
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0002_user_line_display_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("scope", models.CharField(max_length=100, verbose_name="หน้าจอ")),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("status_code", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("location", models.CharField(blank=True, max_length=500)),
+                ("content_type", models.CharField(blank=True, max_length=100)),
+                ("body", models.TextField(blank=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "คีย์กันส่งซ้ำ",
+                "verbose_name_plural": "คีย์กันส่งซ้ำ",
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "key"), name="uniq_idempotency_key")
+                ],
+            },
+        ),
+    ]
@@ -73,3 +73,32 @@ class User(AbstractUser):
     def has_any_role(self, *roles):
         """Check if user has one of the given roles."""
         return self.role in roles
+
+
+class IdempotencyKey(models.Model):
+    """
+    A form submission already handled, and the response it produced.
+
+    Written by the accounts.idempotency.idempotent decorator; a repeated POST
+    with the same key gets the stored response instead of running again.
+    status_code stays null while the first request is still running.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=64)
+    scope = models.CharField(max_length=100, verbose_name="หน้าจอ")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    location = models.CharField(max_length=500, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "คีย์กันส่งซ้ำ"
+        verbose_name_plural = "คีย์กันส่งซ้ำ"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="uniq_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
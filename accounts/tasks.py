@@ -0,0 +1,18 @@
+"""Celery tasks for the accounts app."""
+
+from celery import shared_task
+
+
+@shared_task(name="accounts.tasks.purge_idempotency_keys")
+def purge_idempotency_keys():
+    """Delete idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS."""
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.utils import timezone
+
+    from .models import IdempotencyKey
+
+    cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return f"idempotency keys purged: {deleted}"
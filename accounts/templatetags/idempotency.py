@@ -0,0 +1,25 @@
+"""
+One-time form keys for the @idempotent decorator (accounts/idempotency.py).
+
+Usage in templates:
+    {% load idempotency %}
+    <form method="post">{% csrf_token %}{% idempotency_field %} ...</form>
+    <button hx-post="..." hx-headers='{"Idempotency-Key": "{% idempotency_key %}"}'>
+"""
+
+from django import template
+from django.utils.html import format_html
+
+from accounts.idempotency import FORM_FIELD, new_key
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_key():
+    return new_key()
+
+
+@register.simple_tag
+def idempotency_field():
+    return format_html('<input type="hidden" name="{}" value="{}">', FORM_FIELD, new_key())
@@ -0,0 +1,172 @@
+"""Tests for duplicate-submit protection (accounts/idempotency.py)."""
+
+import threading
+
+import pytest
+from django.db import connection
+from django.template import Context, Template
+from django.test import Client
+from django.urls import reverse
+
+from accounts import idempotency
+from accounts.models import IdempotencyKey
+from documents.models import Document, DocumentType
+from jobs.models import JobStatus, JobStatusHistory
+from payments.models import Payment
+
+PAYMENT = {"amount": "100", "method": "cash", "idempotency_key": "k-1"}
+PAYMENT_SCOPE = "payments.views.payment_screen"
+
+
+def _parallel(user, count, url, data):
+    """POST `data` to `url` from `count` threads at once, as `user`; returns the responses."""
+    clients = []
+    for _ in range(count):
+        clients.append(Client())
+        clients[-1].force_login(user)
+    barrier = threading.Barrier(count)
+    responses = [None] * count
+
+    def run(index):
+        try:
+            barrier.wait()
+            responses[index] = clients[index].post(url, data)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+@pytest.mark.django_db
+class TestIdempotent:
+    def test_replay_returns_first_response(self, client, counter_user, job):
+        client.force_login(counter_user)
+        url = reverse("payments:pay", args=[job.pk])
+
+        first = client.post(url, PAYMENT)
+        second = client.post(url, PAYMENT)
+
+        assert Payment.objects.count() == 1
+        assert second.status_code == first.status_code == 302
+        assert second.url == first.url
+        assert second["Idempotent-Replay"] == "true"
+
+    def test_htmx_partial_is_replayed(self, client, owner_user, job):
+        client.force_login(owner_user)
+        url = reverse("jobs:update_status", args=[job.pk])
+        data = {"status": JobStatus.DESIGNING, "idempotency_key": "k-2"}
+
+        first = client.post(url, data, HTTP_HX_REQUEST="true")
+        second = client.post(url, data, HTTP_HX_REQUEST="true")
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert JobStatusHistory.objects.filter(job=job, to_status=JobStatus.DESIGNING).count() == 1
+
+    def test_error_releases_key(self, client, owner_user, job):
+        client.force_login(owner_user)
+        url = reverse("jobs:update_status", args=[job.pk])
+
+        assert client.post(url, {"status": "bogus", "idempotency_key": "k-3"}).status_code == 400
+        assert not IdempotencyKey.objects.exists()
+        response = client.post(url, {"status": JobStatus.DESIGNING, "idempotency_key": "k-3"})
+        assert response.status_code == 200
+
+    def test_oversized_response_releases_key(self, client, owner_user, job, monkeypatch):
+        monkeypatch.setattr(idempotency, "MAX_BODY", 10)
+        client.force_login(owner_user)
+        url = reverse("jobs:update_status", args=[job.pk])
+        data = {"status": JobStatus.DESIGNING, "idempotency_key": "k-9"}
+
+        response = client.post(url, data, HTTP_HX_REQUEST="true")
+
+        assert response.status_code == 200
+        assert not IdempotencyKey.objects.exists()
+
+    def test_key_from_another_view_is_rejected(self, client, counter_user, job):
+        client.force_login(counter_user)
+        client.post(reverse("payments:pay", args=[job.pk]), PAYMENT)
+
+        response = client.post(
+            reverse("documents:create_tax_invoice", args=[job.pk]), {"idempotency_key": "k-1"}
+        )
+
+        assert response.status_code == 422
+        assert not Document.objects.exists()
+
+    def test_keys_are_per_user(self, client, counter_user, owner_user, job):
+        url = reverse("payments:pay", args=[job.pk])
+        client.force_login(counter_user)
+        client.post(url, PAYMENT)
+        client.force_login(owner_user)
+        client.post(url, PAYMENT)
+
+        assert Payment.objects.count() == 2
+
+    def test_without_key_runs_every_time(self, client, counter_user, job):
+        client.force_login(counter_user)
+        url = reverse("documents:create_quotation", args=[job.pk])
+
+        client.post(url)
+        client.post(url)
+
+        assert Document.objects.filter(document_type=DocumentType.QUOTATION).count() == 2
+        assert client.get(url).status_code == 405
+
+    def test_waits_for_the_request_in_flight(self, client, counter_user, job, monkeypatch):
+        IdempotencyKey.objects.create(user=counter_user, key="k-4", scope=PAYMENT_SCOPE)
+
+        def first_request_finishes(seconds):
+            IdempotencyKey.objects.filter(key="k-4").update(status_code=302, location="/done/")
+
+        monkeypatch.setattr(idempotency.time, "sleep", first_request_finishes)
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("payments:pay", args=[job.pk]), {**PAYMENT, "idempotency_key": "k-4"}
+        )
+
+        assert response.url == "/done/"
+        assert not Payment.objects.exists()
+
+    def test_gives_up_waiting(self, client, counter_user, job, monkeypatch):
+        IdempotencyKey.objects.create(user=counter_user, key="k-5", scope=PAYMENT_SCOPE)
+        monkeypatch.setattr(idempotency, "WAIT_SECONDS", 0)
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("payments:pay", args=[job.pk]), {**PAYMENT, "idempotency_key": "k-5"}
+        )
+
+        assert response.status_code == 409
+        assert not Payment.objects.exists()
+
+    def test_template_tag(self):
+        html = Template("{% load idempotency %}{% idempotency_field %}").render(Context())
+        assert html.startswith('<input type="hidden" name="idempotency_key" value="')
+
+
+@pytest.mark.skipif(
+    connection.vendor == "sqlite",
+    reason="SQLite's shared in-memory test database rejects concurrent writers",
+)
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentSubmits:
+    def test_parallel_payment_submits_record_once(self, counter_user, job):
+        responses = _parallel(counter_user, 6, reverse("payments:pay", args=[job.pk]), PAYMENT)
+
+        assert Payment.objects.count() == 1
+        assert {r.status_code for r in responses} == {302}
+        assert sum(r.has_header("Idempotent-Replay") for r in responses) == 5
+
+    def test_parallel_tax_invoice_submits_issue_once(self, counter_user, job):
+        url = reverse("documents:create_tax_invoice", args=[job.pk])
+        responses = _parallel(counter_user, 6, url, {"idempotency_key": "k-9"})
+
+        assert Document.objects.filter(document_type=DocumentType.TAX_INVOICE).count() == 1
+        assert len({r.url for r in responses}) == 1
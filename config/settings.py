@@ -120,6 +120,10 @@ LOGOUT_REDIRECT_URL = "/accounts/login/"
 # Redis (Celery broker — Phase 2)
 REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
 
+# Cache — shared Redis so an invalidation in one process (web, celery) is seen by all.
+# Use CACHE_URL=locmemcache:// for a single-process setup without Redis.
+CACHES = {"default": env.cache("CACHE_URL", default="redis://redis:6379/1")}
+
 # Celery (Phase 2)
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -145,6 +149,35 @@ DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="noreply@printshop.local"
 # Base URL used in notification messages (e.g. tracking links in LINE messages)
 BASE_URL = env("BASE_URL", default="http://localhost:8000")
 
+# Retention for append-only logs — older rows are exported to gzip JSONL under
+# ARCHIVE_PREFIX in default storage and removed by `manage.py archive_history`
+JOB_HISTORY_RETENTION_DAYS = env.int("JOB_HISTORY_RETENTION_DAYS", default=365)
+NOTIFICATION_LOG_RETENTION_DAYS = env.int("NOTIFICATION_LOG_RETENTION_DAYS", default=90)
+ARCHIVE_PREFIX = env("ARCHIVE_PREFIX", default="archive")
+
+# Customer autocomplete answers from a per-worker in-memory index
+# (customers/autocomplete.py); False falls back to the icontains query.
+CUSTOMER_AUTOCOMPLETE_INDEX = env.bool("CUSTOMER_AUTOCOMPLETE_INDEX", default=True)
+
+# Batch PDF runs (monthly billing) render on this many processes (documents/pdf.py)
+PDF_RENDER_WORKERS = env.int("PDF_RENDER_WORKERS", default=4)
+
+# How long a submitted form's idempotency key is remembered (accounts/idempotency.py)
+IDEMPOTENCY_KEY_TTL_HOURS = env.int("IDEMPOTENCY_KEY_TTL_HOURS", default=24)
+
+# Material forecast (production/forecast.py): usage history window, and how
+# soon a predicted stock-out has to be before send_material_alerts warns
+MATERIAL_FORECAST_LOOKBACK_DAYS = env.int("MATERIAL_FORECAST_LOOKBACK_DAYS", default=30)
+MATERIAL_ALERT_DAYS = env.int("MATERIAL_ALERT_DAYS", default=7)
+
+# Due-date estimates at intake (jobs/promise.py) learn from this many days of history
+LEAD_TIME_HISTORY_DAYS = env.int("LEAD_TIME_HISTORY_DAYS", default=90)
+
+# Public tracking page (public/tracking.py): requests allowed per minute from one
+# client IP and for one tracking link before answering 429; 0 turns a limit off
+PUBLIC_TRACKING_RATE_PER_IP = env.int("PUBLIC_TRACKING_RATE_PER_IP", default=60)
+PUBLIC_TRACKING_RATE_PER_TOKEN = env.int("PUBLIC_TRACKING_RATE_PER_TOKEN", default=30)
+
 # Celery Beat — use DB scheduler so schedules are editable from Django Admin
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
@@ -159,6 +192,10 @@ CELERY_BEAT_SCHEDULE = {
         "task": "notifications.tasks.send_payment_reminders",
         "schedule": crontab(hour=9, minute=0),
     },
+    "material-forecast": {
+        "task": "production.tasks.forecast_materials",
+        "schedule": crontab(hour=8, minute=50),
+    },
     "material-alerts": {
         "task": "notifications.tasks.send_material_alerts",
         "schedule": crontab(hour=9, minute=5),
@@ -167,6 +204,30 @@ CELERY_BEAT_SCHEDULE = {
         "task": "notifications.tasks.send_approval_reminders",
         "schedule": crontab(hour=10, minute=0),
     },
+    "status-counter-reconcile": {
+        "task": "jobs.tasks.reconcile_status_counters",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "stock-reconcile": {
+        "task": "production.tasks.reconcile_stock",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "monthly-billing": {
+        "task": "documents.tasks.run_monthly_billing",
+        "schedule": crontab(day_of_month=1, hour=2, minute=0),
+    },
+    "purge-idempotency-keys": {
+        "task": "accounts.tasks.purge_idempotency_keys",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "lead-time-stats": {
+        "task": "jobs.tasks.refresh_lead_times",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "status-dwell-rollup": {
+        "task": "jobs.tasks.refresh_status_dwell",
+        "schedule": crontab(minute="*/15"),
+    },
 }
 
 # django-unfold Admin customisation
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from unfold.admin import ModelAdmin
 
 from .models import Customer, CustomerType
@@ -16,6 +16,7 @@ class CustomerAdmin(ModelAdmin):
     list_filter = ("customer_type", "is_corporate", "is_active")
     search_fields = ("name", "phone", "tax_id", "email")
     readonly_fields = ("created_at", "updated_at")
+    actions = ["merge_selected"]
 
     fieldsets = (
         ("ข้อมูลพื้นฐาน", {"fields": ("customer_type", "name", "phone", "email")}),
@@ -29,3 +30,27 @@ class CustomerAdmin(ModelAdmin):
         ("LINE & หมายเหตุ", {"fields": ("line_user_id", "notes"), "classes": ["collapse"]}),
         ("สถานะ", {"fields": ("is_active", "created_at", "updated_at")}),
     )
+
+    @admin.action(description="รวมลูกค้าที่เลือก (เก็บรายการหลักไว้ 1 รายการ)")
+    def merge_selected(self, request, queryset):
+        from .dedup import merge_customers, pick_survivor
+
+        customers = list(queryset.select_related("line_binding"))
+        if len(customers) < 2:
+            self.message_user(request, "เลือกลูกค้าอย่างน้อย 2 รายการ", messages.WARNING)
+            return
+        survivor = pick_survivor(customers)
+        result = merge_customers(survivor, customers, merged_by=request.user)
+        self.message_user(
+            request,
+            f"รวม {result['customers']} รายการเข้ากับ #{survivor.pk} {survivor.name} "
+            f"(ย้ายงาน {result['jobs']} งาน)",
+            messages.SUCCESS,
+        )
+        if result["unmoved"]:
+            self.message_user(
+                request,
+                f"มีใบกำกับภาษีรายเดือน/ใบแจ้งยอด {result['unmoved']} รายการที่ซ้ำเดือนกับรายการหลัก "
+                "จึงยังอยู่กับลูกค้าที่ถูกรวม",
+                messages.WARNING,
+            )
@@ -0,0 +1,302 @@
+"""
+In-process prefix index for the customer autocomplete.
+
+Each worker keeps a sorted array of search keys built from
+Customer.values("id", "name", "phone"); a lookup is a bisect to the first key
+with the query as prefix plus a short forward scan, so the per-keystroke cost
+is microseconds instead of a double `icontains` scan.
+
+A customer gets a handful of keys, so the index stays a few times the size
+of the customer table:
+  - the normalized name with spaces removed, from the start of each word and
+    from just after a leading honorific (dedup.HONORIFICS), cut to
+    MAX_KEY_LENGTH characters — "สมหญิง รักดี" and "กาแฟ" find
+    "คุณสมหญิง รักดี" and "ร้านกาแฟดอยช้าง";
+  - suffixes of the phone digits, so "234-56" finds 081-234-5678 however
+    the number was formatted.
+Thai is written without spaces, so text in the middle of a word ("ดอยช้าง")
+and phone tails shorter than MIN_PHONE_SUFFIX have no key: when the index
+returns fewer than `limit` rows, search() tops the list up from search_db(),
+so it never finds less than the original query did. Queries longer than
+MAX_KEY_LENGTH are matched on their first MAX_KEY_LENGTH characters and then
+checked against the name.
+
+Freshness: saving a customer bumps VERSION_KEY in the shared cache; deleting
+one bumps EPOCH_KEY. A worker checks the counters at most every
+CHECK_INTERVAL seconds — a VERSION change re-reads only customers updated
+since the last sync, an EPOCH change (or REBUILD_INTERVAL elapsing) rebuilds
+from scratch. search_db() is the original query and remains the fallback
+when CUSTOMER_AUTOCOMPLETE_INDEX is off.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+VERSION_KEY = "customers:autocomplete:version"
+EPOCH_KEY = "customers:autocomplete:epoch"
+LIMIT = 12
+CHECK_INTERVAL = 1.0
+REBUILD_INTERVAL = 3600
+# Re-read rows updated this long before the last sync, to cover commit lag.
+SYNC_OVERLAP = 5
+# Stop scanning after this many matching keys; short queries match a lot.
+MAX_SCAN = 2000
+MIN_PHONE_SUFFIX = 4
+# Name keys are cut to this many characters.
+MAX_KEY_LENGTH = 20
+
+_SPACES = re.compile(r"\s+")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize(text):
+    """Casefolded NFC text with punctuation/symbols removed and whitespace collapsed."""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    # Not a \w regex: Thai vowel and tone marks are not \w but are part of the word.
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def phone_digits(text):
+    return _NON_DIGITS.sub("", text or "")
+
+
+def keys_for(name, phone):
+    """Search keys for one customer (see module docstring)."""
+    from .dedup import normalize_name
+
+    words = normalize(name).split(" ")
+    keys = {"".join(words[i:])[:MAX_KEY_LENGTH] for i in range(len(words))}
+    keys.add(normalize_name(name)[:MAX_KEY_LENGTH])
+    digits = phone_digits(phone)
+    keys.update(digits[i:] for i in range(len(digits) - MIN_PHONE_SUFFIX + 1))
+    keys.discard("")
+    return keys
+
+
+def _contains(name, phone, text):
+    return text in normalize(name).replace(" ", "") or text in phone_digits(phone)
+
+
+class CustomerIndex:
+    """Sorted (key, id) arrays plus id → (name, phone) records."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._ids = []
+        self._records = {}
+        self._record_keys = {}
+        self.version = None
+        self.epoch = None
+        self.synced_at = None
+        self.built_at = 0.0
+        self.checked_at = 0.0
+
+    # -- building -----------------------------------------------------------
+
+    def build(self, rows):
+        """Replace the index with `rows` of (id, name, phone)."""
+        pairs = []
+        records = {}
+        record_keys = {}
+        for pk, name, phone in rows:
+            keys = keys_for(name, phone)
+            records[pk] = (name, phone)
+            record_keys[pk] = keys
+            pairs.extend((key, pk) for key in keys)
+        pairs.sort()
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._ids = [pk for _, pk in pairs]
+            self._records = records
+            self._record_keys = record_keys
+            self.built_at = time.monotonic()
+
+    def _remove(self, pk):
+        for key in self._record_keys.pop(pk, ()):
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._ids[i] == pk:
+                    del self._keys[i]
+                    del self._ids[i]
+                    break
+                i += 1
+        self._records.pop(pk, None)
+
+    def update(self, rows):
+        """Upsert `rows` of (id, name, phone, is_active); inactive rows are dropped."""
+        with self._lock:
+            for pk, name, phone, is_active in rows:
+                self._remove(pk)
+                if not is_active:
+                    continue
+                keys = keys_for(name, phone)
+                self._records[pk] = (name, phone)
+                self._record_keys[pk] = keys
+                for key in keys:
+                    i = bisect_left(self._keys, key)
+                    while i < len(self._keys) and self._keys[i] == key and self._ids[i] < pk:
+                        i += 1
+                    self._keys.insert(i, key)
+                    self._ids.insert(i, pk)
+
+    def __len__(self):
+        return len(self._records)
+
+    # -- querying -----------------------------------------------------------
+
+    def search(self, query, limit=LIMIT):
+        """Top `limit` customers (by name) with a key starting with the query."""
+        # "081-234-5678" normalizes to its digits, which match the phone suffix keys
+        prefix = normalize(query).replace(" ", "")
+        if not prefix:
+            return []
+
+        matched = set()
+        key = prefix[:MAX_KEY_LENGTH]
+        with self._lock:
+            i = bisect_left(self._keys, key)
+            end = min(len(self._keys), i + MAX_SCAN)
+            while i < end and self._keys[i].startswith(key):
+                matched.add(self._ids[i])
+                i += 1
+            records = [(self._records[pk][0], pk, self._records[pk][1]) for pk in matched]
+        if key != prefix:
+            records = [r for r in records if _contains(r[0], r[2], prefix)]
+        records.sort()
+        return [{"id": pk, "name": name, "phone": phone} for name, pk, phone in records[:limit]]
+
+
+_index = CustomerIndex()
+_sync_lock = threading.Lock()
+
+
+def _counters():
+    return cache.get_many([VERSION_KEY, EPOCH_KEY])
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def _sync(index):
+    """Bring `index` up to date with the shared counters (called under _sync_lock)."""
+    from django.utils import timezone
+
+    from .models import Customer
+
+    now = time.monotonic()
+    if index.version is not None and now - index.checked_at < CHECK_INTERVAL:
+        return
+    index.checked_at = now
+    counters = _counters()
+    version, epoch = counters.get(VERSION_KEY, 0), counters.get(EPOCH_KEY, 0)
+
+    full = (
+        index.version is None
+        or epoch != index.epoch
+        or now - index.built_at > REBUILD_INTERVAL
+    )
+    if full:
+        synced_at = timezone.now()
+        index.build(
+            Customer.objects.filter(is_active=True)
+            .order_by()
+            .values_list("id", "name", "phone")
+            .iterator(chunk_size=5000)
+        )
+    elif version != index.version:
+        synced_at = timezone.now()
+        since = index.synced_at - timedelta(seconds=SYNC_OVERLAP)
+        index.update(
+            Customer.objects.filter(updated_at__gte=since)
+            .order_by()
+            .values_list("id", "name", "phone", "is_active")
+        )
+    else:
+        return
+    index.version, index.epoch, index.synced_at = version, epoch, synced_at
+
+
+def search(query, limit=LIMIT):
+    """
+    Autocomplete results from this worker's index, syncing it first if stale.
+
+    Falls back to search_db() for the mid-word and short-phone matches the
+    index has no key for, whenever the index alone cannot fill `limit`.
+    """
+    with _sync_lock:
+        _sync(_index)
+    results = _index.search(query, limit)
+    if len(results) < limit:
+        seen = {row["id"] for row in results}
+        results += [row for row in search_db(query, limit) if row["id"] not in seen]
+        results.sort(key=lambda row: (row["name"], row["id"]))
+    return results[:limit]
+
+
+def notify_changed():
+    """Tell every worker to re-sync — for bulk updates that bypass post_save."""
+    _bump(VERSION_KEY)
+
+
+def reset():
+    """Drop this worker's index; the next search() rebuilds it."""
+    global _index
+    with _sync_lock:
+        _index = CustomerIndex()
+
+
+def search_db(query, limit=LIMIT):
+    """The original database query — fallback path and reference for tests."""
+    from .models import Customer
+
+    return list(
+        Customer.objects.filter(
+            Q(name__icontains=query) | Q(phone__icontains=query),
+            is_active=True,
+        )
+        .values("id", "name", "phone")[:limit]
+    )
+
+
+def enabled():
+    return getattr(settings, "CUSTOMER_AUTOCOMPLETE_INDEX", True)
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers — connected in CustomersConfig.ready()
+# ---------------------------------------------------------------------------
+
+def _on_customer_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _bump(VERSION_KEY)
+
+
+def _on_customer_deleted(sender, instance, **kwargs):
+    _bump(EPOCH_KEY)
+
+
+def connect_index_hooks():
+    from django.db.models.signals import post_delete, post_save
+
+    from .models import Customer
+
+    post_save.connect(
+        _on_customer_saved, sender=Customer, dispatch_uid="autocomplete_customer_saved"
+    )
+    post_delete.connect(
+        _on_customer_deleted, sender=Customer, dispatch_uid="autocomplete_customer_deleted"
+    )
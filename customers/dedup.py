@@ -0,0 +1,316 @@
+"""
+Customer deduplication and merge.
+
+Walk-ins get re-entered at the counter ("คุณสมหญิง" / "สมหญิง รักดี",
+"081-234-5678" / "+66812345678"), splitting their jobs and LINE binding
+across several Customer rows.
+
+find_duplicates() works on plain tuples so it can scan the whole table in one
+pass: each record is normalized once, placed in a few hash blocks (same phone,
+same tax ID, same normalized name, same name prefix + phone tail) and only
+pairs that share a block are scored. Oversized blocks (a shop phone number
+typed in for hundreds of walk-ins) are skipped rather than scored
+quadratically. Matching pairs are clustered with union-find.
+
+merge_customers() folds duplicates into a survivor with bulk UPDATEs.
+Documents reference the job, not the customer, so they follow their jobs;
+their customer_name snapshot is left as issued. Multi-job payment receipts,
+monthly consolidated invoices and statements point at the customer and are
+moved too — except an invoice or statement for a month / batch the survivor
+already has one for (one per customer), which stays with the duplicate and
+is counted as unmoved.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.utils import timezone
+
+from .autocomplete import normalize
+
+DEFAULT_THRESHOLD = 0.8
+# Blocks larger than this are skipped (see module docstring).
+MAX_BLOCK = 50
+NAME_PREFIX_LENGTH = 4
+
+# Matched after normalize(), so punctuation is already a space ("น.ส." → "น ส").
+# Latin affixes carry their space so "mrtech" keeps its "mr".
+HONORIFICS = (
+    "ห้างหุ้นส่วนจำกัด", "นางสาว", "บริษัท", "โรงเรียน", "สำนักงาน", "คุณ", "นาย", "นาง",
+    "ร้าน", "บจก", "หจก", "น ส ", "mr ", "mrs ", "ms ", "khun ",
+)
+SUFFIXES = ("มหาชน", "จำกัด", " company limited", " co ltd", " ltd", " co")
+
+
+def normalize_phone(phone):
+    """Digits only, with +66 / 66 country code rewritten to a leading 0."""
+    digits = "".join(ch for ch in phone or "" if ch.isdigit())
+    if digits.startswith("66") and len(digits) in (10, 11):
+        digits = "0" + digits[2:]
+    return digits
+
+
+def normalize_name(name):
+    """Name without honorifics, company affixes, punctuation or spaces."""
+    name = normalize(name)
+    changed = True
+    while changed:
+        changed = False
+        for prefix in HONORIFICS:
+            if name.startswith(prefix) and len(name) > len(prefix):
+                name = name[len(prefix):].lstrip()
+                changed = True
+        for suffix in SUFFIXES:
+            if name.endswith(suffix) and len(name) > len(suffix):
+                name = name[: -len(suffix)].rstrip()
+                changed = True
+    return name.replace(" ", "")
+
+
+@dataclass(frozen=True)
+class Record:
+    id: int
+    name: str
+    phone: str
+    tax_id: str
+    email: str
+
+    @classmethod
+    def from_row(cls, row):
+        pk, name, phone, tax_id, email = row
+        return cls(
+            pk,
+            normalize_name(name),
+            normalize_phone(phone),
+            (tax_id or "").strip(),
+            (email or "").strip().lower(),
+        )
+
+    def blocking_keys(self):
+        keys = []
+        if len(self.phone) >= 9:
+            keys.append(("phone", self.phone))
+        if self.tax_id:
+            keys.append(("tax", self.tax_id))
+        if self.name:
+            keys.append(("name", self.name))
+            if len(self.phone) >= 4:
+                keys.append(("prefix", self.name[:NAME_PREFIX_LENGTH], self.phone[-4:]))
+        return keys
+
+
+def score(a, b):
+    """Match likelihood in [0, 1] for two Records."""
+    if a.tax_id and b.tax_id and a.tax_id != b.tax_id:
+        return 0.0
+    if a.name and b.name:
+        matcher = SequenceMatcher(None, a.name, b.name)
+        name_sim = matcher.ratio() if matcher.real_quick_ratio() > 0.3 else 0.0
+    else:
+        name_sim = 0.0
+    if (a.phone and a.phone == b.phone) or (a.tax_id and a.tax_id == b.tax_id):
+        return 0.6 + 0.4 * name_sim
+    # Name alone is not enough (two different "สมชาย"s); an email match can tip it.
+    email = 0.2 if a.email and a.email == b.email else 0.0
+    return min(1.0, 0.75 * name_sim + email)
+
+
+@dataclass
+class DuplicateGroup:
+    ids: list
+    pairs: list = field(default_factory=list)  # (id_a, id_b, score)
+
+    @property
+    def best_score(self):
+        return max(s for _, _, s in self.pairs)
+
+    def split(self, min_score):
+        """The groups left when only pairs scoring at least `min_score` link customers."""
+        return _cluster([pair for pair in self.pairs if pair[2] >= min_score])
+
+
+def _cluster(pairs):
+    """Union-find over matching (id_a, id_b, score) pairs — groups largest first."""
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for a, b, _ in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    groups = {}
+    for a, b, s in pairs:
+        group = groups.setdefault(find(a), DuplicateGroup(ids=[]))
+        group.pairs.append((a, b, s))
+    for group in groups.values():
+        group.ids = sorted({pk for a, b, _ in group.pairs for pk in (a, b)})
+    return sorted(groups.values(), key=lambda g: (-len(g.ids), g.ids[0]))
+
+
+def find_duplicates(rows, threshold=DEFAULT_THRESHOLD, max_block=MAX_BLOCK):
+    """
+    Cluster likely duplicates among `rows` of (id, name, phone, tax_id, email).
+
+    Returns (groups, skipped_blocks) — groups of two or more ids, largest first.
+    """
+    records = {}
+    blocks = defaultdict(list)
+    for row in rows:
+        record = Record.from_row(row)
+        records[record.id] = record
+        for key in record.blocking_keys():
+            blocks[key].append(record.id)
+
+    scored = set()
+    matches = []
+    skipped = 0
+    for ids in blocks.values():
+        if len(ids) < 2:
+            continue
+        if len(ids) > max_block:
+            skipped += 1
+            continue
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in scored:
+                    continue
+                scored.add(pair)
+                s = score(records[a], records[b])
+                if s >= threshold:
+                    matches.append((*pair, round(s, 3)))
+    return _cluster(matches), skipped
+
+
+def scan(threshold=DEFAULT_THRESHOLD, max_block=MAX_BLOCK):
+    """find_duplicates() over every active customer."""
+    from .models import Customer
+
+    rows = (
+        Customer.objects.filter(is_active=True)
+        .order_by()
+        .values_list("id", "name", "phone", "tax_id", "email")
+        .iterator(chunk_size=10000)
+    )
+    return find_duplicates(rows, threshold=threshold, max_block=max_block)
+
+
+def pick_survivor(customers):
+    """The record to keep: LINE-bound first, then one with a tax ID, then the oldest."""
+    return min(
+        customers,
+        key=lambda c: (not hasattr(c, "line_binding"), not c.tax_id, c.created_at, c.pk),
+    )
+
+
+FILLABLE_FIELDS = ("email", "tax_id", "billing_address", "line_user_id")
+MERGE_COUNTS = (
+    "jobs", "line_bindings", "payment_receipts", "invoices", "statements", "unmoved", "customers",
+)
+
+
+def _repoint(model, dup_ids, survivor, unique_with=None):
+    """
+    Move `model` rows from the duplicates to `survivor`. With `unique_with`, a
+    row whose value the survivor already has (or an earlier row took) stays.
+
+    Returns (moved, unmoved).
+    """
+    rows = model.objects.filter(customer_id__in=dup_ids)
+    if unique_with is None:
+        return rows.update(customer=survivor), 0
+    taken = set(model.objects.filter(customer=survivor).values_list(unique_with, flat=True))
+    move, unmoved = [], 0
+    for pk, value in rows.order_by("pk").values_list("pk", unique_with):
+        if value in taken:
+            unmoved += 1
+        else:
+            taken.add(value)
+            move.append(pk)
+    return model.objects.filter(pk__in=move).update(customer=survivor), unmoved
+
+
+def merge_customers(survivor, duplicates, merged_by=None):
+    """
+    Fold `duplicates` into `survivor`: repoint jobs, LINE binding, payment
+    receipts, monthly invoices and statements, fill the survivor's blank
+    fields, and deactivate the duplicates with a note.
+
+    Returns a count for each of MERGE_COUNTS.
+    """
+    from documents.models import ConsolidatedInvoice, Statement
+    from jobs.models import Job
+    from notifications.models import CustomerLineBinding
+    from payments.models import PaymentReceipt
+
+    from . import autocomplete
+    from .models import Customer
+
+    dup_ids = [c.pk for c in duplicates if c.pk != survivor.pk]
+    result = dict.fromkeys(MERGE_COUNTS, 0)
+    if not dup_ids:
+        return result
+
+    with transaction.atomic():
+        survivor = Customer.objects.select_for_update().get(pk=survivor.pk)
+        dups = list(
+            Customer.objects.select_for_update().filter(pk__in=dup_ids).order_by("created_at")
+        )
+
+        result["jobs"] = Job.objects.filter(customer_id__in=dup_ids).update(customer=survivor)
+        result["payment_receipts"], _ = _repoint(PaymentReceipt, dup_ids, survivor)
+        result["invoices"], unmoved_invoices = _repoint(
+            ConsolidatedInvoice, dup_ids, survivor, unique_with="period_start"
+        )
+        result["statements"], unmoved_statements = _repoint(
+            Statement, dup_ids, survivor, unique_with="batch_id"
+        )
+        result["unmoved"] = unmoved_invoices + unmoved_statements
+
+        # One binding per customer: keep the survivor's, else adopt the oldest
+        # duplicate's; the rest are unbound so the LINE user can be re-linked.
+        bindings = list(
+            CustomerLineBinding.objects.filter(customer_id__in=dup_ids).order_by("created_at")
+        )
+        if bindings:
+            has_binding = CustomerLineBinding.objects.filter(customer=survivor).exists()
+            unbound = CustomerLineBinding.objects.filter(pk__in=[b.pk for b in bindings])
+            unbound.update(customer=None)
+            if not has_binding:
+                CustomerLineBinding.objects.filter(pk=bindings[0].pk).update(customer=survivor)
+            result["line_bindings"] = len(bindings)
+
+        for name in FILLABLE_FIELDS:
+            if not getattr(survivor, name):
+                value = next((getattr(d, name) for d in dups if getattr(d, name)), "")
+                setattr(survivor, name, value)
+        survivor.is_corporate = survivor.is_corporate or any(d.is_corporate for d in dups)
+        merged_notes = [
+            f"[รวมจาก #{d.pk} {d.name} {d.phone}]" + (f" {d.notes}" if d.notes else "")
+            for d in dups
+        ]
+        survivor.notes = "\n".join(filter(None, [survivor.notes, *merged_notes]))
+        survivor.save()
+
+        who = f" โดย {merged_by}" if merged_by else ""
+        for d in dups:
+            d.is_active = False
+            d.line_user_id = ""
+            d.notes = "\n".join(filter(None, [d.notes, f"[รวมเข้ากับ #{survivor.pk}{who}]"]))
+            d.updated_at = timezone.now()
+        Customer.objects.bulk_update(dups, ["is_active", "line_user_id", "notes", "updated_at"])
+
+    # bulk_update skips post_save; make autocomplete workers drop the duplicates
+    autocomplete.notify_changed()
+    result["customers"] = len(dups)
+    return result
@@ -0,0 +1,92 @@
+"""
+Management command: dedupe_customers
+
+Scans all active customers for likely duplicates (customers/dedup.py) and
+lists them; with --merge, folds each group into its survivor.
+
+Usage:
+    python manage.py dedupe_customers                      # report only
+    python manage.py dedupe_customers --threshold 0.9      # stricter matching
+    python manage.py dedupe_customers --merge              # merge every group found
+    python manage.py dedupe_customers --merge --min-score 0.95
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Find (and optionally merge) duplicate customer records"
+
+    def add_arguments(self, parser):
+        from customers.dedup import DEFAULT_THRESHOLD, MAX_BLOCK
+
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f"Minimum pair score to treat as duplicate (default {DEFAULT_THRESHOLD})",
+        )
+        parser.add_argument(
+            "--max-block",
+            type=int,
+            default=MAX_BLOCK,
+            help=f"Skip blocking keys shared by more customers than this (default {MAX_BLOCK})",
+        )
+        parser.add_argument(
+            "--merge", action="store_true", help="Merge each group into its survivor"
+        )
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=0.0,
+            help="With --merge, only merge customers linked by pairs scoring at least this",
+        )
+
+    def handle(self, *args, **options):
+        from customers.dedup import merge_customers, pick_survivor, scan
+        from customers.models import Customer
+
+        started = time.monotonic()
+        groups, skipped = scan(threshold=options["threshold"], max_block=options["max_block"])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Found {len(groups)} duplicate groups in {elapsed:.1f}s"
+            + (f" ({skipped} oversized blocks skipped)" if skipped else "")
+        )
+
+        merged = 0
+        for group in groups:
+            customers = {
+                c.pk: c
+                for c in Customer.objects.filter(pk__in=group.ids).select_related("line_binding")
+            }
+            survivor = pick_survivor(customers.values())
+            self.stdout.write(
+                f"  score {group.best_score:.2f}"
+                f"  keep #{survivor.pk} {survivor.name} ({survivor.phone})"
+            )
+            for c in customers.values():
+                if c.pk != survivor.pk:
+                    self.stdout.write(f"      dup #{c.pk} {c.name} ({c.phone})")
+            if not options["merge"]:
+                continue
+
+            # every link has to reach --min-score, so that A~B and B~C
+            # alone do not merge A with C
+            for part in group.split(options["min_score"]):
+                members = [customers[pk] for pk in part.ids if pk in customers]
+                survivor = pick_survivor(members)
+                result = merge_customers(survivor, members, merged_by="dedupe_customers")
+                merged += 1
+                self.stdout.write(
+                    f"      merged into #{survivor.pk}: {result['jobs']} jobs,"
+                    f" {result['line_bindings']} LINE bindings,"
+                    f" {result['payment_receipts']} receipts, {result['invoices']} invoices,"
+                    f" {result['statements']} statements"
+                    + (f" ({result['unmoved']} left on duplicates)" if result["unmoved"] else "")
+                )
+
+        if options["merge"]:
+            self.stdout.write(self.style.SUCCESS(f"Merged {merged} groups."))
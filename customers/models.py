@@ -5,7 +5,15 @@ Supports both walk-in individuals and corporate accounts.
 Corporate customers have tax ID (เลขประจำตัวผู้เสียภาษี) for tax invoice generation.
 """
 
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Count, DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+# Jobs whose price is owed once the work is delivered (see outstanding_balance)
+BILLABLE_STATUSES = ["ready", "completed"]
+CLOSED_STATUSES = ["completed", "cancelled"]
 
 
 class CustomerType(models.Model):
@@ -34,6 +42,63 @@ class CustomerType(models.Model):
         return self.name
 
 
+def _money_subquery(queryset, group_by, expression):
+    """Scalar subquery: Sum(expression) over queryset rows grouped by `group_by`, 0 when empty."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    total = queryset.order_by().values(group_by).annotate(total=Sum(expression)).values("total")
+    return Coalesce(Subquery(total, output_field=money), Value(Decimal("0")), output_field=money)
+
+
+class CustomerQuerySet(models.QuerySet):
+    def with_financials(self):
+        """
+        Annotate per-customer money and activity figures in the same query:
+
+          outstanding       billed (ready/completed, not fully paid) minus payments on those jobs
+          open_jobs         jobs not yet completed or cancelled
+          lifetime_revenue  all payments received (amount + WHT)
+          last_order_at     created_at of the most recent job
+
+        Each figure is a correlated subquery, so joins never multiply rows.
+        """
+        from jobs.models import Job
+        from payments.models import Payment
+
+        billable = Job.objects.filter(
+            customer=OuterRef("pk"), status__in=BILLABLE_STATUSES
+        ).exclude(payment_status="paid")
+        billable_payments = Payment.objects.filter(
+            job__customer=OuterRef("pk"), job__status__in=BILLABLE_STATUSES
+        ).exclude(job__payment_status="paid")
+        all_payments = Payment.objects.filter(job__customer=OuterRef("pk"))
+        open_jobs = (
+            Job.objects.filter(customer=OuterRef("pk"))
+            .exclude(status__in=CLOSED_STATUSES)
+            .order_by()
+            .values("customer")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        last_order = (
+            Job.objects.filter(customer=OuterRef("pk"))
+            .order_by()
+            .values("customer")
+            .annotate(last=Max("created_at"))
+            .values("last")
+        )
+        received = F("amount") + F("wht_amount")
+
+        return self.annotate(
+            outstanding=(
+                _money_subquery(billable, "customer", F("quoted_price") - F("discount_amount"))
+                - _money_subquery(billable_payments, "job__customer", received)
+            ),
+            open_jobs=Coalesce(Subquery(open_jobs), 0),
+            lifetime_revenue=_money_subquery(all_payments, "job__customer", received),
+            last_order_at=Subquery(last_order),
+        )
+
+
 class Customer(models.Model):
     """A customer — individual or corporate."""
 
@@ -66,6 +131,8 @@ class Customer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    objects = CustomerQuerySet.as_manager()
+
     class Meta:
         verbose_name = "ลูกค้า"
         verbose_name_plural = "ลูกค้า"
@@ -81,12 +148,11 @@ class Customer(models.Model):
 
     @property
     def outstanding_balance(self):
-        """Sum of unpaid job balances for this customer."""
-        from jobs.models import Job
-
+        """Sum of unpaid job balances — free when loaded via with_financials()."""
+        if hasattr(self, "outstanding"):
+            return self.outstanding
         return (
-            Job.objects.filter(customer=self, status__in=["ready", "completed"])
-            .exclude(payment_status="paid")
-            .aggregate(total=models.Sum("balance_due"))["total"]
-            or 0
+            Customer.objects.with_financials()
+            .values_list("outstanding", flat=True)
+            .get(pk=self.pk)
         )
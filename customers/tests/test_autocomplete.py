@@ -0,0 +1,165 @@
+"""
+Tests for the in-memory customer autocomplete index (customers/autocomplete.py).
+"""
+
+import time
+
+import pytest
+from django.urls import reverse
+
+from customers import autocomplete
+from customers.autocomplete import CustomerIndex, keys_for, normalize
+from customers.models import Customer
+
+NAMES = [
+    ("บริษัท สยามเทค จำกัด", "02-111-2345"),
+    ("ร้านกาแฟดอยช้าง", "081-234-5678"),
+    ("โรงเรียนอนุบาลดาวทอง", "025556789"),
+    ("คุณสมหญิง รักดี", "089-876-5432"),
+    ("Grand Event Co., Ltd.", "02-888-9999"),
+    ("สมชาย ใจดี", "0861112222"),
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(autocomplete, "CHECK_INTERVAL", 0)
+    autocomplete.reset()
+    yield
+    autocomplete.reset()
+
+
+@pytest.fixture
+def customers(customer_type):
+    return [
+        Customer.objects.create(customer_type=customer_type, name=name, phone=phone)
+        for name, phone in NAMES
+    ]
+
+
+def _ids(results):
+    return [row["id"] for row in results]
+
+
+class TestKeys:
+    def test_normalize_keeps_thai_marks(self):
+        assert normalize("  ร้านเสริมสวย-นงนุช!! ") == "ร้านเสริมสวย นงนุช"
+
+    def test_keys_are_word_starts_and_phone_suffixes(self):
+        keys = keys_for("บริษัท สยามเทค จำกัด", "02-111-2345")
+        assert {"บริษัทสยามเทคจำกัด", "สยามเทคจำกัด", "จำกัด", "021112345", "2345"} <= keys
+        assert "ยามเทคจำกัด" not in keys and "345" not in keys
+
+    def test_keys_skip_a_leading_honorific(self):
+        assert "กาแฟดอยช้าง" in keys_for("ร้านกาแฟดอยช้าง", "")
+
+    def test_keys_are_bounded(self):
+        keys = keys_for("ก" * 200, "")
+        assert keys == {"ก" * autocomplete.MAX_KEY_LENGTH}
+
+    def test_no_key_starts_with_a_combining_mark(self):
+        assert "ิษัท" not in keys_for("บริษัท", "")
+
+
+class TestCustomerIndex:
+    def _index(self):
+        index = CustomerIndex()
+        index.build((i, name, phone) for i, (name, phone) in enumerate(NAMES, 1))
+        return index
+
+    def test_name_substring(self):
+        assert _ids(self._index().search("สยาม")) == [1]
+
+    def test_word_and_honorific_starts(self):
+        assert _ids(self._index().search("กาแฟ")) == [2]
+        assert _ids(self._index().search("สมหญิง รักดี")) == [4]
+        assert _ids(self._index().search("ดอยช้าง")) == []
+
+    def test_query_longer_than_keys(self):
+        index = CustomerIndex()
+        long_name = "ร้านวัสดุก่อสร้างและเครื่องมือช่าง"
+        index.build([(1, long_name + "เจริญ", ""), (2, long_name + "รุ่งเรือง", "")])
+
+        assert _ids(index.search(long_name + "เจริญ")) == [1]
+
+    def test_phone_substring_ignores_formatting(self):
+        assert _ids(self._index().search("234-56")) == [2]
+        assert _ids(self._index().search("8889")) == [5]
+
+    def test_case_insensitive_latin(self):
+        assert _ids(self._index().search("grand ev")) == [5]
+
+    def test_update_and_deactivate(self):
+        index = self._index()
+        index.update([
+            (7, "สมชาย ใจงาม", "0800000000", True),
+            (6, "สมชาย ใจดี", "0861112222", False),
+        ])
+
+        assert _ids(index.search("สมชาย")) == [7]
+        assert len(index) == len(NAMES)
+
+    def test_lookup_is_fast(self):
+        index = CustomerIndex()
+        index.build((i, f"ลูกค้า{i} ทดสอบ", f"08{i:08d}") for i in range(20000))
+
+        start = time.perf_counter()
+        for i in range(1000):
+            index.search(f"ลูกค้า{i}")
+        per_lookup = (time.perf_counter() - start) / 1000
+
+        assert per_lookup < 0.005
+
+
+@pytest.mark.django_db
+class TestSync:
+    def test_matches_database_query(self, customers):
+        for query in ["สยาม", "ร้าน", "อนุบาล", "สม", "081-2", "5678", "grand", "ใจดี"]:
+            assert _ids(autocomplete.search(query)) == _ids(autocomplete.search_db(query)), query
+
+    def test_mid_word_and_short_phone_fall_back_to_database(self, customers):
+        for query in ["ดอยช้าง", "678"]:
+            assert autocomplete.search(query) == autocomplete.search_db(query), query
+        assert _ids(autocomplete.search("ดอยช้าง")) == [customers[1].pk]
+        assert len(autocomplete.search("678")) == 2
+
+    def test_new_customer_is_picked_up_incrementally(self, customers, customer_type):
+        autocomplete.search("x")
+        built_at = autocomplete._index.built_at
+
+        new = Customer.objects.create(
+            customer_type=customer_type, name="สมศรี มีสุข", phone="0899999999"
+        )
+
+        assert new.pk in _ids(autocomplete.search("สมศรี"))
+        assert autocomplete._index.built_at == built_at  # updated in place, not rebuilt
+
+    def test_deactivated_and_deleted_customers_disappear(self, customers):
+        autocomplete.search("x")
+        customers[0].is_active = False
+        customers[0].save()
+        assert autocomplete.search("สยาม") == []
+
+        customers[1].delete()
+        assert autocomplete.search("กาแฟ") == []
+
+
+@pytest.mark.django_db
+class TestAutocompleteView:
+    def test_uses_index(self, client, counter_user, customers):
+        client.force_login(counter_user)
+
+        response = client.get(reverse("customers:autocomplete"), {"q": "กาแฟ"})
+
+        assert response.json() == [
+            {"id": customers[1].pk, "name": "ร้านกาแฟดอยช้าง", "phone": "081-234-5678"}
+        ]
+
+    def test_database_fallback(self, client, counter_user, customers, settings):
+        settings.CUSTOMER_AUTOCOMPLETE_INDEX = False
+        client.force_login(counter_user)
+
+        response = client.get(reverse("customers:autocomplete"), {"q": "ดอยช้าง"})
+
+        assert _ids(response.json()) == [customers[1].pk]
+        assert autocomplete._index.version is None
@@ -0,0 +1,227 @@
+"""
+Tests for customer deduplication and merge (customers/dedup.py).
+"""
+
+import random
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from customers.dedup import (
+    DuplicateGroup,
+    find_duplicates,
+    merge_customers,
+    normalize_name,
+    normalize_phone,
+)
+from customers.models import Customer
+from jobs.models import Job
+from notifications.models import CustomerLineBinding
+
+
+def _row(pk, name, phone="", tax_id="", email=""):
+    return (pk, name, phone, tax_id, email)
+
+
+def _customer(customer_type, name, phone):
+    return Customer.objects.create(customer_type=customer_type, name=name, phone=phone)
+
+
+class TestNormalize:
+    @pytest.mark.parametrize(
+        "raw", ["081-234-5678", "081 234 5678", "+66 81 234 5678", "66812345678"]
+    )
+    def test_phone_formats(self, raw):
+        assert normalize_phone(raw) == "0812345678"
+
+    def test_name_drops_honorifics_and_affixes(self):
+        assert normalize_name("คุณสมหญิง รักดี") == normalize_name("สมหญิง  รักดี")
+        assert normalize_name("บริษัท สยามเทค จำกัด") == "สยามเทค"
+        assert normalize_name("Grand Event Co., Ltd.") == "grandevent"
+        assert normalize_name("MrTech") == "mrtech"
+
+
+class TestFindDuplicates:
+    def test_same_phone_similar_name(self):
+        groups, _ = find_duplicates([
+            _row(1, "คุณสมหญิง รักดี", "089-876-5432"),
+            _row(2, "สมหญิง รักดี", "0898765432"),
+            _row(3, "สมชาย ใจดี", "0861112222"),
+        ])
+        assert [g.ids for g in groups] == [[1, 2]]
+
+    def test_typo_in_name_with_same_phone(self):
+        groups, _ = find_duplicates([
+            _row(1, "ร้านกาแฟดอยช้าง", "081-234-5678"),
+            _row(2, "ร้านกาแฟดอยชาง", "+66812345678"),
+        ])
+        assert [g.ids for g in groups] == [[1, 2]]
+
+    def test_shared_phone_different_people_not_matched(self):
+        groups, _ = find_duplicates([
+            _row(1, "สมชาย ใจดี", "0861112222"),
+            _row(2, "วันเพ็ญ ศรีสุข", "0861112222"),
+        ])
+        assert groups == []
+
+    def test_conflicting_tax_ids_never_match(self):
+        groups, _ = find_duplicates([
+            _row(1, "บริษัท สยามเทค จำกัด", "021112345", tax_id="0105560123456"),
+            _row(2, "บริษัท สยามเทค จำกัด", "021112345", tax_id="0105560999999"),
+        ])
+        assert groups == []
+
+    def test_same_name_alone_is_not_enough(self):
+        groups, _ = find_duplicates(
+            [_row(1, "สมชาย ใจดี", "0861112222"), _row(2, "สมชาย ใจดี", "0899999999")]
+        )
+        assert groups == []
+
+    def test_transitive_groups(self):
+        groups, _ = find_duplicates([
+            _row(1, "สมหญิง รักดี", "0898765432"),
+            _row(2, "คุณสมหญิง รักดี", "0898765432", email="som@example.com"),
+            _row(3, "สมหญิง รักดี", "0811111111", email="som@example.com"),
+        ])
+        assert [g.ids for g in groups] == [[1, 2, 3]]
+
+    def test_oversized_blocks_are_skipped(self):
+        rows = [_row(i, f"ลูกค้า walk-in {i}", "020000000") for i in range(10)]
+        groups, skipped = find_duplicates(rows, max_block=5)
+        # the shared phone block and the name-prefix + phone-tail block
+        assert (groups, skipped) == ([], 2)
+
+    def test_scales_near_linearly(self):
+        rng = random.Random(1)
+        rows = [_row(i, f"ลูกค้า{rng.randrange(10**9)}", f"08{i:08d}") for i in range(50000)]
+        rows += [_row(100000 + i, rows[i][1] + " ", rows[i][2]) for i in range(0, 50000, 100)]
+
+        start = time.perf_counter()
+        groups, _ = find_duplicates(rows)
+        elapsed = time.perf_counter() - start
+
+        assert len(groups) == 500
+        assert elapsed < 20
+
+
+class TestSplit:
+    def test_weak_links_do_not_chain(self):
+        group = DuplicateGroup(ids=[1, 2, 3, 4], pairs=[(1, 2, 0.98), (2, 3, 0.7), (3, 4, 0.96)])
+        assert [g.ids for g in group.split(0.95)] == [[1, 2], [3, 4]]
+        assert [g.ids for g in group.split(0.6)] == [[1, 2, 3, 4]]
+
+
+@pytest.mark.django_db
+class TestMerge:
+    def test_merge_repoints_jobs_and_binding(
+        self, customer, customer_type, product_type, counter_user
+    ):
+        dup = Customer.objects.create(
+            customer_type=customer_type, name="บ. ทดสอบ", phone="081-234-5678",
+            email="a@example.com",
+        )
+        job = Job.objects.create(
+            customer=dup, product_type=product_type, title="งาน", quoted_price=100,
+            created_by=counter_user,
+        )
+        CustomerLineBinding.objects.create(customer=dup, line_user_id="U123")
+
+        result = merge_customers(customer, [customer, dup], merged_by="test")
+
+        assert (result["jobs"], result["line_bindings"], result["customers"]) == (1, 1, 1)
+        job.refresh_from_db()
+        dup.refresh_from_db()
+        customer.refresh_from_db()
+        assert job.customer == customer
+        assert CustomerLineBinding.objects.get(line_user_id="U123").customer == customer
+        assert customer.email == "a@example.com"
+        assert f"#{dup.pk}" in customer.notes
+        assert not dup.is_active
+
+    def test_merge_moves_receipts_invoices_and_statements(
+        self, customer, customer_type, product_type, owner_user
+    ):
+        from datetime import date
+
+        from documents.models import (
+            ConsolidatedInvoice,
+            Document,
+            DocumentType,
+            Statement,
+            StatementBatch,
+        )
+        from payments.models import PaymentMethod, PaymentReceipt
+
+        dup = Customer.objects.create(customer_type=customer_type, name="ซ้ำ", phone="0812345678")
+        job = Job.objects.create(
+            customer=dup, product_type=product_type, title="งาน", quoted_price=100,
+            created_by=owner_user,
+        )
+
+        def invoice(owner, month):
+            doc = Document.objects.create(
+                job=job, document_type=DocumentType.TAX_INVOICE, customer_name=owner.name,
+                subtotal=100, total_amount=107, vat_amount=7, issued_by=owner_user,
+            )
+            return ConsolidatedInvoice.objects.create(
+                customer=owner, period_start=month, document=doc, due_date=month
+            )
+
+        receipt = PaymentReceipt.objects.create(
+            customer=dup, amount=100, method=PaymentMethod.CASH, received_by=owner_user
+        )
+        invoice(customer, date(2026, 8, 1))
+        clash = invoice(dup, date(2026, 8, 1))
+        moved = invoice(dup, date(2026, 9, 1))
+        batch = StatementBatch.objects.create(
+            period_start=date(2026, 9, 1), period_end=date(2026, 10, 1), created_by=owner_user
+        )
+        statement = Statement.objects.create(batch=batch, customer=dup)
+
+        result = merge_customers(customer, [dup])
+
+        assert (result["payment_receipts"], result["invoices"], result["statements"]) == (1, 1, 1)
+        assert result["unmoved"] == 1
+        owners = [(receipt, customer), (moved, customer), (statement, customer), (clash, dup)]
+        for record, owner in owners:
+            record.refresh_from_db()
+            assert record.customer_id == owner.pk
+
+    def test_survivor_keeps_its_own_binding(self, customer, customer_type):
+        dup = Customer.objects.create(customer_type=customer_type, name="ซ้ำ", phone="0812345678")
+        CustomerLineBinding.objects.create(customer=customer, line_user_id="Ukeep")
+        CustomerLineBinding.objects.create(customer=dup, line_user_id="Udup")
+
+        merge_customers(customer, [dup])
+
+        assert CustomerLineBinding.objects.get(line_user_id="Ukeep").customer == customer
+        assert CustomerLineBinding.objects.get(line_user_id="Udup").customer is None
+
+    def test_command_reports_and_merges(self, customer_type):
+        a = _customer(customer_type, "คุณสมหญิง รักดี", "089-876-5432")
+        b = _customer(customer_type, "สมหญิง รักดี", "0898765432")
+        out = StringIO()
+
+        call_command("dedupe_customers", stdout=out)
+        assert "Found 1 duplicate groups" in out.getvalue()
+        assert Customer.objects.filter(is_active=True).count() == 2
+
+        call_command("dedupe_customers", "--merge", stdout=StringIO())
+        assert list(Customer.objects.filter(is_active=True)) == [a]
+        b.refresh_from_db()
+        assert not b.is_active
+
+    def test_min_score_applies_to_every_link(self, customer_type):
+        a = _customer(customer_type, "สมหญิง รักดี", "0898765432")
+        _customer(customer_type, "สมหญิง รักดี", "089-876-5432")
+        # same phone, different person: only a weak link to the other two
+        c = _customer(customer_type, "ประยุทธ์", "0898765432")
+
+        call_command(
+            "dedupe_customers", "--threshold", "0.6", "--merge", "--min-score", "0.95",
+            stdout=StringIO(),
+        )
+
+        assert set(Customer.objects.filter(is_active=True)) == {a, c}
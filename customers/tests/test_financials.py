@@ -0,0 +1,159 @@
+"""
+Tests for Customer.objects.with_financials() and the pages built on it.
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from customers.models import Customer
+from jobs.models import Job, JobStatus
+from payments.models import Payment, PaymentMethod
+
+
+def _job(customer, product_type, user, price, status=JobStatus.PENDING, discount=0):
+    job = Job.objects.create(
+        customer=customer,
+        product_type=product_type,
+        title="งานทดสอบ",
+        quoted_price=Decimal(price),
+        discount_amount=Decimal(discount),
+        created_by=user,
+    )
+    if status != JobStatus.PENDING:
+        Job.objects.filter(pk=job.pk).update(status=status)
+        job.refresh_from_db()
+    return job
+
+
+def _pay(job, amount):
+    return Payment.objects.create(
+        job=job, amount=Decimal(amount), method=PaymentMethod.CASH, received_by=job.created_by
+    )
+
+
+def _populate(customer_type, product_type, user, count):
+    customers = Customer.objects.bulk_create(
+        [
+            Customer(customer_type=customer_type, name=f"ลูกค้า {i:03d}", phone=f"08{i:08d}")
+            for i in range(count)
+        ]
+    )
+    Job.objects.bulk_create(
+        [
+            Job(customer=c, product_type=product_type, title="งาน", quoted_price=100,
+                status=status, created_by=user)
+            for c in customers
+            for status in (JobStatus.PENDING, JobStatus.READY, JobStatus.COMPLETED)
+        ]
+    )
+    return customers
+
+
+@pytest.mark.django_db
+class TestWithFinancials:
+    def test_figures(self, customer, product_type, counter_user):
+        ready = _job(customer, product_type, counter_user, "1000", JobStatus.READY, discount="100")
+        _pay(ready, "400")
+        done = _job(customer, product_type, counter_user, "500", JobStatus.COMPLETED)
+        _pay(done, "500")  # fully paid → not outstanding
+        _job(customer, product_type, counter_user, "700", JobStatus.PRINTING)
+        _job(customer, product_type, counter_user, "300", JobStatus.CANCELLED)
+
+        c = Customer.objects.with_financials().get(pk=customer.pk)
+
+        assert c.outstanding == Decimal("500")
+        assert c.open_jobs == 2
+        assert c.lifetime_revenue == Decimal("900")
+        assert c.last_order_at is not None
+
+    def test_customer_without_jobs(self, customer):
+        c = Customer.objects.with_financials().get(pk=customer.pk)
+
+        assert c.outstanding == 0
+        assert c.open_jobs == 0
+        assert c.lifetime_revenue == 0
+        assert c.last_order_at is None
+
+    def test_outstanding_balance_property(self, customer, product_type, counter_user):
+        _job(customer, product_type, counter_user, "800", JobStatus.READY)
+
+        assert customer.outstanding_balance == Decimal("800")
+        annotated = Customer.objects.with_financials().get(pk=customer.pk)
+        assert annotated.outstanding_balance == Decimal("800")
+
+    def test_single_query_for_many_customers(
+        self, customer_type, product_type, counter_user, django_assert_num_queries
+    ):
+        _populate(customer_type, product_type, counter_user, 60)
+
+        with django_assert_num_queries(1):
+            rows = list(Customer.objects.with_financials())
+
+        assert len(rows) == 60
+        # READY + COMPLETED unpaid jobs are owed; PENDING + READY are still open
+        assert {(row.outstanding, row.open_jobs) for row in rows} == {(200, 2)}
+
+
+@pytest.mark.django_db
+class TestCustomerPages:
+    def _queries_for(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_does_not_grow(
+        self, client, owner_user, customer_type, product_type, counter_user
+    ):
+        client.force_login(owner_user)
+        url = reverse("customers:list")
+        _populate(customer_type, product_type, counter_user, 5)
+        few = self._queries_for(client, url)
+        _populate(customer_type, product_type, counter_user, 80)
+        many = self._queries_for(client, url)
+
+        assert many == few
+
+    def test_list_sort_by_outstanding(
+        self, client, owner_user, customer, customer_type, product_type, counter_user
+    ):
+        big = Customer.objects.create(
+            customer_type=customer_type, name="ฮ ลูกค้ารายใหญ่", phone="0800000000"
+        )
+        _job(big, product_type, counter_user, "9000", JobStatus.READY)
+        client.force_login(owner_user)
+
+        response = client.get(reverse("customers:list"), {"sort": "outstanding"})
+
+        assert list(response.context["customers"])[0] == big
+
+    def test_list_htmx_returns_table_partial(self, client, owner_user, customer):
+        client.force_login(owner_user)
+
+        response = client.get(reverse("customers:list"), HTTP_HX_REQUEST="true")
+
+        assert [t.name for t in response.templates][0] == "customers/partials/table.html"
+
+    def test_detail_query_count_is_bounded(
+        self,
+        client,
+        owner_user,
+        customer,
+        product_type,
+        counter_user,
+        django_assert_max_num_queries,
+    ):
+        for _ in range(30):
+            _job(customer, product_type, counter_user, "100", JobStatus.READY)
+        client.force_login(owner_user)
+
+        with django_assert_max_num_queries(8):
+            response = client.get(reverse("customers:detail", args=[customer.pk]))
+
+        assert response.status_code == 200
+        assert len(response.context["jobs"]) == 20
+        assert response.context["customer"].outstanding == Decimal("3000")
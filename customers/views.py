@@ -1,7 +1,7 @@
 """Customer CRUD views with HTMX search support."""
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import F, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
@@ -10,20 +10,44 @@ from accounts.models import Role
 
 from .models import Customer, CustomerType
 
+# ?sort= value → ordering for the customer list (financial columns from with_financials)
+LIST_SORTS = {
+    "name": [F("name").asc()],
+    "outstanding": [F("outstanding").desc(), F("name").asc()],
+    "revenue": [F("lifetime_revenue").desc(), F("name").asc()],
+    "open_jobs": [F("open_jobs").desc(), F("name").asc()],
+    "last_order": [F("last_order_at").desc(nulls_last=True), F("name").asc()],
+}
+
 
 @login_required
 def customer_list(request):
-    customers = Customer.objects.filter(is_active=True).select_related("customer_type")
+    customers = (
+        Customer.objects.filter(is_active=True)
+        .select_related("customer_type")
+        .with_financials()
+    )
     q = request.GET.get("q", "").strip()
     if q:
         customers = customers.filter(Q(name__icontains=q) | Q(phone__icontains=q))
-    return render(request, "customers/list.html", {"customers": customers, "q": q})
+    sort = request.GET.get("sort", "name")
+    if sort not in LIST_SORTS:
+        sort = "name"
+    customers = customers.order_by(*LIST_SORTS[sort])
+
+    context = {"customers": customers, "q": q, "sort": sort}
+    if request.headers.get("HX-Request"):
+        return render(request, "customers/partials/table.html", context)
+    return render(request, "customers/list.html", context)
 
 
 @login_required
 def customer_detail(request, pk):
-    customer = get_object_or_404(Customer, pk=pk)
-    return render(request, "customers/detail.html", {"customer": customer})
+    customer = get_object_or_404(
+        Customer.objects.select_related("customer_type").with_financials(), pk=pk
+    )
+    jobs = customer.jobs.order_by("-created_at")[:20]
+    return render(request, "customers/detail.html", {"customer": customer, "jobs": jobs})
 
 
 @role_required(Role.COUNTER, Role.OWNER)
@@ -58,17 +82,16 @@ def customer_edit(request, pk):
 @login_required
 def customer_autocomplete(request):
     """JSON endpoint for the customer select-autocomplete widget."""
+    from . import autocomplete
+
     q = request.GET.get("q", "").strip()
     if len(q) < 1:
         return JsonResponse([], safe=False)
-    customers = (
-        Customer.objects.filter(
-            Q(name__icontains=q) | Q(phone__icontains=q),
-            is_active=True,
-        )
-        .values("id", "name", "phone")[:12]
-    )
-    return JsonResponse(list(customers), safe=False)
+    if autocomplete.enabled():
+        results = autocomplete.search(q)
+    else:
+        results = autocomplete.search_db(q)
+    return JsonResponse(results, safe=False)
 
 
 @login_required
@@ -0,0 +1,221 @@
+"""
+Cacheable dashboard fragments.
+
+The owner dashboard is split into independent fragments (revenue, pipeline,
+overdue, ...). Each one is rendered to HTML once, stored in the shared cache
+for its own TTL and served to HTMX polls with an ETag, so a wall tablet that
+refreshes every minute costs a cache lookup and usually a 304.
+
+A fragment's cache key / ETag is built from:
+  - a version counter in the cache, bumped by invalidate() when Job or
+    Payment rows change (see connect_invalidation_hooks()),
+  - today's date (overdue / monthly figures roll over at midnight),
+  - the current TTL window, so data that changes without a hook (e.g. the
+    JobStatusDwell rollup) is picked up when the TTL expires.
+"""
+
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from jobs.models import Job, JobStatus, JobStatusCounter, PaymentStatus
+
+# Ordered list of operational statuses shown in pipeline summary
+PIPELINE_STATUSES = [
+    JobStatus.PENDING,
+    JobStatus.DESIGNING,
+    JobStatus.AWAITING_APPROVAL,
+    JobStatus.APPROVED,
+    JobStatus.PRINTING,
+    JobStatus.CUTTING,
+    JobStatus.LAMINATING,
+    JobStatus.READY,
+]
+
+OVERDUE_STATUSES = [
+    JobStatus.PENDING, JobStatus.DESIGNING, JobStatus.AWAITING_APPROVAL,
+    JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING,
+]
+
+
+def _revenue_context(today):
+    from documents.periods import Period
+
+    # Revenue this month (completed + paid)
+    monthly_revenue = (
+        Job.objects.filter(
+            status=JobStatus.COMPLETED,
+            payment_status=PaymentStatus.PAID,
+            **Period.containing(today).lookup("updated_at"),
+        ).aggregate(total=Sum("quoted_price"))["total"]
+        or Decimal("0")
+    )
+    return {"monthly_revenue": monthly_revenue}
+
+
+def _outstanding_context(today):
+    # Outstanding: unpaid or partially paid, not cancelled
+    outstanding = (
+        Job.objects.filter(payment_status__in=[PaymentStatus.UNPAID, PaymentStatus.PARTIAL])
+        .exclude(status=JobStatus.CANCELLED)
+        .aggregate(total=Sum("quoted_price"))["total"]
+        or Decimal("0")
+    )
+    return {"outstanding": outstanding}
+
+
+def _pipeline_context(today):
+    # Pipeline counts — read from the materialized counters, not a GROUP BY over Job
+    raw_counts = JobStatusCounter.snapshot()
+    # Build ordered list with (label, count) so template can iterate cleanly
+    pipeline_rows = [
+        {"label": JobStatus(s).label, "count": raw_counts.get(s, 0), "status": s}
+        for s in PIPELINE_STATUSES
+        if raw_counts.get(s, 0) > 0  # only show statuses that have jobs
+    ]
+    return {
+        "pipeline_rows": pipeline_rows,
+        "pending_count": raw_counts.get(JobStatus.PENDING, 0),
+        "ready_count": raw_counts.get(JobStatus.READY, 0),
+    }
+
+
+def _overdue_context(today):
+    # Overdue: past due date, still in progress
+    overdue_jobs = list(
+        Job.objects.filter(due_date__lt=today, status__in=OVERDUE_STATUSES)
+        .select_related("customer")
+        .order_by("due_date")[:10]
+    )
+    return {"overdue_jobs": overdue_jobs}
+
+
+def _throughput_context(today):
+    # Where work stalls — read from the JobStatusDwell rollup (last 30 days)
+    from jobs import analytics
+
+    since = timezone.now() - timezone.timedelta(days=30)
+    return {
+        "dwell_rows": analytics.dwell_by_status(since),
+        "stall_rows": analytics.current_stalls(),
+        "cycle": analytics.cycle_time(since),
+        "throughput_rows": analytics.throughput_by_user(since)[:8],
+    }
+
+
+# name → template, TTL in seconds, context builder, HTMX poll interval
+FRAGMENTS = {
+    "revenue": {
+        "template": "dashboard/partials/revenue.html",
+        "ttl": 300,
+        "poll": 120,
+        "context": _revenue_context,
+    },
+    "outstanding": {
+        "template": "dashboard/partials/outstanding.html",
+        "ttl": 300,
+        "poll": 120,
+        "context": _outstanding_context,
+    },
+    "counts": {
+        "template": "dashboard/partials/counts.html",
+        "ttl": 120,
+        "poll": 30,
+        "context": _pipeline_context,
+    },
+    "pipeline": {
+        "template": "dashboard/partials/pipeline.html",
+        "ttl": 120,
+        "poll": 30,
+        "context": _pipeline_context,
+    },
+    "overdue": {
+        "template": "dashboard/partials/overdue.html",
+        "ttl": 600,
+        "poll": 120,
+        "context": _overdue_context,
+    },
+    "throughput": {
+        "template": "dashboard/partials/throughput.html",
+        "ttl": 900,
+        "poll": 300,
+        "context": _throughput_context,
+    },
+}
+
+# Which fragments go stale on which kind of change
+JOB_FRAGMENTS = ["revenue", "outstanding", "counts", "pipeline", "overdue"]
+STATUS_FRAGMENTS = ["revenue", "outstanding", "counts", "pipeline", "overdue"]
+PAYMENT_FRAGMENTS = ["revenue", "outstanding"]
+
+
+def _version_key(name):
+    return f"dashboard:fragment:{name}:version"
+
+
+def invalidate(*names):
+    """Bump the version of each named fragment so its cached HTML and ETag go stale."""
+    for name in names:
+        key = _version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No version stored yet (or evicted) — start above the implicit default of 1
+            cache.set(key, 2, timeout=None)
+
+
+def etag(name):
+    """Current ETag for a fragment — also used as its HTML cache key."""
+    ttl = FRAGMENTS[name]["ttl"]
+    version = cache.get(_version_key(name), 1)
+    window = int(time.time() // ttl)
+    return f"{name}-{version}-{timezone.localdate().isoformat()}-{window}"
+
+
+def render(name, request=None):
+    """Return the fragment's HTML, from cache when the current version is stored."""
+    fragment = FRAGMENTS[name]
+    key = f"dashboard:fragment:{etag(name)}"
+    html = cache.get(key)
+    if html is None:
+        context = fragment["context"](timezone.localdate())
+        html = render_to_string(fragment["template"], context, request=request)
+        cache.set(key, html, fragment["ttl"])
+    return html
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks — connected in DashboardConfig.ready()
+# ---------------------------------------------------------------------------
+
+# Invalidate after commit: bumped earlier, a concurrent request could render
+# the old rows and cache them under the new version for the whole TTL.
+
+def _on_job_saved(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate(*JOB_FRAGMENTS))
+
+
+def _on_job_status_changed(sender, **kwargs):
+    invalidate(*STATUS_FRAGMENTS)  # job_status_changed is already sent on commit
+
+
+def _on_payment_saved(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate(*PAYMENT_FRAGMENTS))
+
+
+def connect_invalidation_hooks():
+    from django.db.models.signals import post_delete, post_save
+
+    from jobs.signals import job_status_changed
+    from payments.models import Payment
+
+    post_save.connect(_on_job_saved, sender=Job, dispatch_uid="dashboard_job_saved")
+    post_delete.connect(_on_job_saved, sender=Job, dispatch_uid="dashboard_job_deleted")
+    job_status_changed.connect(_on_job_status_changed, dispatch_uid="dashboard_job_status")
+    post_save.connect(_on_payment_saved, sender=Payment, dispatch_uid="dashboard_payment_saved")
+    post_delete.connect(_on_payment_saved, sender=Payment, dispatch_uid="dashboard_payment_deleted")
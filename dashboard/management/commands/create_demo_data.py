@@ -37,6 +37,10 @@ class Command(BaseCommand):
         admin = self._get_or_create_staff()
         customers = self._create_customers(admin)
         self._create_jobs(customers, admin)
+
+        # Payments were backdated with update(), which bypasses the rollup hooks.
+        from documents import rollups
+        rollups.rebuild()
         self.stdout.write(self.style.SUCCESS("Demo data created successfully."))
 
     # -------------------------------------------------------------------------
@@ -51,6 +55,8 @@ class Command(BaseCommand):
         Job.objects.all().delete()
         from customers.models import Customer
         Customer.objects.filter(name__startswith="[Demo]").delete()
+        from jobs.models import JobStatusCounter
+        JobStatusCounter.reconcile()
         self.stdout.write("  Reset: cleared jobs, payments, documents, demo customers.")
 
     def _get_or_create_staff(self):
@@ -7,6 +7,7 @@ Usage in templates:
     {{ some_date|thai_date_short }}    → "26 ก.พ. 68"
     {{ 12500|baht_text }}              → "หนึ่งหมื่นสองพันห้าร้อยบาทถ้วน"
     {{ 12500|baht:"฿{:,.0f}" }}       → "฿12,500"
+    {{ some_timedelta|thai_duration }} → "2 วัน 3 ชม."
 """
 
 from django import template
@@ -75,6 +76,24 @@ def thai_date_short(value):
         return str(value)
 
 
+@register.filter
+def thai_duration(value):
+    """Format a timedelta as a compact Thai duration (days/hours or hours/minutes)."""
+    if value is None:
+        return ""
+    try:
+        total_minutes = int(value.total_seconds() // 60)
+    except AttributeError:
+        return str(value)
+    days, rem = divmod(total_minutes, 60 * 24)
+    hours, minutes = divmod(rem, 60)
+    if days:
+        return f"{days} วัน {hours} ชม." if hours else f"{days} วัน"
+    if hours:
+        return f"{hours} ชม. {minutes} นาที" if minutes else f"{hours} ชม."
+    return f"{minutes} นาที"
+
+
 @register.filter
 def baht(value, fmt="฿{:,.2f}"):
     """Format number as Thai baht with symbol."""
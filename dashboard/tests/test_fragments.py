@@ -0,0 +1,70 @@
+"""Tests for cached dashboard fragments, ETags and invalidation."""
+
+import pytest
+from django.urls import reverse
+
+from dashboard import fragments
+from jobs.models import JobStatus
+
+
+@pytest.fixture
+def owner_client(client, owner_user):
+    client.force_login(owner_user)
+    return client
+
+
+@pytest.mark.django_db
+class TestDashboardFragments:
+    def test_home_inlines_every_fragment(self, owner_client, job):
+        response = owner_client.get(reverse("dashboard:home"))
+        assert response.status_code == 200
+        for name in fragments.FRAGMENTS:
+            assert reverse("dashboard:fragment", args=[name]) in response.content.decode()
+
+    def test_fragment_returns_etag_and_304_on_revalidation(self, owner_client, job):
+        url = reverse("dashboard:fragment", args=["pipeline"])
+        first = owner_client.get(url)
+        assert first.status_code == 200
+        assert first.has_header("ETag")
+
+        again = owner_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert again.status_code == 304
+
+    def test_unknown_fragment_is_404(self, owner_client):
+        response = owner_client.get(reverse("dashboard:fragment", args=["nope"]))
+        assert response.status_code == 404
+
+    def test_cached_fragment_does_not_query(self, job, django_assert_num_queries):
+        fragments.render("pipeline")
+        with django_assert_num_queries(0):
+            fragments.render("pipeline")
+
+    def test_status_change_invalidates_pipeline(
+        self, job, counter_user, django_capture_on_commit_callbacks
+    ):
+        before = fragments.etag("pipeline")
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.DESIGNING, changed_by=counter_user)
+        assert fragments.etag("pipeline") != before
+        assert "กำลังออกแบบ" in fragments.render("pipeline")
+
+    def test_payment_invalidates_money_fragments_after_commit(
+        self, job, counter_user, django_capture_on_commit_callbacks
+    ):
+        from payments.models import Payment, PaymentMethod
+
+        before = {name: fragments.etag(name) for name in ("revenue", "outstanding")}
+        with django_capture_on_commit_callbacks() as callbacks:
+            payment = Payment.objects.create(
+                job=job, amount=1, method=PaymentMethod.CASH, received_by=counter_user
+            )
+            # not yet committed: a concurrent render would still see the old rows
+            assert all(fragments.etag(name) == etag for name, etag in before.items())
+        for callback in callbacks:
+            callback()
+        assert all(fragments.etag(name) != etag for name, etag in before.items())
+
+        before = {name: fragments.etag(name) for name in ("revenue", "outstanding")}
+        with django_capture_on_commit_callbacks(execute=True):
+            payment.delete()
+        assert all(fragments.etag(name) != etag for name, etag in before.items())
@@ -4,7 +4,13 @@ import datetime
 
 import pytest
 
-from dashboard.templatetags.thai_filters import baht, baht_text, thai_date, thai_date_short
+from dashboard.templatetags.thai_filters import (
+    baht,
+    baht_text,
+    thai_date,
+    thai_date_short,
+    thai_duration,
+)
 
 
 class TestThaiDate:
@@ -61,3 +67,17 @@ class TestBahtText:
     def test_with_satang(self):
         result = baht_text(100.50)
         assert "ห้าสิบสตางค์" in result
+
+
+class TestThaiDuration:
+    def test_days_and_hours(self):
+        assert thai_duration(datetime.timedelta(days=2, hours=3)) == "2 วัน 3 ชม."
+
+    def test_hours_and_minutes(self):
+        assert thai_duration(datetime.timedelta(hours=1, minutes=5)) == "1 ชม. 5 นาที"
+
+    def test_minutes_only(self):
+        assert thai_duration(datetime.timedelta(minutes=12)) == "12 นาที"
+
+    def test_none_returns_empty_string(self):
+        assert thai_duration(None) == ""
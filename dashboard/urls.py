@@ -6,4 +6,6 @@ app_name = "dashboard"
 
 urlpatterns = [
     path("", views.dashboard, name="home"),
+    # HTMX: independently cached dashboard fragments
+    path("fragments/<slug:name>/", views.dashboard_fragment, name="fragment"),
 ]
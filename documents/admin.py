@@ -1,7 +1,15 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin, TabularInline
 
-from .models import Document, DocumentItem, Setting
+from .models import (
+    BillingRun,
+    ConsolidatedInvoice,
+    Document,
+    DocumentItem,
+    Setting,
+    Statement,
+    StatementBatch,
+)
 
 
 class DocumentItemInline(TabularInline):
@@ -29,3 +37,51 @@ class DocumentAdmin(ModelAdmin):
 class SettingAdmin(ModelAdmin):
     list_display = ("key", "value", "description")
     search_fields = ("key", "description")
+
+
+@admin.register(BillingRun)
+class BillingRunAdmin(ModelAdmin):
+    list_display = (
+        "period_start",
+        "status",
+        "invoices_created",
+        "pdfs_rendered",
+        "pdf_failures",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = [f.name for f in BillingRun._meta.fields]
+
+
+@admin.register(ConsolidatedInvoice)
+class ConsolidatedInvoiceAdmin(ModelAdmin):
+    list_display = ("document", "customer", "period_start", "due_date", "pdf")
+    list_filter = ("period_start",)
+    search_fields = ("customer__name", "document__document_number")
+    raw_id_fields = ("customer", "document", "run")
+
+
+class StatementInline(TabularInline):
+    model = Statement
+    extra = 0
+    fields = ("customer", "document_count", "total_amount", "pdf", "emailed_at", "error")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(StatementBatch)
+class StatementBatchAdmin(ModelAdmin):
+    list_display = (
+        "period_start",
+        "period_end",
+        "status",
+        "total",
+        "rendered",
+        "emailed",
+        "failed",
+        "created_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = [f.name for f in StatementBatch._meta.fields]
+    inlines = [StatementInline]
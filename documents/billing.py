@@ -0,0 +1,236 @@
+"""
+Monthly consolidated tax invoices for credit customers.
+
+run_billing() bills every customer whose CustomerType has credit days for
+the chosen month: all their billable (ready/completed), unpaid jobs created
+before the month ended that carry no tax invoice yet go onto one invoice,
+one DocumentItem per job.
+
+Customers are processed in chunks of CHUNK_SIZE. Each chunk is one
+transaction that fetches its jobs in one query, reserves the chunk's invoice
+numbers under one lock (Document.allocate_numbers) and bulk-inserts the
+documents, items and ConsolidatedInvoice rows — so a failure loses at most
+the chunk in flight, and numbering stays gap-free.
+
+ConsolidatedInvoice is unique per customer and month, which makes a run
+idempotent: re-running a month skips customers already billed and renders
+only invoices still missing a PDF. PDFs are rendered RENDER_BATCH at a time
+on a process pool (documents/pdf.py) and stored on the invoice.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import BillingRun, ConsolidatedInvoice, Document, DocumentItem, DocumentType, Setting
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200
+RENDER_BATCH = 50
+CENT = Decimal("0.01")
+
+
+def credit_jobs(period):
+    """Jobs the run for `period` would bill, ordered by customer."""
+    from customers.models import BILLABLE_STATUSES
+    from jobs.models import Job, PaymentStatus
+
+    invoiced = Document.objects.filter(
+        job=OuterRef("pk"), document_type=DocumentType.TAX_INVOICE, is_void=False
+    )
+    invoiced_as_line = DocumentItem.objects.filter(
+        job=OuterRef("pk"),
+        document__document_type=DocumentType.TAX_INVOICE,
+        document__is_void=False,
+    )
+    billed = ConsolidatedInvoice.objects.filter(
+        customer=OuterRef("customer"), period_start=period.start
+    )
+    return (
+        Job.objects.filter(
+            status__in=BILLABLE_STATUSES,
+            created_at__lt=period.end_at,
+            customer__customer_type__credit_days__gt=0,
+        )
+        .exclude(payment_status=PaymentStatus.PAID)
+        .exclude(Exists(invoiced))
+        .exclude(Exists(invoiced_as_line))
+        .exclude(Exists(billed))
+        .order_by("customer_id", "pk")
+    )
+
+
+def _billing_user():
+    from accounts.models import Role, User
+
+    user = User.objects.filter(role=Role.OWNER, is_active=True).order_by("pk").first()
+    if user is None:
+        raise ValueError("No active owner account to issue invoices as")
+    return user
+
+
+def _invoice(period, customer, jobs, number, issued_by, vat_rate):
+    """Unsaved (Document, [DocumentItem], ConsolidatedInvoice) for one customer."""
+    year, sequence, document_number = number
+    divisor = 1 + vat_rate / Decimal("100")
+    total = Decimal("0")
+    items = []
+    for job in jobs:
+        amount = job.quoted_price - job.discount_amount
+        net = (amount / divisor).quantize(CENT, rounding=ROUND_HALF_UP)
+        total += amount
+        items.append(
+            DocumentItem(
+                job=job,
+                description=f"#{job.pk} {job.product_type.name} — {job.title}",
+                quantity=job.quantity,
+                unit=job.product_type.unit,
+                unit_price=(net / max(job.quantity, 1)).quantize(CENT, rounding=ROUND_HALF_UP),
+                amount=net,
+            )
+        )
+    subtotal = sum((item.amount for item in items), Decimal("0"))
+    document = Document(
+        job=jobs[0],
+        document_type=DocumentType.TAX_INVOICE,
+        document_number=document_number,
+        sequence=sequence,
+        year=year,
+        customer_name=customer.name,
+        customer_address=customer.billing_address,
+        customer_tax_id=customer.tax_id,
+        subtotal=subtotal,
+        vat_rate=vat_rate,
+        vat_amount=total - subtotal,
+        total_amount=total,
+        issued_by=issued_by,
+        notes=f"ใบกำกับภาษีรวมประจำเดือน {period.label} ({len(jobs)} งาน)",
+    )
+    consolidated = ConsolidatedInvoice(
+        customer=customer,
+        period_start=period.start,
+        due_date=timezone.localdate() + timedelta(days=customer.customer_type.credit_days),
+    )
+    return document, items, consolidated
+
+
+def _issue_chunk(run, period, customer_ids, issued_by, vat_rate):
+    """Bill one chunk of customers in one transaction; returns invoices created."""
+    from . import rollups
+
+    with transaction.atomic():
+        jobs_by_customer = {}
+        for job in credit_jobs(period).filter(customer_id__in=customer_ids).select_related(
+            "customer__customer_type", "product_type"
+        ):
+            jobs_by_customer.setdefault(job.customer_id, []).append(job)
+        if not jobs_by_customer:
+            return 0
+
+        numbers = Document.allocate_numbers(DocumentType.TAX_INVOICE, len(jobs_by_customer))
+        built = [
+            _invoice(period, jobs[0].customer, jobs, number, issued_by, vat_rate)
+            for jobs, number in zip(jobs_by_customer.values(), numbers)
+        ]
+        documents = Document.objects.bulk_create([document for document, _, _ in built])
+        items, invoices = [], []
+        for document, (_, doc_items, consolidated) in zip(documents, built):
+            for item in doc_items:
+                item.document = document
+            items.extend(doc_items)
+            consolidated.document = document
+            consolidated.run = run
+            invoices.append(consolidated)
+        DocumentItem.objects.bulk_create(items, batch_size=1000)
+        ConsolidatedInvoice.objects.bulk_create(invoices)
+        # bulk_create sends no post_save, so the VAT rollup is applied here
+        rollups.apply_vat_documents(documents)
+        BillingRun.objects.filter(pk=run.pk).update(
+            invoices_created=F("invoices_created") + len(documents)
+        )
+    return len(documents)
+
+
+def issue_invoices(run, period, issued_by, chunk_size=CHUNK_SIZE):
+    """Create the month's consolidated invoices chunk by chunk; returns the number created."""
+    vat_rate = Decimal(Setting.get("vat_rate", "7"))
+    customer_ids = list(credit_jobs(period).values_list("customer_id", flat=True).distinct())
+    created = 0
+    for i in range(0, len(customer_ids), chunk_size):
+        created += _issue_chunk(run, period, customer_ids[i:i + chunk_size], issued_by, vat_rate)
+    return created
+
+
+def render_pending(period, run=None, workers=None, batch_size=RENDER_BATCH):
+    """
+    Render and store PDFs for the month's invoices that have none yet.
+
+    Returns (rendered, failed); failures keep their error on the invoice and
+    are retried by the next run.
+    """
+    from .pdf import render_many, shop_info
+
+    shop = shop_info()
+    pending = (
+        ConsolidatedInvoice.objects.filter(period_start=period.start, pdf="")
+        .select_related("document__issued_by", "document__job")
+        .prefetch_related("document__items")
+        .order_by("pk")
+    )
+    rendered = failed = 0
+    last_pk = 0
+    while chunk := list(pending.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = chunk[-1].pk
+        htmls = [
+            render_to_string(
+                "documents/pdf/document.html", {"document": invoice.document, "shop": shop}
+            )
+            for invoice in chunk
+        ]
+        chunk_failed = 0
+        for invoice, result in zip(chunk, render_many(htmls, workers)):
+            if isinstance(result, Exception):
+                logger.warning("PDF for %s failed: %s", invoice.document.document_number, result)
+                invoice.pdf_error = f"{type(result).__name__}: {result}"
+                chunk_failed += 1
+            else:
+                filename = f"{invoice.document.document_number}.pdf"
+                invoice.pdf.save(filename, ContentFile(result), save=False)
+                invoice.pdf_error = ""
+        ConsolidatedInvoice.objects.bulk_update(chunk, ["pdf", "pdf_error"])
+        rendered += len(chunk) - chunk_failed
+        failed += chunk_failed
+        if run is not None:
+            BillingRun.objects.filter(pk=run.pk).update(
+                pdfs_rendered=F("pdfs_rendered") + len(chunk) - chunk_failed,
+                pdf_failures=F("pdf_failures") + chunk_failed,
+            )
+    return rendered, failed
+
+
+def run_billing(period, user=None, chunk_size=CHUNK_SIZE, workers=None, render=True):
+    """Issue (and render) the month's consolidated invoices; returns the BillingRun."""
+    run = BillingRun.objects.create(period_start=period.start, started_by=user)
+    try:
+        issue_invoices(run, period, user or _billing_user(), chunk_size)
+        if render:
+            render_pending(period, run, workers)
+    except Exception as exc:
+        BillingRun.objects.filter(pk=run.pk).update(
+            status=BillingRun.Status.FAILED,
+            error=f"{type(exc).__name__}: {exc}",
+            finished_at=timezone.now(),
+        )
+        raise
+    BillingRun.objects.filter(pk=run.pk).update(
+        status=BillingRun.Status.DONE, finished_at=timezone.now()
+    )
+    run.refresh_from_db()
+    return run
@@ -0,0 +1,34 @@
+"""
+Management command: rebuild_report_rollups
+
+Recomputes the DailyRevenue and DailyVat report rollups from Payment and
+Document. Run after bulk imports, admin edits or backdated demo data.
+
+Usage:
+    python manage.py rebuild_report_rollups                                  # everything
+    python manage.py rebuild_report_rollups --start 2025-01-01 --end 2025-02-01
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily revenue / VAT rollups from Payment and Document"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+        parser.add_argument(
+            "--end", type=date.fromisoformat, help="Day after the last (YYYY-MM-DD)"
+        )
+
+    def handle(self, *args, **options):
+        from documents.rollups import rebuild
+
+        revenue_rows, vat_rows = rebuild(options["start"], options["end"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {revenue_rows} daily revenue rows, {vat_rows} daily VAT rows."
+            )
+        )
@@ -0,0 +1,54 @@
+"""
+Management command: run_monthly_billing
+
+Issues one consolidated tax invoice per credit customer for a month and
+renders the PDFs (documents/billing.py). Safe to re-run: customers already
+billed for the month are skipped and missing PDFs are retried.
+
+Usage:
+    python manage.py run_monthly_billing                     # last month
+    python manage.py run_monthly_billing --month 2025-09     # BE years work too: 2568-09
+    python manage.py run_monthly_billing --month 2025-09 --no-pdf
+    python manage.py run_monthly_billing --workers 8 --chunk-size 500
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Issue monthly consolidated tax invoices for credit customers"
+
+    def add_arguments(self, parser):
+        from documents.billing import CHUNK_SIZE
+
+        parser.add_argument("--month", help="YYYY-MM (default: last month)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, default=None, help="PDF render processes")
+        parser.add_argument("--no-pdf", action="store_true", help="Issue invoices only")
+
+    def handle(self, *args, **options):
+        from django.utils import timezone
+
+        from documents.billing import run_billing
+        from documents.periods import Period
+
+        if options["month"]:
+            try:
+                year, month = options["month"].split("-")
+                period = Period.month(year, month)
+            except ValueError:
+                raise CommandError("--month must look like 2025-09") from None
+        else:
+            period = Period.containing(timezone.localdate()).previous
+
+        self.stdout.write(f"Billing {period.label}...")
+        run = run_billing(
+            period,
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            render=not options["no_pdf"],
+        )
+        summary = f"Issued {run.invoices_created} invoices, rendered {run.pdfs_rendered} PDFs"
+        if run.pdf_failures:
+            summary += f", {run.pdf_failures} PDF failures (re-run to retry)"
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,143 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def seed_rollups(apps, schema_editor):
+    """Build the rollups from existing payments and tax invoices."""
+    Payment = apps.get_model("payments", "Payment")
+    Document = apps.get_model("documents", "Document")
+    DailyRevenue = apps.get_model("documents", "DailyRevenue")
+    DailyVat = apps.get_model("documents", "DailyVat")
+
+    DailyRevenue.objects.bulk_create(
+        [
+            DailyRevenue(
+                date=row["day"],
+                product_type_id=row["job__product_type"],
+                method=row["method"],
+                total=row["total"],
+                count=row["count"],
+            )
+            for row in Payment.objects.annotate(day=TruncDate("received_at"))
+            .values("day", "job__product_type", "method")
+            .annotate(total=Sum(F("amount") + F("wht_amount")), count=Count("id"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+    DailyVat.objects.bulk_create(
+        [
+            DailyVat(
+                date=row["day"],
+                subtotal=row["subtotal"],
+                vat_amount=row["vat_amount"],
+                total_amount=row["total_amount"],
+                count=row["count"],
+            )
+            for row in Document.objects.filter(
+                document_type="tax_invoice", vat_rate__gt=0, is_void=False
+            )
+            .annotate(day=TruncDate("issued_at"))
+            .values("day")
+            .annotate(
+                subtotal=Sum("subtotal"),
+                vat_amount=Sum("vat_amount"),
+                total_amount=Sum("total_amount"),
+                count=Count("id"),
+            )
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0002_initial"),
+        ("jobs", "0002_initial"),
+        ("payments", "0002_payment_wht"),
+        ("production", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyVat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="วันที่")),
+                (
+                    "subtotal",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="ยอดก่อนภาษี"
+                    ),
+                ),
+                (
+                    "vat_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="VAT"
+                    ),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="ยอดรวม"
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="จำนวนเอกสาร")),
+            ],
+            options={
+                "verbose_name": "VAT รายวัน",
+                "verbose_name_plural": "VAT รายวัน",
+                "ordering": ["date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="วันที่")),
+                ("method", models.CharField(max_length=15, verbose_name="วิธีชำระ")),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="ยอดรวม"
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="จำนวนรายการ")),
+                (
+                    "product_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="production.producttype",
+                        verbose_name="ประเภทสินค้า",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "รายได้รายวัน",
+                "verbose_name_plural": "รายได้รายวัน",
+                "ordering": ["date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "product_type", "method"), name="uniq_daily_revenue"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
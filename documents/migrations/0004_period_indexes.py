@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0003_daily_rollups"),
+        ("jobs", "0006_jobstatuscounter"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(
+                fields=["document_type", "issued_at"], name="documents_d_documen_6a8366_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(fields=["job", "issued_at"], name="documents_d_job_id_2967c0_idx"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("documents", "0004_period_indexes"),
+        ("jobs", "0007_period_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentitem",
+            name="job",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="document_items",
+                to="jobs.job",
+                verbose_name="งาน",
+            ),
+        ),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import documents.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("documents", "0005_documentitem_job"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillingRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("period_start", models.DateField(verbose_name="รอบเดือน")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "กำลังทำงาน"),
+                            ("done", "เสร็จสิ้น"),
+                            ("failed", "ล้มเหลว"),
+                        ],
+                        default="running",
+                        max_length=10,
+                        verbose_name="สถานะ",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True, verbose_name="เริ่มเมื่อ")),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="เสร็จเมื่อ"),
+                ),
+                (
+                    "invoices_created",
+                    models.PositiveIntegerField(default=0, verbose_name="ใบกำกับที่ออก"),
+                ),
+                ("pdfs_rendered", models.PositiveIntegerField(default=0, verbose_name="PDF ที่สร้าง")),
+                (
+                    "pdf_failures",
+                    models.PositiveIntegerField(default=0, verbose_name="PDF ที่ล้มเหลว"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="ข้อผิดพลาด")),
+                (
+                    "started_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="เริ่มโดย",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "รอบวางบิล",
+                "verbose_name_plural": "รอบวางบิล",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ConsolidatedInvoice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("period_start", models.DateField(verbose_name="รอบเดือน")),
+                ("due_date", models.DateField(verbose_name="ครบกำหนดชำระ")),
+                (
+                    "pdf",
+                    models.FileField(
+                        blank=True,
+                        upload_to=documents.models.consolidated_pdf_path,
+                        verbose_name="PDF",
+                    ),
+                ),
+                ("pdf_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="consolidated_invoices",
+                        to="customers.customer",
+                        verbose_name="ลูกค้า",
+                    ),
+                ),
+                (
+                    "document",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="consolidation",
+                        to="documents.document",
+                        verbose_name="ใบกำกับภาษี",
+                    ),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="invoices",
+                        to="documents.billingrun",
+                        verbose_name="รอบวางบิล",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ใบกำกับภาษีรวมรายเดือน",
+                "verbose_name_plural": "ใบกำกับภาษีรวมรายเดือน",
+                "ordering": ["-period_start", "customer"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("customer", "period_start"), name="uniq_consolidated_invoice"
+                    )
+                ],
+            },
+        ),
+    ]
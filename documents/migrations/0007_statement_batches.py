@@ -0,0 +1,136 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import documents.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("documents", "0006_monthly_billing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatementBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("period_start", models.DateField(verbose_name="ตั้งแต่")),
+                ("period_end", models.DateField(verbose_name="ถึง (ไม่รวม)")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "รอคิว"),
+                            ("running", "กำลังสร้าง"),
+                            ("done", "เสร็จสิ้น"),
+                            ("failed", "ล้มเหลว"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="สถานะ",
+                    ),
+                ),
+                ("send_email", models.BooleanField(default=False, verbose_name="ส่งอีเมล")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("total", models.PositiveIntegerField(default=0, verbose_name="จำนวนลูกค้า")),
+                ("rendered", models.PositiveIntegerField(default=0, verbose_name="สร้างแล้ว")),
+                ("emailed", models.PositiveIntegerField(default=0, verbose_name="ส่งอีเมลแล้ว")),
+                ("failed", models.PositiveIntegerField(default=0, verbose_name="ล้มเหลว")),
+                ("error", models.TextField(blank=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="สร้างโดย",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ชุดใบแจ้งยอด",
+                "verbose_name_plural": "ชุดใบแจ้งยอด",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Statement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "document_count",
+                    models.PositiveIntegerField(default=0, verbose_name="จำนวนเอกสาร"),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="ยอดรวม"
+                    ),
+                ),
+                (
+                    "vat_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="VAT"
+                    ),
+                ),
+                (
+                    "pdf",
+                    models.FileField(
+                        blank=True,
+                        upload_to=documents.models.statement_pdf_path,
+                        verbose_name="PDF",
+                    ),
+                ),
+                (
+                    "emailed_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="ส่งอีเมลเมื่อ"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="ข้อผิดพลาด")),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statements",
+                        to="customers.customer",
+                        verbose_name="ลูกค้า",
+                    ),
+                ),
+                (
+                    "batch",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statements",
+                        to="documents.statementbatch",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ใบแจ้งยอด",
+                "verbose_name_plural": "ใบแจ้งยอด",
+                "ordering": ["customer__name"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("batch", "customer"), name="uniq_statement_customer"
+                    )
+                ],
+            },
+        ),
+    ]
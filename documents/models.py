@@ -18,6 +18,14 @@ class DocumentType(models.TextChoices):
     CREDIT_NOTE = "credit_note", "ใบลดหนี้"
 
 
+DOCUMENT_PREFIXES = {
+    DocumentType.QUOTATION: "QT",
+    DocumentType.TAX_INVOICE: "IV",
+    DocumentType.RECEIPT: "RC",
+    DocumentType.CREDIT_NOTE: "CN",
+}
+
+
 class Document(models.Model):
     """
     A financial document (quotation, invoice, receipt).
@@ -75,6 +83,9 @@ class Document(models.Model):
         indexes = [
             models.Index(fields=["document_type", "year", "sequence"]),
             models.Index(fields=["job"]),
+            # Period reports filter issued_at by half-open range (documents/periods.py)
+            models.Index(fields=["document_type", "issued_at"]),
+            models.Index(fields=["job", "issued_at"]),
         ]
 
     def __str__(self):
@@ -93,33 +104,48 @@ class Document(models.Model):
         Uses SELECT FOR UPDATE to prevent race conditions between concurrent
         requests (required for Thai tax compliance — no gaps allowed).
         """
-        current_year = timezone.now().year
-
         with transaction.atomic():
-            last = (
-                Document.objects.select_for_update()
-                .filter(document_type=self.document_type, year=current_year)
-                .order_by("-sequence")
-                .first()
-            )
-            self.sequence = (last.sequence + 1) if last else 1
-            self.year = current_year
-            # Prefix per document type to keep sequences independent
-            # QT-2026-00001, IV-2026-00001, RC-2026-00001, CN-2026-00001
-            prefixes = {
-                DocumentType.QUOTATION: "QT",
-                DocumentType.TAX_INVOICE: "IV",
-                DocumentType.RECEIPT: "RC",
-                DocumentType.CREDIT_NOTE: "CN",
-            }
-            prefix = prefixes.get(self.document_type, "TX")
-            self.document_number = f"{prefix}-{current_year}-{self.sequence:05d}"
+            [numbers] = Document.allocate_numbers(self.document_type, 1)
+            self.year, self.sequence, self.document_number = numbers
+
+    @classmethod
+    def allocate_numbers(cls, document_type, count):
+        """
+        Reserve `count` consecutive numbers for `document_type` under one lock.
+
+        Returns [(year, sequence, document_number), ...]. Call inside the
+        transaction that inserts the documents so the lock is held until then.
+        """
+        current_year = timezone.now().year
+        last = (
+            cls.objects.select_for_update()
+            .filter(document_type=document_type, year=current_year)
+            .order_by("-sequence")
+            .first()
+        )
+        start = (last.sequence + 1) if last else 1
+        # Prefix per document type to keep sequences independent
+        # QT-2026-00001, IV-2026-00001, RC-2026-00001, CN-2026-00001
+        prefix = DOCUMENT_PREFIXES.get(document_type, "TX")
+        return [
+            (current_year, sequence, f"{prefix}-{current_year}-{sequence:05d}")
+            for sequence in range(start, start + count)
+        ]
 
 
 class DocumentItem(models.Model):
     """Line items on a document."""
 
     document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="items")
+    # Set on combined documents (batch quotations) where each line is its own job
+    job = models.ForeignKey(
+        "jobs.Job",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="document_items",
+        verbose_name="งาน",
+    )
     description = models.CharField(max_length=255, verbose_name="รายการ")
     quantity = models.DecimalField(max_digits=10, decimal_places=3, verbose_name="จำนวน")
     unit = models.CharField(max_length=30, default="ชิ้น", verbose_name="หน่วย")
@@ -164,3 +190,243 @@ class Setting(models.Model):
             return cls.objects.get(key=key).value
         except cls.DoesNotExist:
             return default
+
+
+class DailyRevenue(models.Model):
+    """
+    Rollup: money received per day, product type and payment method.
+
+    Maintained by documents.rollups on Payment create/delete; rebuilt from
+    Payment with `manage.py rebuild_report_rollups`. Revenue reports read
+    this table instead of aggregating Payment.
+    """
+
+    date = models.DateField(verbose_name="วันที่")
+    product_type = models.ForeignKey(
+        "production.ProductType",
+        on_delete=models.PROTECT,
+        related_name="+",
+        verbose_name="ประเภทสินค้า",
+    )
+    method = models.CharField(max_length=15, verbose_name="วิธีชำระ")
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="ยอดรวม")
+    count = models.IntegerField(default=0, verbose_name="จำนวนรายการ")
+
+    class Meta:
+        verbose_name = "รายได้รายวัน"
+        verbose_name_plural = "รายได้รายวัน"
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "product_type", "method"], name="uniq_daily_revenue"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.method}: {self.total}"
+
+
+class DailyVat(models.Model):
+    """
+    Rollup: output VAT per day from non-void tax invoices.
+
+    Maintained by documents.rollups on Document create/void; rebuilt from
+    Document with `manage.py rebuild_report_rollups`.
+    """
+
+    date = models.DateField(unique=True, verbose_name="วันที่")
+    subtotal = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="ยอดก่อนภาษี"
+    )
+    vat_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="VAT")
+    total_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="ยอดรวม"
+    )
+    count = models.IntegerField(default=0, verbose_name="จำนวนเอกสาร")
+
+    class Meta:
+        verbose_name = "VAT รายวัน"
+        verbose_name_plural = "VAT รายวัน"
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date}: VAT {self.vat_amount}"
+
+
+class BillingRun(models.Model):
+    """
+    One monthly consolidated tax invoice run (documents/billing.py).
+
+    Re-running the same month resumes it: customers already billed are
+    skipped and only invoices without a PDF are rendered.
+    """
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "กำลังทำงาน"
+        DONE = "done", "เสร็จสิ้น"
+        FAILED = "failed", "ล้มเหลว"
+
+    period_start = models.DateField(verbose_name="รอบเดือน")
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.RUNNING, verbose_name="สถานะ"
+    )
+    started_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="เริ่มโดย",
+    )
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name="เริ่มเมื่อ")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="เสร็จเมื่อ")
+    invoices_created = models.PositiveIntegerField(default=0, verbose_name="ใบกำกับที่ออก")
+    pdfs_rendered = models.PositiveIntegerField(default=0, verbose_name="PDF ที่สร้าง")
+    pdf_failures = models.PositiveIntegerField(default=0, verbose_name="PDF ที่ล้มเหลว")
+    error = models.TextField(blank=True, verbose_name="ข้อผิดพลาด")
+
+    class Meta:
+        verbose_name = "รอบวางบิล"
+        verbose_name_plural = "รอบวางบิล"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.period_start:%Y-%m} — {self.get_status_display()}"
+
+
+def consolidated_pdf_path(instance, filename):
+    return f"invoices/{instance.period_start:%Y/%m}/{filename}"
+
+
+class ConsolidatedInvoice(models.Model):
+    """A customer's monthly consolidated tax invoice — at most one per customer and month."""
+
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.PROTECT,
+        related_name="consolidated_invoices",
+        verbose_name="ลูกค้า",
+    )
+    period_start = models.DateField(verbose_name="รอบเดือน")
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.PROTECT,
+        related_name="consolidation",
+        verbose_name="ใบกำกับภาษี",
+    )
+    run = models.ForeignKey(
+        BillingRun,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoices",
+        verbose_name="รอบวางบิล",
+    )
+    due_date = models.DateField(verbose_name="ครบกำหนดชำระ")
+    pdf = models.FileField(upload_to=consolidated_pdf_path, blank=True, verbose_name="PDF")
+    pdf_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "ใบกำกับภาษีรวมรายเดือน"
+        verbose_name_plural = "ใบกำกับภาษีรวมรายเดือน"
+        ordering = ["-period_start", "customer"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "period_start"], name="uniq_consolidated_invoice"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document.document_number} — {self.period_start:%Y-%m}"
+
+
+class StatementBatch(models.Model):
+    """
+    Statements for every customer with documents in a period (documents/statements.py).
+
+    Generated by the documents.tasks.generate_statements Celery task; the
+    counters are updated as it goes so the page can show progress.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "รอคิว"
+        RUNNING = "running", "กำลังสร้าง"
+        DONE = "done", "เสร็จสิ้น"
+        FAILED = "failed", "ล้มเหลว"
+
+    period_start = models.DateField(verbose_name="ตั้งแต่")
+    period_end = models.DateField(verbose_name="ถึง (ไม่รวม)")
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED, verbose_name="สถานะ"
+    )
+    send_email = models.BooleanField(default=False, verbose_name="ส่งอีเมล")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="สร้างโดย",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    total = models.PositiveIntegerField(default=0, verbose_name="จำนวนลูกค้า")
+    rendered = models.PositiveIntegerField(default=0, verbose_name="สร้างแล้ว")
+    emailed = models.PositiveIntegerField(default=0, verbose_name="ส่งอีเมลแล้ว")
+    failed = models.PositiveIntegerField(default=0, verbose_name="ล้มเหลว")
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "ชุดใบแจ้งยอด"
+        verbose_name_plural = "ชุดใบแจ้งยอด"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.period_start} – {self.period_end}: {self.get_status_display()}"
+
+    @property
+    def period(self):
+        from .periods import Period
+
+        return Period.from_bounds(self.period_start, self.period_end)
+
+    @property
+    def progress(self):
+        """Percent of statements processed (rendered or failed)."""
+        return round(100 * (self.rendered + self.failed) / self.total) if self.total else 100
+
+
+def statement_pdf_path(instance, filename):
+    return f"statements/{instance.batch_id}/{filename}"
+
+
+class Statement(models.Model):
+    """One customer's statement within a StatementBatch."""
+
+    batch = models.ForeignKey(StatementBatch, on_delete=models.CASCADE, related_name="statements")
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.CASCADE,
+        related_name="statements",
+        verbose_name="ลูกค้า",
+    )
+    document_count = models.PositiveIntegerField(default=0, verbose_name="จำนวนเอกสาร")
+    total_amount = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="ยอดรวม"
+    )
+    vat_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="VAT")
+    pdf = models.FileField(upload_to=statement_pdf_path, blank=True, verbose_name="PDF")
+    emailed_at = models.DateTimeField(null=True, blank=True, verbose_name="ส่งอีเมลเมื่อ")
+    error = models.TextField(blank=True, verbose_name="ข้อผิดพลาด")
+
+    class Meta:
+        verbose_name = "ใบแจ้งยอด"
+        verbose_name_plural = "ใบแจ้งยอด"
+        ordering = ["customer__name"]
+        constraints = [
+            models.UniqueConstraint(fields=["batch", "customer"], name="uniq_statement_customer"),
+        ]
+
+    def __str__(self):
+        return f"{self.customer} — batch #{self.batch_id}"
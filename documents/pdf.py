@@ -0,0 +1,63 @@
+"""
+PDF rendering helpers shared by the document views and batch runs.
+
+WeasyPrint layout is CPU-bound and holds the GIL, so batch runs render the
+HTML in the calling process (templates need Django) and hand the strings to
+a process pool for html_to_pdf(). Inside a Celery prefork worker, which is
+a daemonic process and may not start children, they render in-process.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def shop_info():
+    """Shop header block for documents/pdf/document.html."""
+    from .models import Setting
+
+    return {
+        "name": Setting.get("shop_name", "ร้านพิมพ์"),
+        "address": Setting.get("shop_address", ""),
+        "tax_id": Setting.get("shop_tax_id", ""),
+        "phone": Setting.get("shop_phone", ""),
+    }
+
+
+def html_to_pdf(html, base_url=None):
+    """PDF bytes for an HTML string. Runs in pool workers, so keep it module-level."""
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=base_url or settings.BASE_URL).write_pdf()
+
+
+def _render_one(html):
+    try:
+        return html_to_pdf(html)
+    except Exception as exc:  # one bad document must not sink the whole batch
+        return exc
+
+
+def render_many(htmls, workers=None):
+    """
+    Render each HTML string to PDF bytes, in order, on `workers` processes.
+
+    A failed render yields its exception instead of bytes. workers <= 1, a
+    daemonic caller (Celery prefork) or a pool that cannot start renders in
+    this process.
+    """
+    htmls = list(htmls)
+    workers = settings.PDF_RENDER_WORKERS if workers is None else workers
+    if workers <= 1 or len(htmls) <= 1 or multiprocessing.current_process().daemon:
+        return [_render_one(html) for html in htmls]
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(htmls))) as pool:
+            return list(pool.map(_render_one, htmls))
+    except (OSError, AssertionError, BrokenProcessPool) as exc:
+        logger.warning("PDF process pool unavailable (%s); rendering in-process", exc)
+        return [_render_one(html) for html in htmls]
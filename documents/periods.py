@@ -0,0 +1,245 @@
+"""
+Reporting periods — Thai-calendar month / quarter / year selections as
+timezone-aware half-open ranges.
+
+Reports filter with `issued_at__gte=period.start_at, issued_at__lt=period.end_at`
+(see Period.lookup) instead of `__year` / `__month` / `__date`, which wrap the
+column in a function and cannot use a plain btree index.
+
+Years may be given in the Buddhist Era (พ.ศ. 2568) or Common Era (2025);
+anything above BE_THRESHOLD is treated as BE. Labels are always rendered in BE.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+
+BE_OFFSET = 543
+BE_THRESHOLD = 2400
+
+THAI_MONTHS = [
+    "", "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน",
+    "พฤษภาคม", "มิถุนายน", "กรกฎาคม", "สิงหาคม",
+    "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม",
+]
+
+MONTH = "month"
+QUARTER = "quarter"
+YEAR = "year"
+CUSTOM = "custom"
+KINDS = (MONTH, QUARTER, YEAR)
+
+
+def to_ce(year):
+    """Normalise a BE or CE year to CE."""
+    year = int(year)
+    return year - BE_OFFSET if year > BE_THRESHOLD else year
+
+
+def day_start(day):
+    """Aware datetime for local midnight at the start of `day`."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def shift_year(day, years):
+    """Same calendar day `years` away; 29 Feb maps to 28 Feb."""
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class Period:
+    """A half-open date range [start, end) plus how it was selected."""
+
+    kind: str
+    start: date
+    end: date
+
+    # -- constructors -------------------------------------------------------
+
+    @classmethod
+    def month(cls, year, month):
+        start = date(to_ce(year), max(1, min(12, int(month))), 1)
+        return cls(MONTH, start, _add_months(start, 1))
+
+    @classmethod
+    def quarter(cls, year, quarter):
+        quarter = max(1, min(4, int(quarter)))
+        start = date(to_ce(year), (quarter - 1) * 3 + 1, 1)
+        return cls(QUARTER, start, _add_months(start, 3))
+
+    @classmethod
+    def year(cls, year):
+        year = to_ce(year)
+        return cls(YEAR, date(year, 1, 1), date(year + 1, 1, 1))
+
+    @classmethod
+    def between(cls, first, last):
+        """Custom range with an inclusive last day, as entered in a date picker."""
+        return cls(CUSTOM, first, last + timedelta(days=1))
+
+    @classmethod
+    def from_bounds(cls, start, end):
+        """The period [start, end) — as a month, quarter or year when it is exactly one."""
+        for kind in KINDS:
+            candidate = cls.containing(start, kind)
+            if (candidate.start, candidate.end) == (start, end):
+                return candidate
+        return cls(CUSTOM, start, end)
+
+    @classmethod
+    def containing(cls, day, kind=MONTH):
+        if kind == QUARTER:
+            return cls.quarter(day.year, (day.month - 1) // 3 + 1)
+        if kind == YEAR:
+            return cls.year(day.year)
+        return cls.month(day.year, day.month)
+
+    # -- ranges -------------------------------------------------------------
+
+    @property
+    def start_at(self):
+        return day_start(self.start)
+
+    @property
+    def end_at(self):
+        return day_start(self.end)
+
+    @property
+    def last_day(self):
+        return self.end - timedelta(days=1)
+
+    def lookup(self, field):
+        """Filter kwargs for a DateTimeField (`field`) falling in this period."""
+        return {f"{field}__gte": self.start_at, f"{field}__lt": self.end_at}
+
+    def date_lookup(self, field):
+        """Filter kwargs for a DateField (`field`) falling in this period."""
+        return {f"{field}__gte": self.start, f"{field}__lt": self.end}
+
+    # -- navigation ---------------------------------------------------------
+
+    @property
+    def number(self):
+        """Month (1-12) or quarter (1-4) number; None for years and custom ranges."""
+        if self.kind == MONTH:
+            return self.start.month
+        if self.kind == QUARTER:
+            return (self.start.month - 1) // 3 + 1
+        return None
+
+    @property
+    def be_year(self):
+        return self.start.year + BE_OFFSET
+
+    def _step(self, steps):
+        if self.kind == MONTH:
+            start = _add_months(self.start, steps)
+            return Period.month(start.year, start.month)
+        if self.kind == QUARTER:
+            start = _add_months(self.start, steps * 3)
+            return Period.quarter(start.year, (start.month - 1) // 3 + 1)
+        if self.kind == YEAR:
+            return Period.year(self.start.year + steps)
+        length = self.end - self.start
+        return Period(CUSTOM, self.start + length * steps, self.end + length * steps)
+
+    @property
+    def previous(self):
+        return self._step(-1)
+
+    @property
+    def next(self):
+        return self._step(1)
+
+    def shift_years(self, years):
+        """Same period `years` away — the year-over-year comparison window."""
+        if self.kind == CUSTOM:
+            return Period.between(shift_year(self.start, years), shift_year(self.last_day, years))
+        return Period.containing(self.start.replace(year=self.start.year + years), self.kind)
+
+    # -- display ------------------------------------------------------------
+
+    month_choices = [(number, name) for number, name in enumerate(THAI_MONTHS) if number]
+
+    @property
+    def label(self):
+        if self.kind == MONTH:
+            return f"{THAI_MONTHS[self.start.month]} {self.be_year}"
+        if self.kind == QUARTER:
+            return f"ไตรมาส {self.number}/{self.be_year}"
+        if self.kind == YEAR:
+            return f"ปี {self.be_year}"
+        last = self.last_day
+        return (
+            f"{self.start.day} {THAI_MONTHS[self.start.month]} {self.be_year} – "
+            f"{last.day} {THAI_MONTHS[last.month]} {last.year + BE_OFFSET}"
+        )
+
+    @property
+    def query(self):
+        """Query string that selects this period again (for links and exports)."""
+        if self.kind == MONTH:
+            return f"period=month&year={self.start.year}&month={self.number}"
+        if self.kind == QUARTER:
+            return f"period=quarter&year={self.start.year}&quarter={self.number}"
+        if self.kind == YEAR:
+            return f"period=year&year={self.start.year}"
+        return f"start={self.start.isoformat()}&end={self.last_day.isoformat()}"
+
+    @property
+    def slug(self):
+        """Filename-safe identifier, e.g. 2025_03, 2025_Q1, 2025, 20250101-20250115."""
+        if self.kind == MONTH:
+            return f"{self.start.year}_{self.number:02d}"
+        if self.kind == QUARTER:
+            return f"{self.start.year}_Q{self.number}"
+        if self.kind == YEAR:
+            return f"{self.start.year}"
+        return f"{self.start:%Y%m%d}-{self.last_day:%Y%m%d}"
+
+
+def period_from_request(request, default=MONTH):
+    """
+    Period selected by the query string; falls back to the current `default` period.
+
+        ?start=YYYY-MM-DD&end=YYYY-MM-DD          custom range (end inclusive)
+        ?period=month&year=2568&month=3           month (BE or CE year)
+        ?period=quarter&year=2568&quarter=1       quarter
+        ?period=year&year=2568                    year
+
+    `period` may be omitted when only month/year are given, which keeps the
+    existing ?month=&year= links working.
+    """
+    params = request.GET
+    today = timezone.localdate()
+
+    if params.get("start") and params.get("end"):
+        try:
+            first = date.fromisoformat(params["start"])
+            last = date.fromisoformat(params["end"])
+            if last >= first:
+                return Period.between(first, last)
+        except ValueError:
+            pass
+
+    kind = params.get("period") or default
+    if kind not in KINDS:
+        kind = default
+    try:
+        year = to_ce(params.get("year", today.year))
+        if kind == QUARTER:
+            return Period.quarter(year, params.get("quarter", (today.month - 1) // 3 + 1))
+        if kind == YEAR:
+            return Period.year(year)
+        return Period.month(year, params.get("month", today.month))
+    except (ValueError, TypeError):
+        return Period.containing(today, kind)
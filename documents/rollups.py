@@ -0,0 +1,301 @@
+"""
+Daily report rollups — DailyRevenue (payments) and DailyVat (tax invoices).
+
+Rows are adjusted with F() increments as payments and documents are created,
+edited, deleted or voided, and as a paid job changes product type, so a
+monthly or yearly report sums a few hundred daily rows instead of scanning
+Payment / Document. rebuild() recomputes a date range from the source
+tables and is what `rebuild_report_rollups` runs. Receivers are connected
+in DocumentsConfig.ready().
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyRevenue, DailyVat, Document, DocumentType
+from .periods import day_start
+
+
+def _local_date(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def _is_vat_document(doc):
+    return doc.document_type == DocumentType.TAX_INVOICE and Decimal(str(doc.vat_rate)) > 0
+
+
+def apply_payment(payment, sign=1):
+    """Add (sign=1) or remove (sign=-1) one payment from DailyRevenue."""
+    from jobs.models import Job
+
+    amount = Decimal(str(payment.amount)) + Decimal(str(payment.wht_amount or 0))
+    product_type_id = Job.objects.values_list("product_type_id", flat=True).get(pk=payment.job_id)
+    with transaction.atomic():
+        row, _ = DailyRevenue.objects.get_or_create(
+            date=_local_date(payment.received_at),
+            product_type_id=product_type_id,
+            method=payment.method,
+        )
+        DailyRevenue.objects.filter(pk=row.pk).update(
+            total=F("total") + amount * sign, count=F("count") + sign
+        )
+
+
+def _add_revenue(rows):
+    """Add {(date, product_type_id, method): [total, count]} to DailyRevenue."""
+    with transaction.atomic():
+        for (date, product_type_id, method), (total, count) in rows.items():
+            row, _ = DailyRevenue.objects.get_or_create(
+                date=date, product_type_id=product_type_id, method=method
+            )
+            DailyRevenue.objects.filter(pk=row.pk).update(
+                total=F("total") + total, count=F("count") + count
+            )
+
+
+def apply_payments(payments):
+    """apply_payment() for payments inserted with bulk_create (no post_save)."""
+    from jobs.models import Job
+
+    product_types = dict(
+        Job.objects.filter(pk__in={p.job_id for p in payments}).values_list("pk", "product_type_id")
+    )
+    rows = {}
+    for payment in payments:
+        key = (_local_date(payment.received_at), product_types[payment.job_id], payment.method)
+        row = rows.setdefault(key, [Decimal("0"), 0])
+        row[0] += Decimal(str(payment.amount)) + Decimal(str(payment.wht_amount or 0))
+        row[1] += 1
+    _add_revenue(rows)
+
+
+def move_job_revenue(job_id, from_product_type_id, to_product_type_id):
+    """Move a job's payments from one product type's DailyRevenue rows to another's."""
+    from payments.models import Payment
+
+    rows = {}
+    payments = Payment.objects.filter(job_id=job_id).values_list(
+        "received_at", "method", "amount", "wht_amount"
+    )
+    for received_at, method, amount, wht_amount in payments:
+        amount = amount + (wht_amount or 0)
+        day = _local_date(received_at)
+        for product_type_id, sign in ((from_product_type_id, -1), (to_product_type_id, 1)):
+            row = rows.setdefault((day, product_type_id, method), [Decimal("0"), 0])
+            row[0] += amount * sign
+            row[1] += sign
+    _add_revenue(rows)
+
+
+def apply_vat_document(doc, sign=1):
+    """Add (sign=1) or remove (sign=-1) one tax invoice from DailyVat."""
+    if not _is_vat_document(doc):
+        return
+    with transaction.atomic():
+        row, _ = DailyVat.objects.get_or_create(date=_local_date(doc.issued_at))
+        DailyVat.objects.filter(pk=row.pk).update(
+            subtotal=F("subtotal") + Decimal(str(doc.subtotal)) * sign,
+            vat_amount=F("vat_amount") + Decimal(str(doc.vat_amount)) * sign,
+            total_amount=F("total_amount") + Decimal(str(doc.total_amount)) * sign,
+            count=F("count") + sign,
+        )
+
+
+def apply_vat_documents(docs):
+    """apply_vat_document() for documents inserted with bulk_create (no post_save)."""
+    days = {}
+    for doc in docs:
+        if _is_vat_document(doc) and not doc.is_void:
+            day = days.setdefault(_local_date(doc.issued_at), [Decimal("0")] * 3 + [0])
+            day[0] += Decimal(str(doc.subtotal))
+            day[1] += Decimal(str(doc.vat_amount))
+            day[2] += Decimal(str(doc.total_amount))
+            day[3] += 1
+    with transaction.atomic():
+        for date, (subtotal, vat_amount, total_amount, count) in days.items():
+            row, _ = DailyVat.objects.get_or_create(date=date)
+            DailyVat.objects.filter(pk=row.pk).update(
+                subtotal=F("subtotal") + subtotal,
+                vat_amount=F("vat_amount") + vat_amount,
+                total_amount=F("total_amount") + total_amount,
+                count=F("count") + count,
+            )
+
+
+def rebuild(start=None, end=None):
+    """
+    Recompute rollups for dates in [start, end) — everything when both are None.
+
+    Returns (revenue_rows, vat_rows) written.
+    """
+    from payments.models import Payment
+
+    payments = Payment.objects.all()
+    docs = Document.objects.filter(
+        document_type=DocumentType.TAX_INVOICE, vat_rate__gt=0, is_void=False
+    )
+    revenue_rows = DailyRevenue.objects.all()
+    vat_rows = DailyVat.objects.all()
+    if start is not None:
+        start_dt = day_start(start)
+        payments = payments.filter(received_at__gte=start_dt)
+        docs = docs.filter(issued_at__gte=start_dt)
+        revenue_rows = revenue_rows.filter(date__gte=start)
+        vat_rows = vat_rows.filter(date__gte=start)
+    if end is not None:
+        end_dt = day_start(end)
+        payments = payments.filter(received_at__lt=end_dt)
+        docs = docs.filter(issued_at__lt=end_dt)
+        revenue_rows = revenue_rows.filter(date__lt=end)
+        vat_rows = vat_rows.filter(date__lt=end)
+
+    revenue = [
+        DailyRevenue(
+            date=row["day"],
+            product_type_id=row["job__product_type"],
+            method=row["method"],
+            total=row["total"],
+            count=row["count"],
+        )
+        for row in payments.annotate(day=TruncDate("received_at"))
+        .values("day", "job__product_type", "method")
+        .annotate(total=Sum(F("amount") + F("wht_amount")), count=Count("id"))
+        .order_by()
+    ]
+    vat = [
+        DailyVat(
+            date=row["day"],
+            subtotal=row["subtotal"],
+            vat_amount=row["vat_amount"],
+            total_amount=row["total_amount"],
+            count=row["count"],
+        )
+        for row in docs.annotate(day=TruncDate("issued_at"))
+        .values("day")
+        .annotate(
+            subtotal=Sum("subtotal"),
+            vat_amount=Sum("vat_amount"),
+            total_amount=Sum("total_amount"),
+            count=Count("id"),
+        )
+        .order_by()
+    ]
+    with transaction.atomic():
+        revenue_rows.delete()
+        vat_rows.delete()
+        DailyRevenue.objects.bulk_create(revenue, batch_size=1000)
+        DailyVat.objects.bulk_create(vat, batch_size=1000)
+    return len(revenue), len(vat)
+
+
+def revenue_summary(start, end):
+    """Totals and breakdowns from DailyRevenue for [start, end)."""
+    rows = DailyRevenue.objects.filter(date__gte=start, date__lt=end)
+    return {
+        "total": rows.aggregate(total=Sum("total"))["total"] or Decimal("0"),
+        "by_product": list(
+            rows.values("product_type_id", "product_type__name")
+            .annotate(total=Sum("total"), count=Sum("count"))
+            .order_by("-total")
+        ),
+        "by_method": list(
+            rows.values("method").annotate(total=Sum("total")).order_by("-total")
+        ),
+    }
+
+
+def vat_summary(start, end):
+    """VAT totals from DailyVat for [start, end)."""
+    return DailyVat.objects.filter(date__gte=start, date__lt=end).aggregate(
+        total_subtotal=Sum("subtotal"),
+        total_vat=Sum("vat_amount"),
+        total_amount=Sum("total_amount"),
+        count=Sum("count"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers
+# ---------------------------------------------------------------------------
+
+PAYMENT_ROLLUP_FIELDS = ["job_id", "received_at", "method", "amount", "wht_amount"]
+
+
+def _on_payment_pre_save(sender, instance, raw=False, **kwargs):
+    # the payment as it is stored, to take out of the rollup if it is edited
+    instance._rollup_before = None
+    if instance.pk and not raw:
+        row = sender.objects.filter(pk=instance.pk).values(*PAYMENT_ROLLUP_FIELDS).first()
+        instance._rollup_before = SimpleNamespace(**row) if row else None
+
+
+def _on_payment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_payment(instance)
+        return
+    before = getattr(instance, "_rollup_before", None)
+    after = [getattr(instance, field) for field in PAYMENT_ROLLUP_FIELDS]
+    if before is not None and after != [getattr(before, field) for field in PAYMENT_ROLLUP_FIELDS]:
+        apply_payment(before, sign=-1)
+        apply_payment(instance)
+
+
+def _on_payment_deleted(sender, instance, **kwargs):
+    apply_payment(instance, sign=-1)
+
+
+def _on_job_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._rollup_product_type_id = None
+    if instance.pk and not raw and (update_fields is None or "product_type" in update_fields):
+        instance._rollup_product_type_id = (
+            sender.objects.filter(pk=instance.pk).values_list("product_type_id", flat=True).first()
+        )
+
+
+def _on_job_saved(sender, instance, created, raw=False, **kwargs):
+    before = getattr(instance, "_rollup_product_type_id", None)
+    if not raw and not created and before is not None and before != instance.product_type_id:
+        move_job_revenue(instance.pk, before, instance.product_type_id)
+
+
+def _on_document_pre_save(sender, instance, raw=False, **kwargs):
+    instance._was_void = None
+    if instance.pk and not raw:
+        instance._was_void = (
+            Document.objects.filter(pk=instance.pk).values_list("is_void", flat=True).first()
+        )
+
+
+def _on_document_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        if not instance.is_void:
+            apply_vat_document(instance)
+    elif instance._was_void is False and instance.is_void:
+        apply_vat_document(instance, sign=-1)
+    elif instance._was_void is True and not instance.is_void:
+        apply_vat_document(instance)
+
+
+def connect_rollup_hooks():
+    from django.db.models.signals import post_delete, post_save, pre_save
+
+    from jobs.models import Job
+    from payments.models import Payment
+
+    pre_save.connect(_on_payment_pre_save, sender=Payment, dispatch_uid="rollup_payment_pre")
+    post_save.connect(_on_payment_saved, sender=Payment, dispatch_uid="rollup_payment_saved")
+    post_delete.connect(_on_payment_deleted, sender=Payment, dispatch_uid="rollup_payment_deleted")
+    pre_save.connect(_on_document_pre_save, sender=Document, dispatch_uid="rollup_document_pre")
+    post_save.connect(_on_document_saved, sender=Document, dispatch_uid="rollup_document_saved")
+    pre_save.connect(_on_job_pre_save, sender=Job, dispatch_uid="rollup_job_pre")
+    post_save.connect(_on_job_saved, sender=Job, dispatch_uid="rollup_job_saved")
+
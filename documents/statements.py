@@ -0,0 +1,185 @@
+"""
+Customer statements — one PDF per customer per period.
+
+monthly_statement renders a single statement on request; a StatementBatch
+renders every customer with tax invoices or receipts in the period:
+
+  start_batch()    counts activity per customer with one grouped query,
+                   creates one Statement row per customer and queues the
+                   Celery task after commit;
+  process_batch()  works through statements still without a PDF, CHUNK_SIZE
+                   at a time: one query loads the chunk's documents, the HTML
+                   is rendered here and the PDFs on a process pool
+                   (documents/pdf.py), then each is stored and optionally
+                   emailed. A failure is recorded on that statement only.
+
+Re-running process_batch() on the same batch picks up where it stopped.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Document, DocumentType, Setting, Statement, StatementBatch
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50
+STATEMENT_TYPES = [DocumentType.TAX_INVOICE, DocumentType.RECEIPT]
+
+
+def statement_documents(period):
+    """Documents that appear on statements for `period`."""
+    return Document.objects.filter(
+        is_void=False,
+        document_type__in=STATEMENT_TYPES,
+        **period.lookup("issued_at"),
+    )
+
+
+def documents_by_customer(period, customer_ids):
+    """{customer_id: [Document, ...]} for `customer_ids`, in one query."""
+    docs = (
+        statement_documents(period)
+        .filter(job__customer_id__in=customer_ids)
+        .select_related("job")
+        .order_by("job__customer_id", "issued_at")
+    )
+    grouped = {}
+    for doc in docs:
+        grouped.setdefault(doc.job.customer_id, []).append(doc)
+    return grouped
+
+
+def statement_shop():
+    """Shop header block for documents/pdf/statement.html."""
+    keys = ["shop_name", "shop_address", "shop_tax_id", "shop_phone"]
+    return {k: Setting.get(k, "") for k in keys}
+
+
+def statement_html(customer, docs, period, shop, request=None):
+    """HTML for documents/pdf/statement.html; `docs` are the customer's documents."""
+    totals = {
+        "total": sum(doc.total_amount for doc in docs) if docs else None,
+        "vat": sum(doc.vat_amount for doc in docs) if docs else None,
+    }
+    return render_to_string(
+        "documents/pdf/statement.html",
+        {"customer": customer, "docs": docs, "totals": totals, "period": period, "shop": shop},
+        request=request,
+    )
+
+
+def start_batch(period, user=None, send_email=False):
+    """Create a batch with one Statement per customer with documents, and queue its generation."""
+    activity = (
+        statement_documents(period)
+        .order_by()
+        .values("job__customer_id")
+        .annotate(n=Count("id"), total=Sum("total_amount"), vat=Sum("vat_amount"))
+    )
+    with transaction.atomic():
+        batch = StatementBatch.objects.create(
+            period_start=period.start, period_end=period.end, send_email=send_email, created_by=user
+        )
+        statements = Statement.objects.bulk_create(
+            [
+                Statement(
+                    batch=batch,
+                    customer_id=row["job__customer_id"],
+                    document_count=row["n"],
+                    total_amount=row["total"],
+                    vat_amount=row["vat"],
+                )
+                for row in activity
+            ],
+            batch_size=1000,
+        )
+        StatementBatch.objects.filter(pk=batch.pk).update(total=len(statements))
+
+        from .tasks import generate_statements
+
+        transaction.on_commit(lambda: generate_statements.delay(batch.pk))
+    batch.refresh_from_db()
+    return batch
+
+
+def _email(statement, pdf_bytes, period, shop):
+    message = EmailMessage(
+        subject=f"ใบแจ้งยอด {period.label} — {shop.get('shop_name') or 'ร้านพิมพ์'}",
+        body=(
+            f"เรียน {statement.customer.name}\n\n"
+            f"แนบใบแจ้งยอดประจำ{period.label} จำนวน {statement.document_count} รายการ "
+            f"ยอดรวม {statement.total_amount:,.2f} บาท\n"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[statement.customer.email],
+    )
+    message.attach(f"statement_{period.slug}.pdf", pdf_bytes, "application/pdf")
+    message.send()
+
+
+def process_batch(batch_id, workers=None, chunk_size=CHUNK_SIZE):
+    """Render (and email) every statement in the batch that has no PDF yet."""
+    from .pdf import render_many
+
+    batch = StatementBatch.objects.get(pk=batch_id)
+    StatementBatch.objects.filter(pk=batch.pk).update(status=StatementBatch.Status.RUNNING)
+    period = batch.period
+    shop = statement_shop()
+    pending = batch.statements.filter(pdf="").select_related("customer").order_by("pk")
+
+    last_pk = 0
+    try:
+        while chunk := list(pending.filter(pk__gt=last_pk)[:chunk_size]):
+            last_pk = chunk[-1].pk
+            docs = documents_by_customer(period, [s.customer_id for s in chunk])
+            htmls = [
+                statement_html(s.customer, docs.get(s.customer_id, []), period, shop)
+                for s in chunk
+            ]
+            rendered = emailed = failed = 0
+            for statement, result in zip(chunk, render_many(htmls, workers)):
+                if isinstance(result, Exception):
+                    statement.error = f"{type(result).__name__}: {result}"
+                    failed += 1
+                    continue
+                filename = f"{statement.customer_id}_{period.slug}.pdf"
+                statement.pdf.save(filename, ContentFile(result), save=False)
+                statement.error = ""
+                rendered += 1
+                if batch.send_email and statement.customer.email:
+                    try:
+                        _email(statement, result, period, shop)
+                    except Exception as exc:  # SMTP refusal for one address; keep going
+                        logger.warning(
+                            "Statement email to %s failed: %s", statement.customer.email, exc
+                        )
+                        statement.error = f"อีเมล: {exc}"
+                    else:
+                        statement.emailed_at = timezone.now()
+                        emailed += 1
+            Statement.objects.bulk_update(chunk, ["pdf", "error", "emailed_at"])
+            StatementBatch.objects.filter(pk=batch.pk).update(
+                rendered=F("rendered") + rendered,
+                emailed=F("emailed") + emailed,
+                failed=F("failed") + failed,
+            )
+    except Exception as exc:
+        StatementBatch.objects.filter(pk=batch.pk).update(
+            status=StatementBatch.Status.FAILED,
+            error=f"{type(exc).__name__}: {exc}",
+            finished_at=timezone.now(),
+        )
+        raise
+    StatementBatch.objects.filter(pk=batch.pk).update(
+        status=StatementBatch.Status.DONE, finished_at=timezone.now()
+    )
+    batch.refresh_from_db()
+    return batch
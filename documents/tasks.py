@@ -0,0 +1,31 @@
+"""Celery tasks for the documents app."""
+
+from celery import shared_task
+
+
+@shared_task(name="documents.tasks.run_monthly_billing")
+def run_monthly_billing(year=None, month=None):
+    """Consolidated tax invoices for credit customers — last month unless given."""
+    from django.utils import timezone
+
+    from .billing import run_billing
+    from .periods import Period
+
+    if year and month:
+        period = Period.month(year, month)
+    else:
+        period = Period.containing(timezone.localdate()).previous
+    run = run_billing(period)
+    return (
+        f"billing {period.slug}: {run.invoices_created} invoices, "
+        f"{run.pdf_failures} PDF failures"
+    )
+
+
+@shared_task(name="documents.tasks.generate_statements")
+def generate_statements(batch_id):
+    """Render (and email) the statements of a StatementBatch."""
+    from .statements import process_batch
+
+    batch = process_batch(batch_id)
+    return f"statements #{batch.pk}: {batch.rendered}/{batch.total} rendered, {batch.failed} failed"
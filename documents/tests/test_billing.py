@@ -0,0 +1,196 @@
+"""
+Tests for the monthly consolidated tax invoice run (documents/billing.py).
+"""
+
+import multiprocessing
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from customers.models import Customer, CustomerType
+from documents import pdf
+from documents.billing import credit_jobs, run_billing
+from documents.models import BillingRun, ConsolidatedInvoice, DailyVat, Document, DocumentType
+from documents.periods import Period
+from jobs.models import Job, JobStatus
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.PDF_RENDER_WORKERS = 1
+    monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: b"%PDF-1.7 test")
+
+
+def _render_in_daemon(results):
+    results.put(pdf.render_many(["<p>a</p>", "<p>b</p>"], workers=2))
+
+
+@pytest.fixture
+def daemonic(monkeypatch):
+    """Run as if inside a Celery prefork worker, where a process pool cannot start."""
+    worker = SimpleNamespace(daemon=True)
+    monkeypatch.setattr(pdf.multiprocessing, "current_process", lambda: worker)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+    monkeypatch.setattr(pdf, "ProcessPoolExecutor", no_pool)
+
+
+@pytest.fixture
+def period():
+    return Period.containing(timezone.localdate())
+
+
+@pytest.fixture
+def credit_type(db):
+    return CustomerType.objects.create(name="องค์กร", credit_days=30)
+
+
+def _customer(credit_type, name):
+    return Customer.objects.create(
+        customer_type=credit_type, name=name, phone="021112222", is_corporate=True
+    )
+
+
+def _job(customer, product_type, user, price, status=JobStatus.READY, **kwargs):
+    job = Job.objects.create(
+        customer=customer, product_type=product_type, title=f"งาน {price}", quoted_price=price,
+        created_by=user, **kwargs,
+    )
+    Job.objects.filter(pk=job.pk).update(status=status)
+    return job
+
+
+class TestRenderMany:
+    def test_daemonic_process_renders_in_process(self):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        child = context.Process(target=_render_in_daemon, args=(results,), daemon=True)
+        child.start()
+        rendered = results.get(timeout=30)
+        child.join()
+        assert rendered == [b"%PDF-1.7 test", b"%PDF-1.7 test"]
+
+    def test_pool_start_failure_falls_back(self, monkeypatch):
+        def broken(*args, **kwargs):
+            raise OSError("no semaphores")
+
+        monkeypatch.setattr(pdf, "ProcessPoolExecutor", broken)
+        assert pdf.render_many(["a", "b"], workers=4) == [b"%PDF-1.7 test", b"%PDF-1.7 test"]
+
+
+@pytest.mark.django_db
+class TestRunBilling:
+    def test_one_invoice_per_credit_customer(
+        self, credit_type, customer, product_type, owner_user, period
+    ):
+        abc = _customer(credit_type, "บจก. ABC")
+        xyz = _customer(credit_type, "บจก. XYZ")
+        jobs = [
+            _job(abc, product_type, owner_user, 5350),
+            _job(abc, product_type, owner_user, 1070),
+        ]
+        _job(xyz, product_type, owner_user, 2140)
+        _job(xyz, product_type, owner_user, 999, status=JobStatus.PRINTING)  # not billable yet
+        _job(customer, product_type, owner_user, 500)  # walk-in type, no credit days
+
+        run = run_billing(period, owner_user)
+
+        assert run.status == BillingRun.Status.DONE
+        assert (run.invoices_created, run.pdfs_rendered) == (2, 2)
+        invoice = ConsolidatedInvoice.objects.select_related("document").get(customer=abc)
+        doc = invoice.document
+        assert doc.document_type == DocumentType.TAX_INVOICE
+        assert doc.total_amount == Decimal("6420.00")
+        assert doc.subtotal == Decimal("6000.00")
+        assert doc.vat_amount == Decimal("420.00")
+        assert [item.job_id for item in doc.items.all()] == [job.pk for job in jobs]
+        assert invoice.due_date == timezone.localdate() + timedelta(days=30)
+        assert invoice.pdf.read() == b"%PDF-1.7 test"
+
+    def test_numbers_are_consecutive(self, credit_type, product_type, owner_user, period):
+        for i in range(5):
+            _job(_customer(credit_type, f"ลูกค้า {i}"), product_type, owner_user, 100)
+
+        run_billing(period, owner_user, chunk_size=2)
+
+        sequences = sorted(Document.objects.values_list("sequence", flat=True))
+        assert sequences == [1, 2, 3, 4, 5]
+        assert Document.objects.create(
+            job=Job.objects.first(), document_type=DocumentType.TAX_INVOICE, customer_name="x",
+            subtotal=1, total_amount=1, issued_by=owner_user,
+        ).sequence == 6
+
+    def test_rerun_is_idempotent(self, credit_type, product_type, owner_user, period):
+        abc = _customer(credit_type, "บจก. ABC")
+        _job(abc, product_type, owner_user, 1070)
+
+        run_billing(period, owner_user)
+        _job(abc, product_type, owner_user, 2140)  # arrives after the run: next month's invoice
+        second = run_billing(period, owner_user)
+
+        assert second.invoices_created == 0
+        assert ConsolidatedInvoice.objects.count() == 1
+        assert credit_jobs(period.next).count() == 1
+
+    def test_resumes_failed_pdfs(self, credit_type, product_type, owner_user, period, monkeypatch):
+        _job(_customer(credit_type, "บจก. ABC"), product_type, owner_user, 1070)
+        monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: 1 / 0)
+
+        first = run_billing(period, owner_user)
+        assert (first.pdfs_rendered, first.pdf_failures) == (0, 1)
+        assert "ZeroDivisionError" in ConsolidatedInvoice.objects.get().pdf_error
+
+        monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: b"%PDF")
+        second = run_billing(period, owner_user)
+        assert (second.invoices_created, second.pdfs_rendered) == (0, 1)
+        assert ConsolidatedInvoice.objects.get().pdf_error == ""
+
+    def test_skips_jobs_already_invoiced_and_updates_vat_rollup(
+        self, client, credit_type, product_type, owner_user, period
+    ):
+        abc = _customer(credit_type, "บจก. ABC")
+        single = _job(abc, product_type, owner_user, 1070)
+        client.force_login(owner_user)
+        client.post(reverse("documents:create_tax_invoice", args=[single.pk]))
+        monthly = _job(abc, product_type, owner_user, 2140)
+
+        run_billing(period, owner_user)
+
+        doc = ConsolidatedInvoice.objects.get().document
+        assert [item.job_id for item in doc.items.all()] == [monthly.pk]
+        assert DailyVat.objects.aggregate(total=Sum("total_amount"))["total"] == Decimal("3210.00")
+
+        # the per-job endpoint now finds the consolidated invoice instead of issuing another
+        client.post(reverse("documents:create_tax_invoice", args=[monthly.pk]))
+        assert Document.objects.filter(document_type=DocumentType.TAX_INVOICE).count() == 2
+
+    def test_task_in_celery_worker(
+        self, settings, daemonic, credit_type, product_type, owner_user, period
+    ):
+        from documents.tasks import run_monthly_billing
+
+        settings.PDF_RENDER_WORKERS = 4
+        _job(_customer(credit_type, "บจก. ABC"), product_type, owner_user, 1070)
+        _job(_customer(credit_type, "บจก. XYZ"), product_type, owner_user, 2140)
+
+        result = run_monthly_billing(period.start.year, period.start.month)
+        assert result.endswith("2 invoices, 0 PDF failures")
+        assert all(invoice.pdf for invoice in ConsolidatedInvoice.objects.all())
+
+    def test_command(self, credit_type, product_type, owner_user, period):
+        _job(_customer(credit_type, "บจก. ABC"), product_type, owner_user, 1070)
+        out = StringIO()
+
+        call_command("run_monthly_billing", "--month", f"{period.start:%Y-%m}", stdout=out)
+
+        assert "Issued 1 invoices, rendered 1 PDFs" in out.getvalue()
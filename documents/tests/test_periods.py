@@ -0,0 +1,137 @@
+"""
+Tests for reporting periods (documents/periods.py) and the indexes behind them.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from documents.models import Document, DocumentType
+from documents.periods import Period, period_from_request
+from jobs.models import Job, JobStatus
+from payments.models import Payment
+
+
+def _get(**params):
+    return period_from_request(RequestFactory().get("/", params))
+
+
+class TestPeriod:
+    def test_month_is_half_open(self):
+        period = Period.month(2025, 12)
+        assert (period.start, period.end) == (date(2025, 12, 1), date(2026, 1, 1))
+
+    def test_buddhist_era_year_is_converted(self):
+        assert Period.month(2568, 3) == Period.month(2025, 3)
+
+    def test_quarter_and_year(self):
+        assert Period.quarter(2568, 4).start == date(2025, 10, 1)
+        assert Period.quarter(2568, 4).end == date(2026, 1, 1)
+        assert Period.year(2025).end == date(2026, 1, 1)
+
+    def test_lookup_uses_aware_local_midnight(self):
+        lookup = Period.month(2025, 3).lookup("issued_at")
+        start = lookup["issued_at__gte"]
+        assert timezone.is_aware(start)
+        assert timezone.localtime(start).replace(tzinfo=None) == datetime(2025, 3, 1)
+        assert set(lookup) == {"issued_at__gte", "issued_at__lt"}
+
+    def test_navigation_wraps_years(self):
+        assert Period.month(2025, 1).previous == Period.month(2024, 12)
+        assert Period.quarter(2025, 4).next == Period.quarter(2026, 1)
+        assert Period.year(2025).previous == Period.year(2024)
+
+    def test_labels_are_buddhist_era(self):
+        assert Period.month(2025, 3).label == "มีนาคม 2568"
+        assert Period.quarter(2025, 1).label == "ไตรมาส 1/2568"
+        assert Period.year(2025).label == "ปี 2568"
+
+    def test_shift_years_handles_leap_day(self):
+        period = Period.between(date(2024, 2, 1), date(2024, 2, 28)).shift_years(1)
+        assert (period.start, period.end) == (date(2025, 2, 1), date(2025, 3, 1))
+
+
+class TestPeriodFromRequest:
+    def test_legacy_month_year_params(self):
+        assert _get(month="3", year="2025") == Period.month(2025, 3)
+
+    def test_quarter_selection(self):
+        assert _get(period="quarter", year="2568", quarter="2") == Period.quarter(2025, 2)
+
+    def test_custom_range_end_is_inclusive(self):
+        period = _get(start="2025-03-05", end="2025-03-10")
+        assert (period.start, period.end) == (date(2025, 3, 5), date(2025, 3, 11))
+
+    def test_query_round_trips(self):
+        for period in (Period.month(2025, 3), Period.quarter(2025, 2), Period.year(2025)):
+            params = dict(pair.split("=") for pair in period.query.split("&"))
+            assert _get(**params) == period
+
+    def test_garbage_falls_back_to_current_month(self):
+        assert _get(month="abc", year="x") == Period.containing(timezone.localdate())
+
+
+@pytest.mark.django_db
+class TestPeriodReports:
+    def test_vat_report_by_quarter(self, client, owner_user, job, counter_user):
+        Document.objects.create(
+            job=job,
+            document_type=DocumentType.TAX_INVOICE,
+            customer_name=job.customer.name,
+            subtotal=100,
+            vat_rate=7,
+            vat_amount=7,
+            total_amount=107,
+            issued_by=counter_user,
+        )
+        client.force_login(owner_user)
+        today = timezone.localdate()
+
+        response = client.get(
+            reverse("documents:vat_report"),
+            {"period": "quarter", "year": today.year, "quarter": (today.month - 1) // 3 + 1},
+        )
+
+        assert response.status_code == 200
+        assert response.context["period"].kind == "quarter"
+        assert len(response.context["docs"]) == 1
+
+
+def _index_name(model, fields):
+    return next(index.name for index in model._meta.indexes if index.fields == fields)
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="EXPLAIN plans are PostgreSQL-specific"
+)
+@pytest.mark.django_db
+class TestIndexUsage:
+    """The range filters must be able to use a plain btree index."""
+
+    def _plan(self, queryset):
+        # Tables are tiny in tests; forbid seq scans so the planner reveals usable indexes.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_vat_report_uses_document_type_issued_at_index(self):
+        period = Period.month(2025, 3)
+        plan = self._plan(
+            Document.objects.filter(
+                document_type=DocumentType.TAX_INVOICE, is_void=False, **period.lookup("issued_at")
+            )
+        )
+        assert _index_name(Document, ["document_type", "issued_at"]) in plan
+
+    def test_payment_range_uses_received_at_index(self):
+        plan = self._plan(Payment.objects.filter(**Period.month(2025, 3).lookup("received_at")))
+        assert _index_name(Payment, ["received_at"]) in plan
+
+    def test_completed_jobs_use_status_updated_at_index(self):
+        march = Period.month(2025, 3).lookup("updated_at")
+        plan = self._plan(Job.objects.filter(status=JobStatus.COMPLETED, **march))
+        assert _index_name(Job, ["status", "updated_at"]) in plan
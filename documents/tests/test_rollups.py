@@ -0,0 +1,179 @@
+"""
+Tests for the DailyRevenue / DailyVat report rollups.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from documents import rollups
+from documents.models import DailyRevenue, DailyVat, Document, DocumentType
+from payments.models import Payment, PaymentMethod
+
+
+def _pay(job, amount, method=PaymentMethod.CASH, user=None):
+    return Payment.objects.create(job=job, amount=Decimal(amount), method=method, received_by=user)
+
+
+def _tax_invoice(job, issued_by, subtotal="1000.00"):
+    subtotal = Decimal(subtotal)
+    vat = (subtotal * Decimal("0.07")).quantize(Decimal("0.01"))
+    return Document.objects.create(
+        job=job,
+        document_type=DocumentType.TAX_INVOICE,
+        customer_name=job.customer.name,
+        subtotal=subtotal,
+        vat_rate=Decimal("7.00"),
+        vat_amount=vat,
+        total_amount=subtotal + vat,
+        issued_by=issued_by,
+    )
+
+
+@pytest.mark.django_db
+class TestRevenueRollup:
+    def test_payment_increments_daily_row(self, job, counter_user):
+        _pay(job, "300.00", user=counter_user)
+        _pay(job, "200.00", user=counter_user)
+
+        row = DailyRevenue.objects.get()
+        assert row.date == timezone.localdate()
+        assert row.product_type_id == job.product_type_id
+        assert row.total == Decimal("500.00")
+        assert row.count == 2
+
+    def test_deleting_payment_decrements(self, job, counter_user):
+        payment = _pay(job, "300.00", user=counter_user)
+        _pay(job, "200.00", user=counter_user)
+        payment.delete()
+
+        row = DailyRevenue.objects.get()
+        assert row.total == Decimal("200.00")
+        assert row.count == 1
+
+    def test_editing_payment_moves_its_contribution(self, job, counter_user):
+        payment = _pay(job, "300.00", user=counter_user)
+        _pay(job, "200.00", user=counter_user)
+        payment.amount = Decimal("350.00")
+        payment.wht_amount = Decimal("10.00")
+        payment.method = PaymentMethod.PROMPTPAY
+        payment.received_at = timezone.now() - timedelta(days=3)
+        payment.save()
+
+        rows = {(r.date, r.method): (r.total, r.count) for r in DailyRevenue.objects.all()}
+        today = timezone.localdate()
+        assert rows[(today, PaymentMethod.CASH)] == (Decimal("200.00"), 1)
+        assert rows[(today - timedelta(days=3), PaymentMethod.PROMPTPAY)] == (Decimal("360.00"), 1)
+
+    def test_changing_job_product_type_moves_its_payments(self, job, counter_user):
+        from production.models import ProductType
+
+        banner = job.product_type_id
+        _pay(job, "300.00", user=counter_user)
+        stickers = ProductType.objects.create(
+            name="สติกเกอร์", base_price=5, pricing_method="per_unit"
+        )
+        job.product_type = stickers
+        job.save()
+
+        rows = {r.product_type_id: (r.total, r.count) for r in DailyRevenue.objects.all()}
+        assert rows[banner] == (Decimal("0.00"), 0)
+        assert rows[stickers.pk] == (Decimal("300.00"), 1)
+
+    def test_rebuild_matches_incremental(self, job, counter_user):
+        _pay(job, "300.00", user=counter_user)
+        _pay(job, "150.00", method=PaymentMethod.PROMPTPAY, user=counter_user)
+        before = sorted(DailyRevenue.objects.values_list("method", "total", "count"))
+
+        rollups.rebuild()
+
+        assert sorted(DailyRevenue.objects.values_list("method", "total", "count")) == before
+
+    def test_rebuild_picks_up_backdated_payments(self, job, counter_user):
+        payment = _pay(job, "300.00", user=counter_user)
+        backdated = timezone.now() - timedelta(days=40)
+        Payment.objects.filter(pk=payment.pk).update(received_at=backdated)
+
+        rollups.rebuild()
+
+        assert DailyRevenue.objects.get().date == timezone.localdate() - timedelta(days=40)
+
+
+@pytest.mark.django_db
+class TestVatRollup:
+    def test_tax_invoice_increments(self, job, counter_user):
+        _tax_invoice(job, counter_user)
+
+        row = DailyVat.objects.get()
+        assert row.vat_amount == Decimal("70.00")
+        assert row.count == 1
+
+    def test_non_vat_documents_are_ignored(self, job, counter_user):
+        Document.objects.create(
+            job=job,
+            document_type=DocumentType.QUOTATION,
+            customer_name=job.customer.name,
+            subtotal=Decimal("1000"),
+            total_amount=Decimal("1000"),
+            issued_by=counter_user,
+        )
+        assert not DailyVat.objects.exists()
+
+    def test_voiding_removes_from_rollup(self, job, counter_user):
+        doc = _tax_invoice(job, counter_user)
+        doc.is_void = True
+        doc.save()
+
+        row = DailyVat.objects.get()
+        assert row.vat_amount == 0
+        assert row.count == 0
+
+        doc.is_void = False
+        doc.save()
+        row.refresh_from_db()
+        assert row.count == 1
+
+
+@pytest.mark.django_db
+class TestReportViews:
+    def test_revenue_report_reads_rollup(self, client, owner_user, job, counter_user):
+        _pay(job, "750.00", user=counter_user)
+        client.force_login(owner_user)
+
+        response = client.get(reverse("documents:revenue"))
+
+        assert response.status_code == 200
+        assert response.context["total"] == Decimal("750.00")
+        assert response.context["by_product"][0]["product_type__name"] == job.product_type.name
+
+    def test_revenue_report_custom_range_and_yoy(self, client, owner_user, job, counter_user):
+        payment = _pay(job, "400.00", user=counter_user)
+        last_year = timezone.now() - timedelta(days=365)
+        Payment.objects.filter(pk=payment.pk).update(received_at=last_year)
+        rollups.rebuild()
+        _pay(job, "600.00", user=counter_user)
+        client.force_login(owner_user)
+
+        today = timezone.localdate()
+        response = client.get(
+            reverse("documents:revenue"),
+            {"start": (today - timedelta(days=1)).isoformat(), "end": today.isoformat()},
+        )
+
+        assert response.context["period"].kind == "custom"
+        assert response.context["total"] == Decimal("600.00")
+        assert response.context["prev_total"] == Decimal("400.00")
+        assert response.context["growth"] == Decimal("50")
+
+    def test_vat_report_totals_from_rollup(self, client, owner_user, job, counter_user):
+        _tax_invoice(job, counter_user)
+        client.force_login(owner_user)
+
+        response = client.get(reverse("documents:vat_report"))
+
+        assert response.status_code == 200
+        assert response.context["totals"]["total_vat"] == Decimal("70.00")
+        assert len(response.context["docs"]) == 1
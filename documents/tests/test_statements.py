@@ -0,0 +1,172 @@
+"""
+Tests for bulk statement batches (documents/statements.py).
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+
+from customers.models import Customer
+from documents import pdf, tasks
+from documents.models import Document, DocumentType, Statement, StatementBatch
+from documents.periods import Period
+from documents.statements import process_batch, start_batch
+from jobs.models import Job
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.PDF_RENDER_WORKERS = 1
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: b"%PDF-1.7 test")
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Batch ids handed to the Celery task."""
+    ids = []
+    monkeypatch.setattr(tasks.generate_statements, "delay", ids.append)
+    return ids
+
+
+@pytest.fixture
+def period():
+    return Period.containing(timezone.localdate())
+
+
+def _other_customer(customer_type):
+    return Customer.objects.create(customer_type=customer_type, name="ร้าน ข", phone="0811111111")
+
+
+def _invoice(customer, product_type, user, total, document_type=DocumentType.TAX_INVOICE):
+    job = Job.objects.create(
+        customer=customer,
+        product_type=product_type,
+        title="งาน",
+        quoted_price=total,
+        created_by=user,
+    )
+    return Document.objects.create(
+        job=job, document_type=document_type, customer_name=customer.name,
+        subtotal=total, total_amount=total, vat_amount=Decimal("7.00"), issued_by=user,
+    )
+
+
+@pytest.mark.django_db
+class TestStatementBatch:
+    def test_one_statement_per_customer_with_documents(
+        self,
+        customer,
+        customer_type,
+        product_type,
+        owner_user,
+        period,
+        queued,
+        django_capture_on_commit_callbacks,
+    ):
+        other = _other_customer(customer_type)
+        Customer.objects.create(customer_type=customer_type, name="ไม่มีเอกสาร", phone="0822222222")
+        _invoice(customer, product_type, owner_user, 100)
+        _invoice(customer, product_type, owner_user, 50, DocumentType.RECEIPT)
+        _invoice(customer, product_type, owner_user, 999, DocumentType.QUOTATION)
+        _invoice(other, product_type, owner_user, 200)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            batch = start_batch(period, owner_user)
+
+        assert queued == [batch.pk]
+        assert batch.total == 2
+        statement = batch.statements.get(customer=customer)
+        assert (statement.document_count, statement.total_amount) == (2, Decimal("150.00"))
+
+        batch = process_batch(batch.pk)
+
+        assert (batch.status, batch.rendered, batch.failed, batch.progress) == (
+            StatementBatch.Status.DONE, 2, 0, 100
+        )
+        assert Statement.objects.get(pk=statement.pk).pdf.read() == b"%PDF-1.7 test"
+        assert mail.outbox == []
+
+    def test_emails_customers_with_an_address(
+        self, customer, product_type, owner_user, period, queued
+    ):
+        customer.email = "billing@example.com"
+        customer.save()
+        _invoice(customer, product_type, owner_user, 100)
+
+        batch = process_batch(start_batch(period, owner_user, send_email=True).pk)
+
+        assert batch.emailed == 1
+        assert mail.outbox[0].to == ["billing@example.com"]
+        assert mail.outbox[0].attachments[0][2] == "application/pdf"
+        assert Statement.objects.get().emailed_at is not None
+
+    def test_failure_is_isolated_and_resumable(
+        self, customer, customer_type, product_type, owner_user, period, queued, monkeypatch
+    ):
+        other = _other_customer(customer_type)
+        _invoice(customer, product_type, owner_user, 100)
+        _invoice(other, product_type, owner_user, 200)
+        monkeypatch.setattr(
+            pdf, "html_to_pdf", lambda html, base_url=None: 1 / 0 if "ร้าน ข" in html else b"%PDF"
+        )
+
+        batch = process_batch(start_batch(period, owner_user).pk, chunk_size=1)
+
+        assert (batch.status, batch.rendered, batch.failed) == (StatementBatch.Status.DONE, 1, 1)
+        assert "ZeroDivisionError" in Statement.objects.get(customer=other).error
+
+        monkeypatch.setattr(pdf, "html_to_pdf", lambda html, base_url=None: b"%PDF")
+        batch = process_batch(batch.pk)
+        assert batch.rendered == 2
+        assert Statement.objects.get(customer=other).error == ""
+
+    def test_task_in_celery_worker(
+        self,
+        settings,
+        monkeypatch,
+        customer,
+        customer_type,
+        product_type,
+        owner_user,
+        period,
+        queued,
+    ):
+        # a prefork worker is daemonic: a process pool would fail to start
+        settings.PDF_RENDER_WORKERS = 4
+        worker = SimpleNamespace(daemon=True)
+        monkeypatch.setattr(pdf.multiprocessing, "current_process", lambda: worker)
+        monkeypatch.setattr(pdf, "ProcessPoolExecutor", None)
+        other = _other_customer(customer_type)
+        _invoice(customer, product_type, owner_user, 100)
+        _invoice(other, product_type, owner_user, 200)
+        batch = start_batch(period, owner_user)
+
+        result = tasks.generate_statements(batch.pk)
+
+        assert result == f"statements #{batch.pk}: 2/2 rendered, 0 failed"
+
+
+@pytest.mark.django_db
+class TestStatementViews:
+    def test_start_and_poll(self, client, customer, product_type, owner_user, period, queued):
+        _invoice(customer, product_type, owner_user, 100)
+        client.force_login(owner_user)
+
+        url = f"{reverse('documents:statement_batches')}?{period.query}"
+        response = client.post(url, {"send_email": "1"})
+
+        batch = StatementBatch.objects.get()
+        assert response.url == reverse("documents:statement_batch", args=[batch.pk])
+        assert batch.send_email
+        partial = client.get(response.url, HTTP_HX_REQUEST="true")
+        assert b'hx-trigger="every 2s"' in partial.content
+
+    def test_counter_forbidden(self, client, counter_user):
+        client.force_login(counter_user)
+        assert client.get(reverse("documents:statement_batches")).status_code == 403
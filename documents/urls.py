@@ -17,4 +17,6 @@ urlpatterns = [
     path("vat-report/export/", views.vat_report_export_excel, name="vat_report_export"),
     path("revenue/", views.revenue_report, name="revenue"),
     path("statement/<int:customer_id>/", views.monthly_statement, name="monthly_statement"),
+    path("statements/", views.statement_batches, name="statement_batches"),
+    path("statements/<int:pk>/", views.statement_batch, name="statement_batch"),
 ]
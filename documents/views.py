@@ -4,10 +4,12 @@ from datetime import date, timedelta
 from decimal import ROUND_HALF_UP, Decimal
 
 from django.contrib.auth.decorators import login_required
+from django.db.models import Q
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 
+from accounts.idempotency import idempotent
 from accounts.mixins import role_required
 from accounts.models import Role
 from jobs.models import Job, JobStatus, PaymentStatus
@@ -39,16 +41,12 @@ def document_pdf(request, pk):
     """Generate PDF via WeasyPrint and stream to browser."""
     from weasyprint import HTML
 
+    from .pdf import shop_info
+
     doc = get_object_or_404(Document.objects.prefetch_related("items").select_related("issued_by"), pk=pk)
-    shop_info = {
-        "name": Setting.get("shop_name", "ร้านพิมพ์"),
-        "address": Setting.get("shop_address", ""),
-        "tax_id": Setting.get("shop_tax_id", ""),
-        "phone": Setting.get("shop_phone", ""),
-    }
     html_string = render_to_string(
         "documents/pdf/document.html",
-        {"document": doc, "shop": shop_info},
+        {"document": doc, "shop": shop_info()},
         request=request,
     )
     pdf_bytes = HTML(string=html_string, base_url=request.build_absolute_uri("/")).write_pdf()
@@ -58,8 +56,11 @@ def document_pdf(request, pk):
 
 
 @role_required(Role.COUNTER, Role.OWNER)
+@idempotent
 def create_quotation(request, job_id):
-    """Create a quotation document for a job."""
+    """Create a quotation document for a job. POST only."""
+    if request.method != "POST":
+        return HttpResponse(status=405)
     job = get_object_or_404(Job.objects.select_related("customer"), pk=job_id)
 
     doc = Document.objects.create(
@@ -87,10 +88,11 @@ def create_quotation(request, job_id):
 def get_or_create_receipt(job, created_by):
     """
     Get existing receipt for job or create one.
-    Called from payments.views after payment recorded.
+    Called from payments.views after payment recorded. A combined receipt
+    from payments.allocation that lists this job counts as its receipt.
     """
     existing = Document.objects.filter(
-        job=job,
+        Q(job=job) | Q(items__job=job),
         document_type=DocumentType.RECEIPT,
         is_void=False,
     ).first()
@@ -121,13 +123,15 @@ def get_or_create_receipt(job, created_by):
 
 
 @role_required(Role.COUNTER, Role.OWNER)
+@idempotent
 def create_tax_invoice(request, job_id):
     """Create a VAT-inclusive tax invoice for a job. POST only."""
     job = get_object_or_404(Job.objects.select_related("customer"), pk=job_id)
 
-    # Guard: return existing non-void tax invoice if one already exists
+    # Guard: return existing non-void tax invoice if one already exists,
+    # including a monthly consolidated invoice that lists this job
     existing = Document.objects.filter(
-        job=job,
+        Q(job=job) | Q(items__job=job),
         document_type=DocumentType.TAX_INVOICE,
         is_void=False,
     ).first()
@@ -367,27 +371,22 @@ def aging_export_excel(request):
 
 @login_required
 def vat_report_export_excel(request):
-    """Export VAT report for a given month/year as Excel (.xlsx)."""
+    """Export the VAT report for the selected period as Excel (.xlsx)."""
     import io
 
     import openpyxl
     from openpyxl.styles import Alignment, Font, PatternFill
 
-    today = date.today()
-    try:
-        month = int(request.GET.get("month", today.month))
-        year = int(request.GET.get("year", today.year))
-    except (ValueError, TypeError):
-        month, year = today.month, today.year
-    month = max(1, min(12, month))
+    from .periods import period_from_request
+
+    period = period_from_request(request)
 
     docs = (
         Document.objects.filter(
             document_type=DocumentType.TAX_INVOICE,
             vat_rate__gt=0,
             is_void=False,
-            issued_at__year=year,
-            issued_at__month=month,
+            **period.lookup("issued_at"),
         )
         .select_related("job__customer")
         .order_by("issued_at")
@@ -395,7 +394,7 @@ def vat_report_export_excel(request):
 
     wb = openpyxl.Workbook()
     ws = wb.active
-    ws.title = f"VAT {month:02d}-{year}"
+    ws.title = f"VAT {period.slug}"
 
     header_fill = PatternFill("solid", fgColor="4F46E5")
     header_font = Font(bold=True, color="FFFFFF", size=10)
@@ -439,7 +438,7 @@ def vat_report_export_excel(request):
     buf = io.BytesIO()
     wb.save(buf)
     buf.seek(0)
-    filename = f"vat_report_{month:02d}_{year}.xlsx"
+    filename = f"vat_report_{period.slug}.xlsx"
     response = HttpResponse(
         buf.getvalue(),
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -448,192 +447,133 @@ def vat_report_export_excel(request):
     return response
 
 
-@role_required(Role.OWNER, Role.ACCOUNTANT)
-def revenue_report(request):
-    """Monthly revenue summary — payments received, by product type and method."""
-    today = date.today()
-    try:
-        month = int(request.GET.get("month", today.month))
-        year = int(request.GET.get("year", today.year))
-    except (ValueError, TypeError):
-        month, year = today.month, today.year
-    month = max(1, min(12, month))
-
-    from django.db.models import Count, F, Sum
-
-    from payments.models import Payment
+def _growth(current, previous):
+    """Percent change vs previous period, or None when there is no baseline."""
+    if not previous:
+        return None
+    return (Decimal(current or 0) - previous) / previous * 100
 
-    payments = Payment.objects.filter(
-        received_at__year=year,
-        received_at__month=month,
-    ).select_related("job__product_type")
 
-    total = payments.aggregate(total=Sum(F("amount") + F("wht_amount")))["total"] or 0
-
-    by_product = (
-        payments.values("job__product_type__name")
-        .annotate(total=Sum(F("amount") + F("wht_amount")), count=Count("id"))
-        .order_by("-total")
-    )
-
-    by_method = (
-        payments.values("method")
-        .annotate(total=Sum(F("amount") + F("wht_amount")))
-        .order_by("-total")
-    )
+@role_required(Role.OWNER, Role.ACCOUNTANT)
+def revenue_report(request):
+    """Revenue summary — payments received, by product type and method, with year-over-year."""
+    from . import rollups
+    from .periods import period_from_request
+
+    period = period_from_request(request)
+    last_year = period.shift_years(-1)
+    current = rollups.revenue_summary(period.start, period.end)
+    previous = rollups.revenue_summary(last_year.start, last_year.end)
+
+    prev_by_product = {row["product_type_id"]: row["total"] for row in previous["by_product"]}
+    by_product = [
+        {**row, "prev_total": prev_by_product.get(row["product_type_id"], Decimal("0"))}
+        for row in current["by_product"]
+    ]
 
     completed_count = Job.objects.filter(
-        status=JobStatus.COMPLETED,
-        updated_at__year=year,
-        updated_at__month=month,
+        status=JobStatus.COMPLETED, **period.lookup("updated_at")
     ).count()
 
-    if month == 1:
-        prev_month, prev_year = 12, year - 1
-    else:
-        prev_month, prev_year = month - 1, year
-
-    if month == 12:
-        next_month, next_year = 1, year + 1
-    else:
-        next_month, next_year = month + 1, year
-
-    thai_months = [
-        "", "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน",
-        "พฤษภาคม", "มิถุนายน", "กรกฎาคม", "สิงหาคม",
-        "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม",
-    ]
-
     return render(request, "documents/revenue.html", {
-        "total": total,
+        "period": period,
+        "total": current["total"],
+        "prev_total": previous["total"],
+        "growth": _growth(current["total"], previous["total"]),
         "by_product": by_product,
-        "by_method": by_method,
+        "by_method": current["by_method"],
         "completed_count": completed_count,
-        "month": month,
-        "month_name": thai_months[month],
-        "year": year,
-        "prev_month": prev_month,
-        "prev_year": prev_year,
-        "next_month": next_month,
-        "next_year": next_year,
     })
 
 
 @login_required
 def vat_report(request):
-    """Monthly VAT output tax report."""
-    today = date.today()
-    try:
-        month = int(request.GET.get("month", today.month))
-        year = int(request.GET.get("year", today.year))
-    except (ValueError, TypeError):
-        month, year = today.month, today.year
+    """VAT output tax report — tax invoices in the period, totals from the daily rollup."""
+    from . import rollups
+    from .periods import period_from_request
 
-    # Clamp month to 1-12
-    month = max(1, min(12, month))
+    period = period_from_request(request)
+    last_year = period.shift_years(-1)
 
     docs = (
         Document.objects.filter(
             document_type=DocumentType.TAX_INVOICE,
             vat_rate__gt=0,
             is_void=False,
-            issued_at__year=year,
-            issued_at__month=month,
+            **period.lookup("issued_at"),
         )
         .select_related("job__customer")
         .order_by("issued_at")
     )
 
-    from django.db.models import Sum
-
-    totals = docs.aggregate(
-        total_subtotal=Sum("subtotal"),
-        total_vat=Sum("vat_amount"),
-        total_amount=Sum("total_amount"),
-    )
+    totals = rollups.vat_summary(period.start, period.end)
+    prev_totals = rollups.vat_summary(last_year.start, last_year.end)
 
-    # Prev / next month navigation
-    if month == 1:
-        prev_month, prev_year = 12, year - 1
-    else:
-        prev_month, prev_year = month - 1, year
-
-    if month == 12:
-        next_month, next_year = 1, year + 1
-    else:
-        next_month, next_year = month + 1, year
-
-    thai_months = [
-        "", "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน",
-        "พฤษภาคม", "มิถุนายน", "กรกฎาคม", "สิงหาคม",
-        "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม",
-    ]
     return render(
         request,
         "documents/vat_report.html",
         {
+            "period": period,
             "docs": docs,
             "totals": totals,
-            "month": month,
-            "month_name": thai_months[month],
-            "year": year,
-            "prev_month": prev_month,
-            "prev_year": prev_year,
-            "next_month": next_month,
-            "next_year": next_year,
+            "prev_totals": prev_totals,
+            "vat_growth": _growth(totals["total_vat"], prev_totals["total_vat"]),
         },
     )
 
 
 @role_required(Role.COUNTER, Role.OWNER, Role.ACCOUNTANT)
 def monthly_statement(request, customer_id):
-    """Generate a monthly statement PDF for a customer."""
+    """Generate a statement PDF for a customer (month by default, or any period)."""
     from weasyprint import HTML
 
     from customers.models import Customer
 
-    from django.db.models import Sum
+    from .periods import period_from_request
+    from .statements import statement_documents, statement_html, statement_shop
 
     customer = get_object_or_404(Customer, pk=customer_id)
-    today = date.today()
-    try:
-        month = int(request.GET.get("month", today.month))
-        year = int(request.GET.get("year", today.year))
-    except (ValueError, TypeError):
-        month, year = today.month, today.year
-    month = max(1, min(12, month))
-
-    docs = Document.objects.filter(
-        job__customer=customer,
-        is_void=False,
-        issued_at__year=year,
-        issued_at__month=month,
-        document_type__in=[DocumentType.TAX_INVOICE, DocumentType.RECEIPT],
-    ).select_related("job").order_by("issued_at")
-
-    totals = docs.aggregate(total=Sum("total_amount"), vat=Sum("vat_amount"))
-    shop_info = {k: Setting.get(k, "") for k in ["shop_name", "shop_address", "shop_tax_id", "shop_phone"]}
-
-    thai_months = [
-        "", "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน",
-        "พฤษภาคม", "มิถุนายน", "กรกฎาคม", "สิงหาคม",
-        "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม",
-    ]
+    period = period_from_request(request)
 
-    html_string = render_to_string(
-        "documents/pdf/statement.html",
-        {
-            "customer": customer,
-            "docs": docs,
-            "totals": totals,
-            "month": month,
-            "month_name": thai_months[month],
-            "year": year,
-            "shop": shop_info,
-        },
-        request=request,
+    docs = list(
+        statement_documents(period).filter(job__customer=customer).select_related("job").order_by("issued_at")
     )
+    html_string = statement_html(customer, docs, period, statement_shop(), request=request)
     pdf = HTML(string=html_string, base_url=request.build_absolute_uri("/")).write_pdf()
     response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="statement_{customer_id}_{year}_{month:02d}.pdf"'
+    filename = f"statement_{customer_id}_{period.slug}.pdf"
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
     return response
+
+
+@role_required(Role.OWNER, Role.ACCOUNTANT)
+@idempotent
+def statement_batches(request):
+    """Bulk statements — list batches and start one for the selected period."""
+    from .models import StatementBatch
+    from .periods import period_from_request
+    from .statements import start_batch
+
+    period = period_from_request(request)
+    if request.method == "POST":
+        batch = start_batch(period, request.user, send_email=bool(request.POST.get("send_email")))
+        return redirect("documents:statement_batch", pk=batch.pk)
+
+    batches = StatementBatch.objects.select_related("created_by")[:20]
+    return render(
+        request, "documents/statement_batches.html", {"period": period, "batches": batches}
+    )
+
+
+@role_required(Role.OWNER, Role.ACCOUNTANT)
+def statement_batch(request, pk):
+    """Progress and downloads for one statement batch; HTMX polls the progress partial."""
+    from .models import StatementBatch
+
+    batch = get_object_or_404(StatementBatch, pk=pk)
+    if request.headers.get("HX-Request"):
+        return render(request, "documents/partials/statement_progress.html", {"batch": batch})
+    statements = batch.statements.select_related("customer")
+    return render(
+        request, "documents/statement_batch.html", {"batch": batch, "statements": statements}
+    )
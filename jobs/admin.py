@@ -1,7 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin, TabularInline
 
-from .models import Job, JobApproval, JobFile, JobStatusHistory
+from .models import Job, JobFile, JobSlip, JobStatusHistory
 
 
 class JobStatusHistoryInline(TabularInline):
@@ -47,3 +47,13 @@ class JobStatusHistoryAdmin(ModelAdmin):
 
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(JobSlip)
+class JobSlipAdmin(ModelAdmin):
+    list_display = ("job", "rendered_at")
+    readonly_fields = ("job", "pdf", "fingerprint", "rendered_at")
+    search_fields = ("job__title", "job__customer__name")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,173 @@
+"""
+Throughput analytics built from the JobStatusHistory audit log.
+
+Every history row marks the moment a job left `from_status`. The moment it
+entered that status is the previous row's changed_at for the same job (LAG
+over changed_at), or the job's created_at for its first transition. Those
+segments are persisted in JobStatusDwell so the dashboard reads a small
+rollup instead of re-windowing the whole log on every hit.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, Lag
+from django.utils import timezone
+
+from .models import Job, JobStatus, JobStatusDwell, JobStatusHistory
+
+# Statuses where a job is still waiting on someone — used for "where work stalls"
+ACTIVE_STATUSES = [
+    JobStatus.PENDING,
+    JobStatus.DESIGNING,
+    JobStatus.AWAITING_APPROVAL,
+    JobStatus.REVISION,
+    JobStatus.APPROVED,
+    JobStatus.PRINTING,
+    JobStatus.CUTTING,
+    JobStatus.LAMINATING,
+    JobStatus.READY,
+    JobStatus.ON_HOLD,
+]
+
+# How far back refresh_status_dwell() looks for history rows committed late
+DWELL_OVERLAP = timedelta(days=1)
+
+
+def _segments(job_ids):
+    """History rows for job_ids annotated with when from_status was entered (single pass)."""
+    return (
+        JobStatusHistory.objects.filter(job_id__in=job_ids)
+        .annotate(
+            prev_changed_at=Window(
+                expression=Lag("changed_at"),
+                partition_by=[F("job_id")],
+                order_by=[F("changed_at").asc(), F("id").asc()],
+            ),
+            job_created_at=F("job__created_at"),
+        )
+        .values(
+            "id", "job_id", "from_status", "changed_at", "changed_by_id",
+            "prev_changed_at", "job_created_at",
+        )
+    )
+
+
+def refresh_status_dwell(batch_size=5000):
+    """
+    Append JobStatusDwell rows for history entries not yet rolled up.
+
+    Looks for history rows without a dwell row from DWELL_OVERLAP before the
+    newest rolled-up exit on, so a transition whose transaction committed
+    after later ones had been rolled up is still picked up. Only jobs with
+    new history are re-windowed, so each run costs in proportion to the new
+    activity, not the size of the log. Returns the number of rows created.
+    """
+    newest = JobStatusDwell.objects.aggregate(m=Max("exited_at"))["m"]
+    pending = JobStatusHistory.objects.filter(dwell__isnull=True)
+    if newest is not None:
+        pending = pending.filter(changed_at__gte=newest - DWELL_OVERLAP)
+
+    created = 0
+    last_id = 0
+    while True:
+        new_ids = list(
+            pending.filter(id__gt=last_id).order_by("id").values_list("id", "job_id")[:batch_size]
+        )
+        if not new_ids:
+            return created
+        last_id = new_ids[-1][0]
+
+        wanted = {hid for hid, _ in new_ids}
+        job_ids = {job_id for _, job_id in new_ids}
+        rows = []
+        for seg in _segments(job_ids):
+            if seg["id"] not in wanted:
+                continue
+            entered_at = seg["prev_changed_at"] or seg["job_created_at"]
+            rows.append(
+                JobStatusDwell(
+                    history_id=seg["id"],
+                    job_id=seg["job_id"],
+                    status=seg["from_status"],
+                    entered_at=entered_at,
+                    exited_at=seg["changed_at"],
+                    duration=max(seg["changed_at"] - entered_at, timedelta(0)),
+                    changed_by_id=seg["changed_by_id"],
+                )
+            )
+        with transaction.atomic():
+            JobStatusDwell.objects.bulk_create(rows, ignore_conflicts=True)
+        created += len(rows)
+        if len(new_ids) < batch_size:
+            return created
+
+
+def dwell_by_status(since):
+    """Average / longest time spent in each status, for segments that ended after `since`."""
+    rows = (
+        JobStatusDwell.objects.filter(exited_at__gte=since)
+        .values("status")
+        .annotate(avg=Avg("duration"), longest=Max("duration"), count=Count("id"))
+    )
+    by_status = {row["status"]: row for row in rows}
+    return [
+        {"status": s, "label": JobStatus(s).label, **by_status[s]}
+        for s in JobStatus.values
+        if s in by_status
+    ]
+
+
+def job_dwell(job):
+    """Per-job breakdown: total time spent in each status (ordered by first entry)."""
+    totals = {}
+    for row in job.status_dwells.order_by("entered_at").values("status", "duration"):
+        totals[row["status"]] = totals.get(row["status"], timedelta(0)) + row["duration"]
+    return [{"status": s, "label": JobStatus(s).label, "duration": d} for s, d in totals.items()]
+
+
+def cycle_time(since):
+    """Average and count of PENDING → COMPLETED cycle times for jobs completed after `since`."""
+    completed = JobStatusHistory.objects.filter(
+        to_status=JobStatus.COMPLETED, changed_at__gte=since
+    ).annotate(cycle=F("changed_at") - F("job__created_at"))
+    return completed.aggregate(avg=Avg("cycle"), count=Count("id"))
+
+
+def throughput_by_user(since):
+    """Stages finished per staff member (designer, operator, ...) since `since`."""
+    rows = (
+        JobStatusDwell.objects.filter(exited_at__gte=since, changed_by__isnull=False)
+        .values("changed_by_id", "changed_by__username", "changed_by__first_name", "status")
+        .annotate(count=Count("id"), avg=Avg("duration"))
+        .order_by("-count")
+    )
+    return [{**row, "label": JobStatus(row["status"]).label} for row in rows]
+
+
+def current_stalls():
+    """Jobs currently sitting in each active status and how long the oldest has waited."""
+    entered = (
+        JobStatusHistory.objects.filter(job_id=OuterRef("pk"))
+        .order_by("-changed_at", "-id")
+        .values("changed_at")[:1]
+    )
+    rows = (
+        Job.objects.filter(status__in=ACTIVE_STATUSES)
+        .annotate(entered_at=Coalesce(Subquery(entered), F("created_at")))
+        .values("status")
+        .annotate(count=Count("id"), oldest_entered=Min("entered_at"))
+    )
+    now = timezone.now()
+    by_status = {row["status"]: row for row in rows}
+    return [
+        {
+            "status": s,
+            "label": JobStatus(s).label,
+            "count": by_status[s]["count"],
+            "oldest": now - by_status[s]["oldest_entered"],
+        }
+        for s in ACTIVE_STATUSES
+        if s in by_status
+    ]
@@ -0,0 +1,250 @@
+"""
+Batch quoting for multi-line orders.
+
+Corporate customers send order sheets with dozens of lines. A batch is
+parsed from pasted CSV text, an uploaded .csv/.xlsx or a JSON list, priced
+in one pass with production.pricing.quote() (one ProductType query for the
+whole sheet), and saved as one Job per line with bulk_create plus a single
+quotation Document whose DocumentItems point back at their jobs.
+
+Columns, in this order when there is no header row:
+
+    product_type, title, quantity, width_cm, height_cm, price, description
+
+product_type is a name (Thai or English) or id; price is optional and
+overrides the computed quote.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+
+COLUMNS = ("product_type", "title", "quantity", "width_cm", "height_cm", "price", "description")
+HEADER_ALIASES = {
+    "ประเภทสินค้า": "product_type",
+    "สินค้า": "product_type",
+    "ชื่องาน": "title",
+    "จำนวน": "quantity",
+    "กว้าง": "width_cm",
+    "กว้าง (ซม.)": "width_cm",
+    "สูง": "height_cm",
+    "สูง (ซม.)": "height_cm",
+    "ราคา": "price",
+    "รายละเอียด": "description",
+}
+MAX_LINES = 500
+
+
+@dataclass
+class BatchLine:
+    number: int
+    product_type_id: int
+    product_name: str
+    unit: str
+    title: str
+    quantity: int
+    width_cm: Decimal | None
+    height_cm: Decimal | None
+    price: Decimal
+    description: str = ""
+    price_overridden: bool = False
+
+
+def read_rows(text="", upload=None):
+    """
+    Raw rows (lists of cells) from pasted CSV text or an uploaded .csv / .xlsx.
+
+    Raises ValueError for an upload that cannot be read.
+    """
+    if upload is not None and upload.name.lower().endswith(".xlsx"):
+        import zipfile
+
+        import openpyxl
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+            sheet = workbook.worksheets[0]
+            rows = [
+                ["" if v is None else v for v in row] for row in sheet.iter_rows(values_only=True)
+            ]
+            workbook.close()
+        except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as exc:
+            raise ValueError("อ่านไฟล์ Excel ไม่ได้") from exc
+        return rows
+    if upload is not None:
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError as exc:
+            raise ValueError("ไฟล์ CSV ต้องเข้ารหัส UTF-8") from exc
+    try:
+        return list(csv.reader(io.StringIO(text)))
+    except csv.Error as exc:
+        raise ValueError("อ่านไฟล์ CSV ไม่ได้") from exc
+
+
+def _header(row):
+    """Column names if `row` is a header row, else None."""
+    names = []
+    for cell in row:
+        key = str(cell).strip().lower()
+        names.append(key if key in COLUMNS else HEADER_ALIASES.get(key))
+    return names if "product_type" in names else None
+
+
+def rows_to_dicts(rows):
+    """Map raw rows to dicts keyed by COLUMNS, honouring an optional header row."""
+    rows = [row for row in rows if any(str(cell).strip() for cell in row)]
+    columns = COLUMNS
+    if rows and (header := _header(rows[0])):
+        columns, rows = header, rows[1:]
+    return [
+        {name: str(cell).strip() for name, cell in zip(columns, row) if name}
+        for row in rows
+    ]
+
+
+def _decimal(value, field):
+    """Non-negative Decimal from a cell, None when blank."""
+    if value in ("", None):
+        return None
+    try:
+        number = Decimal(str(value).replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"{field}ไม่ถูกต้อง: {value}") from None
+    if not number.is_finite() or number < 0:
+        raise ValueError(f"{field}ไม่ถูกต้อง: {value}")
+    return number
+
+
+def price_lines(items, customer_type=None):
+    """
+    Validate and price `items` (dicts keyed by COLUMNS).
+
+    Returns (lines, errors) where errors is a list of (line_number, message).
+    """
+    from production.models import ProductType
+    from production.pricing import UnknownProductType, quote
+
+    product_types = {}
+    for pt in ProductType.objects.filter(is_active=True).values("id", "name", "name_en", "unit"):
+        product_types[str(pt["id"])] = pt
+        product_types[pt["name"].casefold()] = pt
+        if pt["name_en"]:
+            product_types[pt["name_en"].casefold()] = pt
+
+    lines, errors = [], []
+    if len(items) > MAX_LINES:
+        return [], [(0, f"รับได้สูงสุด {MAX_LINES} รายการต่อครั้ง")]
+
+    for number, item in enumerate(items, 1):
+        try:
+            pt = product_types.get(str(item.get("product_type", "")).strip().casefold())
+            if pt is None:
+                raise ValueError(f"ไม่พบประเภทสินค้า: {item.get('product_type', '')}")
+            quantity = _decimal(item.get("quantity") or "1", "จำนวน")
+            if quantity != quantity.to_integral_value() or quantity < 1:
+                raise ValueError(f"จำนวนไม่ถูกต้อง: {item.get('quantity')}")
+            width = _decimal(item.get("width_cm"), "ความกว้าง")
+            height = _decimal(item.get("height_cm"), "ความสูง")
+            override = _decimal(item.get("price"), "ราคา")
+            if override is None:
+                price = quote(pt["id"], int(quantity), width, height, customer_type)
+            else:
+                price = override.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        except (ValueError, UnknownProductType) as exc:
+            errors.append((number, str(exc)))
+            continue
+        lines.append(
+            BatchLine(
+                number=number,
+                product_type_id=pt["id"],
+                product_name=pt["name"],
+                unit=pt["unit"],
+                title=(item.get("title") or pt["name"])[:200],
+                quantity=int(quantity),
+                width_cm=width,
+                height_cm=height,
+                price=price,
+                description=item.get("description", ""),
+                price_overridden=override is not None,
+            )
+        )
+    return lines, errors
+
+
+def create_batch(customer, lines, created_by, due_date=None, notes=""):
+    """
+    Create one Job per line and one quotation Document covering them all.
+
+    Returns (document, jobs). Runs in a fixed number of queries whatever the
+    number of lines.
+    """
+    from dashboard import fragments
+    from documents.models import Document, DocumentItem, DocumentType
+
+    from .models import Job, JobStatus, JobStatusCounter
+    from .slips import queue_render
+
+    if not lines:
+        raise ValueError("batch has no lines")
+
+    with transaction.atomic():
+        # bulk_create skips Job.save(), so the status counter is adjusted here
+        jobs = Job.objects.bulk_create(
+            [
+                Job(
+                    customer=customer,
+                    product_type_id=line.product_type_id,
+                    title=line.title,
+                    description=line.description,
+                    quantity=line.quantity,
+                    width_cm=line.width_cm,
+                    height_cm=line.height_cm,
+                    quoted_price=line.price,
+                    due_date=due_date,
+                    created_by=created_by,
+                )
+                for line in lines
+            ]
+        )
+        JobStatusCounter.adjust({JobStatus.PENDING: len(jobs)})
+
+        total = sum((line.price for line in lines), Decimal("0"))
+        document = Document.objects.create(
+            job=jobs[0],
+            document_type=DocumentType.QUOTATION,
+            customer_name=customer.name,
+            customer_address=customer.billing_address,
+            customer_tax_id=customer.tax_id,
+            subtotal=total,
+            vat_rate=0,
+            vat_amount=0,
+            total_amount=total,
+            issued_by=created_by,
+            notes=notes,
+        )
+        # bulk_create skips DocumentItem.save(); amount is the exact line price
+        DocumentItem.objects.bulk_create(
+            [
+                DocumentItem(
+                    document=document,
+                    job=job,
+                    description=f"{line.product_name} — {line.title}",
+                    quantity=line.quantity,
+                    unit=line.unit,
+                    unit_price=(line.price / line.quantity).quantize(
+                        Decimal("0.01"), rounding=ROUND_HALF_UP
+                    ),
+                    amount=line.price,
+                )
+                for job, line in zip(jobs, lines)
+            ]
+        )
+    # no post_save for bulk-created jobs
+    fragments.invalidate(*fragments.JOB_FRAGMENTS)
+    queue_render(job.pk for job in jobs)
+    return document, jobs
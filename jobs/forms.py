@@ -28,3 +28,43 @@ class JobCreateForm(TailwindFormMixin, forms.ModelForm):
             "internal_notes": forms.Textarea(attrs={"rows": 2}),
             "due_date": forms.DateInput(attrs={"type": "date"}),
         }
+
+
+class BatchQuoteForm(TailwindFormMixin, forms.Form):
+    """Multi-line order: pasted CSV lines and/or an uploaded .csv / .xlsx sheet."""
+
+    customer = forms.ModelChoiceField(
+        queryset=None,
+        widget=forms.HiddenInput(),
+        error_messages={"required": "กรุณาเลือกลูกค้า", "invalid_choice": "ไม่พบลูกค้า"},
+    )
+    lines = forms.CharField(
+        required=False,
+        label="รายการ",
+        widget=forms.Textarea(attrs={"rows": 10, "placeholder": "ป้ายไวนิล, ป้ายหน้าร้าน, 2, 200, 100"}),
+    )
+    sheet = forms.FileField(required=False, label="ไฟล์ CSV / Excel")
+    due_date = forms.DateField(
+        required=False, label="กำหนดส่ง", widget=forms.DateInput(attrs={"type": "date"})
+    )
+    notes = forms.CharField(
+        required=False, label="หมายเหตุ", widget=forms.Textarea(attrs={"rows": 2})
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from customers.models import Customer
+
+        self.fields["customer"].queryset = Customer.objects.filter(is_active=True)
+
+    def clean_sheet(self):
+        sheet = self.cleaned_data.get("sheet")
+        if sheet and not sheet.name.lower().endswith((".csv", ".xlsx")):
+            raise forms.ValidationError("รองรับเฉพาะไฟล์ .csv หรือ .xlsx")
+        return sheet
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("lines", "").strip() and not cleaned.get("sheet"):
+            raise forms.ValidationError("กรุณาใส่รายการหรืออัปโหลดไฟล์")
+        return cleaned
@@ -0,0 +1,130 @@
+"""
+Management command: archive_history
+
+Moves old rows out of the append-only logs (JobStatusHistory, NotificationLog)
+so the hot tables stay small. Rows past the retention window are written to
+gzip-compressed JSONL files in default storage, one folder per month:
+
+    <ARCHIVE_PREFIX>/jobstatushistory/2025-01/<run-timestamp>.jsonl.gz
+    <ARCHIVE_PREFIX>/notificationlog/2025-01/<run-timestamp>.jsonl.gz
+
+and then deleted in batches. Job history is only archived for jobs that are
+COMPLETED or CANCELLED, so an active job's timeline is never cut short.
+JobStatusDwell is refreshed first so analytics keep the archived segments.
+
+Usage:
+    python manage.py archive_history                     # use settings retention
+    python manage.py archive_history --history-days 180  # override
+    python manage.py archive_history --dry-run           # count only
+"""
+
+import gzip
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Export old JobStatusHistory / NotificationLog rows to gzip JSONL and delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--history-days",
+            type=int,
+            default=settings.JOB_HISTORY_RETENTION_DAYS,
+            help="Keep job status history newer than this many days",
+        )
+        parser.add_argument(
+            "--notification-days",
+            type=int,
+            default=settings.NOTIFICATION_LOG_RETENTION_DAYS,
+            help="Keep notification logs newer than this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be archived",
+        )
+
+    def handle(self, *args, **options):
+        from jobs.analytics import refresh_status_dwell
+        from jobs.models import JobStatus, JobStatusHistory
+        from notifications.models import NotificationLog
+
+        now = timezone.now()
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        if not dry_run:
+            refresh_status_dwell()
+
+        history = JobStatusHistory.objects.filter(
+            changed_at__lt=now - timezone.timedelta(days=options["history_days"]),
+            job__status__in=[JobStatus.COMPLETED, JobStatus.CANCELLED],
+        )
+        archived = self._archive(
+            history,
+            "jobstatushistory",
+            "changed_at",
+            ["job_id", "from_status", "to_status", "changed_by_id", "note", "changed_at"],
+            batch_size,
+            dry_run,
+        )
+        self.stdout.write(f"  JobStatusHistory: {archived} rows")
+
+        logs = NotificationLog.objects.filter(
+            sent_at__lt=now - timezone.timedelta(days=options["notification_days"]),
+        )
+        archived = self._archive(
+            logs,
+            "notificationlog",
+            "sent_at",
+            ["job_id", "line_user_id", "message_type", "sent_at", "success", "error_message"],
+            batch_size,
+            dry_run,
+        )
+        self.stdout.write(f"  NotificationLog: {archived} rows")
+
+        verb = "Would archive" if dry_run else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} rows older than retention window."))
+
+    # -------------------------------------------------------------------------
+
+    def _archive(self, queryset, name, date_field, fields, batch_size, dry_run):
+        if dry_run:
+            return queryset.count()
+
+        run_stamp = timezone.now().strftime("%Y%m%dT%H%M%S")
+        total = 0
+        part = 0
+        while True:
+            rows = list(queryset.order_by("pk").values("pk", *fields)[:batch_size])
+            if not rows:
+                return total
+
+            by_month = defaultdict(list)
+            for row in rows:
+                by_month[timezone.localtime(row[date_field]).strftime("%Y-%m")].append(row)
+            for month, month_rows in by_month.items():
+                self._write(f"{name}/{month}/{run_stamp}-{part:04d}.jsonl.gz", month_rows)
+            part += 1
+
+            # Export first, delete second: a failed delete re-exports, never loses rows
+            with transaction.atomic():
+                queryset.model.objects.filter(pk__in=[row["pk"] for row in rows]).delete()
+            total += len(rows)
+
+    def _write(self, relative_path, rows):
+        lines = "".join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n" for row in rows
+        )
+        path = f"{settings.ARCHIVE_PREFIX}/{relative_path}"
+        default_storage.save(path, ContentFile(gzip.compress(lines.encode("utf-8"))))
@@ -0,0 +1,86 @@
+"""
+Management command: benchmark_status_counts
+
+Times the dashboard pipeline query (GROUP BY status over Job) against a read
+of the materialized JobStatusCounter table. Synthetic jobs are inserted with
+bulk_create inside a transaction that is rolled back at the end, so the
+command leaves no data behind.
+
+Usage:
+    python manage.py benchmark_status_counts                 # 1,000,000 jobs
+    python manage.py benchmark_status_counts --jobs 100000 --repeat 20
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark GROUP BY status counts vs JobStatusCounter at scale (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["jobs"], options["repeat"], options["batch_size"])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write("Synthetic jobs rolled back.")
+
+    def _run(self, n_jobs, repeat, batch_size):
+        from django.db.models import Count
+
+        from accounts.models import User
+        from customers.models import Customer
+        from jobs.models import Job, JobStatus, JobStatusCounter
+        from production.models import ProductType
+
+        customer = Customer.objects.first()
+        product = ProductType.objects.first()
+        user = User.objects.first()
+        if not (customer and product and user):
+            raise CommandError(
+                "Need at least one Customer, ProductType and User (run create_demo_data)."
+            )
+
+        statuses = JobStatus.values
+        self.stdout.write(f"Inserting {n_jobs:,} synthetic jobs...")
+        start = time.perf_counter()
+        for offset in range(0, n_jobs, batch_size):
+            Job.objects.bulk_create(
+                [
+                    Job(
+                        customer=customer,
+                        product_type=product,
+                        created_by=user,
+                        title="bench",
+                        status=statuses[i % len(statuses)],
+                    )
+                    for i in range(offset, min(offset + batch_size, n_jobs))
+                ],
+                batch_size=batch_size,
+            )
+        JobStatusCounter.reconcile()
+        self.stdout.write(f"  inserted in {time.perf_counter() - start:.1f}s")
+
+        def group_by():
+            return dict(Job.objects.order_by().values_list("status").annotate(n=Count("id")))
+
+        variants = [("GROUP BY status", group_by), ("JobStatusCounter", JobStatusCounter.snapshot)]
+        for label, fn in variants:
+            fn()  # warm-up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            per_call = (time.perf_counter() - start) / repeat * 1000
+            self.stdout.write(f"  {label:<18} {per_call:9.2f} ms/call")
@@ -0,0 +1,41 @@
+"""
+Management command: reconcile_status_counters
+
+Compares the materialized JobStatusCounter rows with a real GROUP BY over
+Job, reports any drift and (unless --check) rewrites the counters.
+
+Usage:
+    python manage.py reconcile_status_counters          # detect + fix
+    python manage.py reconcile_status_counters --check  # detect only, exit 1 on drift
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Detect and fix drift between JobStatusCounter and the Job table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report drift without fixing it; exit with status 1 if any is found",
+        )
+
+    def handle(self, *args, **options):
+        from jobs.models import JobStatusCounter
+
+        drift = JobStatusCounter.reconcile(fix=not options["check"])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Status counters match the Job table."))
+            return
+
+        for status, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"  {status}: counter={stored} actual={actual}")
+
+        if options["check"]:
+            self.stdout.write(self.style.ERROR(f"Drift found in {len(drift)} status counters."))
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} status counters."))
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0003_phase2_changes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobStatusDwell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "รอดำเนินการ"),
+                            ("designing", "กำลังออกแบบ"),
+                            ("awaiting_approval", "รอลูกค้าอนุมัติ"),
+                            ("revision", "แก้ไขงาน"),
+                            ("approved", "อนุมัติแล้ว"),
+                            ("printing", "กำลังพิมพ์"),
+                            ("cutting", "กำลังตัด"),
+                            ("laminating", "กำลังเคลือบ"),
+                            ("ready", "พร้อมรับ"),
+                            ("completed", "เสร็จสิ้น"),
+                            ("cancelled", "ยกเลิก"),
+                            ("on_hold", "พักงาน"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("entered_at", models.DateTimeField()),
+                ("exited_at", models.DateTimeField()),
+                ("duration", models.DurationField()),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "history",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dwell",
+                        to="jobs.jobstatushistory",
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_dwells",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ระยะเวลาในสถานะ",
+                "verbose_name_plural": "ระยะเวลาในสถานะ",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "exited_at"], name="jobs_jobsta_status_bf1bf1_idx"
+                    ),
+                    models.Index(
+                        fields=["changed_by", "exited_at"], name="jobs_jobsta_changed_7416ef_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0004_jobstatusdwell"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobstatusdwell",
+            name="history",
+            field=models.OneToOneField(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="dwell",
+                to="jobs.jobstatushistory",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobstatushistory",
+            index=models.Index(fields=["job", "changed_at"], name="jobs_jobsta_job_id_e5c642_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="jobstatushistory",
+            index=models.Index(fields=["changed_at"], name="jobs_jobsta_changed_8f0bef_idx"),
+        ),
+    ]
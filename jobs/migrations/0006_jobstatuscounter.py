@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Initialise one counter row per status from the current Job table."""
+    Job = apps.get_model("jobs", "Job")
+    JobStatusCounter = apps.get_model("jobs", "JobStatusCounter")
+    counts = dict(Job.objects.order_by().values_list("status").annotate(n=models.Count("id")))
+    statuses = [
+        "pending",
+        "designing",
+        "awaiting_approval",
+        "revision",
+        "approved",
+        "printing",
+        "cutting",
+        "laminating",
+        "ready",
+        "completed",
+        "cancelled",
+        "on_hold",
+    ]
+    JobStatusCounter.objects.bulk_create(
+        [JobStatusCounter(status=s, count=counts.get(s, 0)) for s in statuses]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("jobs", "0005_history_indexes"),
+        ("production", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobStatusCounter",
+            fields=[
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "รอดำเนินการ"),
+                            ("designing", "กำลังออกแบบ"),
+                            ("awaiting_approval", "รอลูกค้าอนุมัติ"),
+                            ("revision", "แก้ไขงาน"),
+                            ("approved", "อนุมัติแล้ว"),
+                            ("printing", "กำลังพิมพ์"),
+                            ("cutting", "กำลังตัด"),
+                            ("laminating", "กำลังเคลือบ"),
+                            ("ready", "พร้อมรับ"),
+                            ("completed", "เสร็จสิ้น"),
+                            ("cancelled", "ยกเลิก"),
+                            ("on_hold", "พักงาน"),
+                        ],
+                        max_length=20,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "จำนวนงานตามสถานะ",
+                "verbose_name_plural": "จำนวนงานตามสถานะ",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(fields=["status", "due_date"], name="jobs_job_status_adb87a_idx"),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
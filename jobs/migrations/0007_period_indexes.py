@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+        ('jobs', '0006_jobstatuscounter'),
+        ('production', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'updated_at'], name='jobs_job_status_9ab298_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+import jobs.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0007_period_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSlip",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("pdf", models.FileField(upload_to=jobs.models.job_slip_path, verbose_name="PDF")),
+                ("fingerprint", models.CharField(max_length=64)),
+                (
+                    "rendered_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="สร้างเมื่อ"),
+                ),
+                (
+                    "job",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slip",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ใบงาน (PDF)",
+                "verbose_name_plural": "ใบงาน (PDF)",
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0008_job_slips"),
+        ("production", "0005_stations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeadTimeStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "รอดำเนินการ"),
+                            ("designing", "กำลังออกแบบ"),
+                            ("awaiting_approval", "รอลูกค้าอนุมัติ"),
+                            ("revision", "แก้ไขงาน"),
+                            ("approved", "อนุมัติแล้ว"),
+                            ("printing", "กำลังพิมพ์"),
+                            ("cutting", "กำลังตัด"),
+                            ("laminating", "กำลังเคลือบ"),
+                            ("ready", "พร้อมรับ"),
+                            ("completed", "เสร็จสิ้น"),
+                            ("cancelled", "ยกเลิก"),
+                            ("on_hold", "พักงาน"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("samples", models.PositiveIntegerField(verbose_name="จำนวนงานตัวอย่าง")),
+                ("share", models.FloatField(verbose_name="สัดส่วนงานที่ผ่านสถานะนี้")),
+                ("median", models.DurationField()),
+                ("p80", models.DurationField()),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "product_type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="production.producttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "สถิติระยะเวลางาน",
+                "verbose_name_plural": "สถิติระยะเวลางาน",
+            },
+        ),
+    ]
@@ -9,7 +9,7 @@ import os
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -56,6 +56,61 @@ class PaymentStatus(models.TextChoices):
     PAID = "paid", "ชำระครบ"
 
 
+class JobQuerySet(models.QuerySet):
+    def bulk_transition(self, ids, new_status, changed_by=None, note=""):
+        """
+        Move many jobs to new_status in a fixed number of queries.
+
+        Rows are locked with SELECT FOR UPDATE; jobs whose current status does
+        not allow the transition are skipped. Returns the list of moved job ids.
+        """
+        with transaction.atomic():
+            rows = list(
+                self.select_for_update()
+                .filter(pk__in=ids)
+                .order_by("pk")
+                .values_list("pk", "status")
+            )
+            moved = [
+                (pk, old_status)
+                for pk, old_status in rows
+                if new_status in ALLOWED_TRANSITIONS.get(old_status, set())
+            ]
+            if not moved:
+                return []
+
+            moved_ids = [pk for pk, _ in moved]
+            self.model.objects.filter(pk__in=moved_ids).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            deltas = {new_status: len(moved)}
+            for _, old_status in moved:
+                deltas[old_status] = deltas.get(old_status, 0) - 1
+            JobStatusCounter.adjust(deltas)
+            JobStatusHistory.objects.bulk_create(
+                [
+                    JobStatusHistory(
+                        job_id=pk,
+                        from_status=old_status,
+                        to_status=new_status,
+                        changed_by=changed_by,
+                        note=note,
+                    )
+                    for pk, old_status in moved
+                ]
+            )
+            _send_status_changed(moved_ids, new_status)
+        return moved_ids
+
+
+def _send_status_changed(job_ids, new_status):
+    from .signals import job_status_changed
+
+    transaction.on_commit(
+        lambda: job_status_changed.send(sender=Job, job_ids=job_ids, to_status=new_status)
+    )
+
+
 def job_file_upload_path(instance, filename):
     now = timezone.now()
     return f"jobs/{now.year}/{now.month:02d}/job_{instance.job_id}/{filename}"
@@ -139,6 +194,8 @@ class Job(models.Model):
     # Internal notes
     internal_notes = models.TextField(blank=True, verbose_name="หมายเหตุภายใน")
 
+    objects = JobQuerySet.as_manager()
+
     class Meta:
         verbose_name = "งาน"
         verbose_name_plural = "งาน"
@@ -146,12 +203,22 @@ class Job(models.Model):
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["customer", "status"]),
+            models.Index(fields=["status", "due_date"]),
+            models.Index(fields=["status", "updated_at"]),
             models.Index(fields=["tracking_token"]),
         ]
 
     def __str__(self):
         return f"#{self.pk} {self.title} — {self.customer.name}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            JobStatusCounter.adjust({self.status: 1})
+
     @property
     def total_paid(self):
         from decimal import Decimal
@@ -170,24 +237,36 @@ class Job(models.Model):
         Move job to new_status, enforcing allowed transitions.
         Records history entry for every change.
         changed_by=None is allowed for customer-initiated transitions (public tracking page).
+
+        The row is locked with SELECT FOR UPDATE and the current status re-read
+        from the database, so two operators advancing the same job concurrently
+        cannot both succeed from a stale instance.
         """
-        allowed = ALLOWED_TRANSITIONS.get(self.status, set())
-        if new_status not in allowed:
-            raise ValueError(
-                f"Cannot transition from '{self.status}' to '{new_status}'. "
-                f"Allowed: {allowed}"
+        with transaction.atomic():
+            old_status = (
+                Job.objects.select_for_update()
+                .values_list("status", flat=True)
+                .get(pk=self.pk)
             )
-        old_status = self.status
-        self.status = new_status
-        self.save(update_fields=["status", "updated_at"])
-
-        JobStatusHistory.objects.create(
-            job=self,
-            from_status=old_status,
-            to_status=new_status,
-            changed_by=changed_by,
-            note=note,
-        )
+            self.status = old_status
+            allowed = ALLOWED_TRANSITIONS.get(old_status, set())
+            if new_status not in allowed:
+                raise ValueError(
+                    f"Cannot transition from '{old_status}' to '{new_status}'. "
+                    f"Allowed: {allowed}"
+                )
+            self.status = new_status
+            self.save(update_fields=["status", "updated_at"])
+            JobStatusCounter.adjust({old_status: -1, new_status: 1})
+
+            JobStatusHistory.objects.create(
+                job=self,
+                from_status=old_status,
+                to_status=new_status,
+                changed_by=changed_by,
+                note=note,
+            )
+            _send_status_changed([self.pk], new_status)
 
     def get_tracking_url(self):
         from django.urls import reverse
@@ -202,6 +281,82 @@ class Job(models.Model):
         return None
 
 
+class JobStatusCounter(models.Model):
+    """
+    Materialized number of jobs in each status — one row per JobStatus.
+
+    Kept in step with Job inside the same transaction by Job.save() (new
+    jobs), transition_to() and bulk_transition(). Writes that bypass those
+    paths (admin status edits, bulk_create, raw deletes) are caught by
+    reconcile(), run nightly and by `manage.py reconcile_status_counters`.
+    """
+
+    status = models.CharField(max_length=20, choices=JobStatus.choices, primary_key=True)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "จำนวนงานตามสถานะ"
+        verbose_name_plural = "จำนวนงานตามสถานะ"
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+    @classmethod
+    def adjust(cls, deltas):
+        """Apply {status: +/-n} to the counters with F() updates (no read-modify-write)."""
+        deltas = {status: n for status, n in deltas.items() if n}
+        if not deltas:
+            return
+        missing = set(deltas) - set(
+            cls.objects.filter(status__in=deltas).values_list("status", flat=True)
+        )
+        if missing:
+            cls.objects.bulk_create([cls(status=s) for s in missing], ignore_conflicts=True)
+        # in status order, so opposite moves lock the counter rows in the same order
+        for status, n in sorted(deltas.items()):
+            cls.objects.filter(status=status).update(
+                count=models.F("count") + n, updated_at=timezone.now()
+            )
+
+    @classmethod
+    def snapshot(cls):
+        """All status counts as {status: count}, read from the counter table in one query."""
+        counts = dict.fromkeys(JobStatus.values, 0)
+        counts.update(cls.objects.values_list("status", "count"))
+        return counts
+
+    @classmethod
+    def reconcile(cls, fix=True):
+        """
+        Compare counters with a real GROUP BY over Job.
+
+        Returns {status: (counter_value, actual_value)} for every status that
+        drifted; when fix=True the counters are overwritten with the actual
+        values under a table-level row lock.
+        """
+        with transaction.atomic():
+            stored = dict(cls.objects.select_for_update().values_list("status", "count"))
+            actual = dict.fromkeys(JobStatus.values, 0)
+            actual.update(
+                Job.objects.order_by().values_list("status").annotate(n=models.Count("id"))
+            )
+            drift = {
+                status: (stored.get(status, 0), n)
+                for status, n in actual.items()
+                if stored.get(status) != n
+            }
+            if fix and drift:
+                now = timezone.now()
+                cls.objects.bulk_create(
+                    [cls(status=s, count=actual[s], updated_at=now) for s in drift],
+                    update_conflicts=True,
+                    unique_fields=["status"],
+                    update_fields=["count", "updated_at"],
+                )
+        return drift
+
+
 class JobStatusHistory(models.Model):
     """Immutable audit log of every status change on a job."""
 
@@ -222,6 +377,10 @@ class JobStatusHistory(models.Model):
         verbose_name = "ประวัติสถานะ"
         verbose_name_plural = "ประวัติสถานะ"
         ordering = ["-changed_at"]
+        indexes = [
+            models.Index(fields=["job", "changed_at"]),
+            models.Index(fields=["changed_at"]),
+        ]
 
     def __str__(self):
         return f"Job #{self.job_id}: {self.from_status} → {self.to_status}"
@@ -274,6 +433,31 @@ class JobFile(models.Model):
             return ""
 
 
+def job_slip_path(instance, filename):
+    return f"slips/{instance.job_id // 1000:04d}/{filename}"
+
+
+class JobSlip(models.Model):
+    """
+    A job's rendered A5 slip PDF, kept so it is not re-rendered on every print.
+
+    fingerprint is the SHA-256 of the slip HTML the PDF was made from; see
+    jobs/slips.py.
+    """
+
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name="slip")
+    pdf = models.FileField(upload_to=job_slip_path, verbose_name="PDF")
+    fingerprint = models.CharField(max_length=64)
+    rendered_at = models.DateTimeField(default=timezone.now, verbose_name="สร้างเมื่อ")
+
+    class Meta:
+        verbose_name = "ใบงาน (PDF)"
+        verbose_name_plural = "ใบงาน (PDF)"
+
+    def __str__(self):
+        return f"Slip — Job #{self.job_id}"
+
+
 class JobApproval(models.Model):
     """
     Design approval record from customer.
@@ -311,3 +495,76 @@ class JobApproval(models.Model):
 
     def __str__(self):
         return f"Job #{self.job_id} — {self.get_decision_display()}"
+
+
+class JobStatusDwell(models.Model):
+    """
+    Rollup: how long a job sat in one status before it moved on.
+
+    One row per JobStatusHistory entry, built incrementally by
+    jobs.analytics.refresh_status_dwell(). changed_by is the user who moved
+    the job *out* of the status, i.e. whoever did the work for that stage.
+    """
+
+    # No DB constraint: the rollup outlives history rows removed by archive_history
+    history = models.OneToOneField(
+        JobStatusHistory,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="dwell",
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="status_dwells")
+    status = models.CharField(max_length=20, choices=JobStatus.choices)
+    entered_at = models.DateTimeField()
+    exited_at = models.DateTimeField()
+    duration = models.DurationField()
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    class Meta:
+        verbose_name = "ระยะเวลาในสถานะ"
+        verbose_name_plural = "ระยะเวลาในสถานะ"
+        indexes = [
+            models.Index(fields=["status", "exited_at"]),
+            models.Index(fields=["changed_by", "exited_at"]),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.job_id}: {self.status} ({self.duration})"
+
+
+class LeadTimeStat(models.Model):
+    """
+    Rollup: how long jobs of one product type spend in one work status.
+
+    Rebuilt nightly from JobStatusDwell by jobs.promise.refresh_lead_times();
+    product_type=None rows cover all product types and back up types with
+    too little history. jobs.promise.estimate() reads this table (through
+    the cache) to suggest a due date at intake.
+    """
+
+    product_type = models.ForeignKey(
+        "production.ProductType",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    status = models.CharField(max_length=20, choices=JobStatus.choices)
+    samples = models.PositiveIntegerField(verbose_name="จำนวนงานตัวอย่าง")
+    share = models.FloatField(verbose_name="สัดส่วนงานที่ผ่านสถานะนี้")
+    median = models.DurationField()
+    p80 = models.DurationField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "สถิติระยะเวลางาน"
+        verbose_name_plural = "สถิติระยะเวลางาน"
+
+    def __str__(self):
+        return f"{self.product_type_id or 'all'} / {self.status}: p80 {self.p80}"
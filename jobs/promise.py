@@ -0,0 +1,160 @@
+"""
+Due-date promise — a realistic completion date to quote at the counter.
+
+An estimate adds up two parts:
+
+  - history: for each work status (PENDING through LAMINATING), how long
+    jobs of this product type spent there — the 80th percentile, weighted
+    by the share of jobs that pass through it (not every job is designed
+    or laminated). refresh_lead_times() rebuilds these figures nightly
+    from the JobStatusDwell rollup into the small LeadTimeStat table;
+    product types with fewer than MIN_SAMPLES jobs use the all-types row.
+  - load: production time is the longer of the history and what the
+    printing stations have queued now (production/scheduler.py) plus this
+    job's own run time on the fastest station.
+
+The table is kept in the cache, so estimate() normally costs a cache hit
+and the cached production plan — fast enough to run on every keystroke of
+the intake form.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import JobStatus, JobStatusDwell, LeadTimeStat
+
+DESIGN_STATUSES = [
+    JobStatus.PENDING,
+    JobStatus.DESIGNING,
+    JobStatus.AWAITING_APPROVAL,
+    JobStatus.REVISION,
+    JobStatus.APPROVED,
+]
+PRODUCTION_STATUSES = [JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING]
+WORK_STATUSES = DESIGN_STATUSES + PRODUCTION_STATUSES
+MIN_SAMPLES = 5
+CACHE_KEY = "jobs:promise:lead_times"
+
+
+@dataclass
+class Estimate:
+    ready_at: datetime
+    design: timedelta
+    production: timedelta
+    queue: timedelta
+    samples: int  # jobs behind the history figures; 0 means no history yet
+
+    @property
+    def date(self):
+        return timezone.localtime(self.ready_at).date()
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
+
+
+def refresh_lead_times(days=None):
+    """Rebuild LeadTimeStat from the last `days` of JobStatusDwell; returns the row count."""
+    days = days or settings.LEAD_TIME_HISTORY_DAYS
+    since = timezone.now() - timedelta(days=days)
+    # one total per (job, status): two rounds of REVISION are one sample, their sum
+    rows = (
+        JobStatusDwell.objects.filter(exited_at__gte=since, status__in=WORK_STATUSES)
+        .values_list("job_id", "job__product_type_id", "status")
+        .annotate(total=Sum("duration"))
+        .order_by()
+    )
+    totals, jobs = {}, {}
+    for job_id, product_type_id, status, total in rows:
+        for key in (product_type_id, None):
+            totals.setdefault((key, status), []).append(total)
+            jobs.setdefault(key, set()).add(job_id)
+
+    now = timezone.now()
+    stats = []
+    for (product_type_id, status), durations in totals.items():
+        durations.sort()
+        stats.append(
+            LeadTimeStat(
+                product_type_id=product_type_id,
+                status=status,
+                samples=len(durations),
+                share=len(durations) / len(jobs[product_type_id]),
+                median=_percentile(durations, 50),
+                p80=_percentile(durations, 80),
+                refreshed_at=now,
+            )
+        )
+    with transaction.atomic():
+        LeadTimeStat.objects.all().delete()
+        LeadTimeStat.objects.bulk_create(stats)
+    cache.delete(CACHE_KEY)
+    return len(stats)
+
+
+def lead_times():
+    """{product_type_id or None: {"samples": n, "statuses": {status: expected time}}}, cached."""
+    table = cache.get(CACHE_KEY)
+    if table is None:
+        table = {}
+        for product_type_id, status, samples, share, p80 in LeadTimeStat.objects.values_list(
+            "product_type_id", "status", "samples", "share", "p80"
+        ):
+            entry = table.setdefault(product_type_id, {"samples": 0, "statuses": {}})
+            entry["statuses"][status] = p80 * share
+            entry["samples"] = max(entry["samples"], samples)
+        cache.set(CACHE_KEY, table, None)
+    return table
+
+
+def _total(history, statuses):
+    return sum((history["statuses"].get(s, timedelta(0)) for s in statuses), timedelta(0))
+
+
+def estimate(product_type_id, quantity=1, width_cm=None, height_cm=None, now=None):
+    """When a job taken now should be ready for pickup, as an Estimate."""
+    from production.models import ProductType, Station
+    from production.scheduler import backlog, work_minutes
+
+    now = now or timezone.now()
+    table = lead_times()
+    history = table.get(product_type_id)
+    if not history or history["samples"] < MIN_SAMPLES:
+        history = table.get(None) or {"samples": 0, "statuses": {}}
+    design = _total(history, DESIGN_STATUSES)
+    production = _total(history, PRODUCTION_STATUSES)
+
+    # wait for a printing station from when the design is done, then this job's own run
+    queue = timedelta(0)
+    free = backlog(Station.Stage.PRINTING)
+    if free:
+        row = {
+            "pricing_method": ProductType.objects.filter(pk=product_type_id)
+            .values_list("pricing_method", flat=True)
+            .first(),
+            "quantity": quantity,
+            "width_cm": width_cm,
+            "height_cm": height_cm,
+        }
+        start = now + design
+        done = (
+            max(at, start) + timedelta(minutes=work_minutes(row, station))
+            for station, at in free.items()
+        )
+        queue = min(done) - start
+
+    return Estimate(
+        ready_at=now + design + max(production, queue),
+        design=design,
+        production=production,
+        queue=queue,
+        samples=history["samples"],
+    )
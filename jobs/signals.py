@@ -0,0 +1,14 @@
+"""
+Signals sent by the jobs app.
+
+job_status_changed fires after the transaction that changed job statuses has
+committed — from transition_to() for one job and bulk_transition() for many.
+bulk_transition() writes with UPDATE, so post_save is not sent for it;
+listeners that care about status should use this signal.
+
+    job_status_changed.send(sender=Job, job_ids=[...], to_status="ready")
+"""
+
+from django.dispatch import Signal
+
+job_status_changed = Signal()
@@ -0,0 +1,171 @@
+"""
+Job slips — the A5 counter slip with the tracking QR, rendered once and kept.
+
+A JobSlip holds a job's PDF and the SHA-256 of the slip HTML it was made
+from. Building the HTML is cheap (the QR comes from payments/qr.py); laying
+it out in WeasyPrint is not. So refresh() renders the HTML for each job,
+compares hashes, and sends only the slips whose printed content changed — or
+that were never rendered — to the documents/pdf.py process pool.
+
+  - jobs.tasks.render_job_slips pre-renders slips after a job is created or
+    edited (connect_slip_hooks, create_batch);
+  - status moves only change the slip footer, so those slips are refreshed
+    the next time they are printed rather than on every transition;
+  - combined_pdf() joins many slips into one PDF for the printer queue.
+"""
+
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import JobSlip
+
+logger = logging.getLogger(__name__)
+
+
+def slip_shop():
+    """Shop header block for jobs/pdf/job_slip.html."""
+    from documents.models import Setting
+
+    return {k: Setting.get(k, "") for k in ["shop_name", "shop_address", "shop_phone"]}
+
+
+def slip_html(job, shop):
+    """HTML for one job's slip; `job` needs customer and product_type loaded."""
+    from payments.qr import qr_data_uri
+
+    tracking_url = settings.BASE_URL.rstrip("/") + job.get_tracking_url()
+    return render_to_string(
+        "jobs/pdf/job_slip.html",
+        {"job": job, "shop": shop, "qr_src": qr_data_uri(tracking_url)},
+    )
+
+
+def refresh(jobs, workers=None):
+    """
+    Bring the stored slips for `jobs` up to date.
+
+    Returns (slips, rendered): {job_id: JobSlip} for every job with a stored
+    slip, and {job_id: PDF bytes or the exception} for those rendered now.
+    """
+    from documents.pdf import render_many
+
+    shop = slip_shop()
+    slips = {slip.job_id: slip for slip in JobSlip.objects.filter(job__in=[job.pk for job in jobs])}
+    stale = []
+    for job in jobs:
+        html = slip_html(job, shop)
+        fingerprint = hashlib.sha256(html.encode()).hexdigest()
+        slip = slips.get(job.pk)
+        if slip is None or slip.fingerprint != fingerprint or not slip.pdf:
+            stale.append((job, html, fingerprint))
+    if not stale:
+        return slips, {}
+
+    rendered, created, updated = {}, [], []
+    now = timezone.now()
+    results = render_many([html for _, html, _ in stale], workers)
+    for (job, _, fingerprint), result in zip(stale, results):
+        rendered[job.pk] = result
+        if isinstance(result, Exception):
+            logger.warning("Slip for job #%s failed: %s", job.pk, result)
+            continue
+        slip = slips.get(job.pk) or JobSlip(job=job)
+        if slip.pdf:
+            slip.pdf.delete(save=False)
+        slip.fingerprint, slip.rendered_at = fingerprint, now
+        slip.pdf.save(f"job_{job.pk}_{fingerprint[:12]}.pdf", ContentFile(result), save=False)
+        slips[job.pk] = slip
+        (updated if slip.pk else created).append(slip)
+    fields = ["pdf", "fingerprint", "rendered_at"]
+    JobSlip.objects.bulk_update(updated, fields)
+    # a Celery pre-render and a print can race to create the same slip; last one wins
+    JobSlip.objects.bulk_create(
+        created, update_conflicts=True, unique_fields=["job"], update_fields=fields
+    )
+    return slips, rendered
+
+
+def slip_pdfs(jobs, workers=None):
+    """PDF bytes (or the render exception) per job, in order — stored if fresh, else rendered."""
+    slips, rendered = refresh(jobs, workers)
+    result = []
+    for job in jobs:
+        if job.pk in rendered:
+            result.append(rendered[job.pk])
+        else:
+            with slips[job.pk].pdf.open("rb") as f:
+                result.append(f.read())
+    return result
+
+
+def slip_pdf(job):
+    """One job's slip PDF bytes; raises if it cannot be rendered."""
+    (pdf,) = slip_pdfs([job], workers=1)
+    if isinstance(pdf, Exception):
+        raise pdf
+    return pdf
+
+
+def concatenate(pdfs):
+    """One PDF with the pages of each PDF in `pdfs`, in order."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for pdf in pdfs:
+        writer.append(io.BytesIO(pdf))
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def combined_pdf(jobs, workers=None):
+    """
+    (PDF bytes, failed job ids) — every job's slip in one document.
+
+    Slips that fail to render are left out and reported rather than failing
+    the whole print run.
+    """
+    pdfs = slip_pdfs(jobs, workers)
+    failed = [job.pk for job, pdf in zip(jobs, pdfs) if isinstance(pdf, Exception)]
+    return concatenate(pdf for pdf in pdfs if not isinstance(pdf, Exception)), failed
+
+
+def queue_render(job_ids):
+    """Pre-render these jobs' slips in Celery once the current transaction commits."""
+    from .tasks import render_job_slips
+
+    def send():
+        try:
+            render_job_slips.delay(job_ids)
+        except Exception as exc:  # broker down: the slip is rendered when first printed instead
+            logger.warning("Could not queue slip rendering for jobs %s: %s", job_ids, exc)
+
+    job_ids = list(job_ids)
+    if job_ids:
+        transaction.on_commit(send)
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers
+# ---------------------------------------------------------------------------
+
+def _on_job_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # saves naming their fields are status and payment updates; the slip is
+    # refreshed when it is next printed
+    if not raw and (created or update_fields is None):
+        queue_render([instance.pk])
+
+
+def connect_slip_hooks():
+    from django.db.models.signals import post_save
+
+    from .models import Job
+
+    post_save.connect(_on_job_saved, sender=Job, dispatch_uid="slip_job_saved")
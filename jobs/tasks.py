@@ -0,0 +1,46 @@
+"""Celery tasks for the jobs app."""
+
+from celery import shared_task
+
+
+@shared_task(name="jobs.tasks.refresh_status_dwell")
+def refresh_status_dwell():
+    """Roll new JobStatusHistory rows up into JobStatusDwell."""
+    from .analytics import refresh_status_dwell as refresh
+
+    return f"status_dwell rows added: {refresh()}"
+
+
+@shared_task(name="jobs.tasks.reconcile_status_counters")
+def reconcile_status_counters():
+    """Fix any drift between JobStatusCounter and the Job table."""
+    from .models import JobStatusCounter
+
+    drift = JobStatusCounter.reconcile()
+    return f"status_counters fixed: {sorted(drift)}"
+
+
+@shared_task(name="jobs.tasks.render_job_slips")
+def render_job_slips(job_ids):
+    """Render the slips of these jobs that are missing or out of date."""
+    from .models import Job
+    from .slips import refresh
+
+    jobs = list(
+        Job.objects.filter(pk__in=job_ids)
+        .select_related("customer", "product_type")
+        .order_by("pk")
+    )
+    # Celery's prefork workers are daemonic and cannot start a process pool
+    _, rendered = refresh(jobs, workers=1)
+    return f"slips rendered: {len(rendered)}"
+
+
+@shared_task(name="jobs.tasks.refresh_lead_times")
+def refresh_lead_times():
+    """Rebuild the lead-time statistics behind intake due-date estimates."""
+    from .analytics import refresh_status_dwell
+    from .promise import refresh_lead_times as refresh
+
+    refresh_status_dwell()
+    return f"lead_time_stats rows: {refresh()}"
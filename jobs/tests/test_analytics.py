@@ -0,0 +1,98 @@
+"""Tests for time-in-status analytics built from JobStatusHistory."""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from jobs import analytics
+from jobs.models import JobStatus, JobStatusDwell, JobStatusHistory
+
+
+def _backdate(job, hours_ago_per_step):
+    """Rewrite created_at / changed_at so each history step is N hours apart."""
+    now = timezone.now()
+    start = now - timedelta(hours=sum(hours_ago_per_step))
+    type(job).objects.filter(pk=job.pk).update(created_at=start)
+    moment = start
+    for history, hours in zip(job.status_history.order_by("id"), hours_ago_per_step):
+        moment += timedelta(hours=hours)
+        JobStatusHistory.objects.filter(pk=history.pk).update(changed_at=moment)
+
+
+@pytest.mark.django_db
+class TestStatusDwell:
+    def test_refresh_builds_one_row_per_transition(self, job, designer_user):
+        job.transition_to(JobStatus.DESIGNING)
+        job.transition_to(JobStatus.AWAITING_APPROVAL, changed_by=designer_user)
+        _backdate(job, [2, 5])
+
+        assert analytics.refresh_status_dwell() == 2
+
+        dwell = {d.status: d for d in JobStatusDwell.objects.all()}
+        assert dwell[JobStatus.PENDING].duration == timedelta(hours=2)
+        assert dwell[JobStatus.DESIGNING].duration == timedelta(hours=5)
+        assert dwell[JobStatus.DESIGNING].changed_by == designer_user
+
+    def test_refresh_is_incremental(self, job):
+        job.transition_to(JobStatus.DESIGNING)
+        analytics.refresh_status_dwell()
+        assert analytics.refresh_status_dwell() == 0
+
+        job.transition_to(JobStatus.AWAITING_APPROVAL)
+        assert analytics.refresh_status_dwell() == 1
+        latest = JobStatusDwell.objects.get(status=JobStatus.DESIGNING)
+        # entered DESIGNING when the first history row was written, not at job creation
+        first = job.status_history.get(to_status=JobStatus.DESIGNING)
+        assert latest.entered_at == first.changed_at
+
+    def test_refresh_picks_up_history_committed_late(
+        self, job, customer, product_type, counter_user
+    ):
+        from jobs.models import Job
+
+        other = Job.objects.create(
+            customer=customer, product_type=product_type, title="งานอื่น", quoted_price=100,
+            created_by=counter_user,
+        )
+        job.transition_to(JobStatus.DESIGNING)
+        other.transition_to(JobStatus.DESIGNING)
+        analytics.refresh_status_dwell()
+        # the lower id was not yet visible when the higher one was rolled up
+        early = job.status_history.get()
+        JobStatusDwell.objects.filter(history_id=early.pk).delete()
+
+        assert analytics.refresh_status_dwell() == 1
+        assert JobStatusDwell.objects.filter(history_id=early.pk).exists()
+
+    def test_job_detail_shows_time_in_status(self, client, job, counter_user):
+        from django.urls import reverse
+
+        job.transition_to(JobStatus.DESIGNING)
+        _backdate(job, [3])
+        analytics.refresh_status_dwell()
+        client.force_login(counter_user)
+        response = client.get(reverse("jobs:detail", args=[job.pk]))
+
+        assert response.context["dwell"][0]["duration"] == timedelta(hours=3)
+        assert "เวลาในแต่ละสถานะ" in response.content.decode()
+
+    def test_dwell_by_status_and_throughput(self, job, designer_user):
+        job.transition_to(JobStatus.DESIGNING)
+        job.transition_to(JobStatus.AWAITING_APPROVAL, changed_by=designer_user)
+        _backdate(job, [1, 3])
+        analytics.refresh_status_dwell()
+        since = timezone.now() - timedelta(days=1)
+
+        rows = {r["status"]: r for r in analytics.dwell_by_status(since)}
+        assert rows[JobStatus.DESIGNING]["avg"] == timedelta(hours=3)
+
+        throughput = analytics.throughput_by_user(since)
+        assert throughput[0]["changed_by_id"] == designer_user.pk
+        assert throughput[0]["count"] == 1
+
+    def test_current_stalls_counts_active_jobs(self, job):
+        job.transition_to(JobStatus.DESIGNING)
+        rows = {r["status"]: r for r in analytics.current_stalls()}
+        assert rows[JobStatus.DESIGNING]["count"] == 1
+        assert rows[JobStatus.DESIGNING]["oldest"] >= timedelta(0)
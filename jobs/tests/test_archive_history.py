@@ -0,0 +1,76 @@
+"""Tests for the archive_history management command."""
+
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs.models import JobStatus, JobStatusDwell, JobStatusHistory
+from notifications.models import NotificationLog
+
+
+@pytest.fixture
+def archive_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _age_history(job, days):
+    JobStatusHistory.objects.filter(job=job).update(
+        changed_at=timezone.now() - timedelta(days=days)
+    )
+
+
+@pytest.mark.django_db
+class TestArchiveHistory:
+    def test_archives_old_history_of_closed_jobs(self, job, archive_root):
+        job.transition_to(JobStatus.CANCELLED)
+        _age_history(job, 400)
+
+        call_command("archive_history", history_days=365)
+
+        assert not JobStatusHistory.objects.filter(job=job).exists()
+        files = list((archive_root / "archive" / "jobstatushistory").rglob("*.jsonl.gz"))
+        assert len(files) == 1
+        rows = [json.loads(line) for line in gzip.decompress(files[0].read_bytes()).splitlines()]
+        assert rows[0]["job_id"] == job.pk
+        assert rows[0]["to_status"] == JobStatus.CANCELLED
+
+    def test_keeps_history_of_active_jobs(self, job, archive_root):
+        job.transition_to(JobStatus.DESIGNING)
+        _age_history(job, 400)
+
+        call_command("archive_history", history_days=365)
+
+        assert JobStatusHistory.objects.filter(job=job).count() == 1
+
+    def test_dwell_rollup_survives_archive(self, job, archive_root):
+        job.transition_to(JobStatus.CANCELLED)
+        _age_history(job, 400)
+
+        call_command("archive_history", history_days=365)
+
+        assert JobStatusDwell.objects.filter(job=job, status=JobStatus.PENDING).exists()
+
+    def test_archives_old_notification_logs(self, job, archive_root):
+        old, recent = (
+            NotificationLog.objects.create(job=job, line_user_id="U1", message_type="status_change")
+            for _ in range(2)
+        )
+        old_sent_at = timezone.now() - timedelta(days=100)
+        NotificationLog.objects.filter(pk=old.pk).update(sent_at=old_sent_at)
+
+        call_command("archive_history", notification_days=90)
+
+        assert list(NotificationLog.objects.values_list("pk", flat=True)) == [recent.pk]
+
+    def test_dry_run_deletes_nothing(self, job, archive_root):
+        job.transition_to(JobStatus.CANCELLED)
+        _age_history(job, 400)
+
+        call_command("archive_history", history_days=365, dry_run=True)
+
+        assert JobStatusHistory.objects.filter(job=job).exists()
@@ -0,0 +1,196 @@
+"""
+Tests for batch quoting (jobs/batch.py and the jobs:batch_create view).
+"""
+
+import io
+import json
+from decimal import Decimal
+
+import openpyxl
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from documents.models import Document, DocumentType
+from jobs.batch import create_batch, price_lines, read_rows, rows_to_dicts
+from jobs.models import Job, JobStatusCounter
+from production import pricing
+from production.models import ProductType
+
+
+@pytest.fixture(autouse=True)
+def fresh_prices(monkeypatch):
+    monkeypatch.setattr(pricing, "CHECK_INTERVAL", 0)
+    pricing.invalidate()
+
+
+@pytest.fixture
+def stickers(db):
+    return ProductType.objects.create(
+        name="สติ๊กเกอร์", name_en="Sticker", base_price=5, pricing_method="per_unit", unit="ชิ้น"
+    )
+
+
+class TestParsing:
+    def test_rows_without_header_use_column_order(self):
+        rows = read_rows("ป้ายไวนิล, ป้ายหน้าร้าน, 2, 200, 100\n\n")
+        assert rows_to_dicts(rows) == [
+            {
+                "product_type": "ป้ายไวนิล",
+                "title": "ป้ายหน้าร้าน",
+                "quantity": "2",
+                "width_cm": "200",
+                "height_cm": "100",
+            }
+        ]
+
+    def test_thai_header_in_any_order(self):
+        rows = read_rows("จำนวน,ประเภทสินค้า,ชื่องาน,หมายเหตุ\n3,Sticker,โลโก้,x\n")
+        assert rows_to_dicts(rows) == [
+            {"quantity": "3", "product_type": "Sticker", "title": "โลโก้"}
+        ]
+
+    def test_xlsx_upload(self):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(["product_type", "title", "quantity"])
+        workbook.active.append(["Sticker", "โลโก้", 100])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile("order.xlsx", buffer.getvalue())
+
+        assert rows_to_dicts(read_rows(upload=upload)) == [
+            {"product_type": "Sticker", "title": "โลโก้", "quantity": "100"}
+        ]
+
+    def test_unreadable_upload(self):
+        with pytest.raises(ValueError):
+            read_rows(upload=SimpleUploadedFile("order.xlsx", b"not a zip"))
+
+
+@pytest.mark.django_db
+class TestPriceLines:
+    def test_quotes_and_overrides(self, product_type, stickers):
+        lines, errors = price_lines([
+            {
+                "product_type": "ป้ายไวนิล",
+                "title": "ป้าย",
+                "quantity": "2",
+                "width_cm": "200",
+                "height_cm": "100",
+            },
+            {"product_type": "sticker", "quantity": "100"},
+            {"product_type": str(stickers.pk), "title": "พิเศษ", "quantity": "10", "price": "1,000"},
+        ])
+
+        assert errors == []
+        assert [line.price for line in lines] == [
+            Decimal("600.00"), Decimal("500.00"), Decimal("1000.00")
+        ]
+        assert lines[1].title == "สติ๊กเกอร์"
+        assert lines[2].price_overridden
+
+    def test_errors_carry_line_numbers(self, product_type):
+        lines, errors = price_lines([
+            {"product_type": "ป้ายไวนิล", "quantity": "1"},
+            {"product_type": "ไม่มี"},
+            {"product_type": "ป้ายไวนิล", "quantity": "1.5"},
+            {"product_type": "ป้ายไวนิล", "width_cm": "-1"},
+        ])
+
+        assert len(lines) == 1
+        assert [number for number, _ in errors] == [2, 3, 4]
+
+
+@pytest.mark.django_db
+class TestCreateBatch:
+    def test_two_hundred_lines_in_a_handful_of_queries(
+        self, customer, product_type, stickers, counter_user, django_assert_max_num_queries
+    ):
+        JobStatusCounter.reconcile()
+        items = [
+            {
+                "product_type": "ป้ายไวนิล" if i % 2 else "Sticker",
+                "title": f"งาน {i}",
+                "quantity": "2",
+                "width_cm": "100",
+                "height_cm": "50",
+            }
+            for i in range(200)
+        ]
+        pricing.quote(product_type.pk, 1, 0, 0)  # tables already compiled by an earlier request
+
+        # one INSERT per table on PostgreSQL; SQLite splits them at its variable limit
+        with django_assert_max_num_queries(16):
+            lines, errors = price_lines(items, customer.customer_type_id)
+            document, jobs = create_batch(customer, lines, counter_user)
+
+        assert errors == []
+        assert len(jobs) == 200
+        assert Job.objects.filter(customer=customer).count() == 200
+        assert document.document_type == DocumentType.QUOTATION
+        assert document.items.count() == 200
+        assert set(document.items.values_list("job_id", flat=True)) == {job.pk for job in jobs}
+        assert document.total_amount == sum(line.price for line in lines)
+        assert JobStatusCounter.reconcile(fix=False) == {}
+
+
+@pytest.mark.django_db
+class TestBatchView:
+    def test_preview_does_not_save(self, client, counter_user, customer, product_type):
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("jobs:batch_create"),
+            {"customer": customer.pk, "lines": "ป้ายไวนิล,ป้าย,1,100,100", "action": "preview"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        assert response.status_code == 200
+        assert [line.price for line in response.context["lines"]] == [Decimal("150.00")]
+        assert not Job.objects.exists()
+
+    def test_create_from_csv_upload(self, client, counter_user, customer, product_type):
+        client.force_login(counter_user)
+        csv = "ประเภทสินค้า,ชื่องาน,จำนวน\nป้ายไวนิล,ก,1\nป้ายไวนิล,ข,2\n"
+        sheet = SimpleUploadedFile("order.csv", csv.encode())
+
+        response = client.post(
+            reverse("jobs:batch_create"), {"customer": customer.pk, "sheet": sheet}
+        )
+
+        document = Document.objects.get()
+        assert response.url == reverse("documents:detail", args=[document.pk])
+        assert Job.objects.count() == 2
+
+    def test_errors_block_creation(self, client, counter_user, customer, product_type):
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("jobs:batch_create"), {"customer": customer.pk, "lines": "ป้ายไวนิล\nไม่มี"}
+        )
+
+        assert response.context["errors"] == [(2, "ไม่พบประเภทสินค้า: ไม่มี")]
+        assert not Job.objects.exists()
+
+    def test_json(self, client, counter_user, customer, product_type):
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("jobs:batch_create"),
+            json.dumps({
+                "customer": customer.pk,
+                "lines": [
+                    {"product_type": "ป้ายไวนิล", "quantity": 3, "width_cm": 100, "height_cm": 100}
+                ],
+            }),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        body = response.json()
+        assert Job.objects.get().pk == body["jobs"][0]
+        assert body["total"] == "450.00"
+
+    def test_designer_forbidden(self, client, designer_user):
+        client.force_login(designer_user)
+        assert client.get(reverse("jobs:batch_create")).status_code == 403
@@ -2,7 +2,7 @@
 
 import pytest
 
-from jobs.models import Job, JobStatus
+from jobs.models import Job, JobStatus, JobStatusCounter, JobStatusHistory
 
 
 @pytest.mark.django_db
@@ -48,3 +48,113 @@ class TestJobStatusTransitions:
             title="งาน 2", quantity=1, quoted_price=100, created_by=counter_user
         )
         assert job1.tracking_token != job2.tracking_token
+
+    def test_stale_instance_cannot_repeat_transition(self, job, counter_user):
+        stale = Job.objects.get(pk=job.pk)
+        job.transition_to(JobStatus.DESIGNING, changed_by=counter_user)
+        # stale copy still believes the job is PENDING
+        with pytest.raises(ValueError, match="Cannot transition"):
+            stale.transition_to(JobStatus.DESIGNING, changed_by=counter_user)
+        assert job.status_history.count() == 1
+
+
+@pytest.mark.django_db
+class TestBulkTransition:
+    def _make_jobs(self, job, n, status):
+        jobs = []
+        for i in range(n):
+            jobs.append(
+                Job.objects.create(
+                    customer=job.customer, product_type=job.product_type,
+                    title=f"งาน {i}", quantity=1, quoted_price=100,
+                    created_by=job.created_by, status=status,
+                )
+            )
+        return jobs
+
+    def test_moves_allowed_jobs_and_records_history(self, job, counter_user):
+        printing = self._make_jobs(job, 3, JobStatus.PRINTING)
+        ids = [j.pk for j in printing]
+
+        moved = Job.objects.bulk_transition(ids, JobStatus.READY, counter_user)
+
+        assert sorted(moved) == sorted(ids)
+        assert Job.objects.filter(pk__in=ids, status=JobStatus.READY).count() == 3
+        history = JobStatusHistory.objects.filter(job_id__in=ids)
+        assert history.count() == 3
+        assert all(h.from_status == JobStatus.PRINTING for h in history)
+        assert all(h.changed_by == counter_user for h in history)
+
+    def test_skips_jobs_with_disallowed_transition(self, job, counter_user):
+        printing = self._make_jobs(job, 2, JobStatus.PRINTING)
+        ids = [j.pk for j in printing] + [job.pk]  # job is PENDING
+
+        moved = Job.objects.bulk_transition(ids, JobStatus.READY, counter_user)
+
+        assert job.pk not in moved
+        job.refresh_from_db()
+        assert job.status == JobStatus.PENDING
+        assert not job.status_history.exists()
+
+    def test_query_count_is_constant(self, job, counter_user, django_assert_max_num_queries):
+        ids = [j.pk for j in self._make_jobs(job, 25, JobStatus.CUTTING)]
+        # lock+read, UPDATE, history bulk_create, counter upserts — independent of job count
+        with django_assert_max_num_queries(10):
+            Job.objects.bulk_transition(ids, JobStatus.READY, counter_user)
+
+
+@pytest.mark.django_db
+class TestJobStatusCounter:
+    def test_new_job_increments_counter(self, job):
+        assert JobStatusCounter.snapshot()[JobStatus.PENDING] == 1
+
+    def test_transition_moves_count(self, job, counter_user):
+        job.transition_to(JobStatus.CANCELLED, changed_by=counter_user)
+        counts = JobStatusCounter.snapshot()
+        assert counts[JobStatus.PENDING] == 0
+        assert counts[JobStatus.CANCELLED] == 1
+
+    def test_bulk_transition_moves_counts(self, job, counter_user):
+        jobs = [
+            Job.objects.create(
+                customer=job.customer, product_type=job.product_type, title="พิมพ์",
+                created_by=counter_user, status=status,
+            )
+            for status in (JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.CUTTING)
+        ]
+        Job.objects.bulk_transition([j.pk for j in jobs], JobStatus.READY, counter_user)
+        counts = JobStatusCounter.snapshot()
+        assert counts[JobStatus.PRINTING] == 0
+        assert counts[JobStatus.CUTTING] == 0
+        assert counts[JobStatus.READY] == 3
+
+    def test_adjust_updates_rows_in_status_order(self, job):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        # opposite moves must lock the two counter rows in the same order
+        for deltas in (
+            {JobStatus.REVISION: -1, JobStatus.AWAITING_APPROVAL: 1},
+            {JobStatus.AWAITING_APPROVAL: -1, JobStatus.REVISION: 1},
+        ):
+            with CaptureQueriesContext(connection) as ctx:
+                JobStatusCounter.adjust(deltas)
+            updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+            assert len(updates) == 2
+            assert f"'{JobStatus.AWAITING_APPROVAL}'" in updates[0]
+            assert f"'{JobStatus.REVISION}'" in updates[1]
+
+    def test_snapshot_is_one_query(self, job, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            JobStatusCounter.snapshot()
+
+    def test_reconcile_detects_and_fixes_drift(self, job):
+        # Direct UPDATE bypasses transition_to, so the counters drift
+        Job.objects.filter(pk=job.pk).update(status=JobStatus.READY)
+
+        drift = JobStatusCounter.reconcile(fix=False)
+        assert drift == {JobStatus.PENDING: (1, 0), JobStatus.READY: (0, 1)}
+
+        JobStatusCounter.reconcile()
+        assert JobStatusCounter.reconcile(fix=False) == {}
+        assert JobStatusCounter.snapshot()[JobStatus.READY] == 1
@@ -0,0 +1,162 @@
+"""Tests for intake due-date estimates (jobs/promise.py)."""
+
+from datetime import timedelta
+from decimal import Decimal
+from itertools import count
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import promise
+from jobs.models import Job, JobStatus, JobStatusDwell, LeadTimeStat
+
+_history_ids = count(1)
+
+
+def _dwell(job, status, hours):
+    exited = timezone.now() - timedelta(days=1)
+    JobStatusDwell.objects.create(
+        history_id=next(_history_ids),
+        job=job,
+        status=status,
+        entered_at=exited - timedelta(hours=hours),
+        exited_at=exited,
+        duration=timedelta(hours=hours),
+    )
+
+
+def _jobs(n, customer, product_type, counter_user):
+    return [
+        Job.objects.create(
+            customer=customer,
+            product_type=product_type,
+            title=f"งาน {i}",
+            quoted_price=100,
+            created_by=counter_user,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def history(customer, product_type, counter_user):
+    """
+    Five banner jobs: 10h pending, 1-5h printing; two of them designed
+    (24h, then 2 rounds of revision).
+    """
+    jobs = _jobs(5, customer, product_type, counter_user)
+    for i, job in enumerate(jobs, 1):
+        _dwell(job, JobStatus.PENDING, 10)
+        _dwell(job, JobStatus.PRINTING, i)
+    for job in jobs[:2]:
+        _dwell(job, JobStatus.DESIGNING, 24)
+        _dwell(job, JobStatus.REVISION, 3)
+        _dwell(job, JobStatus.REVISION, 3)
+    promise.refresh_lead_times()
+    return jobs
+
+
+@pytest.mark.django_db
+class TestLeadTimes:
+    def test_refresh_builds_per_type_and_overall_rows(self, history, product_type):
+        stats = {(s.product_type_id, s.status): s for s in LeadTimeStat.objects.all()}
+        assert len(stats) == 8  # 4 statuses × (product type, all types)
+
+        printing = stats[(product_type.pk, JobStatus.PRINTING)]
+        assert (printing.samples, printing.share) == (5, 1.0)
+        assert printing.median == timedelta(hours=3)
+        assert printing.p80 == timedelta(hours=4)
+
+        revision = stats[(None, JobStatus.REVISION)]
+        assert revision.samples == 2
+        assert revision.share == pytest.approx(0.4)
+        assert revision.p80 == timedelta(hours=6)  # both rounds of one job
+
+    def test_refresh_ignores_old_history(self, settings, customer, product_type, counter_user):
+        (job,) = _jobs(1, customer, product_type, counter_user)
+        _dwell(job, JobStatus.PENDING, 1)
+        JobStatusDwell.objects.update(exited_at=timezone.now() - timedelta(days=100))
+        settings.LEAD_TIME_HISTORY_DAYS = 90
+        assert promise.refresh_lead_times() == 0
+
+    def test_task(self, history):
+        from jobs.tasks import refresh_lead_times
+
+        assert refresh_lead_times() == "lead_time_stats rows: 8"
+
+
+@pytest.mark.django_db
+class TestEstimate:
+    def test_from_history(self, history, product_type):
+        now = timezone.now()
+        estimate = promise.estimate(product_type.pk, now=now)
+        # pending 10h + designing 24h × 0.4 + revision 6h × 0.4, printing 4h
+        assert estimate.design == timedelta(hours=22)
+        assert estimate.production == timedelta(hours=4)
+        assert estimate.ready_at == now + timedelta(hours=26)
+        assert estimate.samples == 5
+
+    def test_thin_history_uses_all_types(self, history):
+        from production.models import ProductType
+
+        stickers = ProductType.objects.create(
+            name="สติกเกอร์", base_price=5, pricing_method="per_unit"
+        )
+        assert promise.estimate(stickers.pk).design == timedelta(hours=22)
+
+    def test_no_history(self, product_type):
+        now = timezone.now()
+        estimate = promise.estimate(product_type.pk, now=now)
+        assert (estimate.ready_at, estimate.samples) == (now, 0)
+
+    def test_busy_printers_push_the_date(self, history, product_type, customer, counter_user):
+        from production.models import Station
+
+        Station.objects.create(
+            name="Roland", stage=Station.Stage.PRINTING, sqm_per_hour=Decimal("1")
+        )
+        queued = [job.pk for job in _jobs(3, customer, product_type, counter_user)]
+        Job.objects.filter(pk__in=queued).update(
+            status=JobStatus.PRINTING, width_cm=1000, height_cm=1000
+        )
+
+        estimate = promise.estimate(
+            product_type.pk, quantity=1, width_cm=Decimal(100), height_cm=Decimal(100)
+        )
+        # 300 hours of printing queued: far longer than the 4h history
+        assert estimate.queue > timedelta(days=30)
+        earliest = timezone.now() + estimate.design + estimate.queue - timedelta(seconds=5)
+        assert estimate.ready_at >= earliest
+
+    def test_stats_come_from_the_cache(self, history, product_type):
+        promise.estimate(product_type.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            promise.estimate(product_type.pk)
+        assert not any("leadtimestat" in q["sql"].lower() for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestEstimateView:
+    def test_renders_suggested_date(self, client, counter_user, history, product_type):
+        client.force_login(counter_user)
+        response = client.get(
+            reverse("jobs:estimate_due_date"), {"product_type": product_type.pk, "quantity": 2}
+        )
+        expected = promise.estimate(product_type.pk).date
+        assert response.status_code == 200
+        assert expected.strftime("%Y-%m-%d") in response.content.decode()
+
+    def test_no_product_type_no_estimate(self, client, counter_user):
+        client.force_login(counter_user)
+        response = client.get(reverse("jobs:estimate_due_date"), {"product_type": ""})
+        assert (response.status_code, response.content) == (200, b"")
+
+    def test_bad_input(self, client, counter_user, product_type):
+        client.force_login(counter_user)
+        response = client.get(
+            reverse("jobs:estimate_due_date"), {"product_type": product_type.pk, "quantity": "x"}
+        )
+        assert response.status_code == 400
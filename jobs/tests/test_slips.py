@@ -0,0 +1,205 @@
+"""
+Tests for stored job slips and batch slip printing (jobs/slips.py).
+"""
+
+import io
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfReader, PdfWriter
+
+from documents import pdf
+from jobs import slips, tasks
+from jobs.models import Job, JobSlip, JobStatus
+
+
+def _page_count(data):
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+@pytest.fixture
+def renders(settings, tmp_path, monkeypatch):
+    """HTML strings sent to WeasyPrint; each becomes a one-page PDF."""
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.PDF_RENDER_WORKERS = 1
+    calls = []
+
+    def fake_html_to_pdf(html, base_url=None):
+        calls.append(html)
+        if "BROKEN" in html:
+            raise ValueError("layout failed")
+        writer = PdfWriter()
+        writer.add_blank_page(width=420, height=595)
+        out = io.BytesIO()
+        writer.write(out)
+        return out.getvalue()
+
+    monkeypatch.setattr(pdf, "html_to_pdf", fake_html_to_pdf)
+    return calls
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Job id lists handed to the Celery task."""
+    batches = []
+    monkeypatch.setattr(tasks.render_job_slips, "delay", batches.append)
+    return batches
+
+
+def _jobs(customer, product_type, user, n):
+    return [
+        Job.objects.create(
+            customer=customer, product_type=product_type, title=f"งาน {i}", created_by=user
+        )
+        for i in range(n)
+    ]
+
+
+def _loaded(jobs):
+    return list(
+        Job.objects.filter(pk__in=[j.pk for j in jobs])
+        .select_related("customer", "product_type")
+        .order_by("pk")
+    )
+
+
+@pytest.mark.django_db
+class TestSlipPdf:
+    def test_rendered_once_then_served_from_storage(self, job, renders):
+        first = slips.slip_pdf(_loaded([job])[0])
+        second = slips.slip_pdf(_loaded([job])[0])
+
+        assert first == second and _page_count(first) == 1
+        assert len(renders) == 1
+        assert JobSlip.objects.get(job=job).pdf.name.startswith("slips/")
+
+    def test_printed_field_change_re_renders(self, job, renders):
+        slips.slip_pdf(job)
+        old_name = JobSlip.objects.get(job=job).pdf.name
+
+        job.deposit_amount = 100  # not on the slip
+        job.save()
+        slips.slip_pdf(job)
+        assert len(renders) == 1
+
+        job.title = "ป้ายใหม่"
+        job.save()
+        slips.slip_pdf(job)
+        assert len(renders) == 2 and "ป้ายใหม่" in renders[-1]
+        slip = JobSlip.objects.get(job=job)
+        assert slip.pdf.name != old_name
+        assert not slip.pdf.storage.exists(old_name)
+
+    def test_status_move_refreshes_on_next_print(self, job, renders, counter_user):
+        slips.slip_pdf(job)
+        job.transition_to(JobStatus.PRINTING, changed_by=counter_user)
+        slips.slip_pdf(job)
+        assert len(renders) == 2
+
+    def test_view(self, client, counter_user, job, renders):
+        client.force_login(counter_user)
+        response = client.get(reverse("jobs:slip", args=[job.pk]))
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/pdf"
+        assert _page_count(response.content) == 1
+
+
+@pytest.mark.django_db
+class TestCombinedPdf:
+    def test_only_stale_slips_are_rendered(self, customer, product_type, counter_user, renders):
+        jobs = _loaded(_jobs(customer, product_type, counter_user, 3))
+        slips.slip_pdf(jobs[0])
+
+        data, failed = slips.combined_pdf(jobs)
+
+        assert _page_count(data) == 3 and failed == []
+        assert len(renders) == 3
+        assert JobSlip.objects.count() == 3
+
+    def test_failed_slip_is_left_out(self, customer, product_type, counter_user, renders):
+        jobs = _jobs(customer, product_type, counter_user, 3)
+        Job.objects.filter(pk=jobs[1].pk).update(title="BROKEN")
+
+        data, failed = slips.combined_pdf(_loaded(jobs))
+
+        assert _page_count(data) == 2
+        assert failed == [jobs[1].pk]
+        assert not JobSlip.objects.filter(job=jobs[1]).exists()
+
+    def test_queries_do_not_grow_with_slips(self, customer, product_type, counter_user, renders):
+        def count(n):
+            jobs = _loaded(_jobs(customer, product_type, counter_user, n))
+            with CaptureQueriesContext(connection) as ctx:
+                slips.combined_pdf(jobs)
+            return len(ctx.captured_queries)
+
+        # SQLite may split the bulk insert at its variable limit, hence <= rather than ==
+        assert count(20) <= count(5) + 2
+
+
+@pytest.mark.django_db
+class TestBatchView:
+    def test_prints_todays_jobs(self, client, counter_user, customer, product_type, renders):
+        today = _jobs(customer, product_type, counter_user, 3)
+        old = _jobs(customer, product_type, counter_user, 1)[0]
+        Job.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+        Job.objects.filter(pk=today[2].pk).update(status=JobStatus.CANCELLED)
+        client.force_login(counter_user)
+
+        response = client.get(reverse("jobs:slips"))
+
+        assert response.status_code == 200
+        assert _page_count(response.content) == 2
+        assert "slips_" + timezone.localdate().isoformat() in response["Content-Disposition"]
+
+    def test_selected_ids(self, client, counter_user, customer, product_type, renders):
+        jobs = _jobs(customer, product_type, counter_user, 4)
+        client.force_login(counter_user)
+
+        response = client.get(reverse("jobs:slips"), {"ids": [jobs[0].pk, jobs[3].pk]})
+
+        assert _page_count(response.content) == 2
+
+    def test_nothing_to_print(self, client, counter_user, renders):
+        client.force_login(counter_user)
+        response = client.get(reverse("jobs:slips"), {"date": "2020-01-01"})
+        assert response.status_code == 302
+        assert client.get(reverse("jobs:slips"), {"date": "nope"}).status_code == 400
+
+
+@pytest.mark.django_db
+class TestPreRender:
+    def test_create_and_edit_queue_render(
+        self, customer, product_type, counter_user, queued, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            job = Job.objects.create(
+                customer=customer, product_type=product_type, title="ป้าย", created_by=counter_user
+            )
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.PRINTING, changed_by=counter_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            job.title = "ป้ายใหม่"
+            job.save()
+        assert queued == [[job.pk], [job.pk]]
+
+    def test_batch_create_queues_every_job(
+        self, customer, product_type, counter_user, queued, django_capture_on_commit_callbacks
+    ):
+        from jobs.batch import create_batch, price_lines
+
+        lines, _ = price_lines(
+            [{"product_type": product_type.name, "title": f"ป้าย {i}"} for i in range(3)]
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            _, jobs = create_batch(customer, lines, counter_user)
+        assert queued == [[job.pk for job in jobs]]
+
+    def test_task_renders_missing_slips(self, customer, product_type, counter_user, renders):
+        jobs = _jobs(customer, product_type, counter_user, 2)
+        assert tasks.render_job_slips([j.pk for j in jobs]) == "slips rendered: 2"
+        assert tasks.render_job_slips([j.pk for j in jobs]) == "slips rendered: 0"
@@ -8,6 +8,8 @@ urlpatterns = [
     path("", views.job_list, name="list"),
     path("kanban/", views.design_kanban, name="kanban"),
     path("new/", views.job_create, name="create"),
+    path("batch/", views.job_batch_create, name="batch_create"),
+    path("slips/", views.job_slips_pdf, name="slips"),
     path("<int:pk>/", views.job_detail, name="detail"),
     path("<int:pk>/edit/", views.job_edit, name="edit"),
     path("<int:pk>/reorder/", views.job_reorder, name="reorder"),
@@ -17,4 +19,5 @@ urlpatterns = [
     path("<int:pk>/files/<int:file_pk>/delete/", views.job_file_delete, name="file_delete"),
     # HTMX: inline price calculation
     path("calculate-price/", views.calculate_price, name="calculate_price"),
+    path("estimate-due-date/", views.estimate_due_date, name="estimate_due_date"),
 ]
@@ -7,6 +7,7 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
+from accounts.idempotency import idempotent
 from accounts.mixins import role_required
 from accounts.models import Role
 
@@ -41,47 +42,77 @@ def job_list(request):
 
 @login_required
 def job_slip_pdf(request, pk):
-    """Generate an A5 job slip PDF with QR code for the customer tracking URL."""
-    import base64
-    import io
-
-    import qrcode
-    from django.template.loader import render_to_string
-    from weasyprint import HTML
-
-    from documents.models import Setting
+    """A5 job slip PDF with QR code for the customer tracking URL (stored; see jobs/slips.py)."""
+    from .slips import slip_pdf
 
     job = get_object_or_404(
         Job.objects.select_related("customer", "product_type"),
         pk=pk,
     )
-    shop_info = {k: Setting.get(k, "") for k in ["shop_name", "shop_address", "shop_phone"]}
-    tracking_url = request.build_absolute_uri(job.get_tracking_url())
-    buf = io.BytesIO()
-    qrcode.make(tracking_url).save(buf, format="PNG")
-    qr_b64 = base64.b64encode(buf.getvalue()).decode()
-    html_string = render_to_string(
-        "jobs/pdf/job_slip.html",
-        {"job": job, "shop": shop_info, "qr_b64": qr_b64},
-        request=request,
-    )
-    pdf = HTML(string=html_string, base_url=request.build_absolute_uri("/")).write_pdf()
-    response = HttpResponse(pdf, content_type="application/pdf")
+    response = HttpResponse(slip_pdf(job), content_type="application/pdf")
     response["Content-Disposition"] = f'inline; filename="job_{job.pk}_slip.pdf"'
     return response
 
 
+@login_required
+def job_slips_pdf(request):
+    """
+    Many job slips in one PDF for the printer queue.
+
+    ?ids=1&ids=2 prints those jobs; otherwise every job taken in on ?date=
+    (YYYY-MM-DD, default today) that is not cancelled.
+    """
+    from datetime import date, timedelta
+
+    from django.contrib import messages
+
+    from documents.periods import day_start
+
+    from .slips import combined_pdf
+
+    jobs = Job.objects.select_related("customer", "product_type").order_by("pk")
+    ids = [i for i in request.GET.getlist("ids") if i.isdigit()]
+    if ids:
+        jobs, label = jobs.filter(pk__in=ids), "selected"
+    else:
+        try:
+            day = (
+                date.fromisoformat(request.GET["date"])
+                if request.GET.get("date")
+                else timezone.localdate()
+            )
+        except ValueError:
+            return HttpResponse("วันที่ไม่ถูกต้อง", status=400)
+        next_day = day + timedelta(days=1)
+        jobs = jobs.filter(created_at__gte=day_start(day), created_at__lt=day_start(next_day))
+        jobs, label = jobs.exclude(status=JobStatus.CANCELLED), day.isoformat()
+    jobs = list(jobs)
+    if not jobs:
+        messages.info(request, "ไม่มีใบงานให้พิมพ์")
+        return redirect("jobs:list")
+
+    pdf, failed = combined_pdf(jobs)
+    response = HttpResponse(pdf, content_type="application/pdf")
+    response["Content-Disposition"] = f'inline; filename="slips_{label}.pdf"'
+    if failed:
+        response["X-Slips-Failed"] = ",".join(map(str, failed))
+    return response
+
+
 @login_required
 def job_detail(request, pk):
     job = get_object_or_404(
         Job.objects.select_related("customer", "product_type", "assigned_designer"),
         pk=pk,
     )
+    from .analytics import job_dwell
+
     history = job.status_history.select_related("changed_by").order_by("-changed_at")
     files = job.files.select_related("uploaded_by")
     return render(request, "jobs/detail.html", {
         "job": job,
         "history": history,
+        "dwell": job_dwell(job),
         "files": files,
         "today": timezone.localdate(),
     })
@@ -104,6 +135,87 @@ def job_create(request):
     return render(request, "jobs/create.html", {"form": form})
 
 
+@role_required(Role.COUNTER, Role.OWNER)
+@idempotent
+def job_batch_create(request):
+    """
+    Multi-line order: price every line in one pass, then create the jobs and
+    one combined quotation. POST action=preview only prices the lines.
+
+    JSON clients POST {"customer": id, "due_date": "YYYY-MM-DD", "lines": [{...}]}
+    with the column names from jobs/batch.py and get the created ids back.
+    """
+    import json
+
+    from customers.models import Customer
+
+    from .batch import create_batch, price_lines, read_rows, rows_to_dicts
+    from .forms import BatchQuoteForm
+
+    if request.method == "POST" and request.content_type == "application/json":
+        from django.utils.dateparse import parse_date
+
+        try:
+            payload = json.loads(request.body)
+            customer = Customer.objects.select_related("customer_type").get(
+                pk=payload["customer"], is_active=True
+            )
+            items = [
+                {k: str(v) for k, v in item.items() if v is not None} for item in payload["lines"]
+            ]
+            due_date = parse_date(payload.get("due_date") or "") or None
+        except (ValueError, KeyError, TypeError, AttributeError, Customer.DoesNotExist):
+            return JsonResponse({"error": "invalid request"}, status=400)
+        lines, errors = price_lines(items, customer.customer_type_id)
+        if errors or not lines:
+            errors = [{"line": n, "message": m} for n, m in errors]
+            return JsonResponse({"errors": errors}, status=400)
+        notes = payload.get("notes", "")
+        document, jobs = create_batch(customer, lines, request.user, due_date, notes)
+        return JsonResponse(
+            {
+                "document": document.pk,
+                "document_number": document.document_number,
+                "jobs": [job.pk for job in jobs],
+                "total": str(document.total_amount),
+            },
+            status=201,
+        )
+
+    lines, errors = [], []
+    if request.method == "POST":
+        form = BatchQuoteForm(request.POST, request.FILES)
+        if form.is_valid():
+            customer = form.cleaned_data["customer"]
+            try:
+                rows = read_rows(form.cleaned_data["lines"], form.cleaned_data["sheet"])
+            except ValueError as exc:
+                rows, errors = [], [(0, str(exc))]
+            if rows:
+                lines, errors = price_lines(rows_to_dicts(rows), customer.customer_type_id)
+            if lines and not errors and request.POST.get("action") != "preview":
+                due_date, notes = form.cleaned_data["due_date"], form.cleaned_data["notes"]
+                document, _ = create_batch(customer, lines, request.user, due_date, notes)
+                return redirect("documents:detail", pk=document.pk)
+    else:
+        form = BatchQuoteForm(initial={"customer": request.GET.get("customer")})
+
+    customer = None
+    customer_id = form["customer"].value()
+    if customer_id and str(customer_id).isdigit():
+        customer = Customer.objects.filter(pk=customer_id).first()
+    context = {
+        "form": form,
+        "customer": customer,
+        "lines": lines,
+        "errors": errors,
+        "total": sum(line.price for line in lines),
+    }
+    if request.headers.get("HX-Request"):
+        return render(request, "jobs/partials/batch_preview.html", context)
+    return render(request, "jobs/batch_create.html", context)
+
+
 @role_required(Role.COUNTER, Role.OWNER)
 def job_reorder(request, pk):
     """Pre-fill the job creation form from an existing job."""
@@ -139,6 +251,7 @@ def job_edit(request, pk):
 
 
 @login_required
+@idempotent
 def job_update_status(request, pk):
     """HTMX endpoint: transition job status."""
     if request.method != "POST":
@@ -290,31 +403,62 @@ def design_kanban(request):
 def calculate_price(request):
     """
     HTMX endpoint: real-time price calculation.
-    Called on product_type, quantity, width, height change.
+    Called on product_type, quantity, width, height (and customer) change.
     """
     from decimal import Decimal
 
-    from production.models import ProductType
+    from customers.models import Customer
+    from production.pricing import UnknownProductType, quote
 
     try:
         product_type_id = int(request.GET.get("product_type", 0))
         quantity = int(request.GET.get("quantity", 1))
         width = Decimal(request.GET.get("width", 0) or 0)
         height = Decimal(request.GET.get("height", 0) or 0)
-    except (ValueError, TypeError):
+        customer_id = int(request.GET.get("customer") or 0)
+    except (ValueError, TypeError, ArithmeticError):
         return HttpResponse("0", status=400)
 
+    customer_type = None
+    if customer_id:
+        customer_type = (
+            Customer.objects.filter(pk=customer_id)
+            .values_list("customer_type_id", flat=True)
+            .first()
+        )
+
     try:
-        pt = ProductType.objects.get(pk=product_type_id, is_active=True)
-    except ProductType.DoesNotExist:
-        return render(request, "jobs/partials/price_display.html", {"price": 0})
-
-    if pt.pricing_method == "per_sqm":
-        sqm = (width / 100) * (height / 100)  # cm → m²
-        price = pt.base_price * sqm * quantity
-    elif pt.pricing_method == "per_unit":
-        price = pt.base_price * quantity
-    else:  # flat
-        price = pt.base_price
+        price = quote(product_type_id, quantity, width, height, customer_type)
+    except UnknownProductType:
+        price = 0
+    except ValueError:
+        return HttpResponse("0", status=400)
 
     return render(request, "jobs/partials/price_display.html", {"price": price})
+
+
+@login_required
+def estimate_due_date(request):
+    """
+    HTMX endpoint: suggested due date for the job being entered.
+    Called alongside calculate_price when product_type, quantity or size change.
+    """
+    from decimal import Decimal
+
+    from .promise import estimate
+
+    try:
+        product_type_id = int(request.GET.get("product_type") or 0)
+        quantity = int(request.GET.get("quantity") or 1)
+        width = Decimal(request.GET.get("width_cm") or 0)
+        height = Decimal(request.GET.get("height_cm") or 0)
+    except (ValueError, TypeError, ArithmeticError):
+        return HttpResponse("", status=400)
+    if not product_type_id:
+        return HttpResponse("")
+
+    return render(
+        request,
+        "jobs/partials/due_date_estimate.html",
+        {"estimate": estimate(product_type_id, quantity, width, height)},
+    )
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0003_notification"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notificationlog",
+            index=models.Index(fields=["sent_at"], name="notificatio_sent_at_d19621_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notificationlog",
+            index=models.Index(
+                fields=["message_type", "sent_at"], name="notificatio_message_f8d284_idx"
+            ),
+        ),
+    ]
@@ -63,6 +63,10 @@ class NotificationLog(models.Model):
         verbose_name = "Notification Log"
         verbose_name_plural = "Notification Logs"
         ordering = ["-sent_at"]
+        indexes = [
+            models.Index(fields=["sent_at"]),
+            models.Index(fields=["message_type", "sent_at"]),
+        ]
 
     def __str__(self):
         status = "✓" if self.success else "✗"
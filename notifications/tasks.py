@@ -16,7 +16,6 @@ import logging
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
-from django.db.models import Count
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -121,7 +120,7 @@ def send_daily_summary():
     if not line_on and not email_on:
         return "disabled"
 
-    from jobs.models import Job, JobStatus, PaymentStatus
+    from jobs.models import Job, JobStatus, JobStatusCounter, PaymentStatus
 
     today = timezone.localdate()
 
@@ -137,13 +136,8 @@ def send_daily_summary():
         JobStatus.READY,
     ]
 
-    # Jobs by status
-    counts = {
-        row["status"]: row["count"]
-        for row in Job.objects.filter(status__in=active_statuses)
-        .values("status")
-        .annotate(count=Count("id"))
-    }
+    # Jobs by status (materialized counters)
+    counts = JobStatusCounter.snapshot()
 
     # Due today
     due_today = Job.objects.filter(due_date=today, status__in=active_statuses).count()
@@ -243,16 +237,28 @@ def send_payment_reminders():
 
 @shared_task(name="notifications.tasks.send_material_alerts")
 def send_material_alerts():
-    """Alert owner about low-stock materials (LINE + email, debounced 24h)."""
+    """
+    Alert owner about low-stock materials and materials the pipeline forecast
+    (production/forecast.py) expects to run out within MATERIAL_ALERT_DAYS
+    (LINE + email, debounced 24h).
+    """
     line_on = _line_enabled()
     email_on = _email_enabled()
     if not line_on and not email_on:
         return "disabled"
 
+    from django.db.models import Q
+
     from production.models import Material
+
     from .models import NotificationLog
 
-    low_stock = [m for m in Material.objects.filter(is_active=True) if m.is_low_stock]
+    horizon = timezone.localdate() + timezone.timedelta(days=settings.MATERIAL_ALERT_DAYS)
+    low_stock = list(
+        Material.objects.filter(
+            Q(is_low_stock=True) | Q(stockout_date__lte=horizon), is_active=True
+        )
+    )
     if not low_stock:
         return "no low stock"
 
@@ -277,6 +283,11 @@ def send_material_alerts():
             f"{material.name}: {material.quantity_in_stock} {material.unit} "
             f"(ขั้นต่ำ: {material.min_quantity} {material.unit})"
         )
+        if material.stockout_date and material.stockout_date <= horizon:
+            text += (
+                f"\nงานค้างต้องใช้อีก {material.projected_need} {material.unit} "
+                f"คาดว่าจะหมดภายในวันที่ {material.stockout_date:%d/%m/%Y}"
+            )
 
         if line_on:
             _push_owner_line(text)
@@ -306,14 +317,26 @@ def send_approval_reminders():
     if not _line_enabled():
         return "disabled"
 
+    from django.db.models import OuterRef, Subquery
+
     from jobs.models import Job, JobStatus, JobStatusHistory
 
     reminder_days = int(_get_setting("approval_reminder_days", "3"))
     cutoff = timezone.now() - timezone.timedelta(days=reminder_days)
 
+    # When each job last entered AWAITING_APPROVAL — one correlated lookup on the
+    # (job, changed_at) index instead of a query per job
+    entered_awaiting = (
+        JobStatusHistory.objects.filter(job=OuterRef("pk"), to_status=JobStatus.AWAITING_APPROVAL)
+        .order_by("-changed_at")
+        .values("changed_at")[:1]
+    )
+
     # Find jobs stuck in AWAITING_APPROVAL where the last status change is old enough
     awaiting_jobs = (
         Job.objects.filter(status=JobStatus.AWAITING_APPROVAL)
+        .annotate(awaiting_since=Subquery(entered_awaiting))
+        .filter(awaiting_since__lte=cutoff)
         .select_related("customer")
         .prefetch_related("customer__line_binding")
     )
@@ -322,18 +345,6 @@ def send_approval_reminders():
     sent = 0
 
     for job in awaiting_jobs:
-        # Check when the job entered AWAITING_APPROVAL
-        last_transition = (
-            JobStatusHistory.objects.filter(
-                job=job,
-                to_status=JobStatus.AWAITING_APPROVAL,
-            )
-            .order_by("-changed_at")
-            .first()
-        )
-        if not last_transition or last_transition.changed_at > cutoff:
-            continue
-
         try:
             binding = job.customer.line_binding
         except Exception:
@@ -1,7 +1,7 @@
 from django.contrib import admin
-from unfold.admin import ModelAdmin
+from unfold.admin import ModelAdmin, TabularInline
 
-from .models import BankAccount, Payment
+from .models import BankAccount, BankStatementImport, BankStatementLine, Payment, PaymentReceipt
 
 
 @admin.register(BankAccount)
@@ -16,4 +16,65 @@ class PaymentAdmin(ModelAdmin):
     list_filter = ("method", "is_deposit")
     search_fields = ("job__title", "reference_number")
     readonly_fields = ("received_at",)
+    raw_id_fields = ("receipt",)
     date_hierarchy = "received_at"
+
+
+class PaymentAllocationInline(TabularInline):
+    model = Payment
+    fk_name = "receipt"
+    extra = 0
+    fields = ("job", "amount")
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(PaymentReceipt)
+class PaymentReceiptAdmin(ModelAdmin):
+    list_display = (
+        "customer",
+        "amount",
+        "method",
+        "reference_number",
+        "document",
+        "received_by",
+        "received_at",
+    )
+    list_filter = ("method",)
+    search_fields = ("customer__name", "reference_number")
+    readonly_fields = [f.name for f in PaymentReceipt._meta.fields]
+    inlines = [PaymentAllocationInline]
+
+
+class BankStatementLineInline(TabularInline):
+    model = BankStatementLine
+    extra = 0
+    fields = (
+        "posted_at", "amount", "reference", "description", "status", "payment", "match_reason"
+    )
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(BankStatementImport)
+class BankStatementImportAdmin(ModelAdmin):
+    list_display = (
+        "filename",
+        "bank_account",
+        "line_count",
+        "matched_count",
+        "skipped_count",
+        "uploaded_by",
+        "uploaded_at",
+    )
+    readonly_fields = [f.name for f in BankStatementImport._meta.fields]
+    inlines = [BankStatementLineInline]
+
+
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(ModelAdmin):
+    list_display = ("posted_at", "amount", "reference", "description", "status", "payment")
+    list_filter = ("status",)
+    search_fields = ("reference", "description")
+    raw_id_fields = ("statement_import", "payment")
+    date_hierarchy = "posted_at"
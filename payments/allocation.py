@@ -0,0 +1,203 @@
+"""
+Payment allocation — one customer payment spread over many jobs.
+
+allocate_payment() records a PaymentReceipt and one Payment per job it
+covers, in a single transaction and a fixed number of queries however many
+jobs there are:
+
+  - the jobs are locked with SELECT ... FOR UPDATE and their amounts paid so
+    far read with one grouped aggregate;
+  - the allocations are inserted with one bulk_create, so Payment.save() and
+    its post_save receivers do not run — the job payment statuses are set
+    with one bulk_update and the revenue rollup and dashboard are updated
+    here instead;
+  - one receipt Document lists every job as a DocumentItem.
+
+Without explicit amounts the payment goes to the customer's open jobs,
+oldest first.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Payment, PaymentMethod, PaymentReceipt, payment_status_for
+
+
+class AllocationError(ValueError):
+    """The amounts do not fit the jobs' outstanding balances."""
+
+
+def _locked_jobs(customer, job_ids):
+    from jobs.models import Job, JobStatus, PaymentStatus
+
+    jobs = (
+        Job.objects.select_for_update()
+        .filter(customer=customer)
+        .exclude(status=JobStatus.CANCELLED)
+    )
+    if job_ids is None:
+        jobs = jobs.exclude(payment_status=PaymentStatus.PAID)
+    else:
+        jobs = jobs.filter(pk__in=job_ids)
+    # no select_related: PostgreSQL cannot lock the nullable side of an outer join
+    return list(jobs.order_by("created_at", "pk"))
+
+
+def _paid(job_ids):
+    rows = (
+        Payment.objects.filter(job_id__in=job_ids)
+        .values("job_id")
+        .annotate(total=Sum(F("amount") + F("wht_amount")))
+        .values_list("job_id", "total")
+    )
+    return dict(rows)
+
+
+def plan(amount, balances, allocations=None):
+    """
+    {job_id: amount} to pay, checked against `balances` ({job_id: outstanding}).
+
+    With `allocations` None, `amount` is spread over the jobs in the order of
+    `balances`. Raises AllocationError if the amounts do not add up.
+    """
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise AllocationError("จำนวนเงินต้องมากกว่า 0")
+    if allocations is None:
+        allocations, remaining = {}, amount
+        for job_id, balance in balances.items():
+            if remaining <= 0:
+                break
+            if balance > 0:
+                allocations[job_id] = min(balance, remaining)
+                remaining -= allocations[job_id]
+        if remaining > 0:
+            raise AllocationError(f"ยอดชำระเกินยอดค้างชำระ ฿{remaining:,.2f}")
+        return allocations
+
+    allocations = {
+        job_id: Decimal(value) for job_id, value in allocations.items() if Decimal(value)
+    }
+    for job_id, value in allocations.items():
+        if job_id not in balances:
+            raise AllocationError(f"ไม่พบงาน #{job_id} ของลูกค้ารายนี้")
+        if value < 0 or value > balances[job_id]:
+            raise AllocationError(f"ยอดของงาน #{job_id} เกินยอดค้างชำระ ฿{balances[job_id]:,.2f}")
+    if sum(allocations.values(), Decimal("0")) != amount:
+        raise AllocationError("ยอดที่แบ่งให้แต่ละงานไม่เท่ากับจำนวนเงินที่รับ")
+    return allocations
+
+
+def _receipt_document(receipt, jobs, allocations, product_types):
+    from documents.models import Document, DocumentItem, DocumentType
+
+    customer = receipt.customer
+    document = Document.objects.create(
+        job=jobs[0],
+        document_type=DocumentType.RECEIPT,
+        customer_name=customer.name,
+        customer_address=customer.billing_address,
+        customer_tax_id=customer.tax_id,
+        subtotal=receipt.amount,
+        vat_rate=0,
+        vat_amount=0,
+        total_amount=receipt.amount,
+        issued_by=receipt.received_by,
+        notes=" ".join(filter(None, [f"รับชำระรวม {len(jobs)} งาน", receipt.reference_number])),
+    )
+    DocumentItem.objects.bulk_create(
+        [
+            DocumentItem(
+                document=document,
+                job=job,
+                description=f"#{job.pk} {product_types[job.product_type_id]} — {job.title}",
+                quantity=1,
+                unit="งาน",
+                unit_price=allocations[job.pk],
+                amount=allocations[job.pk],
+            )
+            for job in jobs
+        ]
+    )
+    return document
+
+
+def allocate_payment(
+    customer,
+    amount,
+    received_by,
+    allocations=None,
+    method=PaymentMethod.BANK_TRANSFER,
+    bank_account=None,
+    reference_number="",
+    notes="",
+):
+    """
+    Record one payment from `customer` across several jobs; returns the PaymentReceipt.
+
+    `allocations` maps job id to amount; None pays the open jobs oldest first.
+    Raises AllocationError (nothing is saved) when the amounts do not fit.
+    """
+    from dashboard import fragments
+    from documents import rollups
+    from jobs.models import Job
+    from production.models import ProductType
+
+    with transaction.atomic():
+        jobs = _locked_jobs(customer, None if allocations is None else list(allocations))
+        paid = _paid([job.pk for job in jobs])
+        balances = {
+            job.pk: job.quoted_price - job.discount_amount - paid.get(job.pk, Decimal("0"))
+            for job in jobs
+        }
+        shares = plan(amount, balances, allocations)
+        jobs = [job for job in jobs if job.pk in shares]
+
+        receipt = PaymentReceipt.objects.create(
+            customer=customer,
+            amount=amount,
+            method=method,
+            bank_account=bank_account,
+            reference_number=reference_number,
+            received_by=received_by,
+            notes=notes,
+        )
+        payments = Payment.objects.bulk_create(
+            [
+                Payment(
+                    job=job,
+                    receipt=receipt,
+                    amount=shares[job.pk],
+                    method=method,
+                    bank_account=bank_account,
+                    reference_number=reference_number,
+                    received_by=received_by,
+                    notes=notes,
+                )
+                for job in jobs
+            ]
+        )
+
+        now = timezone.now()
+        changed = []
+        for job in jobs:
+            status = payment_status_for(job, paid.get(job.pk, Decimal("0")) + shares[job.pk])
+            if job.payment_status != status:
+                job.payment_status, job.updated_at = status, now
+                changed.append(job)
+        Job.objects.bulk_update(changed, ["payment_status", "updated_at"])
+
+        product_type_ids = {job.product_type_id for job in jobs}
+        product_types = dict(
+            ProductType.objects.filter(pk__in=product_type_ids).values_list("pk", "name")
+        )
+        receipt.document = _receipt_document(receipt, jobs, shares, product_types)
+        receipt.save(update_fields=["document"])
+
+        # bulk_create sends no post_save, so the rollup and dashboard are updated here
+        rollups.apply_payments(payments)
+        fragments.invalidate(*fragments.JOB_FRAGMENTS)
+    return receipt
@@ -0,0 +1,102 @@
+"""
+Management command: benchmark_promptpay_qr
+
+Times the PromptPay QR endpoint before and after the QR service: the
+original PNG-through-Pillow, base64 <img> response against the SVG endpoint
+with a cold cache (every amount new) and warm (amounts repeat, as they do
+while the counter types). Reports latency and response size, raw and
+gzipped.
+
+Usage:
+    python manage.py benchmark_promptpay_qr
+    python manage.py benchmark_promptpay_qr --requests 2000 --promptpay-id 0812345678
+"""
+
+import base64
+import gzip
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+
+
+def png_qr_view(request):
+    """The pre-service endpoint body: PNG via Pillow, base64 in an <img> tag."""
+    import qrcode
+    from promptpay import qrcode as ppqr
+
+    payload = ppqr.generate_payload(
+        request.GET["promptpay_id"], amount=float(request.GET["amount"])
+    )
+    buf = io.BytesIO()
+    qrcode.make(payload).save(buf, format="PNG")
+    b64 = base64.b64encode(buf.getvalue()).decode()
+    return HttpResponse(
+        f'<img src="data:image/png;base64,{b64}" alt="PromptPay QR" class="w-48 h-48 mx-auto">'
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark the PNG PromptPay QR endpoint vs the memoized SVG QR service"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--amounts", type=int, default=50, help="distinct amounts in the warm run"
+        )
+        parser.add_argument("--promptpay-id", default="0812345678")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        from django.core.cache import cache
+        from django.test import RequestFactory
+
+        from accounts.models import Role, User
+        from payments import qr
+        from payments.views import generate_promptpay_qr
+
+        factory = RequestFactory()
+        user = User(username="benchmark", role=Role.OWNER)  # never saved
+        rng = random.Random(options["seed"])
+        n = options["requests"]
+        unique = [f"{rng.randint(100, 500_000) / 100:.2f}" for _ in range(n)]
+        repeated = [rng.choice(unique[: options["amounts"]]) for _ in range(n)]
+
+        def request(amount):
+            req = factory.get("/", {"promptpay_id": options["promptpay_id"], "amount": amount})
+            req.user = user
+            return req
+
+        def forget(amounts):
+            """Drop these amounts' QRs from the LRU and the shared cache."""
+            from promptpay import qrcode as ppqr
+
+            qr.clear()
+            payloads = [
+                ppqr.generate_payload(options["promptpay_id"], amount=float(amount))
+                for amount in amounts
+            ]
+            cache.delete_many([qr.cache_key(payload) for payload in payloads])
+
+        runs = [
+            ("PNG <img> (before)", png_qr_view, unique, None),
+            ("SVG, cold cache", generate_promptpay_qr, unique, forget),
+            ("SVG, repeated amounts", generate_promptpay_qr, repeated, forget),
+        ]
+        for label, view, amounts, reset in runs:
+            if reset:
+                reset(set(amounts))
+            requests = [request(amount) for amount in amounts]
+            start = time.perf_counter()
+            for req in requests:
+                response = view(req)
+            per_call = (time.perf_counter() - start) / n * 1000
+            body = response.content
+            self.stdout.write(
+                f"  {label:<22} {per_call:8.3f} ms/request  "
+                f"{len(body):6,} B  ({len(gzip.compress(body)):5,} B gzipped)"
+            )
+        forget(set(unique))
+
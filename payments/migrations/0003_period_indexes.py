@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_period_indexes'),
+        ('payments', '0002_payment_wht'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['received_at'], name='payments_pa_receive_b583fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['job', 'received_at'], name='payments_pa_job_id_4ae419_idx'),
+        ),
+    ]
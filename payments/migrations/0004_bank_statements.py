@@ -0,0 +1,141 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0007_period_indexes"),
+        ("payments", "0003_period_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BankStatementImport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255, verbose_name="ไฟล์")),
+                ("uploaded_at", models.DateTimeField(auto_now_add=True, verbose_name="วันที่นำเข้า")),
+                ("line_count", models.PositiveIntegerField(default=0, verbose_name="จำนวนรายการ")),
+                ("matched_count", models.PositiveIntegerField(default=0, verbose_name="จับคู่อัตโนมัติ")),
+                (
+                    "skipped_count",
+                    models.PositiveIntegerField(default=0, verbose_name="ข้าม (นำเข้าแล้ว)"),
+                ),
+            ],
+            options={
+                "verbose_name": "การนำเข้า statement",
+                "verbose_name_plural": "การนำเข้า statement",
+                "ordering": ["-uploaded_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="BankStatementLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("posted_at", models.DateTimeField(verbose_name="วันที่รายการ")),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, max_digits=12, verbose_name="จำนวนเงิน"),
+                ),
+                (
+                    "reference",
+                    models.CharField(blank=True, max_length=100, verbose_name="เลขอ้างอิง"),
+                ),
+                (
+                    "description",
+                    models.CharField(blank=True, max_length=255, verbose_name="รายละเอียด"),
+                ),
+                ("fingerprint", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("matched", "จับคู่แล้ว"),
+                            ("unmatched", "รอตรวจสอบ"),
+                            ("duplicate", "บันทึกไว้แล้ว"),
+                            ("ignored", "ไม่เกี่ยวข้อง"),
+                        ],
+                        default="unmatched",
+                        max_length=10,
+                        verbose_name="สถานะ",
+                    ),
+                ),
+                (
+                    "match_reason",
+                    models.CharField(blank=True, max_length=100, verbose_name="เหตุผลที่จับคู่"),
+                ),
+            ],
+            options={
+                "verbose_name": "รายการใน statement",
+                "verbose_name_plural": "รายการใน statement",
+                "ordering": ["posted_at", "pk"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["reference_number"], name="payments_pa_referen_c54e4c_idx"),
+        ),
+        migrations.AddField(
+            model_name="bankstatementimport",
+            name="bank_account",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="statement_imports",
+                to="payments.bankaccount",
+                verbose_name="บัญชีธนาคาร",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bankstatementimport",
+            name="uploaded_by",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="นำเข้าโดย",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bankstatementline",
+            name="payment",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="statement_line",
+                to="payments.payment",
+                verbose_name="การชำระเงิน",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bankstatementline",
+            name="statement_import",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="lines",
+                to="payments.bankstatementimport",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bankstatementline",
+            index=models.Index(
+                fields=["status", "posted_at"], name="payments_ba_status_21f487_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("documents", "0007_statement_batches"),
+        ("payments", "0004_bank_statements"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentReceipt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, max_digits=12, verbose_name="จำนวนเงิน"),
+                ),
+                (
+                    "method",
+                    models.CharField(
+                        choices=[
+                            ("cash", "เงินสด"),
+                            ("promptpay", "PromptPay"),
+                            ("bank_transfer", "โอนผ่านธนาคาร"),
+                            ("credit_card", "บัตรเครดิต"),
+                            ("cheque", "เช็ค"),
+                        ],
+                        max_length=15,
+                        verbose_name="วิธีชำระ",
+                    ),
+                ),
+                (
+                    "reference_number",
+                    models.CharField(blank=True, max_length=50, verbose_name="เลขอ้างอิง"),
+                ),
+                ("received_at", models.DateTimeField(auto_now_add=True, verbose_name="วันที่รับ")),
+                ("notes", models.CharField(blank=True, max_length=255, verbose_name="หมายเหตุ")),
+                (
+                    "bank_account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="payments.bankaccount",
+                        verbose_name="บัญชีที่รับโอน",
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="payment_receipts",
+                        to="customers.customer",
+                        verbose_name="ลูกค้า",
+                    ),
+                ),
+                (
+                    "document",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="payment_receipt",
+                        to="documents.document",
+                        verbose_name="ใบเสร็จ",
+                    ),
+                ),
+                (
+                    "received_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="รับเงินโดย",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ใบรับเงินรวม",
+                "verbose_name_plural": "ใบรับเงินรวม",
+                "ordering": ["-received_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="receipt",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="allocations",
+                to="payments.paymentreceipt",
+                verbose_name="ใบรับเงินรวม",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("payments", "0005_payment_receipts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="payment",
+            name="received_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name="วันที่รับ"),
+        ),
+    ]
@@ -3,10 +3,17 @@ Payment models.
 
 A job can have multiple payments (e.g., deposit + balance).
 BankAccount is reference data managed via Admin.
+BankStatementImport / BankStatementLine hold imported bank statements
+(payments/reconcile.py); unmatched lines wait in the review queue.
+PaymentReceipt is one incoming payment split across several jobs
+(payments/allocation.py); its allocations are ordinary Payment rows.
 """
 
+from decimal import Decimal
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class PaymentMethod(models.TextChoices):
@@ -75,6 +82,15 @@ class Payment(models.Model):
         help_text="Slip number for bank transfer / PromptPay",
     )
     is_deposit = models.BooleanField(default=False, verbose_name="เป็นมัดจำ")
+    # Set when this payment is one job's share of a multi-job payment
+    receipt = models.ForeignKey(
+        "PaymentReceipt",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="allocations",
+        verbose_name="ใบรับเงินรวม",
+    )
 
     # WHT (Withholding Tax) — corporate customers deduct WHT from payment
     wht_rate = models.DecimalField(
@@ -92,13 +108,19 @@ class Payment(models.Model):
         on_delete=models.PROTECT,
         verbose_name="รับเงินโดย",
     )
-    received_at = models.DateTimeField(auto_now_add=True, verbose_name="วันที่รับ")
+    # Defaults to now; statement imports set the bank's posting time instead.
+    received_at = models.DateTimeField(default=timezone.now, verbose_name="วันที่รับ")
     notes = models.CharField(max_length=255, blank=True, verbose_name="หมายเหตุ")
 
     class Meta:
         verbose_name = "การชำระเงิน"
         verbose_name_plural = "การชำระเงิน"
         ordering = ["-received_at"]
+        indexes = [
+            models.Index(fields=["received_at"]),
+            models.Index(fields=["job", "received_at"]),
+            models.Index(fields=["reference_number"]),
+        ]
 
     def __str__(self):
         return f"฿{self.amount:,.2f} ({self.get_method_display()}) — Job #{self.job_id}"
@@ -108,17 +130,164 @@ class Payment(models.Model):
         self._update_job_payment_status()
 
     def _update_job_payment_status(self):
-        from jobs.models import PaymentStatus
-
         job = self.job
-        total_paid = job.total_paid
-        if total_paid <= 0:
-            new_status = PaymentStatus.UNPAID
-        elif total_paid >= (job.quoted_price - job.discount_amount):
-            new_status = PaymentStatus.PAID
-        else:
-            new_status = PaymentStatus.PARTIAL
-
+        new_status = payment_status_for(job, job.total_paid)
         if job.payment_status != new_status:
             job.payment_status = new_status
             job.save(update_fields=["payment_status", "updated_at"])
+
+
+def payment_status_for(job, total_paid):
+    """PaymentStatus of `job` once `total_paid` (amount + WHT) has been received."""
+    from jobs.models import PaymentStatus
+
+    if total_paid <= 0:
+        return PaymentStatus.UNPAID
+    if total_paid >= (job.quoted_price - job.discount_amount):
+        return PaymentStatus.PAID
+    return PaymentStatus.PARTIAL
+
+
+def update_payment_statuses(job_ids):
+    """
+    Recompute payment_status for `job_ids` with one aggregate query.
+
+    For payments inserted with bulk_create, which skips Payment.save().
+    Returns the number of jobs whose status changed.
+    """
+    from django.db.models import F, Sum
+    from django.db.models.functions import Coalesce
+    from django.utils import timezone
+
+    from jobs.models import Job
+
+    paid = Coalesce(Sum(F("payments__amount") + F("payments__wht_amount")), Decimal("0"))
+    changed = []
+    for job in Job.objects.filter(pk__in=job_ids).annotate(paid=paid):
+        new_status = payment_status_for(job, job.paid)
+        if job.payment_status != new_status:
+            job.payment_status = new_status
+            job.updated_at = timezone.now()
+            changed.append(job)
+    Job.objects.bulk_update(changed, ["payment_status", "updated_at"])
+    return len(changed)
+
+
+class PaymentReceipt(models.Model):
+    """One payment from a customer that covers several jobs."""
+
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.PROTECT,
+        related_name="payment_receipts",
+        verbose_name="ลูกค้า",
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="จำนวนเงิน")
+    method = models.CharField(max_length=15, choices=PaymentMethod.choices, verbose_name="วิธีชำระ")
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        verbose_name="บัญชีที่รับโอน",
+    )
+    reference_number = models.CharField(max_length=50, blank=True, verbose_name="เลขอ้างอิง")
+    document = models.OneToOneField(
+        "documents.Document",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payment_receipt",
+        verbose_name="ใบเสร็จ",
+    )
+    received_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="+",
+        verbose_name="รับเงินโดย",
+    )
+    received_at = models.DateTimeField(auto_now_add=True, verbose_name="วันที่รับ")
+    notes = models.CharField(max_length=255, blank=True, verbose_name="หมายเหตุ")
+
+    class Meta:
+        verbose_name = "ใบรับเงินรวม"
+        verbose_name_plural = "ใบรับเงินรวม"
+        ordering = ["-received_at"]
+
+    def __str__(self):
+        return f"฿{self.amount:,.2f} — {self.customer}"
+
+
+class BankStatementImport(models.Model):
+    """One uploaded bank statement file (CSV or OFX)."""
+
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="statement_imports",
+        verbose_name="บัญชีธนาคาร",
+    )
+    filename = models.CharField(max_length=255, verbose_name="ไฟล์")
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="+",
+        verbose_name="นำเข้าโดย",
+    )
+    uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="วันที่นำเข้า")
+    line_count = models.PositiveIntegerField(default=0, verbose_name="จำนวนรายการ")
+    matched_count = models.PositiveIntegerField(default=0, verbose_name="จับคู่อัตโนมัติ")
+    skipped_count = models.PositiveIntegerField(default=0, verbose_name="ข้าม (นำเข้าแล้ว)")
+
+    class Meta:
+        verbose_name = "การนำเข้า statement"
+        verbose_name_plural = "การนำเข้า statement"
+        ordering = ["-uploaded_at"]
+
+    def __str__(self):
+        return f"{self.filename} ({self.uploaded_at:%Y-%m-%d})"
+
+
+class BankStatementLine(models.Model):
+    """A credit line from a bank statement and what it was reconciled to."""
+
+    class Status(models.TextChoices):
+        MATCHED = "matched", "จับคู่แล้ว"
+        UNMATCHED = "unmatched", "รอตรวจสอบ"
+        DUPLICATE = "duplicate", "บันทึกไว้แล้ว"
+        IGNORED = "ignored", "ไม่เกี่ยวข้อง"
+
+    statement_import = models.ForeignKey(
+        BankStatementImport, on_delete=models.CASCADE, related_name="lines"
+    )
+    posted_at = models.DateTimeField(verbose_name="วันที่รายการ")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="จำนวนเงิน")
+    reference = models.CharField(max_length=100, blank=True, verbose_name="เลขอ้างอิง")
+    description = models.CharField(max_length=255, blank=True, verbose_name="รายละเอียด")
+    # Hash of the line's content, so overlapping statements are imported once
+    fingerprint = models.CharField(max_length=64, unique=True)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.UNMATCHED, verbose_name="สถานะ"
+    )
+    payment = models.OneToOneField(
+        Payment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="statement_line",
+        verbose_name="การชำระเงิน",
+    )
+    match_reason = models.CharField(max_length=100, blank=True, verbose_name="เหตุผลที่จับคู่")
+
+    class Meta:
+        verbose_name = "รายการใน statement"
+        verbose_name_plural = "รายการใน statement"
+        ordering = ["posted_at", "pk"]
+        indexes = [
+            models.Index(fields=["status", "posted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.posted_at:%Y-%m-%d} ฿{self.amount:,.2f} {self.reference}"
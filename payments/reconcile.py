@@ -0,0 +1,484 @@
+"""
+Bank statement import and automatic payment reconciliation.
+
+read_statement() parses a bank's CSV export or an OFX file into credit
+entries; import_statement() matches them to open jobs and records the
+result. Each line is tried, in order, against:
+
+  1. an existing Payment with the same reference number — already entered
+     by hand, so the line is marked as a duplicate;
+  2. a job ("#123", "JOB-123") or document number ("IV-2026-00012") in the
+     reference or description, when the amount fits that job's balance;
+  3. the customer's phone number or tax ID in the description, when exactly
+     one of their open jobs has that balance;
+  4. the amount alone, when exactly one open job has that balance.
+
+Lookups are dicts built from a fixed handful of queries (open jobs with
+their balances, referenced documents, customers by indexed phone/tax ID),
+so the query count does not grow with the number of lines. Matched lines
+become Payment rows in one bulk_create; job payment statuses, the revenue
+rollup and the dashboard are updated once per import. Unmatched lines wait
+in the review queue. Fingerprints make re-importing an overlapping
+statement a no-op for lines already seen; when two imports of overlapping
+statements race, the one that loses on the fingerprint constraint is rolled
+back and redone against the lines the other recorded.
+"""
+
+import csv
+import hashlib
+import io
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    BankStatementImport,
+    BankStatementLine,
+    Payment,
+    PaymentMethod,
+    update_payment_statuses,
+)
+
+HEADER_ALIASES = {
+    "date": "date",
+    "transaction date": "date",
+    "วันที่": "date",
+    "วันที่ทำรายการ": "date",
+    "time": "time",
+    "เวลา": "time",
+    "amount": "amount",
+    "credit": "amount",
+    "deposit": "amount",
+    "จำนวนเงิน": "amount",
+    "ฝาก": "amount",
+    "เงินเข้า": "amount",
+    "debit": "debit",
+    "withdrawal": "debit",
+    "ถอน": "debit",
+    "เงินออก": "debit",
+    "reference": "reference",
+    "ref": "reference",
+    "เลขอ้างอิง": "reference",
+    "เลขที่อ้างอิง": "reference",
+    "description": "description",
+    "memo": "description",
+    "รายละเอียด": "description",
+    "รายการ": "description",
+    "หมายเหตุ": "description",
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M")
+HEADER_SCAN_ROWS = 20
+
+JOB_REF = re.compile(r"(?:#|\bJOB[-\s]?)(\d{1,9})\b", re.IGNORECASE)
+DOCUMENT_REF = re.compile(r"\b(?:QT|IV|RC|CN)-\d{4}-\d{5}\b", re.IGNORECASE)
+PHONE = re.compile(r"(?<!\d)0\d{8,9}(?!\d)")
+TAX_ID = re.compile(r"(?<!\d)\d{13}(?!\d)")
+DIGIT_SEPARATOR = re.compile(r"(?<=\d)[-\s](?=\d)")
+
+
+@dataclass
+class StatementEntry:
+    posted_at: datetime
+    amount: Decimal
+    reference: str = ""
+    description: str = ""
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _decode(data):
+    for encoding in ("utf-8-sig", "cp874"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("อ่านไฟล์ไม่ได้ — ต้องเข้ารหัส UTF-8 หรือ TIS-620")
+
+
+def _aware(value):
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _parse_date(value, time_value=""):
+    value = value.strip()
+    if " " in value and not time_value:
+        value, time_value = value.split(" ", 1)
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"วันที่ไม่ถูกต้อง: {value}")
+    if parsed.year > 2400:  # Buddhist era
+        parsed = parsed.replace(year=parsed.year - 543)
+    for fmt in TIME_FORMATS:
+        try:
+            clock = datetime.strptime(time_value.strip(), fmt).time()
+            parsed = datetime.combine(parsed.date(), clock)
+            break
+        except ValueError:
+            continue
+    return _aware(parsed)
+
+
+def _amount(value):
+    """Decimal from a cell, None when blank."""
+    value = str(value).replace(",", "").strip()
+    if not value:
+        return None
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"จำนวนเงินไม่ถูกต้อง: {value}") from None
+    if not amount.is_finite():
+        raise ValueError(f"จำนวนเงินไม่ถูกต้อง: {value}")
+    return amount
+
+
+def parse_csv(text):
+    """Credit entries from a bank CSV export; the header may follow a preamble."""
+    try:
+        rows = list(csv.reader(io.StringIO(text)))
+    except csv.Error as exc:
+        raise ValueError("อ่านไฟล์ CSV ไม่ได้") from exc
+    for index, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        columns = [HEADER_ALIASES.get(str(cell).strip().lower()) for cell in row]
+        if "date" in columns and "amount" in columns:
+            break
+    else:
+        raise ValueError("ไม่พบหัวคอลัมน์วันที่และจำนวนเงิน")
+
+    entries = []
+    for number, row in enumerate(rows[index + 1:], start=index + 2):
+        cells = {name: str(cell).strip() for name, cell in zip(columns, row) if name}
+        if not cells.get("date"):
+            continue
+        try:
+            amount = _amount(cells.get("amount", ""))
+            if amount is None or amount <= 0:
+                continue  # withdrawals and fees
+            entries.append(
+                StatementEntry(
+                    posted_at=_parse_date(cells["date"], cells.get("time", "")),
+                    amount=amount,
+                    reference=cells.get("reference", "")[:100],
+                    description=cells.get("description", "")[:255],
+                )
+            )
+        except ValueError as exc:
+            raise ValueError(f"บรรทัด {number}: {exc}") from None
+    return entries
+
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def _ofx_date(value):
+    # YYYYMMDD[HHMMSS[.XXX]][[-7:MST]]; the offset is ignored and local time assumed
+    digits = re.match(r"\d*", value.strip()).group()
+    try:
+        if len(digits) >= 14:
+            return _aware(datetime.strptime(digits[:14], "%Y%m%d%H%M%S"))
+        return _aware(datetime.strptime(digits[:8], "%Y%m%d"))
+    except ValueError:
+        raise ValueError(f"วันที่ไม่ถูกต้อง: {value}") from None
+
+
+def parse_ofx(text):
+    """Credit entries from an OFX/QFX file (SGML or XML flavour)."""
+    entries = []
+    for block in OFX_TRANSACTION.findall(text):
+        fields = {tag.upper(): value.strip() for tag, value in OFX_FIELD.findall(block)}
+        amount = _amount(fields.get("TRNAMT", ""))
+        if amount is None or amount <= 0:
+            continue
+        description = " ".join(filter(None, [fields.get("NAME", ""), fields.get("MEMO", "")]))
+        reference = fields.get("REFNUM") or fields.get("CHECKNUM") or fields.get("FITID", "")
+        entries.append(
+            StatementEntry(
+                posted_at=_ofx_date(fields.get("DTPOSTED", "")),
+                amount=amount,
+                reference=reference[:100],
+                description=description[:255],
+            )
+        )
+    return entries
+
+
+def read_statement(upload):
+    """StatementEntry list from an uploaded .csv or .ofx/.qfx file; raises ValueError."""
+    text = _decode(upload.read())
+    if upload.name.lower().endswith((".ofx", ".qfx")) or "<OFX>" in text[:4096].upper():
+        entries = parse_ofx(text)
+    else:
+        entries = parse_csv(text)
+    if not entries:
+        raise ValueError("ไม่พบรายการเงินเข้าในไฟล์")
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def _fingerprints(entries, bank_account_id):
+    """Content hash per entry; identical lines in one file are told apart by occurrence."""
+    seen = defaultdict(int)
+    result = []
+    for entry in entries:
+        key = (
+            f"{bank_account_id}|{entry.posted_at.isoformat()}|{entry.amount}"
+            f"|{entry.reference}|{entry.description}"
+        )
+        seen[key] += 1
+        result.append(hashlib.sha256(f"{key}|{seen[key]}".encode()).hexdigest())
+    return result
+
+
+class OpenJobs:
+    """Balances of every job still owed money, indexed by pk, customer and amount."""
+
+    def __init__(self):
+        from jobs.models import Job, JobStatus, PaymentStatus
+
+        paid = Coalesce(Sum(F("payments__amount") + F("payments__wht_amount")), Decimal("0"))
+        rows = (
+            Job.objects.exclude(status=JobStatus.CANCELLED)
+            .exclude(payment_status=PaymentStatus.PAID)
+            .annotate(paid=paid)
+            .values_list("pk", "customer_id", "quoted_price", "discount_amount", "paid")
+        )
+        self.balance = {}
+        self.customer = {}
+        self.by_amount = defaultdict(set)
+        for pk, customer_id, price, discount, total_paid in rows:
+            balance = price - discount - total_paid
+            if balance > 0:
+                self.balance[pk] = balance
+                self.customer[pk] = customer_id
+                self.by_amount[balance].add(pk)
+        self.by_customer = defaultdict(set)
+        for pk, customer_id in self.customer.items():
+            self.by_customer[customer_id].add(pk)
+
+    def pay(self, job_id, amount):
+        old = self.balance[job_id]
+        self.by_amount[old].discard(job_id)
+        self.balance[job_id] = old - amount
+        if self.balance[job_id] > 0:
+            self.by_amount[self.balance[job_id]].add(job_id)
+
+    def fits(self, job_id, amount):
+        return amount <= self.balance.get(job_id, Decimal("0"))
+
+    def exact(self, amount, candidates=None):
+        """The only job (of `candidates`, if given) whose balance equals `amount`, else None."""
+        jobs = self.by_amount.get(amount, set())
+        if candidates is not None:
+            jobs = jobs & candidates
+        return next(iter(jobs)) if len(jobs) == 1 else None
+
+
+def _normalized(entry):
+    return DIGIT_SEPARATOR.sub("", f"{entry.reference} {entry.description}")
+
+
+def _lookups(entries):
+    """Existing payment references, document → jobs and phone/tax ID → customer maps."""
+    from customers.models import Customer
+    from documents.models import Document, DocumentItem
+
+    references = {e.reference for e in entries if e.reference}
+    recorded = set(
+        Payment.objects.filter(reference_number__in=references).values_list(
+            "reference_number", flat=True
+        )
+    )
+
+    texts = [_normalized(e) for e in entries]
+    numbers = {n.upper() for text in texts for n in DOCUMENT_REF.findall(text)}
+    document_jobs = defaultdict(set)
+    for number, job_id in Document.objects.filter(
+        document_number__in=numbers, is_void=False
+    ).values_list("document_number", "job_id"):
+        document_jobs[number].add(job_id)
+    for number, job_id in DocumentItem.objects.filter(
+        document__document_number__in=numbers, document__is_void=False, job__isnull=False
+    ).values_list("document__document_number", "job_id"):
+        document_jobs[number].add(job_id)
+
+    phones = {p for text in texts for p in PHONE.findall(text)}
+    tax_ids = {t for text in texts for t in TAX_ID.findall(text)}
+    customers = {}
+    if phones or tax_ids:
+        for pk, phone, tax_id in Customer.objects.filter(
+            Q(phone__in=phones) | Q(tax_id__in=tax_ids)
+        ).values_list("pk", "phone", "tax_id"):
+            customers[phone] = pk
+            if tax_id:
+                customers[tax_id] = pk
+    return recorded, document_jobs, customers
+
+
+def match_entries(entries):
+    """[(status, job_id or None, reason)] per entry, in order."""
+    open_jobs = OpenJobs()
+    recorded, document_jobs, customers = _lookups(entries)
+    results = []
+    for entry in entries:
+        text = _normalized(entry)
+        if entry.reference and entry.reference in recorded:
+            results.append((BankStatementLine.Status.DUPLICATE, None, "มีการบันทึกเลขอ้างอิงนี้แล้ว"))
+            continue
+
+        job_id = reason = None
+        referenced = [int(n) for n in JOB_REF.findall(text)]
+        for number in DOCUMENT_REF.findall(text):
+            referenced.extend(sorted(document_jobs.get(number.upper(), ())))
+        fitting = [pk for pk in dict.fromkeys(referenced) if open_jobs.fits(pk, entry.amount)]
+        if fitting:
+            job_id, reason = fitting[0], "อ้างอิงงาน/เอกสาร"
+
+        if job_id is None:
+            keys = PHONE.findall(text) + TAX_ID.findall(text)
+            matched_customers = {customers[key] for key in keys if key in customers}
+            if len(matched_customers) == 1:
+                customer_id = matched_customers.pop()
+                job_id = open_jobs.exact(entry.amount, open_jobs.by_customer[customer_id])
+                reason = "ลูกค้าและยอดตรงกัน"
+
+        if job_id is None:
+            job_id, reason = open_jobs.exact(entry.amount), "ยอดตรงกับงานเดียว"
+
+        if job_id is None:
+            results.append((BankStatementLine.Status.UNMATCHED, None, ""))
+            continue
+        open_jobs.pay(job_id, entry.amount)
+        if entry.reference:
+            recorded.add(entry.reference)
+        results.append((BankStatementLine.Status.MATCHED, job_id, reason))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def _method(entry):
+    text = entry.description.lower()
+    if "promptpay" in text or "พร้อมเพย์" in text:
+        return PaymentMethod.PROMPTPAY
+    return PaymentMethod.BANK_TRANSFER
+
+
+def _apply_payment_side_effects(payments):
+    """What Payment.save() and its post_save receivers do, once for a bulk insert."""
+    from dashboard import fragments
+    from documents import rollups
+
+    if not payments:
+        return
+    update_payment_statuses({p.job_id for p in payments})
+    rollups.apply_payments(payments)
+    fragments.invalidate(*fragments.JOB_FRAGMENTS)
+
+
+def import_statement(entries, user, bank_account=None, filename=""):
+    """Record a statement's entries, paying every line that matches; returns the import."""
+    try:
+        return _import_statement(entries, user, bank_account, filename)
+    except IntegrityError:
+        # a concurrent import recorded some of these lines first
+        return _import_statement(entries, user, bank_account, filename)
+
+
+def _import_statement(entries, user, bank_account, filename):
+    bank_account_id = bank_account.pk if bank_account else None
+    fingerprints = _fingerprints(entries, bank_account_id)
+    seen = set(
+        BankStatementLine.objects.filter(fingerprint__in=fingerprints).values_list(
+            "fingerprint", flat=True
+        )
+    )
+    fresh = [(e, f) for e, f in zip(entries, fingerprints) if f not in seen]
+    matches = match_entries([e for e, _ in fresh])
+
+    with transaction.atomic():
+        statement_import = BankStatementImport.objects.create(
+            bank_account=bank_account,
+            filename=filename[:255],
+            uploaded_by=user,
+            line_count=len(fresh),
+            skipped_count=len(entries) - len(fresh),
+        )
+        payments = {
+            index: Payment(
+                job_id=job_id,
+                amount=entry.amount,
+                method=_method(entry),
+                bank_account=bank_account,
+                reference_number=entry.reference[:50],
+                received_by=user,
+                received_at=entry.posted_at,
+                notes=f"นำเข้าจาก statement {entry.posted_at:%d/%m/%Y}"[:255],
+            )
+            for index, ((entry, _), (status, job_id, _)) in enumerate(zip(fresh, matches))
+            if status == BankStatementLine.Status.MATCHED
+        }
+        Payment.objects.bulk_create(payments.values(), batch_size=500)
+        BankStatementLine.objects.bulk_create(
+            [
+                BankStatementLine(
+                    statement_import=statement_import,
+                    posted_at=entry.posted_at,
+                    amount=entry.amount,
+                    reference=entry.reference,
+                    description=entry.description,
+                    fingerprint=fingerprint,
+                    status=status,
+                    payment=payments.get(index),
+                    match_reason=reason,
+                )
+                for index, ((entry, fingerprint), (status, _, reason)) in enumerate(
+                    zip(fresh, matches)
+                )
+            ],
+            batch_size=500,
+        )
+        BankStatementImport.objects.filter(pk=statement_import.pk).update(matched_count=len(payments))
+        _apply_payment_side_effects(list(payments.values()))
+    statement_import.matched_count = len(payments)
+    return statement_import
+
+
+def resolve_line(line, job, user):
+    """Pay `job` from an unmatched line picked in the review queue."""
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            job=job,
+            amount=line.amount,
+            method=_method(line),
+            bank_account=line.statement_import.bank_account,
+            reference_number=line.reference[:50],
+            received_by=user,
+            received_at=line.posted_at,
+            notes=f"นำเข้าจาก statement {timezone.localtime(line.posted_at):%d/%m/%Y}",
+        )
+        line.payment = payment
+        line.status = BankStatementLine.Status.MATCHED
+        line.match_reason = f"ตรวจสอบโดย {user.get_full_name() or user.username}"[:100]
+        line.save(update_fields=["payment", "status", "match_reason"])
+    return payment
@@ -0,0 +1,135 @@
+"""
+Tests for multi-job payment allocation (payments/allocation.py).
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from documents.models import DailyRevenue, Document, DocumentType
+from jobs.models import Job, JobStatus, PaymentStatus
+from payments.allocation import AllocationError, allocate_payment, plan
+from payments.models import Payment, PaymentMethod, PaymentReceipt
+
+
+def _jobs(customer, product_type, user, prices):
+    return [
+        Job.objects.create(
+            customer=customer,
+            product_type=product_type,
+            title=f"งาน {i}",
+            quoted_price=price,
+            created_by=user,
+        )
+        for i, price in enumerate(prices)
+    ]
+
+
+class TestPlan:
+    def test_oldest_first(self):
+        balances = {1: Decimal("100"), 2: Decimal("200"), 3: Decimal("300")}
+        assert plan("250", balances) == {1: Decimal("100"), 2: Decimal("150")}
+
+    def test_overpayment(self):
+        with pytest.raises(AllocationError):
+            plan("700", {1: Decimal("100")})
+
+    def test_explicit_amounts_must_add_up_and_fit(self):
+        balances = {1: Decimal("100"), 2: Decimal("200")}
+        assert plan("150", balances, {1: "50", 2: "100"}) == {1: Decimal("50"), 2: Decimal("100")}
+        with pytest.raises(AllocationError):
+            plan("150", balances, {1: "50", 2: "90"})
+        with pytest.raises(AllocationError):
+            plan("150", balances, {1: "150"})
+        with pytest.raises(AllocationError):
+            plan("150", balances, {3: "150"})
+
+
+@pytest.mark.django_db
+class TestAllocatePayment:
+    def test_pays_jobs_and_issues_one_receipt(self, customer, product_type, counter_user):
+        first, second, third = _jobs(customer, product_type, counter_user, [100, 200, 300])
+        Payment.objects.create(
+            job=first, amount=40, method=PaymentMethod.CASH, received_by=counter_user
+        )
+
+        receipt = allocate_payment(customer, Decimal("300"), counter_user, reference_number="TRF-9")
+
+        assert [(p.job_id, p.amount) for p in receipt.allocations.order_by("job_id")] == [
+            (first.pk, Decimal("60.00")),
+            (second.pk, Decimal("200.00")),
+            (third.pk, Decimal("40.00")),
+        ]
+        statuses = dict(Job.objects.values_list("pk", "payment_status"))
+        assert statuses == {first.pk: "paid", second.pk: "paid", third.pk: "partial"}
+        document = receipt.document
+        assert document.document_type == DocumentType.RECEIPT
+        assert document.total_amount == Decimal("300.00")
+        items = sorted(document.items.values_list("job_id", flat=True))
+        assert items == [first.pk, second.pk, third.pk]
+        assert DailyRevenue.objects.aggregate(total=Sum("total"))["total"] == Decimal("340.00")
+
+    def test_constant_queries(self, customer, product_type, counter_user):
+        def queries(count):
+            jobs = _jobs(customer, product_type, counter_user, [10] * count)
+            with CaptureQueriesContext(connection) as ctx:
+                allocate_payment(customer, Decimal(10 * count), counter_user)
+            statuses = Job.objects.filter(pk__in=[j.pk for j in jobs]).values_list(
+                "payment_status", flat=True
+            )
+            assert set(statuses) == {PaymentStatus.PAID}
+            return len(ctx)
+
+        # SQLite splits bulk inserts of 100 payments and items at its variable limit
+        assert queries(100) <= queries(5) + 4
+
+    def test_failure_saves_nothing(self, customer, product_type, counter_user):
+        _jobs(customer, product_type, counter_user, [100])
+
+        with pytest.raises(AllocationError):
+            allocate_payment(customer, Decimal("150"), counter_user)
+
+        assert not Payment.objects.exists()
+        assert not PaymentReceipt.objects.exists()
+        assert not Document.objects.exists()
+
+    def test_cancelled_and_paid_jobs_are_skipped(self, customer, product_type, counter_user):
+        cancelled, paid, open_job = _jobs(customer, product_type, counter_user, [100, 100, 100])
+        Job.objects.filter(pk=cancelled.pk).update(status=JobStatus.CANCELLED)
+        Payment.objects.create(
+            job=paid, amount=100, method=PaymentMethod.CASH, received_by=counter_user
+        )
+
+        receipt = allocate_payment(customer, Decimal("100"), counter_user)
+
+        assert list(receipt.allocations.values_list("job_id", flat=True)) == [open_job.pk]
+
+
+@pytest.mark.django_db
+class TestAllocateView:
+    def test_explicit_split(self, client, counter_user, customer, product_type):
+        first, second = _jobs(customer, product_type, counter_user, [100, 200])
+        client.force_login(counter_user)
+
+        response = client.post(
+            reverse("payments:allocate", args=[customer.pk]),
+            {"amount": "150", "method": "bank_transfer", f"job_{second.pk}": "150"},
+        )
+
+        receipt = PaymentReceipt.objects.get()
+        assert response.url == reverse("documents:detail", args=[receipt.document_id])
+        assert list(receipt.allocations.values_list("job_id", flat=True)) == [second.pk]
+
+    def test_error_is_shown(self, client, counter_user, customer, product_type):
+        _jobs(customer, product_type, counter_user, [100])
+        client.force_login(counter_user)
+
+        response = client.post(reverse("payments:allocate", args=[customer.pk]), {"amount": "500"})
+
+        assert response.status_code == 200
+        assert "ยอดชำระเกินยอดค้างชำระ" in response.content.decode()
+        assert not Payment.objects.exists()
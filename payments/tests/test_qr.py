@@ -0,0 +1,111 @@
+"""
+Tests for the memoized SVG QR service (payments/qr.py) and the PromptPay QR endpoint.
+"""
+
+import base64
+import re
+
+import pytest
+import qrcode
+from django.core.cache import cache
+from django.urls import reverse
+from promptpay import qrcode as ppqr
+
+from payments import qr
+
+
+@pytest.fixture(autouse=True)
+def fresh_lru():
+    qr.clear()
+    yield
+    qr.clear()
+
+
+def _cells(svg):
+    """Dark modules drawn by the SVG path, as a set of (x, y)."""
+    cells, x, y = set(), 0, 0
+    for op, a, b in re.findall(r"([Mmh])(\d+(?:\.5)?)(?: (\d+(?:\.5)?))?", svg):
+        if op == "M":
+            x, y = int(a), int(float(b))
+        elif op == "m":
+            x += int(a)
+        else:
+            cells.update((x + i, y) for i in range(int(a)))
+            x += int(a)
+    return cells
+
+
+class TestQrSvg:
+    def test_path_draws_exactly_the_dark_modules(self):
+        data = "https://example.com/track/abc123"
+        code = qrcode.QRCode(border=qr.QUIET_ZONE)
+        code.add_data(data)
+        code.make(fit=True)
+        expected = {
+            (x, y) for y, row in enumerate(code.get_matrix()) for x, dark in enumerate(row) if dark
+        }
+
+        svg = qr.qr_svg(data)
+
+        assert svg.startswith("<svg") and f'viewBox="0 0 {len(code.get_matrix())}' in svg
+        assert _cells(svg) == expected
+
+    def test_memoized_in_process_and_in_shared_cache(self, monkeypatch):
+        calls = []
+        build = qr._build_svg
+        monkeypatch.setattr(qr, "_build_svg", lambda data: calls.append(data) or build(data))
+
+        first = qr.qr_svg("hello")
+        assert qr.qr_svg("hello") == first
+        assert cache.get(qr.cache_key("hello")) == first
+        qr.clear()  # a fresh worker: LRU empty, shared cache warm
+        assert qr.qr_svg("hello") == first
+        assert calls == ["hello"]
+
+    def test_data_uri(self):
+        uri = qr.qr_data_uri("hello")
+        assert uri.startswith("data:image/svg+xml;base64,")
+        assert base64.b64decode(uri.split(",", 1)[1]).decode() == qr.qr_svg("hello")
+
+
+class TestPromptPaySvg:
+    def test_amount_is_normalized_to_satang(self, monkeypatch):
+        calls = []
+        generate = ppqr.generate_payload
+        monkeypatch.setattr(
+            ppqr, "generate_payload", lambda *a, **kw: calls.append((a, kw)) or generate(*a, **kw)
+        )
+
+        svg = qr.promptpay_svg("0812345678", "100")
+        assert qr.promptpay_svg(" 0812345678", 100.0) == svg
+        assert qr.promptpay_svg("0812345678", "100.001") == svg
+        assert calls == [(("0812345678",), {"amount": 100.0})]
+        assert svg == qr.qr_svg(generate("0812345678", amount=100.0))
+
+    @pytest.mark.parametrize("amount", ["abc", "NaN", "sNaN", "Infinity", "-inf"])
+    def test_invalid_amount(self, amount):
+        with pytest.raises(ValueError):
+            qr.normalize_amount(amount)
+
+
+@pytest.mark.django_db
+class TestPromptPayEndpoint:
+    def test_returns_inline_svg(self, client, counter_user):
+        client.force_login(counter_user)
+        response = client.get(
+            reverse("payments:promptpay_qr"), {"promptpay_id": "0812345678", "amount": "250"}
+        )
+
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert "<svg" in body and "base64" not in body
+        assert qr.promptpay_svg("0812345678", "250") in body
+        assert "max-age=3600" in response["Cache-Control"]
+
+    def test_missing_or_bad_input(self, client, counter_user):
+        client.force_login(counter_user)
+        url = reverse("payments:promptpay_qr")
+        assert client.get(url, {"promptpay_id": "0812345678", "amount": "abc"}).status_code == 400
+        assert client.get(url, {"promptpay_id": "0812345678", "amount": "NaN"}).status_code == 400
+        assert client.get(url, {"promptpay_id": "0812345678", "amount": "0"}).content == b""
+        assert client.get(url, {"amount": "100"}).content == b""
@@ -0,0 +1,216 @@
+"""
+Tests for bank statement import and reconciliation (payments/reconcile.py).
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Sum
+from django.urls import reverse
+
+from customers.models import Customer
+from documents.models import DailyRevenue
+from jobs.models import Job, PaymentStatus
+from payments import reconcile
+from payments.models import BankAccount, BankStatementLine, Payment, PaymentMethod
+from payments.reconcile import import_statement, parse_csv, parse_ofx, read_statement
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20261005093000<TRNAMT>1500.00<FITID>A1<NAME>TRANSFER<MEMO>JOB-{job}
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20261005<TRNAMT>-20.00<FITID>A2<NAME>FEE
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.fixture
+def account(db):
+    return BankAccount.objects.create(
+        bank_name="กสิกรไทย", account_name="ร้าน", account_number="1234567890"
+    )
+
+
+def _job(customer, product_type, user, price, **kwargs):
+    return Job.objects.create(
+        customer=customer, product_type=product_type, title=f"งาน {price}", quoted_price=price,
+        created_by=user, **kwargs,
+    )
+
+
+class TestParsing:
+    def test_csv_with_preamble_thai_header_and_buddhist_dates(self):
+        text = (
+            "บัญชี 123-4-56789-0\n\n"
+            "วันที่,เวลา,รายการ,ถอน,ฝาก,เลขอ้างอิง\n"
+            "05/10/2569,09:30,โอนเงิน #12,,\"1,500.00\",REF1\n"
+            "05/10/2569,10:00,ค่าธรรมเนียม,20.00,,\n"
+        )
+
+        [entry] = parse_csv(text)
+
+        assert entry.amount == Decimal("1500.00")
+        assert (entry.posted_at.year, entry.posted_at.hour) == (2026, 9)
+        assert (entry.reference, entry.description) == ("REF1", "โอนเงิน #12")
+
+    def test_csv_without_header_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_csv("1,2,3\n")
+
+    def test_ofx_credits_only(self):
+        [entry] = parse_ofx(OFX.format(job=7))
+
+        assert (entry.amount, entry.reference) == (Decimal("1500.00"), "A1")
+        assert entry.description == "TRANSFER JOB-7"
+
+    def test_read_statement_detects_ofx(self):
+        upload = SimpleUploadedFile("statement.txt", OFX.format(job=7).encode())
+        assert len(read_statement(upload)) == 1
+
+
+@pytest.mark.django_db
+class TestImport:
+    def test_matching_rules(self, customer, customer_type, product_type, counter_user, account):
+        other = Customer.objects.create(
+            customer_type=customer_type, name="ร้าน ข", phone="0899999999"
+        )
+        by_ref = _job(customer, product_type, counter_user, 1500)
+        by_phone = _job(other, product_type, counter_user, 800)
+        _job(other, product_type, counter_user, 300)
+        by_amount = _job(customer, product_type, counter_user, 4321)
+        _job(customer, product_type, counter_user, 999)
+        _job(other, product_type, counter_user, 999)
+        Payment.objects.create(
+            job=by_amount,
+            amount=1,
+            method=PaymentMethod.CASH,
+            reference_number="SLIP-1",
+            received_by=counter_user,
+        )
+        entries = parse_csv(
+            "date,amount,reference,description\n"
+            f"2026-10-05,1000,,โอน JOB-{by_ref.pk}\n"
+            "2026-10-05,800,,PROMPTPAY 089-999-9999\n"
+            "2026-10-05,4320,,\n"
+            "2026-10-05,999,,\n"
+            "2026-10-05,50,SLIP-1,\n"
+        )
+
+        result = import_statement(entries, counter_user, account, "oct.csv")
+
+        statuses = list(BankStatementLine.objects.order_by("pk").values_list("status", flat=True))
+        assert statuses == ["matched", "matched", "matched", "unmatched", "duplicate"]
+        assert result.matched_count == 3
+        assert Payment.objects.get(job=by_phone).method == PaymentMethod.PROMPTPAY
+        by_ref.refresh_from_db()
+        by_phone.refresh_from_db()
+        by_amount.refresh_from_db()
+        assert by_ref.payment_status == PaymentStatus.PARTIAL
+        assert by_phone.payment_status == PaymentStatus.PAID
+        assert by_amount.payment_status == PaymentStatus.PAID
+        assert DailyRevenue.objects.aggregate(total=Sum("total"))["total"] == Decimal("6121.00")
+
+    def test_two_thousand_lines_without_per_line_queries(
+        self, customer, product_type, counter_user, account, django_assert_max_num_queries
+    ):
+        jobs = [_job(customer, product_type, counter_user, 100) for _ in range(20)]
+        rows = [f"2026-10-05,100,,JOB-{jobs[i % 20].pk}" for i in range(20)]
+        rows += [f"2026-10-06,{1000 + i},,unknown {i}" for i in range(2000)]
+        entries = parse_csv("date,amount,reference,description\n" + "\n".join(rows))
+
+        # lookups are a fixed handful; the rest are INSERT batches, which SQLite
+        # splits at its variable limit (about 110 statement lines per INSERT)
+        with django_assert_max_num_queries(40):
+            result = import_statement(entries, counter_user, account)
+
+        assert (result.line_count, result.matched_count) == (2020, 20)
+        assert Job.objects.filter(payment_status=PaymentStatus.PAID).count() == 20
+
+    def test_reimport_skips_seen_lines(self, customer, product_type, counter_user, account):
+        _job(customer, product_type, counter_user, 1234)
+        entries = parse_csv("date,amount\n2026-10-05,1234\n2026-10-05,1234\n")
+
+        import_statement(entries, counter_user, account)
+        again = import_statement(entries, counter_user, account)
+
+        assert (again.line_count, again.skipped_count) == (0, 2)
+        assert BankStatementLine.objects.count() == 2
+        assert Payment.objects.count() == 1
+
+    def test_payment_is_dated_when_the_bank_posted_it(
+        self, customer, product_type, counter_user, account
+    ):
+        job = _job(customer, product_type, counter_user, 1500)
+        entries = parse_csv(f"date,time,amount,description\n2026-09-28,14:05,1500,JOB-{job.pk}\n")
+
+        import_statement(entries, counter_user, account)
+
+        payment = Payment.objects.get(job=job)
+        assert payment.received_at == entries[0].posted_at
+        assert list(DailyRevenue.objects.values_list("date", "total")) == [
+            (date(2026, 9, 28), Decimal("1500.00"))
+        ]
+
+    def test_concurrent_overlapping_import(
+        self, customer, product_type, counter_user, account, monkeypatch
+    ):
+        job = _job(customer, product_type, counter_user, 1234)
+        entries = parse_csv(f"date,amount,description\n2026-10-05,1234,JOB-{job.pk}\n")
+        match_entries = reconcile.match_entries
+
+        def other_import_first(batch):
+            # the other upload records the same lines after this one's fingerprint check
+            monkeypatch.setattr(reconcile, "match_entries", match_entries)
+            import_statement(entries, counter_user, account)
+            return match_entries(batch)
+
+        monkeypatch.setattr(reconcile, "match_entries", other_import_first)
+        result = import_statement(entries, counter_user, account)
+
+        assert (result.line_count, result.skipped_count) == (0, 1)
+        assert BankStatementLine.objects.count() == 1
+        assert Payment.objects.filter(job=job).count() == 1
+
+
+@pytest.mark.django_db
+class TestReconcileViews:
+    def test_upload_then_resolve_from_queue(
+        self, client, owner_user, customer, product_type, account
+    ):
+        job = _job(customer, product_type, owner_user, 500)
+        _job(customer, product_type, owner_user, 500)
+        client.force_login(owner_user)
+        sheet = SimpleUploadedFile("oct.csv", b"date,amount,description\n2026-10-05,500,unknown\n")
+
+        response = client.post(
+            reverse("payments:statement_import"), {"statement": sheet, "bank_account": account.pk}
+        )
+
+        assert response.status_code == 302
+        line = BankStatementLine.objects.get()
+        assert line.status == BankStatementLine.Status.UNMATCHED
+
+        client.post(
+            reverse("payments:reconcile"), {"line": line.pk, "job": job.pk, "action": "match"}
+        )
+
+        line.refresh_from_db()
+        job.refresh_from_db()
+        assert line.status == BankStatementLine.Status.MATCHED
+        assert line.payment.bank_account == account
+        assert job.payment_status == PaymentStatus.PAID
+
+    def test_counter_forbidden(self, client, counter_user):
+        client.force_login(counter_user)
+        assert client.get(reverse("payments:reconcile")).status_code == 403
+
+    def test_non_numeric_ids_are_rejected(self, client, owner_user):
+        client.force_login(owner_user)
+        url = reverse("payments:reconcile")
+
+        assert client.get(url, {"import": "abc"}).status_code == 200
+        assert client.post(url, {"line": "abc", "action": "ignore"}).status_code == 302
@@ -7,6 +7,9 @@ app_name = "payments"
 urlpatterns = [
     path("job/<int:job_id>/pay/", views.payment_screen, name="pay"),
     path("job/<int:job_id>/receipt/", views.payment_receipt, name="receipt"),
+    path("customer/<int:customer_id>/allocate/", views.allocate_payment_view, name="allocate"),
+    path("statements/import/", views.statement_import, name="statement_import"),
+    path("statements/reconcile/", views.reconcile_review, name="reconcile"),
     # HTMX: generate PromptPay QR code
     path("promptpay-qr/", views.generate_promptpay_qr, name="promptpay_qr"),
 ]
@@ -1,20 +1,21 @@
-"""Payment views — collection screen and PromptPay QR generation."""
-
-import base64
-import io
+"""Payment views — collection screen, PromptPay QR generation and bank statement reconciliation."""
 
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
+from accounts.idempotency import idempotent
 from accounts.mixins import role_required
 from accounts.models import Role
-from jobs.models import Job
+from jobs.models import Job, JobStatus, PaymentStatus
 
-from .models import BankAccount, Payment, PaymentMethod
+from .models import BankAccount, BankStatementImport, BankStatementLine, Payment, PaymentMethod
 
 
 @role_required(Role.COUNTER, Role.OWNER)
+@idempotent
 def payment_screen(request, job_id):
     """Main payment collection screen."""
     job = get_object_or_404(Job.objects.select_related("customer"), pk=job_id)
@@ -72,29 +73,184 @@ def payment_receipt(request, job_id):
 @role_required(Role.COUNTER, Role.OWNER)
 def generate_promptpay_qr(request):
     """
-    HTMX endpoint: generate PromptPay QR PNG and return as base64 img tag.
+    HTMX endpoint: PromptPay QR for the entered amount, as inline SVG.
     Called when payment method changes to PromptPay with an amount.
     """
+    from django.utils.cache import patch_cache_control
+
+    from .qr import normalize_amount, promptpay_svg
+
     try:
-        amount = float(request.GET.get("amount", 0))
-        promptpay_id = request.GET.get("promptpay_id", "")
-    except (ValueError, TypeError):
+        amount = normalize_amount(request.GET.get("amount", 0) or 0)
+    except ValueError:
         return HttpResponse("", status=400)
+    promptpay_id = request.GET.get("promptpay_id", "")
 
     if not promptpay_id or amount <= 0:
         return HttpResponse("")
 
     try:
-        import qrcode
-        from promptpay import qrcode as ppqr
-
-        payload = ppqr.generate_payload(promptpay_id, amount=amount)
-        img = qrcode.make(payload)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        b64 = base64.b64encode(buf.getvalue()).decode()
-        return HttpResponse(
-            f'<img src="data:image/png;base64,{b64}" alt="PromptPay QR" class="w-48 h-48 mx-auto">',
-        )
+        svg = promptpay_svg(promptpay_id, amount)
     except Exception:
         return HttpResponse('<p class="text-red-500">ไม่สามารถสร้าง QR Code ได้</p>')
+    response = HttpResponse(
+        f'<div class="w-48 h-48 mx-auto" role="img" aria-label="PromptPay QR">{svg}</div>'
+    )
+    # same id + amount always gives the same QR; let the browser reuse it
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+
+@role_required(Role.COUNTER, Role.OWNER)
+@idempotent
+def allocate_payment_view(request, customer_id):
+    """One payment covering several of a customer's jobs; issues one receipt."""
+    from decimal import Decimal, InvalidOperation
+
+    from django.db.models import F, Sum
+    from django.db.models.functions import Coalesce
+
+    from customers.models import Customer
+
+    from .allocation import AllocationError, allocate_payment
+
+    customer = get_object_or_404(Customer, pk=customer_id)
+    paid = Coalesce(Sum(F("payments__amount") + F("payments__wht_amount")), Decimal("0"))
+    open_jobs = []
+    for job in (
+        customer.jobs.exclude(status=JobStatus.CANCELLED)
+        .exclude(payment_status=PaymentStatus.PAID)
+        .select_related("product_type")
+        .annotate(paid=paid)
+        .order_by("created_at", "pk")
+    ):
+        job.balance = job.quoted_price - job.discount_amount - job.paid
+        if job.balance > 0:
+            open_jobs.append(job)
+    bank_accounts = BankAccount.objects.filter(is_active=True)
+
+    if request.method == "POST":
+        try:
+            amount = Decimal(request.POST.get("amount", "").replace(",", ""))
+            allocations = {
+                job.pk: Decimal(value.replace(",", ""))
+                for job in open_jobs
+                if (value := request.POST.get(f"job_{job.pk}", "").strip())
+            }
+            receipt = allocate_payment(
+                customer,
+                amount,
+                request.user,
+                allocations=allocations or None,
+                method=request.POST.get("method") or PaymentMethod.BANK_TRANSFER,
+                bank_account=bank_accounts.filter(
+                    pk=request.POST.get("bank_account") or None
+                ).first(),
+                reference_number=request.POST.get("reference_number", "")[:50],
+                notes=request.POST.get("notes", "")[:255],
+            )
+        except InvalidOperation:
+            messages.error(request, "จำนวนเงินไม่ถูกต้อง")
+        except AllocationError as exc:
+            messages.error(request, str(exc))
+        else:
+            count = receipt.allocations.count()
+            messages.success(request, f"รับชำระ ฿{receipt.amount:,.2f} สำหรับ {count} งานแล้ว")
+            return redirect("documents:detail", pk=receipt.document_id)
+
+    return render(
+        request,
+        "payments/allocate.html",
+        {
+            "customer": customer,
+            "open_jobs": open_jobs,
+            "total_due": sum((job.balance for job in open_jobs), Decimal("0")),
+            "bank_accounts": bank_accounts,
+            "payment_methods": PaymentMethod.choices,
+        },
+    )
+
+
+@role_required(Role.OWNER, Role.ACCOUNTANT)
+@idempotent
+def statement_import(request):
+    """Upload a bank statement (CSV/OFX); matched lines become payments."""
+    from .reconcile import import_statement, read_statement
+
+    bank_accounts = BankAccount.objects.filter(is_active=True)
+    if request.method == "POST" and request.FILES.get("statement"):
+        upload = request.FILES["statement"]
+        bank_account = bank_accounts.filter(pk=request.POST.get("bank_account") or None).first()
+        try:
+            entries = read_statement(upload)
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            result = import_statement(entries, request.user, bank_account, upload.name)
+            messages.success(
+                request,
+                f"นำเข้า {result.line_count} รายการ จับคู่อัตโนมัติ {result.matched_count} รายการ"
+                + (f" (ข้ามที่เคยนำเข้าแล้ว {result.skipped_count})" if result.skipped_count else ""),
+            )
+            return redirect(f"{reverse('payments:reconcile')}?import={result.pk}")
+
+    imports = BankStatementImport.objects.select_related("bank_account", "uploaded_by")[:20]
+    return render(
+        request,
+        "payments/statement_import.html",
+        {"bank_accounts": bank_accounts, "imports": imports},
+    )
+
+
+@role_required(Role.OWNER, Role.ACCOUNTANT)
+@idempotent
+def reconcile_review(request):
+    """Review queue — assign unmatched statement lines to a job or ignore them."""
+    from .reconcile import resolve_line
+
+    if request.method == "POST":
+        line_id = request.POST.get("line", "")
+        if not line_id.isdigit():
+            messages.error(request, "ไม่พบรายการที่ระบุ")
+            return redirect(request.get_full_path())
+        line = get_object_or_404(
+            BankStatementLine.objects.select_related("statement_import__bank_account"),
+            pk=line_id,
+            status=BankStatementLine.Status.UNMATCHED,
+        )
+        if request.POST.get("action") == "ignore":
+            line.status = BankStatementLine.Status.IGNORED
+            line.save(update_fields=["status"])
+        else:
+            job_id = request.POST.get("job", "")
+            job = Job.objects.filter(pk=job_id).first() if job_id.isdigit() else None
+            if job is None:
+                messages.error(request, "ไม่พบงานที่ระบุ")
+            else:
+                resolve_line(line, job, request.user)
+                messages.success(request, f"บันทึกการชำระ ฿{line.amount:,.2f} ให้งาน #{job.pk} แล้ว")
+        return redirect(request.get_full_path())
+
+    lines = BankStatementLine.objects.select_related("payment__job__customer").order_by(
+        "-posted_at"
+    )
+    import_id = request.GET.get("import", "")
+    if not import_id.isdigit():
+        import_id = ""
+    if import_id:
+        lines = lines.filter(statement_import_id=import_id)
+        status = request.GET.get("status", "")
+    else:
+        status = request.GET.get("status", BankStatementLine.Status.UNMATCHED)
+    if status:
+        lines = lines.filter(status=status)
+    return render(
+        request,
+        "payments/reconcile.html",
+        {
+            "lines": lines[:500],
+            "status": status,
+            "import_id": import_id,
+            "statuses": BankStatementLine.Status.choices,
+        },
+    )
@@ -1,7 +1,25 @@
 from django.contrib import admin
-from unfold.admin import ModelAdmin
+from unfold.admin import ModelAdmin, TabularInline
 
-from .models import Material, MaterialUsage, ProductType
+from .models import (
+    Material,
+    MaterialUsage,
+    PriceTier,
+    ProductType,
+    SizeBreak,
+    Station,
+    StockMovement,
+)
+
+
+class PriceTierInline(TabularInline):
+    model = PriceTier
+    extra = 0
+
+
+class SizeBreakInline(TabularInline):
+    model = SizeBreak
+    extra = 0
 
 
 @admin.register(ProductType)
@@ -10,21 +28,74 @@ class ProductTypeAdmin(ModelAdmin):
     list_filter = ("pricing_method", "requires_design", "is_active")
     list_editable = ("sort_order", "is_active")
     search_fields = ("name", "name_en")
+    autocomplete_fields = ("material",)
+    inlines = [PriceTierInline, SizeBreakInline]
 
 
 @admin.register(Material)
 class MaterialAdmin(ModelAdmin):
-    list_display = ("name", "quantity_in_stock", "unit", "cost_per_unit", "min_quantity", "is_low_stock", "is_active")
-    list_filter = ("is_active",)
+    list_display = (
+        "name", "quantity_in_stock", "unit", "cost_per_unit", "min_quantity", "is_low_stock",
+        "projected_need", "stockout_date", "is_active",
+    )
+    list_filter = ("is_active", "is_low_stock")
     search_fields = ("name",)
 
-    @admin.display(boolean=True, description="สต็อกต่ำ")
-    def is_low_stock(self, obj):
-        return obj.is_low_stock
+    def get_readonly_fields(self, request, obj=None):
+        # after the opening balance, stock changes only through stock movements
+        forecast = ("is_low_stock", "projected_need", "stockout_date", "forecast_at")
+        return ("quantity_in_stock", *forecast) if obj else forecast
 
 
 @admin.register(MaterialUsage)
 class MaterialUsageAdmin(ModelAdmin):
-    list_display = ("material", "quantity_used", "recorded_at")
+    list_display = ("material", "quantity_used", "job", "recorded_at")
     list_filter = ("material",)
-    readonly_fields = ("recorded_at",)
+    readonly_fields = ("job", "material", "quantity_used", "recorded_at", "notes")
+
+    # usage is recorded from the production queue so stock moves with it
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(ModelAdmin):
+    list_display = ("created_at", "material", "kind", "quantity", "unit_cost", "note", "created_by")
+    list_filter = ("kind", "material")
+    search_fields = ("material__name", "note")
+    fields = ("material", "kind", "quantity", "unit_cost", "note")
+    autocomplete_fields = ("material",)
+    date_hierarchy = "created_at"
+
+    def save_model(self, request, obj, form, change):
+        from .stock import record_movements
+
+        obj.created_by = request.user
+        (saved,) = record_movements([obj])
+        obj.pk = saved.pk
+
+    def has_change_permission(self, request, obj=None):
+        return obj is None
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Station)
+class StationAdmin(ModelAdmin):
+    list_display = (
+        "name",
+        "stage",
+        "operator",
+        "sqm_per_hour",
+        "units_per_hour",
+        "setup_minutes",
+        "hours_per_day",
+        "is_active",
+    )
+    list_filter = ("stage", "is_active")
+    list_editable = ("is_active",)
+    search_fields = ("name",)
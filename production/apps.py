@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ProductionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "production"
+
+    def ready(self):
+        from .board import connect_board_hooks
+        from .pricing import connect_pricing_hooks
+        from .scheduler import connect_schedule_hooks
+
+        connect_pricing_hooks()
+        connect_schedule_hooks()
+        connect_board_hooks()
@@ -0,0 +1,178 @@
+"""
+Live production board for shop-floor displays.
+
+The board shows the production stages side by side — a count and the job
+cards for each, overdue jobs in red. Displays do not query the database for
+updates: when jobs change status (job_status_changed), or a job on the board
+is edited, publish() renders their cards once and stores the change in the
+shared cache as a numbered event:
+
+    production:board:version     latest event number
+    production:board:event:<n>   {"cards": [{"id", "status", "html"}], "counts": {...}}
+
+Each display keeps an SSE stream open (views.board_stream) that checks the
+version in the cache every POLL_SECONDS and sends the events it has not seen
+yet, numbered with the SSE id. A stream ends after STREAM_SECONDS so that it
+does not hold a web worker forever; the browser reconnects with
+Last-Event-ID and carries on from the event it last saw. A display that has
+been away longer than events are kept (EVENT_TTL, MAX_REPLAY) is told to
+reload the page instead.
+"""
+
+import json
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from jobs.models import JobStatus
+
+logger = logging.getLogger(__name__)
+
+BOARD_STATUSES = [JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING, JobStatus.READY]
+VERSION_KEY = "production:board:version"
+EVENT_TTL = 60 * 60
+MAX_REPLAY = 500
+POLL_SECONDS = 1
+STREAM_SECONDS = 30
+KEEPALIVE_SECONDS = 15
+GAP_GRACE_SECONDS = 5
+RETRY_MS = 2000
+
+
+def _event_key(version):
+    return f"production:board:event:{version}"
+
+
+def current_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def render_card(job, today):
+    return render_to_string(
+        "production/partials/job_card.html", {"job": job, "today": today, "kiosk": True}
+    )
+
+
+def board_jobs():
+    """Jobs on the board, each stage's in due-date order (undated last)."""
+    from django.db.models import F
+
+    from jobs.models import Job
+
+    return (
+        Job.objects.filter(status__in=BOARD_STATUSES)
+        .select_related("customer", "product_type")
+        .order_by(F("due_date").asc(nulls_last=True), "created_at")
+    )
+
+
+def counts():
+    from jobs.models import JobStatusCounter
+
+    snapshot = JobStatusCounter.snapshot()
+    return {status: snapshot.get(status, 0) for status in BOARD_STATUSES}
+
+
+def publish(job_ids):
+    """Render the current cards of `job_ids` (removing those off the board) as the next event."""
+    from jobs.models import Job
+
+    today = timezone.localdate()
+    job_ids = list(job_ids)
+    cards = {pk: {"id": pk, "status": "", "html": ""} for pk in job_ids}
+    for job in Job.objects.filter(pk__in=job_ids).select_related("customer", "product_type"):
+        if job.status in BOARD_STATUSES:
+            cards[job.pk] = {"id": job.pk, "status": job.status, "html": render_card(job, today)}
+    event = {"cards": list(cards.values()), "counts": counts()}
+
+    cache.add(VERSION_KEY, 0, None)
+    version = cache.incr(VERSION_KEY)
+    cache.set(_event_key(version), event, EVENT_TTL)
+    return version
+
+
+def _publish_quietly(job_ids):
+    try:
+        publish(job_ids)
+    except Exception as exc:  # cache down: displays catch up on their next reload
+        logger.warning("Could not publish board update for jobs %s: %s", job_ids, exc)
+
+
+def _sse(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {data}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def stream(cursor, seconds=None, poll=None):
+    """
+    SSE text for one connection: events after `cursor`, then new ones as they
+    are published, for `seconds` (STREAM_SECONDS). cursor=None starts from the
+    current version.
+    """
+    seconds = STREAM_SECONDS if seconds is None else seconds
+    poll = POLL_SECONDS if poll is None else poll
+    yield f"retry: {RETRY_MS}\n\n"
+    if cursor is None:
+        cursor = current_version()
+    deadline = time.monotonic() + seconds
+    last_sent = time.monotonic()
+    gap_since = None
+    while True:
+        version = current_version()
+        if version < cursor or version - cursor > MAX_REPLAY:
+            # cache flushed or display away too long
+            yield _sse("reset", "{}")
+            return
+        if version > cursor:
+            keys = [_event_key(v) for v in range(cursor + 1, version + 1)]
+            found = cache.get_many(keys)
+            for v, key in enumerate(keys, cursor + 1):
+                if key not in found:
+                    # publish() numbers an event just before storing it; give it a moment
+                    gap_since = gap_since or time.monotonic()
+                    if time.monotonic() - gap_since > GAP_GRACE_SECONDS:
+                        yield _sse("reset", "{}")
+                        return
+                    break
+                gap_since = None
+                cursor = v
+                last_sent = time.monotonic()
+                yield _sse("cards", json.dumps(found[key]), event_id=v)
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if now - last_sent >= KEEPALIVE_SECONDS:
+            last_sent = now
+            yield ": keepalive\n\n"
+        time.sleep(poll)
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers — connected in ProductionConfig.ready()
+# ---------------------------------------------------------------------------
+
+def _on_job_status_changed(sender, job_ids, to_status, **kwargs):
+    # sent after commit; jobs only leave the board from READY to COMPLETED
+    if to_status in BOARD_STATUSES or to_status == JobStatus.COMPLETED:
+        _publish_quietly(job_ids)
+
+
+def _on_job_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # edits of a job on the board; status moves arrive through job_status_changed
+    if not raw and update_fields is None and instance.status in BOARD_STATUSES:
+        transaction.on_commit(lambda: _publish_quietly([instance.pk]))
+
+
+def connect_board_hooks():
+    from django.db.models.signals import post_save
+
+    from jobs.models import Job
+    from jobs.signals import job_status_changed
+
+    job_status_changed.connect(_on_job_status_changed, dispatch_uid="board_job_status")
+    post_save.connect(_on_job_saved, sender=Job, dispatch_uid="board_job_saved")
@@ -0,0 +1,179 @@
+"""
+Material requirement forecast from the active job pipeline.
+
+Every job from PENDING through LAMINATING that has no material usage
+recorded yet will still consume its product type's material:
+
+    per_sqm   width_cm × height_cm / 10,000 × quantity × material_per_unit
+    per_unit  quantity × material_per_unit
+    flat      material_per_unit
+
+each plus the product type's waste_percent. The database computes that for
+the whole pipeline in one grouped query — per (material, product type, due
+date) — and forecast() walks each material's demand in due-date order
+against quantity_in_stock:
+
+  - the stock-out date is the due date of the first job the stock cannot
+    cover (jobs without a due date count as due today);
+  - when the pipeline is covered, what is left is run down at the average
+    daily usage over the last MATERIAL_FORECAST_LOOKBACK_DAYS days.
+
+run() stores the result on each Material (projected_need, stockout_date);
+notifications.tasks.send_material_alerts warns about materials expected to
+run out within MATERIAL_ALERT_DAYS.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    OuterRef,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import FORECAST_FIELDS, Material, MaterialUsage, StockMovement
+
+QTY = Decimal("0.001")
+ZERO = Decimal("0")
+
+
+@dataclass
+class MaterialForecast:
+    material: Material
+    need: Decimal = ZERO
+    by_product_type: dict = field(default_factory=dict)
+    daily_usage: Decimal = ZERO
+    stockout_date: object = None
+
+    @property
+    def remaining(self):
+        """Stock left once every pipeline job has been produced (negative: short)."""
+        return self.material.quantity_in_stock - self.need
+
+
+def pipeline_statuses():
+    from jobs.models import JobStatus
+
+    return [
+        JobStatus.PENDING,
+        JobStatus.DESIGNING,
+        JobStatus.AWAITING_APPROVAL,
+        JobStatus.REVISION,
+        JobStatus.APPROVED,
+        JobStatus.PRINTING,
+        JobStatus.CUTTING,
+        JobStatus.LAMINATING,
+    ]
+
+
+def _area_units():
+    """cm² per job: width × height × quantity, 10,000 per unit for per_unit and flat."""
+    decimal = DecimalField(max_digits=16, decimal_places=2)
+    return Case(
+        When(
+            product_type__pricing_method="per_sqm",
+            then=Coalesce(F("width_cm"), ZERO) * Coalesce(F("height_cm"), ZERO) * F("quantity"),
+        ),
+        When(product_type__pricing_method="per_unit", then=F("quantity") * Value(10_000)),
+        default=Value(10_000),
+        output_field=decimal,
+    )
+
+
+def pipeline_demand():
+    """[(material_id, product_type_id, due_date, need)] for the pipeline, from one grouped query."""
+    from jobs.models import Job
+
+    rows = (
+        Job.objects.filter(
+            status__in=pipeline_statuses(),
+            product_type__material__isnull=False,
+            product_type__material_per_unit__gt=0,
+        )
+        .exclude(Exists(MaterialUsage.objects.filter(job=OuterRef("pk"))))
+        .values_list(
+            "product_type__material_id",
+            "product_type_id",
+            "due_date",
+            "product_type__material_per_unit",
+            "product_type__waste_percent",
+        )
+        .annotate(area=Sum(_area_units()))
+        .order_by()
+    )
+    # the database only sums products; dividing there would be integer division on SQLite
+    return [
+        (m, pt, due, (Decimal(area or 0) / 10_000 * per_unit * (1 + waste / 100)).quantize(QTY))
+        for m, pt, due, per_unit, waste, area in rows
+    ]
+
+
+def daily_usage(days):
+    """{material_id: average quantity used per day over the last `days` days}."""
+    since = timezone.now() - timedelta(days=days)
+    rows = (
+        StockMovement.objects.filter(kind=StockMovement.Kind.USAGE, created_at__gte=since)
+        .values_list("material_id")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+    return {material_id: (-total / days).quantize(QTY) for material_id, total in rows}
+
+
+def forecast(today=None):
+    """{material_id: MaterialForecast} for every active material."""
+    today = today or timezone.localdate()
+    lookback = settings.MATERIAL_FORECAST_LOOKBACK_DAYS
+    forecasts = {m.pk: MaterialForecast(m) for m in Material.objects.filter(is_active=True)}
+    rates = daily_usage(lookback)
+
+    demand = {}
+    for material_id, product_type_id, due, need in pipeline_demand():
+        if material_id not in forecasts:
+            continue
+        f = forecasts[material_id]
+        f.need += need
+        f.by_product_type[product_type_id] = f.by_product_type.get(product_type_id, ZERO) + need
+        day = max(due or today, today)
+        demand.setdefault(material_id, {})
+        demand[material_id][day] = demand[material_id].get(day, ZERO) + need
+
+    for material_id, f in forecasts.items():
+        f.daily_usage = rates.get(material_id, ZERO)
+        stock = f.material.quantity_in_stock
+        if stock <= 0:
+            f.stockout_date = today
+            continue
+        for day, need in sorted(demand.get(material_id, {}).items()):
+            stock -= need
+            if stock < 0:
+                f.stockout_date = day
+                break
+        else:
+            if f.daily_usage > 0:
+                f.stockout_date = today + timedelta(days=int(stock / f.daily_usage))
+    return forecasts
+
+
+def run(today=None):
+    """Forecast and store projected_need / stockout_date on each material; returns the forecasts."""
+    forecasts = forecast(today)
+    now = timezone.now()
+    materials = []
+    for f in forecasts.values():
+        f.material.projected_need = f.need
+        f.material.stockout_date = f.stockout_date
+        f.material.forecast_at = now
+        materials.append(f.material)
+    Material.objects.bulk_update(materials, FORECAST_FIELDS, batch_size=500)
+    return forecasts
@@ -0,0 +1,65 @@
+"""
+Management command: benchmark_pricing
+
+Times the original calculate_price path (fetch the ProductType, apply the
+base_price formula) against pricing.quote() over the same random inputs.
+
+Usage:
+    python manage.py benchmark_pricing
+    python manage.py benchmark_pricing --quotes 50000
+"""
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def formula_quote(product_type_id, qty, w, h):
+    """The pre-engine calculate_price formula, one query per call."""
+    from production.models import ProductType
+
+    pt = ProductType.objects.get(pk=product_type_id, is_active=True)
+    if pt.pricing_method == "per_sqm":
+        return pt.base_price * (w / 100) * (h / 100) * qty
+    if pt.pricing_method == "per_unit":
+        return pt.base_price * qty
+    return pt.base_price
+
+
+class Command(BaseCommand):
+    help = "Benchmark per-request ProductType pricing vs the cached pricing engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quotes", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        from production import pricing
+        from production.models import ProductType
+
+        ids = list(ProductType.objects.filter(is_active=True).values_list("pk", flat=True))
+        if not ids:
+            raise CommandError("Need at least one active ProductType (run create_demo_data).")
+
+        rng = random.Random(options["seed"])
+        inputs = [
+            (
+                rng.choice(ids),
+                rng.randint(1, 500),
+                Decimal(rng.randint(10, 500)),
+                Decimal(rng.randint(10, 300)),
+            )
+            for _ in range(options["quotes"])
+        ]
+
+        pricing.invalidate()
+        variants = [("ProductType + formula", formula_quote), ("pricing.quote", pricing.quote)]
+        for label, fn in variants:
+            fn(*inputs[0])  # warm-up
+            start = time.perf_counter()
+            for args in inputs:
+                fn(*args)
+            per_call = (time.perf_counter() - start) / len(inputs) * 1_000_000
+            self.stdout.write(f"  {label:<22} {per_call:9.1f} µs/quote")
@@ -0,0 +1,78 @@
+"""
+Management command: benchmark_scheduler
+
+Times scheduler.sequence() on a synthetic stage of --jobs queued jobs
+spread over --stations stations, and scheduler.plan() for each real stage
+(a cold plan: queries plus sequencing). Nothing is written to the database.
+
+Usage:
+    python manage.py benchmark_scheduler
+    python manage.py benchmark_scheduler --jobs 5000 --stations 4
+"""
+
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Benchmark the production scheduler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000)
+        parser.add_argument("--stations", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        from production import scheduler
+        from production.models import Station
+
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+        stations = [
+            Station(
+                pk=i + 1,
+                name=f"เครื่อง {i + 1}",
+                stage=Station.Stage.PRINTING,
+                sqm_per_hour=Decimal(rng.choice([10, 15, 20])),
+                units_per_hour=Decimal(rng.choice([200, 500])),
+                setup_minutes=15,
+            )
+            for i in range(options["stations"])
+        ]
+        jobs = [
+            {
+                "id": i,
+                "due_date": (
+                    (now + timedelta(days=rng.randint(-2, 14))).date()
+                    if rng.random() < 0.9
+                    else None
+                ),
+                "created_at": now - timedelta(minutes=i),
+                "quantity": rng.randint(1, 50),
+                "width_cm": Decimal(rng.randint(30, 300)),
+                "height_cm": Decimal(rng.randint(30, 200)),
+                "pricing_method": rng.choice(["per_sqm", "per_unit", "flat"]),
+                "material_id": rng.randint(1, 6),
+            }
+            for i in range(options["jobs"])
+        ]
+
+        start = time.perf_counter()
+        slots = scheduler.sequence(jobs, stations, now)
+        elapsed = (time.perf_counter() - start) * 1000
+        late = sum(slot.late for slot in slots.values())
+        self.stdout.write(
+            f"  sequence(): {len(jobs)} jobs on {len(stations)} stations"
+            f" in {elapsed:.1f} ms ({late} late)"
+        )
+
+        for stage in scheduler.STAGES:
+            start = time.perf_counter()
+            slots = scheduler.plan(stage, now)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(f"  plan({stage}): {len(slots)} jobs in {elapsed:.1f} ms")
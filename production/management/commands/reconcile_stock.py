@@ -0,0 +1,44 @@
+"""
+Management command: reconcile_stock
+
+Recomputes every material's stock from its StockMovement ledger, reports
+any drift from Material.quantity_in_stock and (unless --check) rewrites the
+stock and low-stock flag.
+
+Usage:
+    python manage.py reconcile_stock          # detect + fix
+    python manage.py reconcile_stock --check  # detect only, exit 1 on drift
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Detect and fix drift between material stock and the stock ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report drift without fixing it; exit with status 1 if any is found",
+        )
+
+    def handle(self, *args, **options):
+        from production.models import Material
+        from production.stock import reconcile
+
+        drift = reconcile(fix=not options["check"])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Material stock matches the ledger."))
+            return
+
+        names = dict(Material.objects.filter(pk__in=drift).values_list("pk", "name"))
+        for pk, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"  {names[pk]} (#{pk}): stock={stored} ledger={actual}")
+
+        if options["check"]:
+            self.stdout.write(self.style.ERROR(f"Drift found in {len(drift)} materials."))
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} materials."))
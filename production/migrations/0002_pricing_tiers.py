@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("production", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="producttype",
+            name="material",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="product_types",
+                to="production.material",
+                verbose_name="วัสดุหลัก",
+            ),
+        ),
+        migrations.AddField(
+            model_name="producttype",
+            name="material_per_unit",
+            field=models.DecimalField(
+                decimal_places=3,
+                default=0,
+                help_text="ต่อ ตร.ม. (ต่อตารางเมตร) หรือต่อชิ้น — ต้นทุนวัสดุบวกเข้าในราคา",
+                max_digits=10,
+                verbose_name="ปริมาณวัสดุต่อหน่วย",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PriceTier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("min_quantity", models.PositiveIntegerField(verbose_name="จำนวนขั้นต่ำ")),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="ใช้แทนราคาฐาน (ต่อ ตร.ม. / ต่อชิ้น / ราคาเหมา ตามวิธีคิดราคา)",
+                        max_digits=10,
+                        verbose_name="ราคาต่อหน่วย",
+                    ),
+                ),
+                (
+                    "product_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_tiers",
+                        to="production.producttype",
+                        verbose_name="ประเภทสินค้า",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ราคาตามจำนวน",
+                "verbose_name_plural": "ราคาตามจำนวน",
+                "ordering": ["product_type", "min_quantity"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product_type", "min_quantity"), name="uniq_price_tier"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SizeBreak",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "min_area_sqm",
+                    models.DecimalField(
+                        decimal_places=3, max_digits=8, verbose_name="พื้นที่ขั้นต่ำ (ตร.ม.)"
+                    ),
+                ),
+                (
+                    "price_per_sqm",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="ราคาต่อ ตร.ม."
+                    ),
+                ),
+                (
+                    "product_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="size_breaks",
+                        to="production.producttype",
+                        verbose_name="ประเภทสินค้า",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ราคาตามขนาด",
+                "verbose_name_plural": "ราคาตามขนาด",
+                "ordering": ["product_type", "min_area_sqm"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product_type", "min_area_sqm"), name="uniq_size_break"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.lookups import LessThanOrEqual
+
+
+def open_ledger(apps, schema_editor):
+    """Carry each material's current stock into the ledger as an opening adjustment."""
+    Material = apps.get_model("production", "Material")
+    StockMovement = apps.get_model("production", "StockMovement")
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(material_id=pk, kind="adjustment", quantity=stock, note="ยอดยกมา")
+            for pk, stock in Material.objects.exclude(quantity_in_stock=0).values_list(
+                "pk", "quantity_in_stock"
+            )
+        ]
+    )
+    Material.objects.update(is_low_stock=LessThanOrEqual(F("quantity_in_stock"), F("min_quantity")))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("production", "0002_pricing_tiers"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="material",
+            name="is_low_stock",
+            field=models.BooleanField(db_index=True, default=True, verbose_name="สต็อกต่ำ"),
+        ),
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("receipt", "รับเข้า"),
+                            ("usage", "ใช้ในงาน"),
+                            ("adjustment", "ปรับยอด"),
+                        ],
+                        max_length=20,
+                        verbose_name="ประเภท",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.DecimalField(decimal_places=3, max_digits=12, verbose_name="จำนวน"),
+                ),
+                (
+                    "unit_cost",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="ต้นทุน/หน่วย (บาท)",
+                    ),
+                ),
+                ("note", models.CharField(blank=True, max_length=255, verbose_name="หมายเหตุ")),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="ผู้บันทึก",
+                    ),
+                ),
+                (
+                    "material",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="movements",
+                        to="production.material",
+                        verbose_name="วัสดุ",
+                    ),
+                ),
+                (
+                    "usage",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="movement",
+                        to="production.materialusage",
+                        verbose_name="การใช้วัสดุ",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "รายการเคลื่อนไหวสต็อก",
+                "verbose_name_plural": "รายการเคลื่อนไหวสต็อก",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["material", "created_at"], name="production__materia_bb428e_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("production", "0003_stock_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="material",
+            name="forecast_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="พยากรณ์เมื่อ"),
+        ),
+        migrations.AddField(
+            model_name="material",
+            name="projected_need",
+            field=models.DecimalField(
+                decimal_places=3, default=0, max_digits=12, verbose_name="งานค้างต้องใช้"
+            ),
+        ),
+        migrations.AddField(
+            model_name="material",
+            name="stockout_date",
+            field=models.DateField(
+                blank=True, db_index=True, null=True, verbose_name="คาดว่าจะหมดวันที่"
+            ),
+        ),
+        migrations.AddField(
+            model_name="producttype",
+            name="waste_percent",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="วัสดุที่เสียระหว่างผลิต ใช้ในการประมาณการใช้วัสดุ ไม่บวกเข้าในราคา",
+                max_digits=5,
+                verbose_name="เผื่อเสีย (%)",
+            ),
+        ),
+    ]
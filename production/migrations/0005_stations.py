@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("production", "0004_material_forecast"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Station",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="ชื่อเครื่อง/สถานี")),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[("printing", "พิมพ์"), ("cutting", "ตัด"), ("laminating", "เคลือบ")],
+                        max_length=20,
+                        verbose_name="ขั้นตอน",
+                    ),
+                ),
+                (
+                    "sqm_per_hour",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="สำหรับสินค้าที่คิดราคาต่อตารางเมตร",
+                        max_digits=8,
+                        verbose_name="ตร.ม. ต่อชั่วโมง",
+                    ),
+                ),
+                (
+                    "units_per_hour",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="สำหรับสินค้าที่คิดราคาต่อชิ้น",
+                        max_digits=10,
+                        verbose_name="ชิ้นต่อชั่วโมง",
+                    ),
+                ),
+                (
+                    "min_minutes",
+                    models.PositiveIntegerField(default=5, verbose_name="เวลาขั้นต่ำต่องาน (นาที)"),
+                ),
+                (
+                    "setup_minutes",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="เวลาที่เสียเมื่องานถัดไปใช้วัสดุต่างจากงานก่อนหน้า",
+                        verbose_name="เวลาเปลี่ยนวัสดุ (นาที)",
+                    ),
+                ),
+                (
+                    "hours_per_day",
+                    models.DecimalField(
+                        decimal_places=2, default=8, max_digits=4, verbose_name="ชั่วโมงทำงานต่อวัน"
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "operator",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="stations",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="ผู้ควบคุมเครื่อง",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "เครื่อง/สถานีผลิต",
+                "verbose_name_plural": "เครื่อง/สถานีผลิต",
+                "ordering": ["stage", "name"],
+            },
+        ),
+    ]
@@ -2,9 +2,12 @@
 Production reference models.
 
 ProductType and Material are configured via Django Admin by the owner.
-MaterialUsage tracks what materials were consumed per job.
+MaterialUsage tracks what materials were consumed per job; every change to
+Material.quantity_in_stock is a StockMovement (see production/stock.py).
+Stations are the machines production/scheduler.py plans the queue across.
 """
 
+from django.conf import settings
 from django.db import models
 
 
@@ -13,7 +16,8 @@ class ProductType(models.Model):
     Category of print product: Banner, Sticker, Business Card, etc.
 
     Each product type has a base pricing structure that the auto-pricing
-    engine uses as a starting point.
+    engine (production/pricing.py) uses as a starting point; PriceTier and
+    SizeBreak rows refine it.
     """
 
     name = models.CharField(max_length=100, verbose_name="ประเภทสินค้า")
@@ -41,6 +45,28 @@ class ProductType(models.Model):
         default="per_unit",
         verbose_name="วิธีคิดราคา",
     )
+    material = models.ForeignKey(
+        "Material",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="product_types",
+        verbose_name="วัสดุหลัก",
+    )
+    material_per_unit = models.DecimalField(
+        max_digits=10,
+        decimal_places=3,
+        default=0,
+        verbose_name="ปริมาณวัสดุต่อหน่วย",
+        help_text="ต่อ ตร.ม. (ต่อตารางเมตร) หรือต่อชิ้น — ต้นทุนวัสดุบวกเข้าในราคา",
+    )
+    waste_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0,
+        verbose_name="เผื่อเสีย (%)",
+        help_text="วัสดุที่เสียระหว่างผลิต ใช้ในการประมาณการใช้วัสดุ ไม่บวกเข้าในราคา",
+    )
     requires_design = models.BooleanField(
         default=True,
         verbose_name="ต้องผ่านขั้นตอนออกแบบ",
@@ -57,12 +83,77 @@ class ProductType(models.Model):
         return self.name
 
 
+class PriceTier(models.Model):
+    """Quantity break: from `min_quantity` pieces the rate becomes `unit_price`."""
+
+    product_type = models.ForeignKey(
+        ProductType,
+        on_delete=models.CASCADE,
+        related_name="price_tiers",
+        verbose_name="ประเภทสินค้า",
+    )
+    min_quantity = models.PositiveIntegerField(verbose_name="จำนวนขั้นต่ำ")
+    unit_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="ราคาต่อหน่วย",
+        help_text="ใช้แทนราคาฐาน (ต่อ ตร.ม. / ต่อชิ้น / ราคาเหมา ตามวิธีคิดราคา)",
+    )
+
+    class Meta:
+        verbose_name = "ราคาตามจำนวน"
+        verbose_name_plural = "ราคาตามจำนวน"
+        ordering = ["product_type", "min_quantity"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product_type", "min_quantity"], name="uniq_price_tier"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_type} ≥{self.min_quantity}: {self.unit_price}"
+
+
+class SizeBreak(models.Model):
+    """Area break for per-sqm products: pieces of at least `min_area_sqm` get `price_per_sqm`."""
+
+    product_type = models.ForeignKey(
+        ProductType,
+        on_delete=models.CASCADE,
+        related_name="size_breaks",
+        verbose_name="ประเภทสินค้า",
+    )
+    min_area_sqm = models.DecimalField(
+        max_digits=8, decimal_places=3, verbose_name="พื้นที่ขั้นต่ำ (ตร.ม.)"
+    )
+    price_per_sqm = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="ราคาต่อ ตร.ม."
+    )
+
+    class Meta:
+        verbose_name = "ราคาตามขนาด"
+        verbose_name_plural = "ราคาตามขนาด"
+        ordering = ["product_type", "min_area_sqm"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product_type", "min_area_sqm"], name="uniq_size_break"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_type} ≥{self.min_area_sqm} ตร.ม.: {self.price_per_sqm}"
+
+
+FORECAST_FIELDS = ("projected_need", "stockout_date", "forecast_at")
+
+
 class Material(models.Model):
     """
     Raw material inventory: vinyl, paper, ink, etc.
 
-    MaterialUsage links to Job to track consumption.
-    Low-stock alerts (Phase 4) use the min_quantity threshold.
+    quantity_in_stock is the sum of the material's StockMovements, kept in
+    step with F() updates by production/stock.py; is_low_stock is updated in
+    the same statement so low-stock alerts read an index, not every row.
     """
 
     name = models.CharField(max_length=150, verbose_name="ชื่อวัสดุ")
@@ -84,6 +175,18 @@ class Material(models.Model):
         default=0,
         verbose_name="ขั้นต่ำก่อนแจ้งเตือน",
     )
+    is_low_stock = models.BooleanField(default=True, db_index=True, verbose_name="สต็อกต่ำ")
+    # written by production/forecast.py
+    projected_need = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        default=0,
+        verbose_name="งานค้างต้องใช้",
+    )
+    stockout_date = models.DateField(
+        null=True, blank=True, db_index=True, verbose_name="คาดว่าจะหมดวันที่"
+    )
+    forecast_at = models.DateTimeField(null=True, blank=True, verbose_name="พยากรณ์เมื่อ")
     is_active = models.BooleanField(default=True)
 
     class Meta:
@@ -94,9 +197,35 @@ class Material(models.Model):
     def __str__(self):
         return f"{self.name} ({self.quantity_in_stock} {self.unit})"
 
-    @property
-    def is_low_stock(self):
-        return self.quantity_in_stock <= self.min_quantity
+    def save(self, *args, **kwargs):
+        """
+        Stock only moves through production/stock.py: an edit never writes back
+        this instance's (possibly stale) stock or forecast fields, and a new
+        material's opening stock is recorded as its first movement.
+        """
+        from django.db.models.lookups import LessThanOrEqual
+
+        adding = self._state.adding
+        if not adding and kwargs.get("update_fields") is None:
+            derived = ("quantity_in_stock", "is_low_stock", *FORECAST_FIELDS)
+            kwargs["update_fields"] = [
+                f.attname
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in derived
+            ]
+        super().save(*args, **kwargs)
+        if adding and self.quantity_in_stock:
+            StockMovement.objects.create(
+                material=self,
+                kind=StockMovement.Kind.ADJUSTMENT,
+                quantity=self.quantity_in_stock,
+                note="ยอดยกมา",
+            )
+        # min_quantity may have changed
+        Material.objects.filter(pk=self.pk).update(
+            is_low_stock=LessThanOrEqual(models.F("quantity_in_stock"), models.F("min_quantity"))
+        )
+        self.is_low_stock = self.quantity_in_stock <= self.min_quantity
 
 
 class MaterialUsage(models.Model):
@@ -127,3 +256,134 @@ class MaterialUsage(models.Model):
 
     def __str__(self):
         return f"{self.material.name} × {self.quantity_used}"
+
+
+class StockMovement(models.Model):
+    """
+    One entry in the stock ledger: material received, used or adjusted.
+
+    quantity is signed — positive into stock, negative out of it — so a
+    material's stock is the sum of its movements.
+    """
+
+    class Kind(models.TextChoices):
+        RECEIPT = "receipt", "รับเข้า"
+        USAGE = "usage", "ใช้ในงาน"
+        ADJUSTMENT = "adjustment", "ปรับยอด"
+
+    material = models.ForeignKey(
+        Material,
+        on_delete=models.PROTECT,
+        related_name="movements",
+        verbose_name="วัสดุ",
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices, verbose_name="ประเภท")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, verbose_name="จำนวน")
+    unit_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="ต้นทุน/หน่วย (บาท)",
+    )
+    usage = models.OneToOneField(
+        MaterialUsage,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="movement",
+        verbose_name="การใช้วัสดุ",
+    )
+    note = models.CharField(max_length=255, blank=True, verbose_name="หมายเหตุ")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="ผู้บันทึก",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "รายการเคลื่อนไหวสต็อก"
+        verbose_name_plural = "รายการเคลื่อนไหวสต็อก"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["material", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.material_id}: {self.quantity:+}"
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+
+        if self.quantity is None:
+            return
+        if self.kind == self.Kind.RECEIPT and self.quantity <= 0:
+            raise ValidationError({"quantity": "การรับเข้าต้องเป็นจำนวนบวก"})
+        if self.kind == self.Kind.USAGE and self.quantity >= 0:
+            raise ValidationError({"quantity": "การใช้วัสดุต้องเป็นจำนวนลบ"})
+        if self.quantity == 0:
+            raise ValidationError({"quantity": "จำนวนต้องไม่เป็น 0"})
+
+
+class Station(models.Model):
+    """
+    A machine or work station in one production stage — the large-format
+    printer, the cutting table, the laminator. production/scheduler.py
+    sequences each stage's queued jobs across its active stations.
+    """
+
+    class Stage(models.TextChoices):
+        # values match the JobStatus a job is in while it waits for the stage
+        PRINTING = "printing", "พิมพ์"
+        CUTTING = "cutting", "ตัด"
+        LAMINATING = "laminating", "เคลือบ"
+
+    name = models.CharField(max_length=100, verbose_name="ชื่อเครื่อง/สถานี")
+    stage = models.CharField(max_length=20, choices=Stage.choices, verbose_name="ขั้นตอน")
+    operator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="stations",
+        verbose_name="ผู้ควบคุมเครื่อง",
+    )
+    sqm_per_hour = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        verbose_name="ตร.ม. ต่อชั่วโมง",
+        help_text="สำหรับสินค้าที่คิดราคาต่อตารางเมตร",
+    )
+    units_per_hour = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name="ชิ้นต่อชั่วโมง",
+        help_text="สำหรับสินค้าที่คิดราคาต่อชิ้น",
+    )
+    min_minutes = models.PositiveIntegerField(default=5, verbose_name="เวลาขั้นต่ำต่องาน (นาที)")
+    setup_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="เวลาเปลี่ยนวัสดุ (นาที)",
+        help_text="เวลาที่เสียเมื่องานถัดไปใช้วัสดุต่างจากงานก่อนหน้า",
+    )
+    hours_per_day = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        default=8,
+        verbose_name="ชั่วโมงทำงานต่อวัน",
+    )
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "เครื่อง/สถานีผลิต"
+        verbose_name_plural = "เครื่อง/สถานีผลิต"
+        ordering = ["stage", "name"]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_stage_display()})"
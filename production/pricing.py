@@ -0,0 +1,202 @@
+"""
+Auto-pricing engine (PRD BILL-001).
+
+quote() prices one line from compiled, per-process price tables, so the
+HTMX price preview costs no queries per keystroke:
+
+    rate     = PriceTier for the quantity / SizeBreak for the piece area
+               (the lower of the two when both apply), else base_price
+    units    = m² in total (per_sqm), pieces (per_unit) or 1 (flat)
+    subtotal = (rate + material cost per unit) × units
+    total    = subtotal − CustomerType.discount_percent, rounded to satang
+
+With no tiers, breaks, material or discount this is exactly the original
+calculate_price formula.
+
+Freshness: saving or deleting a ProductType, PriceTier, SizeBreak, Material
+or CustomerType drops this worker's tables and bumps VERSION_KEY in the
+shared cache; other workers check it at most every CHECK_INTERVAL seconds
+and recompile on change.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "production:pricing:version"
+CHECK_INTERVAL = 1.0
+CENT = Decimal("0.01")
+HUNDRED = Decimal(100)
+ZERO = Decimal(0)
+
+
+class UnknownProductType(LookupError):
+    """The product type does not exist or is inactive."""
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    """One product type's pricing, compiled for bisect lookups."""
+
+    method: str
+    base_price: Decimal
+    material_cost: Decimal
+    tier_quantities: tuple = ()
+    tier_prices: tuple = ()
+    break_areas: tuple = ()
+    break_prices: tuple = ()
+
+    def rate(self, quantity, area):
+        """Price per unit for `quantity` pieces of `area` m² each."""
+        candidates = []
+        i = bisect_right(self.tier_quantities, quantity)
+        if i:
+            candidates.append(self.tier_prices[i - 1])
+        if self.method == "per_sqm":
+            i = bisect_right(self.break_areas, area)
+            if i:
+                candidates.append(self.break_prices[i - 1])
+        return min(candidates) if candidates else self.base_price
+
+    def units(self, quantity, area):
+        if self.method == "per_sqm":
+            return area * quantity
+        if self.method == "per_unit":
+            return Decimal(quantity)
+        return Decimal(1)
+
+
+def compile_tables():
+    """({product_type_id: PriceTable}, {customer_type_id: discount_percent}) from the database."""
+    from customers.models import CustomerType
+
+    from .models import ProductType
+
+    product_types = (
+        ProductType.objects.filter(is_active=True)
+        .select_related("material")
+        .prefetch_related("price_tiers", "size_breaks")
+    )
+    tables = {}
+    for pt in product_types:
+        tiers = sorted((t.min_quantity, t.unit_price) for t in pt.price_tiers.all())
+        breaks = sorted((b.min_area_sqm, b.price_per_sqm) for b in pt.size_breaks.all())
+        material_cost = pt.material.cost_per_unit * pt.material_per_unit if pt.material else ZERO
+        tables[pt.pk] = PriceTable(
+            method=pt.pricing_method,
+            base_price=pt.base_price,
+            material_cost=material_cost,
+            tier_quantities=tuple(q for q, _ in tiers),
+            tier_prices=tuple(p for _, p in tiers),
+            break_areas=tuple(a for a, _ in breaks),
+            break_prices=tuple(p for _, p in breaks),
+        )
+    discounts = dict(CustomerType.objects.values_list("pk", "discount_percent"))
+    return tables, discounts
+
+
+class _Cache:
+    def __init__(self):
+        self.tables = {}
+        self.discounts = {}
+        self.version = None
+        self.checked_at = 0.0
+
+
+_cache = _Cache()
+_lock = threading.Lock()
+
+
+def _current():
+    """This worker's tables, recompiled if another worker bumped the version."""
+    state = _cache
+    now = time.monotonic()
+    if state.version is not None and now - state.checked_at < CHECK_INTERVAL:
+        return state
+    with _lock:
+        state = _cache
+        version = cache.get(VERSION_KEY, 0)
+        if state.version != version:
+            state = _Cache()
+            state.tables, state.discounts = compile_tables()
+            state.version = version
+            _replace(state)
+        state.checked_at = now
+    return state
+
+
+def _replace(state):
+    global _cache
+    _cache = state
+
+
+def _discount_percent(state, customer_type):
+    if customer_type is None:
+        return ZERO
+    if hasattr(customer_type, "discount_percent"):
+        return customer_type.discount_percent
+    return state.discounts.get(customer_type, ZERO)
+
+
+def quote(product_type_id, qty, w, h, customer_type=None):
+    """
+    Price for `qty` pieces of `w` × `h` cm of product type `product_type_id`.
+
+    `customer_type` is a CustomerType, its pk, or None (no discount). Returns
+    a Decimal rounded to 0.01; raises UnknownProductType for a missing or
+    inactive product type and ValueError for negative inputs.
+    """
+    qty = int(qty)
+    w, h = Decimal(w or 0), Decimal(h or 0)
+    if qty < 0 or w < 0 or h < 0:
+        raise ValueError("quantity and size must not be negative")
+
+    state = _current()
+    table = state.tables.get(product_type_id)
+    if table is None:
+        raise UnknownProductType(product_type_id)
+
+    area = (w / HUNDRED) * (h / HUNDRED)  # cm → m²
+    subtotal = (table.rate(qty, area) + table.material_cost) * table.units(qty, area)
+    discount = _discount_percent(state, customer_type)
+    if discount:
+        subtotal -= subtotal * discount / HUNDRED
+    return subtotal.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def invalidate():
+    """Drop this worker's tables and make every other worker recompile."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+    _replace(_Cache())
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers — connected in ProductionConfig.ready()
+# ---------------------------------------------------------------------------
+
+def _on_pricing_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate()
+        # again after commit, so no worker keeps tables compiled from the old rows
+        transaction.on_commit(invalidate)
+
+
+def connect_pricing_hooks():
+    from django.db.models.signals import post_delete, post_save
+
+    from customers.models import CustomerType
+
+    from .models import Material, PriceTier, ProductType, SizeBreak
+
+    for model in (ProductType, PriceTier, SizeBreak, Material, CustomerType):
+        uid = f"pricing_{model._meta.label_lower}"
+        post_save.connect(_on_pricing_changed, sender=model, dispatch_uid=f"{uid}_saved")
+        post_delete.connect(_on_pricing_changed, sender=model, dispatch_uid=f"{uid}_deleted")
@@ -0,0 +1,248 @@
+"""
+Production scheduler — which station runs each queued job, in what order,
+and when it should be done.
+
+Jobs in PRINTING, CUTTING and LAMINATING wait for the active Stations of
+that stage. For each stage, sequence():
+
+  - takes the jobs earliest-due-date first (undated jobs last), and jobs due
+    the same day grouped by material, so a roll is run through before the
+    station changes over;
+  - gives each job to the station that would finish it first, counting the
+    station's setup_minutes when the job's material differs from the one it
+    ran last — so same-material work tends to stay on the same machine;
+  - turns the minutes of work ahead of each job into start and finish times
+    over the station's working day (DAY_START, hours_per_day).
+
+It works on plain rows in memory, so a floor of a few thousand active jobs
+is planned in well under a second. Each stage's plan is cached (PLAN_TTL)
+under a version that connect_schedule_hooks() bumps when a job enters,
+leaves or is edited in that stage, so a transition re-plans only the
+stages it touches.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Station
+
+STAGES = Station.Stage.values
+DAY_START = time(9)
+PLAN_TTL = 300
+
+
+@dataclass
+class Slot:
+    job_id: int
+    station_id: int
+    sequence: int  # position in the station's queue, from 1
+    start: datetime
+    finish: datetime
+    late: bool
+
+
+class _Lane:
+    """A station while its queue is being planned."""
+
+    def __init__(self, station):
+        self.station = station
+        self.free_at = 0.0  # working minutes from now
+        self.material_id = None
+        self.count = 0
+
+
+class _Clock:
+    """Maps working minutes from `now` onto a station's working days."""
+
+    def __init__(self, station, now):
+        self.day = max(float(station.hours_per_day), 0.5) * 60
+        local = timezone.localtime(now)
+        self.first = local.date()
+        elapsed = (local - self._opens(self.first)).total_seconds() / 60
+        if elapsed >= self.day:
+            self.first += timedelta(days=1)
+            elapsed = 0
+        self.offset = max(elapsed, 0)
+
+    def _opens(self, day):
+        return timezone.make_aware(datetime.combine(day, DAY_START))
+
+    def at(self, minutes, finish=False):
+        days, rest = divmod(self.offset + minutes, self.day)
+        if finish and days and not rest:
+            # work that ends at closing time finishes that day, not at the next opening
+            days, rest = days - 1, self.day
+        return self._opens(self.first + timedelta(days=int(days))) + timedelta(minutes=rest)
+
+
+def work_minutes(job, station):
+    """Minutes `station` needs for a queued job row (see queued_jobs())."""
+    minutes = 0
+    if job["pricing_method"] == "per_sqm" and station.sqm_per_hour:
+        sqm = float((job["width_cm"] or 0) * (job["height_cm"] or 0)) / 10_000 * job["quantity"]
+        minutes = sqm / float(station.sqm_per_hour) * 60
+    elif job["pricing_method"] == "per_unit" and station.units_per_hour:
+        minutes = job["quantity"] / float(station.units_per_hour) * 60
+    return max(minutes, station.min_minutes)
+
+
+def _priority(job):
+    return (job["due_date"] or date.max, job["material_id"] or 0, job["created_at"], job["id"])
+
+
+def sequence(jobs, stations, now):
+    """
+    Plan one stage: `jobs` are queued job rows, `stations` its active stations.
+
+    Returns {job_id: Slot}; empty when the stage has no station to plan on.
+    """
+    if not stations:
+        return {}
+    lanes = [_Lane(station) for station in stations]
+    placed = []
+    for job in sorted(jobs, key=_priority):
+        best = None
+        for lane in lanes:
+            changeover = lane.material_id is not None and lane.material_id != job["material_id"]
+            start = lane.free_at + (lane.station.setup_minutes if changeover else 0)
+            finish = start + work_minutes(job, lane.station)
+            if best is None or finish < best[0]:
+                best = (finish, start, lane)
+        finish, start, lane = best
+        lane.free_at, lane.material_id = finish, job["material_id"]
+        lane.count += 1
+        placed.append((job, lane, start, finish))
+
+    clocks = {lane.station.pk: _Clock(lane.station, now) for lane in lanes}
+    slots = {}
+    sequence_no = {lane.station.pk: 0 for lane in lanes}
+    for job, lane, start, finish in placed:
+        clock = clocks[lane.station.pk]
+        sequence_no[lane.station.pk] += 1
+        finish_at = clock.at(finish, finish=True)
+        slots[job["id"]] = Slot(
+            job_id=job["id"],
+            station_id=lane.station.pk,
+            sequence=sequence_no[lane.station.pk],
+            start=clock.at(start),
+            finish=finish_at,
+            late=job["due_date"] is not None and finish_at.date() > job["due_date"],
+        )
+    return slots
+
+
+def queued_jobs(stage):
+    """The rows sequence() needs for every job waiting in `stage`, from one query."""
+    from jobs.models import Job
+
+    return list(
+        Job.objects.filter(status=stage)
+        .order_by()
+        .values(
+            "id",
+            "due_date",
+            "created_at",
+            "quantity",
+            "width_cm",
+            "height_cm",
+            pricing_method=F("product_type__pricing_method"),
+            material_id=F("product_type__material_id"),
+        )
+    )
+
+
+def _version_key(stage):
+    return f"production:schedule:{stage}:version"
+
+
+def plan(stage, now=None):
+    """{job_id: Slot} for one stage — cached until the stage changes or PLAN_TTL passes."""
+    key = f"production:schedule:{stage}:{cache.get(_version_key(stage), 1)}"
+    if now is None:
+        slots = cache.get(key)
+        if slots is not None:
+            return slots
+    stations = list(Station.objects.filter(stage=stage, is_active=True).order_by("pk"))
+    slots = sequence(queued_jobs(stage), stations, now or timezone.now())
+    if now is None:
+        cache.set(key, slots, PLAN_TTL)
+    return slots
+
+
+def schedule(stages=STAGES, now=None):
+    """{job_id: Slot} across the given stages."""
+    slots = {}
+    for stage in stages:
+        slots.update(plan(stage, now))
+    return slots
+
+
+def backlog(stage):
+    """{Station: when its planned queue is done} for the stage's active stations; now if idle."""
+    now = timezone.now()
+    done = {}
+    for slot in plan(stage).values():
+        done[slot.station_id] = max(done.get(slot.station_id, now), slot.finish)
+    stations = Station.objects.filter(stage=stage, is_active=True)
+    return {station: done.get(station.pk, now) for station in stations}
+
+
+def invalidate(*stages):
+    """Bump each stage's plan version so the next read re-plans it."""
+    for stage in stages:
+        key = _version_key(stage)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def stages_touched(to_status):
+    """Stages a job moving to `to_status` can be entering or leaving."""
+    from jobs.models import ALLOWED_TRANSITIONS
+
+    return [
+        stage
+        for stage in STAGES
+        if stage == to_status or to_status in ALLOWED_TRANSITIONS[stage]
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks — connected in ProductionConfig.ready()
+# ---------------------------------------------------------------------------
+
+# Saves invalidate after commit: bumped earlier, a concurrent request could
+# re-plan from the old rows and cache that plan under the new version.
+
+def _on_job_status_changed(sender, to_status, **kwargs):
+    invalidate(*stages_touched(to_status))  # job_status_changed is already sent on commit
+
+
+def _on_job_saved(sender, instance, raw=False, **kwargs):
+    # due date, size or product type edits of a queued job
+    if not raw and instance.status in STAGES:
+        stage = instance.status
+        transaction.on_commit(lambda: invalidate(stage))
+
+
+def _on_station_saved(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate(*STAGES))
+
+
+def connect_schedule_hooks():
+    from django.db.models.signals import post_delete, post_save
+
+    from jobs.models import Job
+    from jobs.signals import job_status_changed
+
+    job_status_changed.connect(_on_job_status_changed, dispatch_uid="schedule_job_status")
+    post_save.connect(_on_job_saved, sender=Job, dispatch_uid="schedule_job_saved")
+    post_delete.connect(_on_job_saved, sender=Job, dispatch_uid="schedule_job_deleted")
+    post_save.connect(_on_station_saved, sender=Station, dispatch_uid="schedule_station_saved")
+    post_delete.connect(_on_station_saved, sender=Station, dispatch_uid="schedule_station_deleted")
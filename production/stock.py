@@ -0,0 +1,197 @@
+"""
+Material stock ledger.
+
+Every change to Material.quantity_in_stock is a StockMovement — a receipt,
+a usage on a job or an adjustment — and is applied in the same transaction
+as one UPDATE per material:
+
+    quantity_in_stock = quantity_in_stock + delta,
+    is_low_stock      = (quantity_in_stock + delta) <= min_quantity
+
+The database does the arithmetic, so two operators recording usage of the
+same roll at once cannot lose each other's update, and is_low_stock is
+always current: low-stock alerts filter on it instead of scanning stock.
+
+reconcile() recomputes stock from the ledger and fixes drift; it runs
+nightly and from `manage.py reconcile_stock`.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.lookups import LessThanOrEqual
+
+from .models import Material, MaterialUsage, StockMovement
+
+ZERO = Decimal("0")
+
+
+class StockError(ValueError):
+    """A movement that cannot be recorded (bad quantity, unknown material)."""
+
+
+def _quantity(value, allow_negative=False):
+    try:
+        quantity = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise StockError(f"จำนวนไม่ถูกต้อง: {value!r}") from None
+    if not quantity.is_finite() or quantity == 0 or (quantity < 0 and not allow_negative):
+        raise StockError(f"จำนวนไม่ถูกต้อง: {value!r}")
+    return quantity
+
+
+def _apply(deltas):
+    """Add {material_id: delta} to stock, one F() UPDATE per material, in id order."""
+    for material_id, delta in sorted(deltas.items()):
+        if delta:
+            stock = F("quantity_in_stock") + delta
+            Material.objects.filter(pk=material_id).update(
+                quantity_in_stock=stock, is_low_stock=LessThanOrEqual(stock, F("min_quantity"))
+            )
+
+
+def record_movements(movements):
+    """Save unsaved StockMovements with one insert and apply them to stock."""
+    deltas = {}
+    for movement in movements:
+        deltas[movement.material_id] = deltas.get(movement.material_id, ZERO) + movement.quantity
+    with transaction.atomic():
+        # stock first: the row locks make reconcile() wait for this transaction
+        _apply(deltas)
+        movements = StockMovement.objects.bulk_create(movements)
+    return movements
+
+
+def receive(material, quantity, user=None, unit_cost=None, note=""):
+    """Stock bought in; returns the StockMovement."""
+    (movement,) = record_movements(
+        [
+            StockMovement(
+                material=material,
+                kind=StockMovement.Kind.RECEIPT,
+                quantity=_quantity(quantity),
+                unit_cost=unit_cost,
+                note=note,
+                created_by=user,
+            )
+        ]
+    )
+    return movement
+
+
+def adjust(material, quantity, user=None, note=""):
+    """Signed correction (count, damage, spoilage); returns the StockMovement."""
+    (movement,) = record_movements(
+        [
+            StockMovement(
+                material=material,
+                kind=StockMovement.Kind.ADJUSTMENT,
+                quantity=_quantity(quantity, allow_negative=True),
+                note=note,
+                created_by=user,
+            )
+        ]
+    )
+    return movement
+
+
+def record_usage(rows, user=None):
+    """
+    Record material used on jobs — e.g. everything an operator ran in one go.
+
+    `rows` are (job_id, material_id, quantity, notes) tuples. Creates one
+    MaterialUsage and one usage StockMovement per row in a fixed number of
+    queries, and returns the MaterialUsages. Stock may go negative: the
+    material has already been used, so the ledger records it and the
+    material shows as low.
+    """
+    rows = [
+        (int(job_id), int(material_id), _quantity(quantity), notes or "")
+        for job_id, material_id, quantity, notes in rows
+    ]
+    if not rows:
+        return []
+    from jobs.models import Job
+
+    materials = set(
+        Material.objects.filter(pk__in={r[1] for r in rows}).values_list("pk", flat=True)
+    )
+    jobs = set(Job.objects.filter(pk__in={r[0] for r in rows}).values_list("pk", flat=True))
+    for job_id, material_id, _, _ in rows:
+        if material_id not in materials:
+            raise StockError(f"ไม่พบวัสดุ #{material_id}")
+        if job_id not in jobs:
+            raise StockError(f"ไม่พบงาน #{job_id}")
+
+    with transaction.atomic():
+        usages = MaterialUsage.objects.bulk_create(
+            [
+                MaterialUsage(
+                    job_id=job_id,
+                    material_id=material_id,
+                    quantity_used=quantity,
+                    notes=notes[:255],
+                )
+                for job_id, material_id, quantity, notes in rows
+            ]
+        )
+        record_movements(
+            [
+                StockMovement(
+                    material_id=usage.material_id,
+                    kind=StockMovement.Kind.USAGE,
+                    quantity=-usage.quantity_used,
+                    usage=usage,
+                    note=f"งาน #{usage.job_id}",
+                    created_by=user,
+                )
+                for usage in usages
+            ]
+        )
+    return usages
+
+
+def estimated_usage(job):
+    """Material the job's product type says it needs, waste included; None without a material."""
+    pt = job.product_type
+    if not pt.material_id or not pt.material_per_unit:
+        return None
+    if pt.pricing_method == "per_sqm":
+        if not (job.width_cm and job.height_cm):
+            return None
+        units = job.width_cm * job.height_cm / 10_000 * job.quantity
+    elif pt.pricing_method == "per_unit":
+        units = Decimal(job.quantity)
+    else:
+        units = Decimal(1)
+    waste = 1 + pt.waste_percent / 100
+    return (pt.material_per_unit * units * waste).quantize(Decimal("0.001"))
+
+
+def reconcile(fix=True):
+    """
+    Compare each material's stock with the sum of its ledger.
+
+    Returns {material_id: (stored, ledger)} for every material that drifted;
+    with fix=True the stock (and is_low_stock) is rewritten from the ledger
+    while the materials are locked.
+    """
+    with transaction.atomic():
+        stored = dict(
+            Material.objects.select_for_update()
+            .order_by("pk")
+            .values_list("pk", "quantity_in_stock")
+        )
+        ledger = dict.fromkeys(stored, ZERO)
+        ledger.update(
+            StockMovement.objects.order_by().values_list("material_id").annotate(total=Sum("quantity"))
+        )
+        drift = {pk: (stored[pk], ledger[pk]) for pk in stored if stored[pk] != ledger[pk]}
+        if fix:
+            for pk, (_, actual) in drift.items():
+                Material.objects.filter(pk=pk).update(
+                    quantity_in_stock=actual,
+                    is_low_stock=LessThanOrEqual(Value(actual), F("min_quantity")),
+                )
+    return drift
@@ -0,0 +1,22 @@
+"""Celery tasks for the production app."""
+
+from celery import shared_task
+
+
+@shared_task(name="production.tasks.reconcile_stock")
+def reconcile_stock():
+    """Fix any drift between Material.quantity_in_stock and the stock ledger."""
+    from .stock import reconcile
+
+    drift = reconcile()
+    return f"stock fixed: {sorted(drift)}"
+
+
+@shared_task(name="production.tasks.forecast_materials")
+def forecast_materials():
+    """Refresh each material's projected pipeline need and stock-out date."""
+    from .forecast import run
+
+    forecasts = run()
+    short = sum(1 for f in forecasts.values() if f.stockout_date)
+    return f"materials forecast: {len(forecasts)}, stock-out predicted: {short}"
@@ -0,0 +1,139 @@
+"""
+Tests for the live production board (production/board.py).
+"""
+
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job, JobStatus
+from production import board
+
+
+def _printing(job):
+    Job.objects.filter(pk=job.pk).update(status=JobStatus.PRINTING)
+    job.status = JobStatus.PRINTING
+    return job
+
+
+def _events(chunks):
+    """(id, event, data) for each SSE message in `chunks`."""
+    events = []
+    for chunk in chunks:
+        lines = [line for line in chunk.strip().splitlines() if not line.startswith(":")]
+        fields = dict(line.split(": ", 1) for line in lines)
+        if "event" in fields:
+            events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.django_db
+class TestPublish:
+    def test_event_has_rendered_cards_and_counts(self, job):
+        _printing(job)
+        assert board.publish([job.pk]) == 1
+        assert board.publish([job.pk]) == 2
+
+        event = cache.get("production:board:event:2")
+        (card,) = event["cards"]
+        assert (card["id"], card["status"]) == (job.pk, JobStatus.PRINTING)
+        assert f'id="job-card-{job.pk}"' in card["html"]
+        assert "hx-post" not in card["html"]  # kiosk cards have no buttons
+        assert set(event["counts"]) == set(board.BOARD_STATUSES)
+
+    def test_transitions_publish_after_commit(
+        self, job, counter_user, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.DESIGNING, changed_by=counter_user)
+        assert board.current_version() == 0  # not on the board
+
+        _printing(job)
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.READY, changed_by=counter_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.COMPLETED, changed_by=counter_user)
+
+        assert board.current_version() == 2
+        ready = cache.get("production:board:event:1")
+        completed = cache.get("production:board:event:2")
+        assert ready["cards"][0]["status"] == JobStatus.READY
+        assert ready["counts"][JobStatus.READY] == 1
+        assert completed["cards"] == [{"id": job.pk, "status": "", "html": ""}]
+
+    def test_editing_a_board_job_publishes(
+        self, monkeypatch, job, django_capture_on_commit_callbacks
+    ):
+        from jobs.tasks import render_job_slips
+
+        monkeypatch.setattr(render_job_slips, "delay", lambda job_ids: None)
+        _printing(job)
+        job.due_date = timezone.localdate() - timezone.timedelta(days=1)
+        with django_capture_on_commit_callbacks(execute=True):
+            job.save()
+        (card,) = cache.get("production:board:event:1")["cards"]
+        assert "เลยกำหนด" in card["html"]
+
+
+@pytest.mark.django_db
+class TestStream:
+    def test_replays_missed_events_without_touching_the_database(self, job):
+        _printing(job)
+        for _ in range(3):
+            board.publish([job.pk])
+
+        with CaptureQueriesContext(connection) as ctx:
+            chunks = list(board.stream(1, seconds=0))
+        assert len(ctx.captured_queries) == 0
+        assert chunks[0] == f"retry: {board.RETRY_MS}\n\n"
+        assert [(i, e) for i, e, _ in _events(chunks)] == [("2", "cards"), ("3", "cards")]
+
+    def test_new_connection_starts_at_current_version(self, job):
+        board.publish([job.pk])
+        assert _events(board.stream(None, seconds=0)) == []
+
+    def test_too_far_behind_resets(self, monkeypatch, job):
+        monkeypatch.setattr(board, "MAX_REPLAY", 2)
+        for _ in range(4):
+            board.publish([job.pk])
+        assert _events(board.stream(1, seconds=0)) == [(None, "reset", {})]
+        assert _events(board.stream(9, seconds=0)) == [(None, "reset", {})]  # cache was flushed
+
+    def test_expired_event_resets_after_grace(self, monkeypatch, job):
+        monkeypatch.setattr(board, "GAP_GRACE_SECONDS", 0.05)
+        board.publish([job.pk])
+        board.publish([job.pk])
+        cache.delete("production:board:event:1")
+        assert _events(board.stream(0, seconds=1, poll=0.01)) == [(None, "reset", {})]
+
+
+@pytest.mark.django_db
+class TestViews:
+    def test_board_page(self, client, counter_user, job):
+        _printing(job)
+        board.publish([job.pk])
+        client.force_login(counter_user)
+        response = client.get(reverse("production:board"))
+
+        assert response.context["cursor"] == 1
+        columns = {c["status"]: c for c in response.context["columns"]}
+        assert [j.pk for j in columns[JobStatus.PRINTING]["jobs"]] == [job.pk]
+        assert f'id="job-card-{job.pk}"' in response.content.decode()
+
+    def test_stream_resumes_from_last_event_id(self, monkeypatch, client, counter_user, job):
+        monkeypatch.setattr(board, "STREAM_SECONDS", 0)
+        for _ in range(3):
+            board.publish([job.pk])
+        client.force_login(counter_user)
+        response = client.get(
+            reverse("production:board_stream"), {"cursor": "0"}, HTTP_LAST_EVENT_ID="2"
+        )
+
+        assert response["Content-Type"] == "text/event-stream"
+        chunks = [c.decode() for c in response.streaming_content]
+        assert [i for i, _, _ in _events(chunks)] == ["3"]
@@ -0,0 +1,188 @@
+"""
+Tests for the material forecast (production/forecast.py).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from jobs.models import Job, JobStatus
+from production import forecast, stock
+from production.models import Material, ProductType
+
+TODAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def vinyl(db):
+    return Material.objects.create(
+        name="ไวนิล",
+        unit="ตร.ม.",
+        cost_per_unit=Decimal("40"),
+        quantity_in_stock=Decimal("10"),
+        min_quantity=2,
+    )
+
+
+@pytest.fixture
+def banner(product_type, vinyl):
+    product_type.material = vinyl
+    product_type.material_per_unit = Decimal("1")
+    product_type.waste_percent = Decimal("10")
+    product_type.save()
+    return product_type
+
+
+def _job(customer, product_type, counter_user, **kwargs):
+    fields = {"title": "งาน", "quantity": 1, "width_cm": 200, "height_cm": 100, "quoted_price": 300}
+    fields.update(kwargs)
+    return Job.objects.create(
+        customer=customer, product_type=product_type, created_by=counter_user, **fields
+    )
+
+
+@pytest.mark.django_db
+class TestDemand:
+    def test_need_per_pricing_method_with_waste(self, banner, vinyl, customer, counter_user):
+        _job(customer, banner, counter_user, quantity=2)  # 2 × 2 ตร.ม. + 10%
+        stickers = ProductType.objects.create(
+            name="สติกเกอร์",
+            unit="ชิ้น",
+            base_price=5,
+            pricing_method="per_unit",
+            material=vinyl,
+            material_per_unit=Decimal("0.01"),
+        )
+        _job(customer, stickers, counter_user, quantity=100, width_cm=None, height_cm=None)
+        flat = ProductType.objects.create(
+            name="ออกแบบ",
+            unit="งาน",
+            base_price=500,
+            pricing_method="flat",
+            material=vinyl,
+            material_per_unit=3,
+        )
+        _job(customer, flat, counter_user, width_cm=None, height_cm=None)
+
+        f = forecast.forecast(TODAY)[vinyl.pk]
+        assert f.by_product_type == {
+            banner.pk: Decimal("4.4"), stickers.pk: Decimal("1"), flat.pk: Decimal("3")
+        }
+        assert f.need == Decimal("8.4")
+        assert f.remaining == Decimal("1.6")
+
+    def test_matches_estimated_usage(self, banner, customer, counter_user):
+        job = _job(
+            customer, banner, counter_user, quantity=3, width_cm=Decimal("150.5"), height_cm=90
+        )
+        ((_, _, _, need),) = forecast.pipeline_demand()
+        assert need == stock.estimated_usage(job) == Decimal("4.470")
+
+    def test_only_unproduced_pipeline_jobs(self, banner, vinyl, customer, counter_user):
+        _job(customer, banner, counter_user)
+        _job(customer, banner, counter_user, status=JobStatus.COMPLETED)
+        _job(customer, banner, counter_user, status=JobStatus.CANCELLED)
+        used = _job(customer, banner, counter_user, status=JobStatus.PRINTING)
+        stock.record_usage([(used.pk, vinyl.pk, "2", "")])
+
+        assert forecast.forecast(TODAY)[vinyl.pk].need == Decimal("2.2")
+
+    def test_demand_is_one_query(self, banner, customer, counter_user):
+        for i in range(20):
+            _job(customer, banner, counter_user, due_date=TODAY + timedelta(days=i % 4))
+        with CaptureQueriesContext(connection) as ctx:
+            rows = forecast.pipeline_demand()
+        assert len(ctx.captured_queries) == 1
+        assert len(rows) == 4  # grouped per due date
+
+
+@pytest.mark.django_db
+class TestStockout:
+    def test_first_due_date_the_stock_cannot_cover(self, banner, vinyl, customer, counter_user):
+        # 10 in stock, 2.2 per job
+        for offset in (1, 1, 3, 3, 5):
+            _job(customer, banner, counter_user, due_date=TODAY + timedelta(days=offset))
+        assert forecast.forecast(TODAY)[vinyl.pk].stockout_date == TODAY + timedelta(days=5)
+
+    def test_undated_and_overdue_jobs_are_due_today(self, banner, vinyl, customer, counter_user):
+        for _ in range(4):
+            _job(customer, banner, counter_user)
+        _job(customer, banner, counter_user, due_date=TODAY - timedelta(days=3))
+        assert forecast.forecast(TODAY)[vinyl.pk].stockout_date == TODAY
+
+    def test_out_of_stock_is_today(self, vinyl):
+        stock.adjust(vinyl, "-10")
+        assert forecast.forecast(TODAY)[vinyl.pk].stockout_date == TODAY
+
+    def test_covered_pipeline_runs_down_at_daily_usage(
+        self, settings, banner, vinyl, customer, counter_user
+    ):
+        settings.MATERIAL_FORECAST_LOOKBACK_DAYS = 10
+        done = _job(customer, banner, counter_user, status=JobStatus.COMPLETED)
+        stock.receive(vinyl, "10")
+        stock.record_usage([(done.pk, vinyl.pk, "5", "")])  # 0.5 a day, 15 left
+        _job(customer, banner, counter_user, due_date=TODAY + timedelta(days=1))  # 12.8 left
+
+        f = forecast.forecast(TODAY)[vinyl.pk]
+        assert f.daily_usage == Decimal("0.5")
+        assert f.stockout_date == TODAY + timedelta(days=25)
+
+    def test_no_usage_and_covered_has_no_date(self, vinyl):
+        assert forecast.forecast(TODAY)[vinyl.pk].stockout_date is None
+
+
+@pytest.mark.django_db
+class TestRun:
+    def test_stores_forecast_on_materials(self, banner, vinyl, customer, counter_user):
+        for _ in range(5):
+            _job(customer, banner, counter_user)
+        forecast.run(TODAY)
+
+        vinyl.refresh_from_db()
+        assert vinyl.projected_need == Decimal("11")
+        assert vinyl.stockout_date == TODAY
+        assert vinyl.forecast_at is not None
+        assert vinyl.quantity_in_stock == Decimal("10")
+
+    def test_material_edit_keeps_forecast(self, banner, vinyl, customer, counter_user):
+        stale = Material.objects.get(pk=vinyl.pk)
+        _job(customer, banner, counter_user)
+        forecast.run(TODAY)
+        stale.name = "ไวนิลด้าน"
+        stale.save()
+
+        vinyl.refresh_from_db()
+        assert vinyl.projected_need == Decimal("2.2")
+
+    def test_task(self, vinyl):
+        from production.tasks import forecast_materials
+
+        assert forecast_materials() == "materials forecast: 1, stock-out predicted: 0"
+
+
+@pytest.mark.django_db
+class TestAlerts:
+    @pytest.fixture
+    def email_alerts(self, settings):
+        from documents.models import Setting
+
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        Setting.objects.create(key="notification_email_enabled", value="1")
+        Setting.objects.create(key="notification_email_recipient", value="owner@example.com")
+
+    def test_alerts_before_stock_runs_low(
+        self, email_alerts, banner, vinyl, customer, counter_user
+    ):
+        from notifications.tasks import send_material_alerts
+
+        assert send_material_alerts() == "no low stock"
+        for _ in range(5):
+            _job(customer, banner, counter_user)
+        forecast.run()
+
+        assert send_material_alerts() == "material_alerts sent: 1"
+        assert "คาดว่าจะหมด" in mail.outbox[0].body
@@ -0,0 +1,186 @@
+"""
+Tests for the pricing engine (production/pricing.py).
+"""
+
+import random
+import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from customers.models import CustomerType
+from production import pricing
+from production.management.commands.benchmark_pricing import formula_quote
+from production.models import Material, PriceTier, ProductType, SizeBreak
+from production.pricing import UnknownProductType, quote
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables(monkeypatch):
+    monkeypatch.setattr(pricing, "CHECK_INTERVAL", 0)
+    pricing.invalidate()
+
+
+@pytest.fixture
+def product_types(db):
+    return {
+        method: ProductType.objects.create(
+            name=method, base_price=Decimal("137.50"), pricing_method=method
+        )
+        for method in ("per_sqm", "per_unit", "flat")
+    }
+
+
+@pytest.mark.django_db
+class TestMatchesOriginalFormula:
+    def test_random_simple_cases(self, product_types):
+        rng = random.Random(7)
+        for _ in range(500):
+            pt = rng.choice(list(product_types.values()))
+            qty = rng.randint(0, 1000)
+            w = Decimal(rng.randint(0, 50000)) / 100
+            h = Decimal(rng.randint(0, 50000)) / 100
+
+            expected = formula_quote(pt.pk, qty, w, h).quantize(Decimal("0.01"))
+            assert quote(pt.pk, qty, w, h) == expected, (pt.pricing_method, qty, w, h)
+
+    def test_no_queries_once_compiled(self, product_types, django_assert_num_queries):
+        quote(product_types["per_sqm"].pk, 1, 100, 100)
+        with django_assert_num_queries(0):
+            for pt in product_types.values():
+                quote(pt.pk, 3, 120, 80)
+
+    def test_unknown_or_inactive(self, product_types):
+        with pytest.raises(UnknownProductType):
+            quote(0, 1, 100, 100)
+        ProductType.objects.filter(pk=product_types["flat"].pk).update(is_active=False)
+        pricing.invalidate()
+        with pytest.raises(UnknownProductType):
+            quote(product_types["flat"].pk, 1, 0, 0)
+
+    def test_negative_input(self, product_types):
+        with pytest.raises(ValueError):
+            quote(product_types["per_unit"].pk, -1, 0, 0)
+
+
+@pytest.mark.django_db
+class TestRules:
+    def test_quantity_tiers(self, product_types):
+        pt = product_types["per_unit"]
+        PriceTier.objects.create(product_type=pt, min_quantity=100, unit_price=Decimal("2.00"))
+        PriceTier.objects.create(product_type=pt, min_quantity=500, unit_price=Decimal("1.50"))
+
+        assert quote(pt.pk, 99, 0, 0) == Decimal("13612.50")
+        assert quote(pt.pk, 100, 0, 0) == Decimal("200.00")
+        assert quote(pt.pk, 499, 0, 0) == Decimal("998.00")
+        assert quote(pt.pk, 500, 0, 0) == Decimal("750.00")
+
+    def test_flat_tier_is_a_package_price(self, product_types):
+        pt = product_types["flat"]
+        PriceTier.objects.create(product_type=pt, min_quantity=500, unit_price=Decimal("900"))
+
+        assert quote(pt.pk, 100, 0, 0) == Decimal("137.50")
+        assert quote(pt.pk, 500, 0, 0) == Decimal("900.00")
+
+    def test_size_breaks_and_lowest_rate_wins(self, product_types):
+        pt = product_types["per_sqm"]
+        SizeBreak.objects.create(
+            product_type=pt, min_area_sqm=Decimal("2"), price_per_sqm=Decimal("120")
+        )
+        PriceTier.objects.create(product_type=pt, min_quantity=10, unit_price=Decimal("110"))
+
+        assert quote(pt.pk, 1, 100, 100) == Decimal("137.50")  # 1 m²: base rate
+        assert quote(pt.pk, 1, 200, 100) == Decimal("240.00")  # 2 m² piece: size break
+        assert quote(pt.pk, 10, 200, 100) == Decimal("2200.00")  # both apply: tier is lower
+
+    def test_material_cost_per_unit(self, product_types):
+        vinyl = Material.objects.create(name="ไวนิล", unit="ตร.ม.", cost_per_unit=Decimal("40"))
+        pt = product_types["per_sqm"]
+        pt.material = vinyl
+        pt.material_per_unit = Decimal("1.1")
+        pt.save()
+
+        assert quote(pt.pk, 2, 100, 50) == Decimal("181.50")  # (137.50 + 44) × 1 m²
+
+    def test_customer_type_discount(self, product_types):
+        vip = CustomerType.objects.create(name="VIP", discount_percent=Decimal("10"))
+        pt = product_types["per_unit"]
+
+        assert quote(pt.pk, 2, 0, 0, vip) == Decimal("247.50")
+        assert quote(pt.pk, 2, 0, 0, vip.pk) == Decimal("247.50")
+        assert quote(pt.pk, 2, 0, 0, None) == Decimal("275.00")
+
+
+@pytest.mark.django_db
+class TestInvalidation:
+    def test_product_type_change_recompiles(self, product_types):
+        pt = product_types["per_unit"]
+        assert quote(pt.pk, 1, 0, 0) == Decimal("137.50")
+
+        pt.base_price = Decimal("200")
+        pt.save()
+        assert quote(pt.pk, 1, 0, 0) == Decimal("200.00")
+
+        tier = PriceTier.objects.create(product_type=pt, min_quantity=1, unit_price=Decimal("180"))
+        assert quote(pt.pk, 1, 0, 0) == Decimal("180.00")
+        tier.delete()
+        assert quote(pt.pk, 1, 0, 0) == Decimal("200.00")
+
+    def test_other_worker_bump_is_picked_up(self, product_types):
+        pt = product_types["per_unit"]
+        quote(pt.pk, 1, 0, 0)
+        ProductType.objects.filter(pk=pt.pk).update(base_price=Decimal("99"))
+        assert quote(pt.pk, 1, 0, 0) == Decimal("137.50")  # update() sends no signal
+
+        pricing.cache.incr(pricing.VERSION_KEY)  # as another worker's invalidate() would
+        assert quote(pt.pk, 1, 0, 0) == Decimal("99.00")
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+    def test_quote_is_fast(self, product_types):
+        ids = [pt.pk for pt in product_types.values()]
+        quote(ids[0], 1, 100, 100)
+
+        start = time.perf_counter()
+        for i in range(10000):
+            quote(ids[i % 3], i % 200 + 1, 150, 90)
+        per_quote = (time.perf_counter() - start) / 10000
+
+        assert per_quote < 0.0005
+
+    def test_command(self, product_types):
+        out = StringIO()
+        call_command("benchmark_pricing", "--quotes", "200", stdout=out)
+        assert "pricing.quote" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestCalculatePriceView:
+    def test_applies_customer_discount(self, client, counter_user, customer, product_type):
+        customer.customer_type.discount_percent = Decimal("20")
+        customer.customer_type.save()
+        client.force_login(counter_user)
+
+        response = client.get(
+            reverse("jobs:calculate_price"),
+            {
+                "product_type": product_type.pk,
+                "quantity": 2,
+                "width": 100,
+                "height": 100,
+                "customer": customer.pk,
+            },
+        )
+
+        assert response.context["price"] == Decimal("240.00")
+
+    def test_bad_input(self, client, counter_user, product_type):
+        client.force_login(counter_user)
+        response = client.get(
+            reverse("jobs:calculate_price"), {"product_type": product_type.pk, "quantity": -1}
+        )
+        assert response.status_code == 400
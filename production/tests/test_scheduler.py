@@ -0,0 +1,235 @@
+"""
+Tests for the production scheduler (production/scheduler.py).
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job, JobStatus
+from production import scheduler
+from production.models import Station
+
+MONDAY = date(2026, 3, 2)
+EARLY = timezone.make_aware(datetime(2026, 3, 2, 8, 0))  # before DAY_START
+
+
+def _station(pk=1, **kwargs):
+    fields = {
+        "name": f"เครื่อง {pk}", "stage": Station.Stage.PRINTING, "units_per_hour": Decimal("60")
+    }
+    fields.update(kwargs)
+    return Station(pk=pk, **fields)
+
+
+def _row(pk, due=None, material=1, quantity=60, method="per_unit", width=None, height=None):
+    return {
+        "id": pk,
+        "due_date": due,
+        "created_at": EARLY - timedelta(days=1) + timedelta(minutes=pk),
+        "quantity": quantity,
+        "width_cm": width,
+        "height_cm": height,
+        "pricing_method": method,
+        "material_id": material,
+    }
+
+
+def _order(slots, station_id=1):
+    ordered = sorted(slots.values(), key=lambda s: s.sequence)
+    return [s.job_id for s in ordered if s.station_id == station_id]
+
+
+class TestSequence:
+    def test_work_minutes(self):
+        station = _station(sqm_per_hour=Decimal("12"), min_minutes=5)
+        banner = _row(1, method="per_sqm", width=Decimal(200), height=Decimal(100), quantity=3)
+        assert scheduler.work_minutes(banner, station) == 30
+        assert scheduler.work_minutes(_row(1, quantity=90), station) == 90
+        assert scheduler.work_minutes(_row(1, method="flat"), station) == 5
+        assert scheduler.work_minutes(_row(1, quantity=1), station) == 5
+
+    def test_earliest_due_date_first_undated_last(self):
+        rows = [_row(1), _row(2, due=MONDAY + timedelta(days=3)), _row(3, due=MONDAY)]
+        assert _order(scheduler.sequence(rows, [_station()], EARLY)) == [3, 2, 1]
+
+    def test_same_day_jobs_grouped_by_material(self):
+        rows = [
+            _row(1, due=MONDAY, material=1),
+            _row(2, due=MONDAY, material=2),
+            _row(3, due=MONDAY, material=1),
+        ]
+        assert _order(scheduler.sequence(rows, [_station(setup_minutes=30)], EARLY)) == [1, 3, 2]
+
+    def test_material_stays_on_its_station(self):
+        stations = [_station(1, setup_minutes=30), _station(2, setup_minutes=30)]
+        rows = [
+            _row(1, due=MONDAY, material=1),
+            _row(2, due=MONDAY, material=2),
+            _row(3, due=MONDAY + timedelta(days=1), material=2),
+            _row(4, due=MONDAY + timedelta(days=1), material=1),
+        ]
+        slots = scheduler.sequence(rows, stations, EARLY)
+        assert slots[4].station_id == slots[1].station_id
+        assert slots[3].station_id == slots[2].station_id
+
+    def test_times_follow_the_working_day(self):
+        station = _station(hours_per_day=Decimal("8"))
+        rows = [
+            _row(1, due=MONDAY, quantity=240),
+            _row(2, due=MONDAY, quantity=240),
+            _row(3, due=MONDAY),
+        ]
+        slots = scheduler.sequence(rows, [station], EARLY)
+
+        assert slots[1].start == timezone.make_aware(datetime(2026, 3, 2, 9, 0))
+        assert slots[1].finish == timezone.make_aware(datetime(2026, 3, 2, 13, 0))
+        # closing time, same day
+        assert slots[2].finish == timezone.make_aware(datetime(2026, 3, 2, 17, 0))
+        assert slots[3].start == timezone.make_aware(datetime(2026, 3, 3, 9, 0))
+        assert [s.late for s in (slots[1], slots[2], slots[3])] == [False, False, True]
+
+    def test_after_hours_starts_next_morning(self):
+        evening = timezone.make_aware(datetime(2026, 3, 2, 18, 30))
+        slots = scheduler.sequence([_row(1)], [_station()], evening)
+        assert slots[1].start == timezone.make_aware(datetime(2026, 3, 3, 9, 0))
+
+    def test_no_stations_no_plan(self):
+        assert scheduler.sequence([_row(1)], [], EARLY) == {}
+
+    def test_two_thousand_jobs_in_under_a_second(self):
+        stations = [
+            _station(pk, setup_minutes=15, sqm_per_hour=Decimal("15")) for pk in range(1, 5)
+        ]
+        rows = [
+            _row(
+                i,
+                due=MONDAY + timedelta(days=i % 10) if i % 7 else None,
+                material=i % 5,
+                method=("per_sqm", "per_unit", "flat")[i % 3],
+                width=Decimal(120),
+                height=Decimal(80),
+                quantity=1 + i % 20,
+            )
+            for i in range(2000)
+        ]
+        start = time.perf_counter()
+        slots = scheduler.sequence(rows, stations, EARLY)
+        assert time.perf_counter() - start < 1
+        assert len(slots) == 2000
+
+
+@pytest.fixture
+def printer(db):
+    return Station.objects.create(
+        name="Roland", stage=Station.Stage.PRINTING, sqm_per_hour=Decimal("10")
+    )
+
+
+def _job(customer, product_type, counter_user, status=JobStatus.PRINTING, **kwargs):
+    job = Job.objects.create(
+        customer=customer,
+        product_type=product_type,
+        title="ป้าย",
+        width_cm=200,
+        height_cm=100,
+        quoted_price=300,
+        created_by=counter_user,
+        **kwargs,
+    )
+    Job.objects.filter(pk=job.pk).update(status=status)
+    job.status = status
+    return job
+
+
+@pytest.mark.django_db
+class TestPlan:
+    def test_plan_is_cached_per_stage(self, printer, customer, product_type, counter_user):
+        job = _job(customer, product_type, counter_user)
+        with CaptureQueriesContext(connection) as ctx:
+            assert list(scheduler.plan("printing")) == [job.pk]
+        assert len(ctx.captured_queries) == 2  # stations + queued jobs
+        with CaptureQueriesContext(connection) as ctx:
+            scheduler.plan("printing")
+        assert len(ctx.captured_queries) == 0
+
+    def test_transition_replans_only_touched_stages(
+        self, printer, customer, product_type, counter_user, django_capture_on_commit_callbacks
+    ):
+        job = _job(customer, product_type, counter_user)
+        scheduler.schedule()
+        with django_capture_on_commit_callbacks(execute=True):
+            job.transition_to(JobStatus.CUTTING, changed_by=counter_user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert scheduler.plan("printing") == {}
+            scheduler.plan("cutting")
+            scheduler.plan("laminating")
+        assert len(ctx.captured_queries) == 4  # laminating still cached
+
+    def test_editing_a_queued_job_replans_its_stage(
+        self, printer, customer, product_type, counter_user, django_capture_on_commit_callbacks
+    ):
+        job = _job(customer, product_type, counter_user)
+        other = _job(customer, product_type, counter_user)
+        assert _order(scheduler.plan("printing"), printer.pk) == [job.pk, other.pk]
+        other.due_date = timezone.localdate()
+        with django_capture_on_commit_callbacks(execute=True):
+            other.save()
+            # not before commit, or a concurrent read would cache the old plan
+            assert _order(scheduler.plan("printing"), printer.pk) == [job.pk, other.pk]
+        assert _order(scheduler.plan("printing"), printer.pk) == [other.pk, job.pk]
+
+    def test_stages_touched(self):
+        assert scheduler.stages_touched(JobStatus.PRINTING) == ["printing"]
+        assert scheduler.stages_touched(JobStatus.LAMINATING) == [
+            "printing", "cutting", "laminating"
+        ]
+        assert scheduler.stages_touched(JobStatus.DESIGNING) == []
+
+
+@pytest.mark.django_db
+class TestQueueView:
+    @pytest.fixture
+    def operator_user(self, db):
+        from accounts.models import Role
+
+        return get_user_model().objects.create_user(
+            username="op", password="testpass123", role=Role.OPERATOR
+        )
+
+    def test_operator_sees_own_stations_in_sequence(
+        self, client, operator_user, printer, customer, product_type, counter_user
+    ):
+        printer.operator = operator_user
+        printer.save()
+        Station.objects.create(name="โต๊ะตัด", stage=Station.Stage.CUTTING)
+        today = timezone.localdate()
+        later = _job(customer, product_type, counter_user, due_date=today + timedelta(days=5))
+        sooner = _job(customer, product_type, counter_user, due_date=today + timedelta(days=1))
+        cutting = _job(customer, product_type, counter_user, status=JobStatus.CUTTING)
+
+        client.force_login(operator_user)
+        jobs = client.get(reverse("production:queue")).context["jobs"]
+        assert [job.pk for job in jobs] == [sooner.pk, later.pk]
+        assert jobs[0].slot.sequence == 1 and jobs[0].station == printer
+
+        jobs = client.get(reverse("production:queue"), {"all": "1"}).context["jobs"]
+        assert {job.pk for job in jobs} == {sooner.pk, later.pk, cutting.pk}
+
+    def test_without_stations_orders_by_due_date(
+        self, client, owner_user, customer, product_type, counter_user
+    ):
+        undated = _job(customer, product_type, counter_user)
+        dated = _job(customer, product_type, counter_user, due_date=timezone.localdate())
+        client.force_login(owner_user)
+        response = client.get(reverse("production:queue"))
+        assert [job.pk for job in response.context["jobs"]] == [dated.pk, undated.pk]
+        assert "คาดว่าเสร็จ" not in response.content.decode()
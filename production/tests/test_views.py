@@ -0,0 +1,41 @@
+"""Tests for the production queue's HTMX status endpoint."""
+
+import pytest
+from django.urls import reverse
+
+from accounts.models import Role, User
+from jobs.models import Job, JobStatus
+
+
+@pytest.fixture
+def operator_client(client, db):
+    operator = User.objects.create_user(username="operator", password="x", role=Role.OPERATOR)
+    client.force_login(operator)
+    return client
+
+
+@pytest.mark.django_db
+class TestUpdateStatus:
+    def test_moves_job_and_returns_card(self, operator_client, job):
+        Job.objects.filter(pk=job.pk).update(status=JobStatus.PRINTING)
+        url = reverse("production:update_status", args=[job.pk])
+
+        response = operator_client.post(url, {"status": JobStatus.READY})
+
+        assert response.status_code == 200
+        assert f'id="job-card-{job.pk}"' in response.content.decode()
+        job.refresh_from_db()
+        assert job.status == JobStatus.READY
+
+    def test_job_already_moved_shows_current_card(self, operator_client, job):
+        Job.objects.filter(pk=job.pk).update(status=JobStatus.COMPLETED)
+        url = reverse("production:update_status", args=[job.pk])
+
+        response = operator_client.post(url, {"status": JobStatus.READY})
+
+        # swapped by HTMX in place of the stale card
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert f'id="job-card-{job.pk}"' in body
+        assert JobStatus.COMPLETED.label in body
+        assert "ถูกเปลี่ยนสถานะไปแล้ว" in body
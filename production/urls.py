@@ -7,4 +7,8 @@ app_name = "production"
 urlpatterns = [
     path("queue/", views.production_queue, name="queue"),
     path("queue/<int:job_id>/status/", views.update_job_status, name="update_status"),
+    path("queue/bulk-ready/", views.bulk_mark_ready, name="bulk_ready"),
+    path("queue/usage/", views.record_usage, name="record_usage"),
+    path("board/", views.production_board, name="board"),
+    path("board/stream/", views.board_stream, name="board_stream"),
 ]
@@ -1,9 +1,13 @@
 """Production queue views — mobile-first for operators."""
 
+from datetime import date
+
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
-from django.shortcuts import get_object_or_404, render
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
 
+from accounts.idempotency import idempotent
 from accounts.mixins import role_required
 from accounts.models import Role
 from jobs.models import Job, JobStatus
@@ -12,18 +16,45 @@ from jobs.models import Job, JobStatus
 @login_required
 def production_queue(request):
     """
-    Mobile-first production queue.
-    Shows jobs in PRINTING and CUTTING status, ordered by created date.
+    Mobile-first production queue, in the order production/scheduler.py plans.
+
+    An operator who runs stations sees those stations' jobs with predicted
+    finish times; ?all=1 (and everyone else) shows the whole floor.
     """
-    jobs = (
-        Job.objects.filter(status__in=[JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING])
-        .select_related("customer", "product_type")
-        .order_by("created_at")
+    from .models import Station
+    from .scheduler import STAGES, schedule
+
+    slots = schedule()
+    stations = {station.pk: station for station in Station.objects.all()}
+    mine = {pk for pk, station in stations.items() if station.operator_id == request.user.pk}
+    show_all = request.GET.get("all") == "1" or not mine
+
+    jobs = list(Job.objects.filter(status__in=STAGES).select_related("customer", "product_type"))
+    for job in jobs:
+        job.slot = slots.get(job.pk)
+        job.station = stations.get(job.slot.station_id) if job.slot else None
+    if not show_all:
+        jobs = [job for job in jobs if job.slot and job.slot.station_id in mine]
+    # planned jobs by start time; a stage without stations falls back to due date
+    jobs.sort(
+        key=lambda job: (0, job.slot.start, job.slot.station_id)
+        if job.slot
+        else (1, job.due_date or date.max, job.created_at)
+    )
+    return render(
+        request,
+        "production/queue.html",
+        {
+            "jobs": jobs,
+            "show_all": show_all,
+            "has_stations": bool(mine),
+            "today": timezone.localdate(),
+        },
     )
-    return render(request, "production/queue.html", {"jobs": jobs})
 
 
 @role_required(Role.OPERATOR, Role.OWNER)
+@idempotent
 def update_job_status(request, job_id):
     """HTMX endpoint: advance job to next status from production queue."""
     if request.method != "POST":
@@ -37,5 +68,123 @@ def update_job_status(request, job_id):
     if new_status not in production_statuses:
         return HttpResponse("Invalid status", status=400)
 
-    job.transition_to(new_status, changed_by=request.user)
-    return render(request, "production/partials/job_card.html", {"job": job})
+    context = {"today": timezone.localdate()}
+    try:
+        job.transition_to(new_status, changed_by=request.user)
+    except ValueError:
+        # Another operator already moved this job — show the card as it is now.
+        # 200, not 409: HTMX does not swap error responses.
+        job = Job.objects.select_related("customer").get(pk=job_id)
+        context["notice"] = "งานนี้ถูกเปลี่ยนสถานะไปแล้ว"
+    return render(request, "production/partials/job_card.html", {"job": job, **context})
+
+
+@role_required(Role.OPERATOR, Role.OWNER)
+@idempotent
+def bulk_mark_ready(request):
+    """POST: move all selected queue jobs to READY in one transaction."""
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    job_ids = [int(pk) for pk in request.POST.getlist("job_ids") if pk.isdigit()]
+    if job_ids:
+        Job.objects.filter(
+            status__in=[JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING]
+        ).bulk_transition(job_ids, JobStatus.READY, changed_by=request.user)
+    return redirect("production:queue")
+
+
+@role_required(Role.OPERATOR, Role.OWNER)
+@idempotent
+def record_usage(request):
+    """
+    Record the material used on many jobs at once — the end of a print run.
+
+    The form lists the queue (or ?job=1&job=2) with each product type's
+    material and estimated quantity filled in; rows left blank are skipped.
+    """
+    from django.contrib import messages
+
+    from .models import Material
+    from .stock import StockError, estimated_usage
+    from .stock import record_usage as record
+
+    if request.method == "POST":
+        rows = [
+            (job_id, material_id, quantity, notes)
+            for job_id, material_id, quantity, notes in zip(
+                request.POST.getlist("job"),
+                request.POST.getlist("material"),
+                request.POST.getlist("quantity"),
+                request.POST.getlist("notes"),
+            )
+            if job_id.isdigit() and material_id.isdigit() and quantity.strip()
+        ]
+        try:
+            usages = record(rows, user=request.user)
+        except StockError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f"บันทึกการใช้วัสดุ {len(usages)} รายการ")
+            return redirect("production:queue")
+
+    job_ids = [int(pk) for pk in request.GET.getlist("job") if pk.isdigit()]
+    jobs = Job.objects.select_related("customer", "product_type")
+    if job_ids:
+        jobs = jobs.filter(pk__in=job_ids)
+    else:
+        jobs = jobs.filter(status__in=[JobStatus.PRINTING, JobStatus.CUTTING, JobStatus.LAMINATING])
+    jobs = list(jobs.order_by("created_at"))
+    for job in jobs:
+        job.estimated_usage = estimated_usage(job)
+    return render(
+        request,
+        "production/record_usage.html",
+        {"jobs": jobs, "materials": Material.objects.filter(is_active=True)},
+        status=400 if request.method == "POST" else 200,
+    )
+
+
+@login_required
+def production_board(request):
+    """Full-screen production board for shop-floor displays, kept live by board_stream."""
+    from .board import BOARD_STATUSES, board_jobs, counts, current_version
+
+    # read the cursor first: anything published while the page renders is replayed
+    cursor = current_version()
+    by_status = {status: [] for status in BOARD_STATUSES}
+    for job in board_jobs():
+        by_status[job.status].append(job)
+    stage_counts = counts()
+    columns = [
+        {
+            "status": status,
+            "label": JobStatus(status).label,
+            "count": stage_counts[status],
+            "jobs": by_status[status],
+        }
+        for status in BOARD_STATUSES
+    ]
+    return render(
+        request,
+        "production/board.html",
+        {"columns": columns, "cursor": cursor, "today": timezone.localdate()},
+    )
+
+
+@login_required
+def board_stream(request):
+    """
+    SSE: board changes after the client's cursor (Last-Event-ID on reconnect,
+    else ?cursor= from the page), then live ones until the stream times out.
+    """
+    from django.http import StreamingHttpResponse
+
+    from .board import stream
+
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("cursor", "")
+    cursor = int(raw) if raw.isdigit() else None
+    response = StreamingHttpResponse(stream(cursor), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: pass events through as they are written
+    return response
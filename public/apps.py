@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PublicConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "public"
+
+    def ready(self):
+        from .tracking import connect_invalidation_hooks
+
+        connect_invalidation_hooks()
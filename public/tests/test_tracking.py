@@ -0,0 +1,110 @@
+"""Tests for the cached public tracking page (public/tracking.py)."""
+
+import re
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.models import Job, JobApproval, JobFile, JobStatus
+
+
+def _url(job):
+    return reverse("public:track", kwargs={"token": job.tracking_token})
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_revalidation_gets_304(self, client, job):
+        first = client.get(_url(job))
+        assert first.status_code == 200
+        assert "no-cache" in first["Cache-Control"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = client.get(_url(job), HTTP_IF_NONE_MATCH=first["ETag"])
+        assert again.status_code == 304
+        assert again["ETag"] == first["ETag"]
+        assert len(ctx.captured_queries) == 1
+
+    def test_page_comes_from_the_cache(self, client, job):
+        client.get(_url(job))
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(_url(job))
+        assert response.status_code == 200
+        assert len(ctx.captured_queries) == 1
+        assert f"#{job.pk}" in response.content.decode()
+
+    def test_status_change_busts_the_etag(self, client, job, counter_user):
+        before = client.get(_url(job))["ETag"]
+        job.transition_to(JobStatus.DESIGNING, changed_by=counter_user)
+        after = client.get(_url(job), HTTP_IF_NONE_MATCH=before)
+        assert after.status_code == 200
+        assert after["ETag"] != before
+
+    def test_file_and_approval_changes_bust_the_etag(self, client, job, counter_user):
+        tags = [client.get(_url(job))["ETag"]]
+        proof = JobFile.objects.create(
+            job=job,
+            file="jobs/proof.png",
+            file_type=JobFile.FileType.PROOF,
+            uploaded_by=counter_user,
+        )
+        tags.append(client.get(_url(job))["ETag"])
+        proof.delete()
+        tags.append(client.get(_url(job))["ETag"])
+        JobApproval.objects.create(job=job, decision=JobApproval.Decision.APPROVED)
+        tags.append(client.get(_url(job))["ETag"])
+        assert len(set(tags)) == 4
+
+    def test_confirmation_flag_has_its_own_etag(self, client, job):
+        plain = client.get(_url(job))["ETag"]
+        assert client.get(_url(job), {"approved": "1"})["ETag"] != plain
+
+    def test_unknown_token(self, client):
+        token = "00000000-0000-0000-0000-000000000000"
+        response = client.get(reverse("public:track", kwargs={"token": token}))
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestCsrf:
+    def test_cached_page_carries_each_visitors_token(self, job, customer):
+        Job.objects.filter(pk=job.pk).update(status=JobStatus.AWAITING_APPROVAL)
+        first, second = Client(enforce_csrf_checks=True), Client(enforce_csrf_checks=True)
+        first.get(_url(job))
+        page = second.get(_url(job)).content.decode()
+
+        assert "__tracking_csrf_token__" not in page
+        csrf = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page).group(1)
+        response = second.post(
+            reverse("public:approve", kwargs={"token": job.tracking_token}),
+            {"csrfmiddlewaretoken": csrf},
+        )
+        assert response.status_code == 302
+        job.refresh_from_db()
+        assert job.status == JobStatus.APPROVED
+
+
+@pytest.mark.django_db
+class TestRateLimit:
+    def test_per_token(self, settings, client, job):
+        settings.PUBLIC_TRACKING_RATE_PER_TOKEN = 2
+        assert [client.get(_url(job)).status_code for _ in range(3)] == [200, 200, 429]
+
+    def test_per_ip(self, settings, client, job, customer, product_type, counter_user):
+        settings.PUBLIC_TRACKING_RATE_PER_IP = 2
+        other = Job.objects.create(
+            customer=customer,
+            product_type=product_type,
+            title="งานอื่น",
+            quoted_price=100,
+            created_by=counter_user,
+        )
+        client.get(_url(job))
+        client.get(_url(other))
+        response = client.get(_url(job))
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) <= 60
+        assert client.get(_url(job), REMOTE_ADDR="10.0.0.2").status_code == 200
@@ -0,0 +1,138 @@
+"""
+Cached public tracking page.
+
+Customers open their tracking link many times, and LINE link previews fetch
+it again each time it is shared, so job_tracking does not rebuild the page
+on every hit:
+
+  - etag() reads one row: the job's updated_at with its latest status
+    history and approval ids, a version bumped when its files change (see
+    connect_invalidation_hooks()) and the current TTL window. A client that
+    already has the page gets a 304.
+  - render() keeps the page in the shared cache under that ETag for TTL
+    seconds. The approval forms' CSRF token is left as a placeholder in the
+    cached HTML and filled in for each request.
+  - allow() caps requests per client IP and per token in one-minute windows
+    (PUBLIC_TRACKING_RATE_PER_IP, PUBLIC_TRACKING_RATE_PER_TOKEN), so a
+    crawler storm is turned away before it reaches the database.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from jobs.models import Job, JobFile
+
+TTL = 300
+RATE_WINDOW = 60
+CSRF_PLACEHOLDER = "__tracking_csrf_token__"
+
+
+def _files_version_key(job_id):
+    return f"public:tracking:files:{job_id}:version"
+
+
+def invalidate_files(job_id):
+    """Bump the job's file version so its cached page and ETag go stale."""
+    key = _files_version_key(job_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def etag(token, approved=False, revised=False):
+    """Current ETag of the tracking page for `token` — None when there is no such job."""
+    row = (
+        Job.objects.filter(tracking_token=token)
+        .values_list("pk", "updated_at")
+        .annotate(last_history=Max("status_history__id"), last_approval=Max("approvals__id"))
+        .first()
+    )
+    if row is None:
+        return None
+    pk, updated_at, last_history, last_approval = row
+    files = cache.get(_files_version_key(pk), 1)
+    window = int(time.time() // TTL)
+    flags = f"{'a' if approved else ''}{'r' if revised else ''}"
+    return (
+        f"track-{pk}-{updated_at.timestamp():.6f}-{last_history or 0}-{last_approval or 0}"
+        f"-{files}-{window}{flags}"
+    )
+
+
+def _context(token, approved, revised):
+    job = (
+        Job.objects.select_related("customer", "product_type")
+        .prefetch_related("files")
+        .get(tracking_token=token)
+    )
+    return {
+        "job": job,
+        "history": job.status_history.order_by("-changed_at")[:5],
+        "proof_files": [f for f in job.files.all() if f.file_type == JobFile.FileType.PROOF],
+        "last_approval": job.approvals.order_by("-decided_at").first(),
+        "approved": approved,
+        "revised": revised,
+        "csrf_token": CSRF_PLACEHOLDER,
+    }
+
+
+def render(request, token, tag, approved=False, revised=False):
+    """The page's HTML for ETag `tag`, from cache when stored, with this request's CSRF token."""
+    key = f"public:tracking:{tag}"
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string("public/tracking.html", _context(token, approved, revised))
+        cache.set(key, html, TTL)
+    if CSRF_PLACEHOLDER in html:
+        html = html.replace(CSRF_PLACEHOLDER, get_token(request))
+    return html
+
+
+def _hit(key, limit):
+    if not limit:
+        return True
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, RATE_WINDOW * 2)
+        count = 1
+    return count <= limit
+
+
+def allow(request, token):
+    """False once this client IP or this token has used up its requests for the current minute."""
+    window = int(time.time() // RATE_WINDOW)
+    ip = request.META.get("REMOTE_ADDR", "")
+    per_ip = settings.PUBLIC_TRACKING_RATE_PER_IP
+    per_token = settings.PUBLIC_TRACKING_RATE_PER_TOKEN
+    return _hit(f"public:tracking:rate:ip:{ip}:{window}", per_ip) and _hit(
+        f"public:tracking:rate:token:{token}:{window}", per_token
+    )
+
+
+def retry_after():
+    """Seconds until the current rate window ends."""
+    return RATE_WINDOW - int(time.time()) % RATE_WINDOW
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks — connected in PublicConfig.ready()
+# ---------------------------------------------------------------------------
+
+def _on_file_changed(sender, instance, raw=False, **kwargs):
+    # status and approval changes already show in the ETag's row
+    if not raw:
+        invalidate_files(instance.job_id)
+
+
+def connect_invalidation_hooks():
+    from django.db.models.signals import post_delete, post_save
+
+    post_save.connect(_on_file_changed, sender=JobFile, dispatch_uid="tracking_file_saved")
+    post_delete.connect(_on_file_changed, sender=JobFile, dispatch_uid="tracking_file_deleted")
@@ -5,30 +5,37 @@ The tracking page lets customers check job status via a UUID URL —
 no account required.
 """
 
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
 
 from jobs.models import Job, JobApproval, JobFile, JobStatus
 
+from . import tracking
+
 
 def job_tracking(request, token):
     """Public job status page — accessible via unique URL, no login required."""
-    job = get_object_or_404(
-        Job.objects.select_related("customer", "product_type").prefetch_related("files"),
-        tracking_token=token,
-    )
-    history = job.status_history.order_by("-changed_at")[:5]
-    proof_files = [f for f in job.files.all() if f.file_type == JobFile.FileType.PROOF]
-    last_approval = job.approvals.order_by("-decided_at").first()
-
-    context = {
-        "job": job,
-        "history": history,
-        "proof_files": proof_files,
-        "last_approval": last_approval,
-        "approved": request.GET.get("approved") == "1",
-        "revised": request.GET.get("revised") == "1",
-    }
-    return render(request, "public/tracking.html", context)
+    token = str(token)
+    if not tracking.allow(request, token):
+        response = HttpResponse("มีการเปิดหน้านี้บ่อยเกินไป กรุณาลองใหม่อีกครั้งในภายหลัง", status=429)
+        response["Retry-After"] = tracking.retry_after()
+        return response
+
+    approved = request.GET.get("approved") == "1"
+    revised = request.GET.get("revised") == "1"
+    tag = tracking.etag(token, approved, revised)
+    if tag is None:
+        raise Http404
+
+    # 304 when the client's copy is current, otherwise the page from cache
+    etag = quote_etag(tag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(tracking.render(request, token, tag, approved, revised))
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 def job_approve(request, token):